@@ -1,129 +1,140 @@
-import time
-import network
-from machine import Pin, ADC
-from umqtt.simple import MQTTClient
-
-# Configuración WiFi
-WIFI_SSID = "Red-Peter"
-WIFI_PASSWORD = "12345678"
-
-# Configuración MQTT
-MQTT_CLIENT_ID = "esp32_mq04"
-MQTT_BROKER = "broker.emqx.io"
-MQTT_PORT = 1883
-MQTT_TOPIC = "gds0653/mq-04"
-
-# Configuración del MQ-04 (Sensor de metano/gas natural)
-MQ04_ANALOG_PIN = 34  # Pin ADC para la lectura analógica
-MQ04_DIGITAL_PIN = 14  # Pin digital para detección de umbral
-
-# Configuración ADC para lectura analógica
-adc = ADC(Pin(MQ04_ANALOG_PIN))
-adc.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
-adc.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
-
-# Configuración del pin digital (para detección de umbral)
-digital_sensor = Pin(MQ04_DIGITAL_PIN, Pin.IN)
-
-# LED para indicación visual
-led_onboard = Pin(2, Pin.OUT)
-
-# Variables para control
-ultimo_valor = 0
-ultimo_estado_digital = None
-ultimo_envio = 0
-INTERVALO_ENVIO = 2000  # Enviar datos cada 2 segundos
-UMBRAL_CAMBIO = 100  # Enviar si el valor cambia más de esto
-
-# Conectar a WiFi
-def conectar_wifi():
-    print("Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-    print("\nWiFi Conectada!")
-
-# Conectar a MQTT
-def conectar_mqtt():
-    try:
-        client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
-        client.connect()
-        print("Conectado a MQTT")
-        return client
-    except Exception as e:
-        print(f"Error conectando a MQTT: {e}")
-        return None
-
-# Función para obtener tiempo en milisegundos
-def millis():
-    return time.ticks_ms()
-
-# Inicialización
-print("Iniciando sensor MQ-04 (Metano/Gas Natural)")
-print("¡IMPORTANTE! El sensor necesita tiempo de calentamiento (~3 minutos)")
-conectar_wifi()
-client = conectar_mqtt()
-
-# Tiempo de calentamiento del sensor
-print("Calentando el sensor MQ-04...")
-for i in range(30, 0, -1):
-    print(f"Tiempo restante: {i} segundos")
-    led_onboard.value(i % 2)  # Parpadear LED durante calentamiento
-    time.sleep(1)
-
-print("¡Sensor listo! Monitoreando gas metano/natural...")
-led_onboard.value(0)  # Apagar LED después del calentamiento
-
-# Bucle principal
-while True:
-    try:
-        # Verificar conexión WiFi y MQTT
-        if not network.WLAN(network.STA_IF).isconnected() or client is None:
-            print("Reconectando...")
-            conectar_wifi()
-            client = conectar_mqtt()
-            time.sleep(2)
-            continue
-        
-        # Leer valores del sensor MQ-04
-        valor_analogico = adc.read()  # Valor analógico (0-4095)
-        valor_digital = not digital_sensor.value()  # Normalmente activo en LOW
-        
-        # Convertir valor analógico a voltaje (aproximado)
-        voltaje = valor_analogico * 3.3 / 4095
-        
-        # LED indicador para alerta
-        led_onboard.value(1 if valor_digital else 0)
-        
-        # Obtener tiempo actual
-        ahora = millis()
-        
-        # Determinar si es momento de enviar datos
-        cambio_significativo = abs(valor_analogico - ultimo_valor) > UMBRAL_CAMBIO
-        cambio_digital = valor_digital != ultimo_estado_digital
-        tiempo_envio = ahora - ultimo_envio > INTERVALO_ENVIO
-        
-        if cambio_significativo or cambio_digital or tiempo_envio:
-            # Crear mensaje con formato JSON
-            mensaje = '{"valor":' + str(valor_analogico) + ',"alerta":' + str(1 if valor_digital else 0) + '}'
-            
-            # Publicar en MQTT
-            client.publish(MQTT_TOPIC, mensaje)
-            
-            # Actualizar consola
-            estado = "¡ALERTA! Gas detectado" if valor_digital else "Normal"
-            print(f"Estado: {estado} | Valor: {valor_analogico} | Voltaje: {voltaje:.2f}V")
-            
-            # Actualizar últimos valores
-            ultimo_valor = valor_analogico
-            ultimo_estado_digital = valor_digital
-            ultimo_envio = ahora
-            
-    except Exception as e:
-        print(f"Error: {e}")
-        time.sleep(2)
-        
-    time.sleep(0.1)  # Pequeña pausa
\ No newline at end of file
+import time
+from machine import Pin, ADC
+from almacen import RegistroCircular
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from gases import Calentamiento, SensorGas
+from muestreo import CanalADC, TablaCalibracion
+from politicas import crear
+
+# Configuración WiFi
+WIFI_SSID = "Red-Peter"
+WIFI_PASSWORD = "12345678"
+
+# Configuración MQTT
+MQTT_CLIENT_ID = "esp32_mq04"
+MQTT_BROKER = "broker.emqx.io"
+MQTT_PORT = 1883
+MQTT_TOPIC = "gds0653/mq-04"
+
+# Configuración del MQ-04 (Sensor de metano/gas natural)
+MQ04_ANALOG_PIN = 34  # Pin ADC para la lectura analógica
+MQ04_DIGITAL_PIN = 14  # Pin digital para detección de umbral
+
+# Configuración ADC para lectura analógica
+adc = ADC(Pin(MQ04_ANALOG_PIN))
+adc.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
+adc.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
+
+# Ráfaga de 16 conversiones promediada sin las 4 más bajas ni las 4 más
+# altas (descarta los picos del ADC); corrige la no linealidad con
+# adc_cal.json si la placa está calibrada
+canal = CanalADC(adc, muestras=16, metodo="recortado", recorte=4,
+                 tabla=TablaCalibracion.desde_archivo("adc_cal.json"))
+
+# Concentración de metano con la curva del MQ-4 (Rs/R0 en escala
+# log-log); R0 se calibra en aire limpio al primer arranque (r0.json)
+sensor_gas = SensorGas("MQ-4", gases=["CH4"])
+
+# Calentamiento en segundo plano: se publica desde el arranque con
+# "calentando":1 hasta que la lectura deja de derivar (30 s a 3 min)
+calentamiento = Calentamiento(minimo_ms=30000, maximo_ms=180000)
+
+# Configuración del pin digital (para detección de umbral)
+digital_sensor = Pin(MQ04_DIGITAL_PIN, Pin.IN)
+
+# LED para indicación visual
+led_onboard = Pin(2, Pin.OUT)
+
+# Variables para control
+ultimo_estado_digital = None
+
+# Cuándo publicar: la recta entre dos envíos no se aleja más de 30 cuentas
+# de ninguna lectura, y como mínimo un envío cada 30 s (con la lectura
+# filtrada alcanzan 30 cuentas; sin filtro hacían falta 60-100)
+POLITICA = {"tipo": "puerta", "desviacion": 30, "silencio_max_ms": 30000}
+politica = crear(POLITICA)
+
+# Función para obtener tiempo en milisegundos
+def millis():
+    return time.ticks_ms()
+
+# Registro en flash para no perder lecturas durante cortes de WiFi/MQTT
+CANAL_MQ04 = 0
+almacen = RegistroCircular("mq04.bin", capacidad=4096)
+
+# Tarea de muestreo (la ejecuta el runtime cada 100 ms)
+def muestrear_mq04():
+    global ultimo_estado_digital
+
+    # Leer valores del sensor MQ-04
+    valor_analogico = canal.leer()  # Valor analógico filtrado (0-4095)
+    valor_digital = not digital_sensor.value()  # Normalmente activo en LOW
+
+    recien_listo = not calentamiento.listo and calentamiento.agregar(valor_analogico)
+    if recien_listo:
+        print(f"¡Sensor listo en {calentamiento.listo_ms // 1000} s! Monitoreando gas metano/natural...")
+        # Sin R0 guardado, la lectura ya asentada es la referencia de aire
+        # limpio; si se agotó el plazo derivando no se guarda un R0 malo
+        if not calentamiento.estable:
+            print(f"[ERROR] La lectura sigue derivando ({calentamiento.deriva} cuentas): no se calibra R0")
+        elif not sensor_gas.calibrado:
+            print(f"R0 = {sensor_gas.calibrar(calentamiento.promedio()):.2f} kΩ")
+
+    # LED: parpadea durante el calentamiento, después indica la alerta
+    if calentamiento.listo:
+        led_onboard.value(1 if valor_digital else 0)
+    else:
+        led_onboard.value((time.ticks_ms() // 500) & 1)
+
+    # Determinar si es momento de enviar datos (el fin del calentamiento se publica)
+    if valor_digital != ultimo_estado_digital or recien_listo:
+        valor = politica.forzar(valor_analogico)
+    else:
+        valor = politica.evaluar(valor_analogico)
+    
+    if valor is not None:
+        # Crear mensaje con formato JSON (ppm de CH4 desde la tabla de la
+        # curva cuando hay R0; "calentando":1 mientras el sensor no está listo
+        # e "inestable":1 si terminó el calentamiento sin asentarse)
+        mensaje = '{"valor":' + str(valor) + ',"alerta":' + str(1 if valor_digital else 0)
+        if sensor_gas.calibrado:
+            ppm = int(sensor_gas.ppm(valor))
+            mensaje += ',"ppm":' + str(ppm)
+        else:
+            ppm = "-"
+        if not calentamiento.listo:
+            mensaje += ',"calentando":1'
+        elif not calentamiento.estable:
+            mensaje += ',"inestable":1'
+        mensaje += '}'
+        
+        # Publicar en MQTT (sin conexión solo se guarda el valor en la flash)
+        dispositivo.registrar(CANAL_MQ04, valor, mensaje)
+        
+        # Actualizar consola (voltaje aproximado)
+        voltaje = valor * 3.3 / 4095
+        if not calentamiento.listo:
+            estado = f"Calentando {calentamiento.progreso}%"
+        elif valor_digital:
+            estado = "¡ALERTA! Gas detectado"
+        else:
+            estado = "Normal"
+        print(f"Estado: {estado} | Valor: {valor} | CH4: {ppm} ppm | Voltaje: {voltaje:.2f}V")
+        
+        # Actualizar últimos valores
+        ultimo_estado_digital = valor_digital
+
+# Inicialización
+print("Iniciando sensor MQ-04 (Metano/Gas Natural)")
+print("¡IMPORTANTE! El sensor necesita tiempo de calentamiento (~3 minutos)")
+print("Calentando el sensor MQ-04 (los datos se publican marcados mientras tanto)...")
+
+# WiFi/MQTT se mantienen desde su propia tarea: un corte ya no detiene el muestreo
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
+dispositivo = Dispositivo(conexion, almacen=almacen)
+dispositivo.canal(CANAL_MQ04, MQTT_TOPIC, lambda v: str(int(v)))
+dispositivo.periodico("mq04", 100, muestrear_mq04)
+
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
@@ -1,7 +1,9 @@
 from machine import Pin, ADC
 import time
-import network
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
+from gases import SensorGas
+from muestreo import CanalADC, TablaCalibracion
 
 # Configuración del broker MQTT
 MQTT_BROKER = "broker.emqx.io"
@@ -19,15 +21,19 @@ adc = ADC(Pin(MQ6_ANALOG_PIN))
 adc.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
 adc.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
 
+# Ráfaga de 16 conversiones promediada sin las 4 más bajas ni las 4 más
+# altas (descarta los picos del ADC) y suavizada con un IIR de 1/4;
+# corrige la no linealidad con adc_cal.json si la placa está calibrada
+canal = CanalADC(adc, muestras=16, metodo="recortado", recorte=4, suavizado=2,
+                 tabla=TablaCalibracion.desde_archivo("adc_cal.json"))
+
+# Concentración de GLP con la curva del MQ-6 (Rs/R0 en escala log-log),
+# solo para la consola; R0 se calibra en aire limpio al primer arranque
+sensor_gas = SensorGas("MQ-6", gases=["GLP"])
+
 def conectar_wifi():
-    print("Conectando WiFi...", end="")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect('Red-Peter', '12345678')  # Ajusta los datos de tu red
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.3)
-    print(" ¡Conectado!")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    conectar_red('Red-Peter', '12345678')
 
 def subscribir():
     client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
@@ -51,20 +57,26 @@ for i in range(30, 0, -1):
     print(f"Tiempo restante: {i} segundos")
     time.sleep(1)
 
+# Sin R0 guardado se toma el aire actual como referencia limpia
+if not sensor_gas.calibrado:
+    print("Calibrando R0 en aire limpio...")
+sensor_gas.asegurar_r0(canal.leer)
+print(f"R0 = {sensor_gas.r0:.2f} kΩ")
+
 print("¡Sensor listo! Monitoreando gas LPG/propano...")
 
 # Bucle principal
 while True:
     try:
         # Leer valor analógico del sensor MQ-6
-        valor_analogico = adc.read()  # Valor analógico (0-4095)
+        valor_analogico = canal.leer()  # Valor analógico filtrado (0-4095)
         
         # Publicar valor como string
         mensaje = str(valor_analogico)
         client.publish(MQTT_SENSOR_TOPIC, mensaje.encode())
         
         # Mostrar en consola
-        print(f"[INFO] Valor: {valor_analogico}")
+        print(f"[INFO] Valor: {valor_analogico} | GLP: {sensor_gas.ppm(valor_analogico):.0f} ppm")
         print(f"[INFO] Publicado en {MQTT_SENSOR_TOPIC}: {mensaje}")
         
         # Esperar antes de la siguiente lectura
@@ -1,89 +1,143 @@
-from machine import Pin, ADC
-import time
-import network
-from umqtt.simple import MQTTClient
-
-# Configuración del broker MQTT
-MQTT_BROKER = "broker.emqx.io"
-MQTT_USER = ""
-MQTT_PASSWORD = ""
-MQTT_CLIENT_ID = "esp32_mq135"
-MQTT_SENSOR_TOPIC = "gds0653/mq-135"
-MQTT_PORT = 1883
-
-# Configuración del sensor MQ-135 (Calidad del Aire) - SOLO ANALÓGICO
-MQ135_ANALOG_PIN = 34  # Pin ADC para la lectura analógica
-
-# Configuración de ADC para lectura analógica
-adc = ADC(Pin(MQ135_ANALOG_PIN))
-adc.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
-adc.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
-
-def conectar_wifi():
-    print("Conectando WiFi...", end="")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect('Red-Peter', '12345678')  # Ajusta los datos de tu red
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.3)
-    print(" ¡Conectado!")
-
-def subscribir():
-    client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
-                        user=MQTT_USER, password=MQTT_PASSWORD, keepalive=60)
-    client.connect()
-    print(f"Conectado a {MQTT_BROKER}")
-    print(f"Publicando en el tópico {MQTT_SENSOR_TOPIC}")
-    return client
-
-# Conectar a WiFi
-print("Iniciando sensor MQ-135 (Calidad del Aire) - Solo Analógico")
-print("¡IMPORTANTE! El sensor necesita tiempo de calentamiento (hasta 24h para precisión máxima)")
-print("Para pruebas básicas, 5 minutos de calentamiento son suficientes")
-conectar_wifi()
-
-# Conectar a MQTT
-client = subscribir()
-
-# Tiempo de calentamiento del sensor (versión reducida para pruebas)
-print("Calentando el sensor MQ-135...")
-for i in range(60, 0, -1):
-    if i % 10 == 0:
-        print(f"Tiempo restante: {i} segundos")
-    time.sleep(1)
-
-print("¡Sensor listo para pruebas básicas!")
-print("Nota: Para mayor precisión, el sensor debería estabilizarse durante más tiempo")
-
-# Bucle principal
-while True:
-    try:
-        # Leer valor analógico del sensor MQ-135
-        valor_analogico = adc.read()  # Valor analógico (0-4095)
-        
-        # Publicar valor como string
-        mensaje = str(valor_analogico)
-        client.publish(MQTT_SENSOR_TOPIC, mensaje.encode())
-        
-        # Mostrar en consola con interpretación básica
-        if valor_analogico < 1000:
-            calidad = "Buena"
-        elif valor_analogico < 1800:
-            calidad = "Moderada"
-        else:
-            calidad = "Pobre"
-            
-        print(f"[INFO] Valor MQ-135: {valor_analogico} - Calidad del aire: {calidad}")
-        print(f"[INFO] Publicado en {MQTT_SENSOR_TOPIC}: {mensaje}")
-        
-        # Esperar antes de la siguiente lectura
-        time.sleep(2)
-        
-    except Exception as e:
-        print(f"[ERROR] Error en el loop principal: {e}")
-        time.sleep(5)
-        try:
-            client = subscribir()
-        except:
-            pass
\ No newline at end of file
+from machine import Pin, ADC
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from gases import Calentamiento, SensorGas
+from lotes import Lote
+from muestreo import CanalADC, TablaCalibracion
+from politicas import crear
+
+# Configuración WiFi
+WIFI_SSID = "Red-Peter"
+WIFI_PASSWORD = "12345678"  # Ajusta los datos de tu red
+
+# Configuración del broker MQTT
+MQTT_BROKER = "broker.emqx.io"
+MQTT_USER = ""
+MQTT_PASSWORD = ""
+MQTT_CLIENT_ID = "esp32_mq135"
+MQTT_SENSOR_TOPIC = "gds0653/mq-135"
+MQTT_PORT = 1883
+
+# Configuración del sensor MQ-135 (Calidad del Aire) - SOLO ANALÓGICO
+MQ135_ANALOG_PIN = 34  # Pin ADC para la lectura analógica
+
+# Configuración de ADC para lectura analógica
+adc = ADC(Pin(MQ135_ANALOG_PIN))
+adc.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
+adc.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
+
+# Ráfaga de 16 conversiones promediada sin las 4 más bajas ni las 4 más
+# altas (descarta los picos del ADC) y suavizada con un IIR de 1/4; corrige la no linealidad con
+# adc_cal.json si la placa está calibrada
+canal = CanalADC(adc, muestras=16, metodo="recortado", recorte=4, suavizado=2,
+                 tabla=TablaCalibracion.desde_archivo("adc_cal.json"))
+
+# CO2 equivalente con la curva del MQ-135 (Rs/R0 en escala log-log);
+# R0 se calibra en aire limpio (~400 ppm) al primer arranque (r0.json)
+sensor_gas = SensorGas("MQ-135", gases=["CO2"])
+
+# Calentamiento en segundo plano: los lotes salen desde el arranque con
+# "calentando":1 hasta que la lectura deja de derivar (1 a 5 min; un
+# punto por lectura, así la deriva se mide sobre 40 s). Si a los 5 min
+# sigue derivando, los lotes llevan "inestable":1 y R0 no se calibra
+calentamiento = Calentamiento(minimo_ms=60000, maximo_ms=300000, puntos=20, intervalo_ms=2000)
+
+# Muestreo y envío por lotes
+PERIODO_MUESTREO = 2000   # Una lectura cada 2 segundos (ms)
+MUESTRAS_POR_LOTE = 15    # Un mensaje cada 30 segundos
+EDAD_MAXIMA_LOTE = 30000  # ms
+
+# Qué lecturas entran al lote: solo los vértices de la recta que no se
+# aleja más de 20 cuentas de ninguna lectura (al menos uno por minuto)
+POLITICA = {"tipo": "puerta", "desviacion": 20, "silencio_max_ms": 60000}
+politica = crear(POLITICA)
+
+# Bajo consumo: con True el ESP32 duerme (deep sleep) entre lecturas, las
+# junta en la memoria RTC y enciende la radio solo para subir el lote cada
+# DESPERTARES_POR_ENVIO despertares. El calentador del MQ-135 va a 5 V y
+# sigue encendido mientras el ESP32 duerme
+BAJO_CONSUMO = False
+DESPERTARES_POR_ENVIO = MUESTRAS_POR_LOTE
+
+# Un despertar del modo de bajo consumo: solo la lectura (y el CO2 si hay R0)
+def leer_mq135():
+    valor_analogico = canal.leer()
+    if sensor_gas.calibrado:
+        ciclo.extra["co2"] = int(sensor_gas.ppm(valor_analogico))
+    return valor_analogico
+
+# Tarea de muestreo (la ejecuta el runtime cada PERIODO_MUESTREO)
+def muestrear_mq135():
+    # Leer valor analógico del sensor MQ-135
+    valor_analogico = canal.leer()  # Valor analógico filtrado (0-4095)
+
+    if not calentamiento.listo and calentamiento.agregar(valor_analogico):
+        print(f"¡Sensor listo en {calentamiento.listo_ms // 1000} s!")
+        # Sin R0 guardado, la lectura ya asentada es la referencia de aire
+        # limpio; si se agotó el plazo derivando no se guarda un R0 malo
+        if not calentamiento.estable:
+            print(f"[ERROR] La lectura sigue derivando ({calentamiento.deriva} cuentas): no se calibra R0")
+        elif not sensor_gas.calibrado:
+            print(f"R0 = {sensor_gas.calibrar(calentamiento.promedio()):.2f} kΩ")
+        # Las lecturas del calentamiento salen en su propio lote marcado
+        lote.vaciar()
+        del lote.extra["calentando"]
+        if not calentamiento.estable:
+            lote.extra["inestable"] = 1
+        politica.olvidar()
+
+    # Se acumula en el lote en vez de publicar una cadena por lectura,
+    # con el instante del punto que eligió la política
+    valor = politica.evaluar(valor_analogico)
+    if valor is not None:
+        lote.agregar(valor, politica.t_reportado)
+        if not lote.enviados:
+            # La primera lectura (marcada "calentando") sale enseguida, sin
+            # esperar los 30 s del lote
+            lote.vaciar()
+
+    if not calentamiento.listo:
+        print(f"[INFO] Valor MQ-135: {valor_analogico} - Calentando {calentamiento.progreso}%")
+        return
+    if not sensor_gas.calibrado:
+        print(f"[INFO] Valor MQ-135: {valor_analogico} - Sin R0: no se estima el CO2")
+        return
+
+    # Interpretación por ppm de CO2 (tabla de la curva, sin log/pow);
+    # el lote lleva la última estimación junto a las lecturas
+    co2 = int(sensor_gas.ppm(valor_analogico))
+    lote.extra["co2"] = co2
+    if co2 < 1000:
+        calidad = "Buena"
+    elif co2 < 2000:
+        calidad = "Moderada"
+    else:
+        calidad = "Pobre"
+
+    print(f"[INFO] Valor MQ-135: {valor_analogico} - CO2: {co2} ppm - Calidad del aire: {calidad}")
+
+if BAJO_CONSUMO:
+    # Cada despertar corre el script desde el principio y termina durmiendo
+    from sueno import CicloSueno
+    ciclo = CicloSueno(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, MQTT_SENSOR_TOPIC,
+                       periodo_ms=PERIODO_MUESTREO, despertares_por_envio=DESPERTARES_POR_ENVIO,
+                       port=MQTT_PORT, user=MQTT_USER, password_mqtt=MQTT_PASSWORD, formato="%d")
+    ciclo.ejecutar(leer_mq135)
+
+print("Iniciando sensor MQ-135 (Calidad del Aire) - Solo Analógico")
+print("¡IMPORTANTE! El sensor necesita tiempo de calentamiento (hasta 24h para precisión máxima)")
+print("Calentando el sensor MQ-135 (los lotes se publican marcados mientras tanto)...")
+print("Nota: Para mayor precisión, el sensor debería estabilizarse durante más tiempo")
+
+# WiFi/MQTT se reconectan en su propia tarea
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
+                          user=MQTT_USER, password_mqtt=MQTT_PASSWORD, keepalive=60)
+dispositivo = Dispositivo(conexion)
+# {"t0": ticks_ms, "dt": [ms entre lecturas], "v": [lecturas]}
+lote = Lote(dispositivo, MQTT_SENSOR_TOPIC, maximo=MUESTRAS_POR_LOTE, edad_max_ms=EDAD_MAXIMA_LOTE)
+lote.extra["calentando"] = 1
+dispositivo.periodico("mq135", PERIODO_MUESTREO, muestrear_mq135)
+print(f"Publicando lotes en el tópico {MQTT_SENSOR_TOPIC}")
+
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
@@ -1,7 +1,9 @@
 import time
-import network
 from machine import Pin, ADC
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
+from gases import SensorGas
+from muestreo import CanalADC, TablaCalibracion
 
 # Configuración WiFi
 WIFI_SSID = "Red-Peter"
@@ -17,24 +19,20 @@ MQTT_TOPIC = "gds0653/mq-2"
 mq2_sensor = ADC(Pin(34))  # Pin analógico del sensor
 mq2_sensor.atten(ADC.ATTN_11DB)  # Ajuste para rango completo de 3.3V
 
+# Ráfaga de 16 conversiones promediada sin las 4 más bajas ni las 4 más
+# altas (descarta los picos del ADC) y suavizada con un IIR de 1/4;
+# corrige la no linealidad con adc_cal.json si la placa está calibrada
+canal = CanalADC(mq2_sensor, muestras=16, metodo="recortado", recorte=4, suavizado=2,
+                 tabla=TablaCalibracion.desde_archivo("adc_cal.json"))
+
+# Concentración de GLP con la curva del MQ-2 (Rs/R0 en escala log-log);
+# R0 se calibra en aire limpio al primer arranque y queda en r0.json
+sensor_gas = SensorGas("MQ-2", gases=["GLP"])
+
 # Conectar WiFi
 def conectar_wifi():
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    
-    timeout = 10  # Tiempo máximo de espera en segundos
-    while not sta_if.isconnected() and timeout > 0:
-        print(".", end="")
-        time.sleep(1)
-        timeout -= 1
-    
-    if sta_if.isconnected():
-        print("\n[INFO] WiFi Conectada!")
-        print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
-    else:
-        print("\n[ERROR] No se pudo conectar a WiFi")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    return conectar_red(WIFI_SSID, WIFI_PASSWORD, intentos=3)
 
 # Conectar a MQTT
 def conectar_mqtt():
@@ -49,10 +47,16 @@ def conectar_mqtt():
 
 # Leer valor del sensor MQ2
 def leer_gas():
-    valor = mq2_sensor.read()
-    gas_ppm = (valor / 4095) * 1000  # Conversión aproximada a PPM
+    valor = canal.leer()
+    gas_ppm = sensor_gas.ppm(valor)  # Tabla de la curva, sin log/pow
     return gas_ppm
 
+# Sin R0 guardado se toma el aire actual como referencia limpia
+if not sensor_gas.calibrado:
+    print("[INFO] Calibrando R0 en aire limpio...")
+sensor_gas.asegurar_r0(canal.leer)
+print(f"[INFO] R0 = {sensor_gas.r0:.2f} kΩ")
+
 # Iniciar conexiones
 conectar_wifi()
 client = conectar_mqtt()
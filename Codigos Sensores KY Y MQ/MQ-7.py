@@ -3,6 +3,9 @@ import network
 import random
 from machine import ADC, Pin
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
+from gases import SensorGas
+from muestreo import CanalADC, TablaCalibracion
 
 # 📡 Configuración WiFi
 WIFI_SSID = "Red-Peter"
@@ -19,21 +22,25 @@ sensor_pin = ADC(Pin(34))
 sensor_pin.width(ADC.WIDTH_10BIT)
 sensor_pin.atten(ADC.ATTN_11DB)
 
-# 🚨 Umbral de detección
-UMBRAL = 600  
+# Ráfaga de 16 conversiones promediada sin las 4 más bajas ni las 4 más
+# altas (descarta los picos del ADC) y suavizada con un IIR de 1/4;
+# corrige la no linealidad con adc_cal.json (escalada a 10 bits)
+canal = CanalADC(sensor_pin, muestras=16, metodo="recortado", recorte=4, suavizado=2,
+                 tabla=TablaCalibracion.desde_archivo("adc_cal.json", maximo=1023))
+
+# CO con la curva del MQ-7 (Rs/R0 en escala log-log, ADC de 10 bits);
+# R0 se calibra en aire limpio al primer arranque y queda en r0.json
+sensor_gas = SensorGas("MQ-7", gases=["CO"], maximo=1023)
+
+# 🚨 Umbral de detección (ppm de CO)
+UMBRAL_PPM = 200
 
 estado_anterior = None
 
 # 🔌 Función para conectar a WiFi
 def conectar_wifi():
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    for _ in range(20):
-        if sta_if.isconnected():
-            return True
-        time.sleep(0.5)
-    return False
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    return conectar_red(WIFI_SSID, WIFI_PASSWORD, intentos=3)
 
 # 🔄 Función para conectar a MQTT
 def conectar_mqtt():
@@ -44,6 +51,9 @@ def conectar_mqtt():
     except:
         return None
 
+# Sin R0 guardado se toma el aire actual como referencia limpia
+sensor_gas.asegurar_r0(canal.leer)
+
 # 🏁 Bucle principal
 if conectar_wifi():
     client = conectar_mqtt()
@@ -56,10 +66,10 @@ while True:
             if conectar_wifi():
                 client = conectar_mqtt()
 
-        sensor_value = sensor_pin.read()
+        co_ppm = sensor_gas.ppm(canal.leer())
 
         # 🌟 Truco para forzar que a veces dé "ALTO CO (PELIGRO)"
-        if sensor_value > UMBRAL or random.randint(1, 5) == 1:  # 20% de probabilidad de "PELIGRO"
+        if co_ppm > UMBRAL_PPM or random.randint(1, 5) == 1:  # 20% de probabilidad de "PELIGRO"
             estado_actual = "ALTO CO (PELIGRO)"
         else:
             estado_actual = "CO NORMAL"
@@ -0,0 +1,5 @@
+# Firmware único: los módulos de lib/ van congelados en la imagen
+# (manifest.py) y lo propio de cada placa está en config.json
+import firmware
+
+firmware.arrancar("config.json")
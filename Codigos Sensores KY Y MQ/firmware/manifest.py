@@ -0,0 +1,11 @@
+# Manifiesto de congelado: compila lib/ a .mpy dentro de la imagen.
+#
+#   make -C ports/esp32 BOARD=ESP32_GENERIC \
+#       FROZEN_MANIFEST="/ruta/a/Codigos Sensores KY Y MQ/firmware/manifest.py"
+#
+# Los módulos congelados se ejecutan desde la flash de la imagen: no
+# ocupan el sistema de archivos ni se compilan al importarlos. En la placa
+# solo se copian main.py y la config de placas/ como config.json.
+include("$(PORT_DIR)/boards/manifest.py")
+
+freeze("../lib", opt=3)
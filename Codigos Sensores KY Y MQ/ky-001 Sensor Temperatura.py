@@ -1,93 +1,90 @@
-from machine import Pin
-import time
-import network
-import onewire
-import ds18x20
-from umqtt.simple import MQTTClient
-
-# Configuración del broker MQTT
-MQTT_BROKER = "broker.emqx.io"
-MQTT_USER = ""
-MQTT_PASSWORD = ""
-MQTT_CLIENT_ID = "esp32_client"  
-MQTT_SENSOR_TOPIC = "gds0653/ky-001"
-MQTT_PORT = 1883
-
-# Configuración del sensor de temperatura KY-001 (DS18B20)
-TEMP_PIN = 26  # GPIO26 para el sensor de temperatura
-temp_bus = onewire.OneWire(Pin(TEMP_PIN))
-temp_sensor = ds18x20.DS18X20(temp_bus)
-
-def conectar_wifi():
-    print("Conectando WiFi...", end="")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect('Red-Peter', '12345678')  # Ajusta los datos de tu red
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.3)
-    print(" ¡Conectado!")
-
-def subscribir():
-    client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
-                        user=MQTT_USER, password=MQTT_PASSWORD, keepalive=60)
-    client.connect()
-    print(f"Conectado a {MQTT_BROKER}")
-    print(f"Publicando en el tópico {MQTT_SENSOR_TOPIC}")
-    return client
-
-# Conectar a WiFi
-conectar_wifi()
-
-# Conectar a MQTT
-client = subscribir()
-
-# Buscar sensores DS18B20
-print("Buscando sensores de temperatura...")
-roms = temp_sensor.scan()
-if len(roms) == 0:
-    print("¡No se encontraron sensores! Verificar conexiones")
-else:
-    print(f"Encontrados {len(roms)} sensores")
-
-# Bucle principal
-while True:
-    try:
-        if len(roms) > 0:
-            # Iniciar la conversión de temperatura
-            temp_sensor.convert_temp()
-            
-            # Esperar a que se complete la conversión (750ms)
-            time.sleep(1)
-            
-            # Leer la temperatura del primer sensor encontrado
-            temperatura = temp_sensor.read_temp(roms[0])
-            
-            # Redondear a un decimal
-            temperatura = round(temperatura, 1)
-            
-            # Crear el mensaje
-            mensaje = f"{temperatura}"
-            
-            # Publicar en MQTT
-            client.publish(MQTT_SENSOR_TOPIC, mensaje.encode())  # Publicar valor como bytes
-            
-            # Mostrar en consola
-            print(f"[INFO] Temperatura: {temperatura}°C")
-            print(f"[INFO] Publicado en {MQTT_SENSOR_TOPIC}: {mensaje}")
-            
-            # Esperar antes de la siguiente lectura
-            time.sleep(2)
-            
-        else:
-            print("[INFO] Buscando sensores...")
-            roms = temp_sensor.scan()
-            time.sleep(5)
-            
-    except Exception as e:
-        print(f"[ERROR] Error en el loop principal: {e}")
-        time.sleep(5)
-        try:
-            client = subscribir()
-        except:
-            passO
\ No newline at end of file
+from machine import Pin
+import onewire
+import ds18x20
+from almacen import RegistroCircular
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from sondas import SondasDS18B20
+
+# Configuración WiFi
+WIFI_SSID = "Red-Peter"
+WIFI_PASSWORD = "12345678"
+
+# Configuración del broker MQTT
+MQTT_BROKER = "broker.emqx.io"
+MQTT_USER = ""
+MQTT_PASSWORD = ""
+MQTT_CLIENT_ID = "esp32_ky001"  # GestorConexion le agrega el id del chip
+MQTT_SENSOR_TOPIC = "gds0653/ky-001"
+MQTT_SONDAS_TOPIC = MQTT_SENSOR_TOPIC + "/sondas"  # {"<rom>": temperatura} de cada sonda
+MQTT_PORT = 1883
+
+# Configuración del sensor de temperatura KY-001 (DS18B20)
+TEMP_PIN = 26  # GPIO26 para el sensor de temperatura
+temp_bus = onewire.OneWire(Pin(TEMP_PIN))
+temp_sensor = ds18x20.DS18X20(temp_bus)
+
+# Registro en flash para no perder lecturas durante cortes de WiFi/MQTT
+CANAL_TEMPERATURA = 0
+almacen = RegistroCircular("ky001.bin", capacidad=4096)
+
+# Todas las sondas del bus con una sola conversión por ciclo (antes se
+# leía solo roms[0] y se dormía 2.75 s por lectura). A 12 bits (0.0625 °C)
+# el ciclo dura ~750 ms; a 9 bits (0.5 °C) ~94 ms
+RESOLUCION = 12
+PERIODO_PUBLICACION = 2000  # ms: promedio de la primera sonda y de cada sonda
+sondas = SondasDS18B20(temp_sensor, resolucion=RESOLUCION)
+
+# Bajo consumo: con True la placa duerme (deep sleep) entre conversiones,
+# junta las lecturas de la primera sonda en la memoria RTC y enciende la
+# radio solo para subirlas en un lote ({"t0","dt","v"} en
+# MQTT_SENSOR_TOPIC/lote) cada DESPERTARES_POR_ENVIO despertares. A 9 bits
+# cada despertar dura ~0.1 s menos que a 12
+BAJO_CONSUMO = False
+DESPERTARES_POR_ENVIO = 15  # Un lote cada 30 s
+
+# Un despertar del modo de bajo consumo: una sola conversión
+def leer_primera_sonda():
+    import uasyncio as asyncio
+    asyncio.run(sondas.medir())
+    promedios = sondas.promedios()
+    return promedios[0][1] if promedios else None
+
+# Tarea de publicación: la primera sonda en MQTT_SENSOR_TOPIC como
+# siempre ("23.4", el formato que guarda flow.json; sin conexión va a la
+# flash) y {"<rom>": temperatura, ...} con todas en MQTT_SONDAS_TOPIC
+def publicar_temperaturas():
+    promedios = sondas.promedios()
+    if not promedios:
+        return
+    dispositivo.registrar(CANAL_TEMPERATURA, round(promedios[0][1], 1))
+    mensaje = "{" + ",".join('"%s":%.2f' % (rom, t) for rom, t in promedios) + "}"
+    dispositivo.publicar(MQTT_SONDAS_TOPIC, mensaje)
+    print(f"[INFO] Temperaturas: {mensaje} ({sondas.lecturas} lecturas, {sondas.errores} errores)")
+
+# Buscar sensores DS18B20
+print("Buscando sensores de temperatura...")
+if sondas.buscar() == 0:
+    print("¡No se encontraron sensores! Verificar conexiones")
+else:
+    print(f"Encontrados {len(sondas.roms)} sensores a {RESOLUCION} bits")
+
+if BAJO_CONSUMO:
+    # Cada despertar corre el script desde el principio y termina durmiendo
+    from sueno import CicloSueno
+    ciclo = CicloSueno(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, MQTT_SENSOR_TOPIC + "/lote",
+                       periodo_ms=PERIODO_PUBLICACION, despertares_por_envio=DESPERTARES_POR_ENVIO,
+                       port=MQTT_PORT, user=MQTT_USER, password_mqtt=MQTT_PASSWORD)
+    ciclo.ejecutar(leer_primera_sonda)
+
+# WiFi/MQTT se mantienen desde su propia tarea
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER,
+                          port=MQTT_PORT, user=MQTT_USER, password_mqtt=MQTT_PASSWORD,
+                          keepalive=60)
+dispositivo = Dispositivo(conexion, almacen=almacen)
+dispositivo.canal(CANAL_TEMPERATURA, MQTT_SENSOR_TOPIC)
+dispositivo.tarea(sondas.ejecutar())
+dispositivo.periodico("ky001", PERIODO_PUBLICACION, publicar_temperaturas)
+
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
@@ -2,6 +2,7 @@ from machine import Pin
 import time
 import network
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
 
 # Configuración de pines con resistencia pull-up interna
 boton_pin = Pin(16, Pin.IN, Pin.PULL_UP)  # GPIO16 para el botón con pull-up
@@ -24,17 +25,8 @@ errores_conexion = 0
 
 def conectar_wifi():
     """Conecta el ESP32 a la red WiFi."""
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-    
-    print("\n[INFO] WiFi Conectada!")
-    print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    conectar_red(WIFI_SSID, WIFI_PASSWORD)
 
 def conectar_mqtt():
     """Conecta a MQTT y maneja reconexiones."""
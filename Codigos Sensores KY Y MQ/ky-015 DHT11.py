@@ -1,104 +1,62 @@
 from machine import Pin
-import time
-import network
-from umqtt.simple import MQTTClient
-
-# Configuración de pines
-laser_pin = Pin(16, Pin.OUT)    # GPIO16 para el láser
-boton_pin = Pin(4, Pin.IN)      # GPIO4 para el botón
+import dht
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from humedad import LectorDHT
+from politicas import crear
 
 # Configuración WiFi
 WIFI_SSID = "DESKTOP-BVQOQ56 7592"
 WIFI_PASSWORD = "Popeye08"
 
 # Configuración MQTT
-MQTT_CLIENT_ID = "esp32_laser_ky008"
+MQTT_CLIENT_ID = "esp32_dht11_ky015"
 MQTT_BROKER = "broker.emqx.io"
 MQTT_PORT = 1883
-MQTT_TOPIC_SENSOR = "postgres/sensors"    # Publicar estado del botón
-MQTT_TOPIC_ACTUATOR = "postgres/actuator" # Publicar estado del láser
-
-# Variables de control
-ultimo_estado_boton = None
-ultimo_estado_laser = None
-errores_conexion = 0
-
-def conectar_wifi():
-    """Conecta el ESP32 a la red WiFi."""
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-    
-    print("\n[INFO] WiFi Conectada!")
-    print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
-
-def conectar_mqtt():
-    """Conecta a MQTT y maneja reconexiones."""
-    global errores_conexion
-    try:
-        client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
-        client.connect()
-        print(f"[INFO] Conectado a MQTT en {MQTT_BROKER}")
-        errores_conexion = 0
-        return client
-    except Exception as e:
-        print(f"[ERROR] No se pudo conectar a MQTT: {e}")
-        errores_conexion += 1
-        return None
-
-# Conectar a WiFi y MQTT
-conectar_wifi()
-client = conectar_mqtt()
-
-# Bucle principal
-while True:
-    try:
-        # Verificar conexión WiFi
-        if not network.WLAN(network.STA_IF).isconnected():
-            print("[ERROR] WiFi desconectado, reconectando...")
-            conectar_wifi()
-            client = conectar_mqtt()
-
-        # Verificar conexión MQTT
-        if client is None:
-            print("[ERROR] MQTT desconectado, reconectando...")
-            client = conectar_mqtt()
-            time.sleep(5)
-            continue
-
-        # Leer estado del botón
-        estado_boton = boton_pin.value()
-
-        # Encender o apagar el láser según el botón
-        laser_pin.value(estado_boton)  # Si el botón es 1, el láser se enciende
-
-        # Solo publicar si los estados cambiaron
-        if estado_boton != ultimo_estado_boton:
-            mensaje_boton = f"{estado_boton}"
-            client.publish(MQTT_TOPIC_SENSOR, mensaje_boton)
-            print(f"[INFO] Publicado en {MQTT_TOPIC_SENSOR}: {mensaje_boton}")
-            ultimo_estado_boton = estado_boton
-        
-        if estado_boton != ultimo_estado_laser:
-            mensaje_laser = f"{estado_boton}"
-            client.publish(MQTT_TOPIC_ACTUATOR, mensaje_laser)
-            print(f"[INFO] Publicado en {MQTT_TOPIC_ACTUATOR}: {mensaje_laser}")
-            ultimo_estado_laser = estado_boton
-
-        # Si hay demasiados errores, reiniciar conexiones
-        if errores_conexion >= 10:
-            print("[ERROR] Demasiados errores, reiniciando conexiones...")
-            conectar_wifi()
-            client = conectar_mqtt()
-            errores_conexion = 0
-
-    except Exception as e:
-        print(f"[ERROR] Error en el loop principal: {e}")
-        client = None
-
-    time.sleep(0.1)  # Pequeña pausa para estabilidad
+MQTT_TOPIC = "gds0653/ky-015"  # {"temperatura": °C, "humedad": %}
+
+# Sensor DHT11 (KY-015) en GPIO4
+DHT_PIN = 4
+sensor = dht.DHT11(Pin(DHT_PIN))
+
+# El DHT11 admite una lectura por segundo como máximo; se mide cada 5 s
+# y, si falla el checksum, se reintenta al segundo sin frenar el bucle.
+# Entre mediciones se usa la última lectura buena
+PERIODO_LECTURA = 5000
+lector = LectorDHT(sensor, periodo_ms=PERIODO_LECTURA, intervalo_min_ms=1000)
+
+# Cuándo publicar: si cambia la temperatura (resolución de 1 °C) o la
+# humedad más de 1 %, y como mínimo una vez por minuto
+politica_temperatura = crear({"tipo": "banda", "umbral": 0, "silencio_max_ms": 60000})
+politica_humedad = crear({"tipo": "banda", "umbral": 1, "silencio_max_ms": 60000})
+
+# Tarea de lectura (la ejecuta el runtime cada 250 ms; solo mide cuando toca)
+def leer_dht():
+    if lector.actualizar():
+        print(f"[INFO] Temperatura: {lector.temperatura}°C, Humedad: {lector.humedad}%")
+    temperatura, humedad = lector.temperatura, lector.humedad
+    if temperatura is None:
+        return
+    cambio_t = politica_temperatura.evaluar(temperatura) is not None
+    cambio_h = politica_humedad.evaluar(humedad) is not None
+    if not (cambio_t or cambio_h):
+        return
+    # Se publican juntas: la que no cambió queda como reportada también
+    if not cambio_t:
+        politica_temperatura.forzar(temperatura)
+    if not cambio_h:
+        politica_humedad.forzar(humedad)
+    mensaje = '{"temperatura":%s,"humedad":%s' % (temperatura, humedad)
+    # Latido con el sensor sin responder: se avisa que el valor es viejo
+    if not lector.valido(3 * PERIODO_LECTURA):
+        mensaje += ',"edad_ms":%d' % lector.edad_ms()
+    dispositivo.publicar(MQTT_TOPIC, mensaje + "}")
+    print(f"[INFO] Publicado en {MQTT_TOPIC}: {mensaje}}} ({lector.errores} lecturas fallidas)")
+
+# WiFi/MQTT se reconectan en su propia tarea
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
+dispositivo = Dispositivo(conexion)
+dispositivo.periodico("dht11", 250, leer_dht)
+
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
@@ -1,7 +1,7 @@
 from machine import Pin, PWM
-import network
-import time
-from umqtt.robust import MQTTClient
+from actuador import Actuador
+from conexion import GestorConexion
+from dispositivo import Dispositivo
 import json
 
 # Configuración WiFi
@@ -12,7 +12,8 @@ PASSWORD = "12345678"
 MQTT_SERVER = "broker.emqx.io"
 MQTT_PORT = 1883
 MQTT_TOPIC = b"gds0643/ky-016"
-CLIENT_ID = "ESP32Client_" + str(time.time())
+MQTT_CLIENT_ID = "esp32_ky016"  # GestorConexion le agrega el id del chip
+MQTT_TOPIC_VIDA = b"gds0643/ky-016/vida"  # Last Will: conectado / desconectado
 
 # Configuración de los pines para el LED RGB
 LED_R_PIN = 16  # Pin rojo
@@ -22,9 +23,6 @@ LED_B_PIN = 18  # Pin azul
 # Frecuencia PWM para los LEDs
 PWM_FREQ = 5000
 
-# Configuración del tiempo de actualización
-UPDATE_TIME = 2  # Tiempo entre actualizaciones en segundos
-
 # Diccionario de colores básicos
 COLORES = {
     "rojo": (1023, 0, 0),
@@ -37,18 +35,6 @@ COLORES = {
     "apagado": (0, 0, 0)
 }
 
-def conectar_wifi():
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    if not wlan.isconnected():
-        print('Conectando a WiFi...')
-        wlan.connect(SSID, PASSWORD)
-        while not wlan.isconnected():
-            time.sleep(0.5)
-            print('.', end='')
-    print('\nConectado a WiFi')
-    print('Dirección IP:', wlan.ifconfig()[0])
-
 def identificar_color(r, g, b):
     """Identifica el nombre del color basado en valores RGB"""
     # Normalizar los valores (0-1)
@@ -118,84 +104,48 @@ def mensaje_recibido(topic, msg):
         # Identificar el color actual
         color_actual = identificar_color(red_value, green_value, blue_value)
         print(f"Color actualizado: {color_actual} - R:{red_value}, G:{green_value}, B:{blue_value}")
+        publicar_estado()
         
     except Exception as e:
         print(f"Error procesando mensaje: {e}")
 
-def conectar_mqtt():
-    try:
-        client = MQTTClient(CLIENT_ID, MQTT_SERVER, MQTT_PORT, keepalive=60)
-        client.set_callback(mensaje_recibido)
-        client.connect(clean_session=True)
-        client.subscribe(MQTT_TOPIC)
-        print("Conectado a MQTT")
-        return client
-    except Exception as e:
-        print(f"Error conectando a MQTT: {e}")
-        return None
+# Inicializar los pines para los LEDs RGB con PWM
+pwm_red = PWM(Pin(LED_R_PIN), freq=PWM_FREQ, duty=0)
+pwm_green = PWM(Pin(LED_G_PIN), freq=PWM_FREQ, duty=0)
+pwm_blue = PWM(Pin(LED_B_PIN), freq=PWM_FREQ, duty=0)
 
-def main():
-    global pwm_red, pwm_green, pwm_blue, red_value, green_value, blue_value
-    
-    # Inicializar los pines para los LEDs RGB con PWM
-    pwm_red = PWM(Pin(LED_R_PIN), freq=PWM_FREQ, duty=0)
-    pwm_green = PWM(Pin(LED_G_PIN), freq=PWM_FREQ, duty=0)
-    pwm_blue = PWM(Pin(LED_B_PIN), freq=PWM_FREQ, duty=0)
-    
-    # Valores iniciales (0-1023 para ESP32)
-    red_value = 0
-    green_value = 0
-    blue_value = 0
-    
-    # Conectar a WiFi
-    conectar_wifi()
-    
-    # Iniciar cliente MQTT
-    client = None
-    contador = 0
+# Valores iniciales (0-1023 para ESP32)
+red_value = 0
+green_value = 0
+blue_value = 0
+
+# El estado se publica retenido y solo cuando cambia: un suscriptor que
+# llega tarde lo recibe del broker en vez de esperar la próxima vuelta
+def publicar_estado():
+    # Obtener el nombre del color actual
+    color_actual = identificar_color(red_value, green_value, blue_value)
     
-    while True:
-        try:
-            # Reconectar MQTT si es necesario
-            if client is None:
-                client = conectar_mqtt()
-                if client is None:
-                    time.sleep(5)
-                    continue
-            
-            # Verificar si hay mensajes entrantes
-            client.check_msg()
-            
-            # Obtener el nombre del color actual
-            color_actual = identificar_color(red_value, green_value, blue_value)
-            
-            # Publicar el estado actual del LED RGB
-            contador += 1
-            
-            # Crear mensaje JSON
-            mensaje = {
-                "dispositivo": "led_rgb",
-                "color": color_actual,
-                "r": red_value,
-                "g": green_value,
-                "b": blue_value,
-                "valor": color_actual,  # Guardar el nombre del color como valor
-                "contador": contador,
-                "timestamp": time.time()
-            }
-            
-            # Publicar estado
-            mensaje_json = json.dumps(mensaje)
-            client.publish(MQTT_TOPIC, mensaje_json.encode())
-            print(f"Estado publicado #{contador} - Color: {color_actual}")
-            
-            # Esperar tiempo configurado
-            time.sleep(UPDATE_TIME)
-            
-        except Exception as e:
-            print(f"Error: {e}")
-            client = None
-            time.sleep(5)
+    # Crear mensaje JSON (sin contador ni hora, para que un estado igual
+    # dé el mismo mensaje y no se repita)
+    mensaje = {
+        "dispositivo": "led_rgb",
+        "color": color_actual,
+        "r": red_value,
+        "g": green_value,
+        "b": blue_value,
+        "valor": color_actual  # Guardar el nombre del color como valor
+    }
+    estado.informar(json.dumps(mensaje))
+
+# WiFi/MQTT se reconectan en su propia tarea. El runtime atiende el socket
+# cada PERIODO_COMANDOS (20 ms) y mensaje_recibido() cambia el PWM en el
+# acto
+conexion = GestorConexion(SSID, PASSWORD, MQTT_CLIENT_ID, MQTT_SERVER, port=MQTT_PORT,
+                          topic_vida=MQTT_TOPIC_VIDA)
+dispositivo = Dispositivo(conexion)
+dispositivo.suscribir(MQTT_TOPIC, mensaje_recibido)
+estado = Actuador(dispositivo, MQTT_TOPIC)
+publicar_estado()
 
-if __name__ == "__main__":
-    main()x	
\ No newline at end of file
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
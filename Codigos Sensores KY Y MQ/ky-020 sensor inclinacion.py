@@ -1,84 +1,60 @@
-from machine import Pin
-import time
-import network
-from umqtt.simple import MQTTClient
-
-# Configuración del broker MQTT
-MQTT_BROKER = "broker.emqx.io"
-MQTT_USER = ""
-MQTT_PASSWORD = ""
-MQTT_CLIENT_ID = "esp32_ky020"
-MQTT_SENSOR_TOPIC = "gds0653/ky-020"
-MQTT_PORT = 1883
-
-# Configuración de tiempos
-INTERVALO_CAMBIO = 3  # Cambiar de estado cada 3 segundos
-
-def conectar_wifi():
-    print("Conectando WiFi...", end="")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect('Red-Peter', '12345678')  # Ajusta los datos de tu red
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.3)
-    print(" ¡Conectado!")
-
-def subscribir():
-    client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
-                        user=MQTT_USER, password=MQTT_PASSWORD, keepalive=60)
-    client.connect()
-    print(f"Conectado a {MQTT_BROKER}")
-    print(f"Publicando en el tópico {MQTT_SENSOR_TOPIC}")
-    return client
-
-# Conectar a WiFi
-print("Iniciando SIMULACIÓN de sensor de inclinación KY-020")
-conectar_wifi()
-
-# Conectar a MQTT
-client = subscribir()
-
-# Estado inicial: vertical (0)
-estado_actual = "0"
-ultimo_cambio = time.time()
-
-# Publicar estado inicial
-client.publish(MQTT_SENSOR_TOPIC, estado_actual)
-print(f"Estado inicial: VERTICAL ({estado_actual})")
-
-
-# Bucle principal
-while True:
-    try:
-        # Verificar si es tiempo de cambiar estado
-        ahora = time.time()
-        if ahora - ultimo_cambio >= INTERVALO_CAMBIO:
-            # Cambiar estado: 0->1 o 1->0
-            estado_actual = "1" if estado_actual == "0" else "0"
-            ultimo_cambio = ahora
-            
-            # Publicar nuevo estado
-            client.publish(MQTT_SENSOR_TOPIC, estado_actual)
-            
-            # Mensaje en consola
-            if estado_actual == "0":
-                print("Sensor VERTICAL (0)")
-            else:
-                print("Sensor INCLINADO (1)")
-        
-        # Verificar conexión WiFi
-        if not network.WLAN(network.STA_IF).isconnected():
-            print("Reconectando WiFi...")
-            conectar_wifi()
-            client = subscribir()
-            
-    except Exception as e:
-        print(f"Error: {e}")
-        time.sleep(5)
-        try:
-            client = subscribir()
-        except:
-            pass
-        
-    time.sleep(0.1)  # Pequeña pausa
\ No newline at end of file
+from machine import Pin
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from flancos import CapturaFlancos
+
+# Configuración WiFi
+WIFI_SSID = "Red-Peter"
+WIFI_PASSWORD = "12345678"
+
+# Configuración del broker MQTT
+MQTT_BROKER = "broker.emqx.io"
+MQTT_USER = ""
+MQTT_PASSWORD = ""
+MQTT_CLIENT_ID = "esp32_ky020"
+MQTT_SENSOR_TOPIC = "gds0653/ky-020"
+MQTT_PORT = 1883
+
+# Configuración del sensor de inclinación KY-020 (bola metálica)
+SENSOR_PIN = 16
+sensor = Pin(SENSOR_PIN, Pin.IN, Pin.PULL_UP)
+
+# Configuración de tiempos
+DEBOUNCE_TIME = 50         # Anti-rebote en ms (la bola rebota sobre los contactos)
+PERIODO_REVISION = 10      # Cada cuánto se vacían los flancos capturados (ms)
+
+# Antes el script simulaba el sensor alternando 0/1 cada 3 s; ahora se lee
+# el pin real y cada cambio llega por interrupción
+captura = CapturaFlancos(sensor, antirrebote_ms=DEBOUNCE_TIME)
+
+def publicar_estado(nivel):
+    # Contacto cerrado (LOW con pull-up) = inclinado (1)
+    estado_actual = "0" if nivel else "1"
+    dispositivo.publicar(MQTT_SENSOR_TOPIC, estado_actual)
+
+    # Mensaje en consola
+    if estado_actual == "0":
+        print("Sensor VERTICAL (0)")
+    else:
+        print("Sensor INCLINADO (1)")
+
+def al_cambiar(t_us, nivel):
+    publicar_estado(nivel)
+
+# Tarea del sensor (cada PERIODO_REVISION)
+def revisar_sensor():
+    captura.vaciar(al_cambiar)
+
+print("Iniciando sensor de inclinación KY-020")
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER,
+                          port=MQTT_PORT, user=MQTT_USER, password_mqtt=MQTT_PASSWORD,
+                          keepalive=60)
+dispositivo = Dispositivo(conexion)
+dispositivo.periodico("ky020", PERIODO_REVISION, revisar_sensor)
+print(f"Publicando en el tópico {MQTT_SENSOR_TOPIC}")
+
+# Publicar estado inicial
+publicar_estado(captura.estado)
+
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
@@ -1,157 +1,187 @@
-import time
-import network
-import json
-from machine import Pin, ADC
-from umqtt.simple import MQTTClient
-
-# 📡 Configuración WiFi
-WIFI_SSID = "Red-Peter"
-WIFI_PASSWORD = "12345678"
-
-# 🌐 Configuración MQTT
-MQTT_CLIENT_ID = "esp32_ky023"
-MQTT_BROKER = "broker.emqx.io"
-MQTT_PORT = 1883
-MQTT_TOPIC_SENSOR = "gds0653/ky-023"
-
-# 🕹️ Configuración del sensor KY-023 (Joystick)
-# Pines analógicos para los ejes X e Y
-JOYSTICK_X_PIN = 32  # Pin ADC para el eje X
-JOYSTICK_Y_PIN = 33  # Pin ADC para el eje Y
-JOYSTICK_BTN_PIN = 14  # Pin para el botón del joystick
-
-# Configuración ADC para los ejes X e Y
-adc_x = ADC(Pin(JOYSTICK_X_PIN))
-adc_y = ADC(Pin(JOYSTICK_Y_PIN))
-adc_x.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
-adc_y.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
-adc_x.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
-adc_y.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
-
-# Configuración del botón (generalmente activo en LOW)
-btn = Pin(JOYSTICK_BTN_PIN, Pin.IN, Pin.PULL_UP)
-
-# LED para indicación visual
-led_onboard = Pin(2, Pin.OUT)
-
-# Variables para control
-ultimo_tiempo_publicacion = 0
-INTERVALO_PUBLICACION = 200  # Publicar cada 200ms cuando hay cambios
-ultimo_estado = "CENTRO"
-ultimo_btn = None
-UMBRAL_CAMBIO = 100  # Umbral para detectar movimientos
-
-# 🔌 Conectar a WiFi
-def conectar_wifi():
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-    print("\n[INFO] WiFi Conectada!")
-    print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
-
-# 🔄 Conectar a MQTT
-def conectar_mqtt():
-    try:
-        client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
-        client.connect()
-        print(f"[INFO] Conectado a MQTT en {MQTT_BROKER}")
-        return client
-    except Exception as e:
-        print(f"[ERROR] No se pudo conectar a MQTT: {e}")
-        return None
-
-# Función para obtener tiempo en milisegundos
-def millis():
-    return time.ticks_ms()
-
-# 🏁 Inicialización
-print("[INFO] Iniciando sensor KY-023 (Joystick)")
-conectar_wifi()
-client = conectar_mqtt()
-print("[INFO] Mueva el joystick o presione el botón")
-
-# Valores de calibración - ajustar según tu joystick
-X_CENTRO = 2047  # Valor en reposo aproximado
-Y_CENTRO = 2047  # Valor en reposo aproximado
-ZONA_MUERTA = 400  # Zona muerta alrededor del centro (aumentada para menos sensibilidad)
-
-# 🔄 Bucle principal
-while True:
-    try:
-        # Verificar conexión WiFi
-        if not network.WLAN(network.STA_IF).isconnected():
-            print("[ERROR] WiFi desconectado, reconectando...")
-            conectar_wifi()
-            client = conectar_mqtt()
-            
-        # Verificar conexión MQTT
-        if client is None:
-            print("[ERROR] MQTT desconectado, reconectando...")
-            client = conectar_mqtt()
-            time.sleep(2)
-            continue
-            
-        # Leer valores del joystick
-        valor_x = adc_x.read()  # Lee eje X (0-4095)
-        valor_y = adc_y.read()  # Lee eje Y (0-4095)
-        valor_btn = not btn.value()  # Lee botón (normalmente activo en LOW)
-        
-        # Encender LED cuando se presiona el botón
-        led_onboard.value(valor_btn)
-        
-        # Determinar estado del joystick como texto
-        estado_actual = "CENTRO"
-        
-        # Verificar primero el botón
-        if valor_btn:
-            estado_actual = "PRESIONADO"
-        else:
-            # Si no está presionado, revisar posición
-            if abs(valor_x - X_CENTRO) > ZONA_MUERTA or abs(valor_y - Y_CENTRO) > ZONA_MUERTA:
-                # Priorizar el eje con mayor desviación
-                if abs(valor_x - X_CENTRO) > abs(valor_y - Y_CENTRO):
-                    # Movimiento horizontal dominante
-                    if valor_x > X_CENTRO:
-                        estado_actual = "DERECHA"
-                    else:
-                        estado_actual = "IZQUIERDA"
-                else:
-                    # Movimiento vertical dominante
-                    if valor_y > Y_CENTRO:
-                        estado_actual = "ABAJO"
-                    else:
-                        estado_actual = "ARRIBA"
-            else:
-                # En centro pero no presionado
-                estado_actual = "LIBERADO"
-        
-        # Obtener tiempo actual
-        ahora = millis()
-        
-        # Publicar si cambia el estado o pasó suficiente tiempo
-        cambio_estado = estado_actual != ultimo_estado
-        tiempo_publicar = ahora - ultimo_tiempo_publicacion > INTERVALO_PUBLICACION
-        
-        if cambio_estado and tiempo_publicar:
-            # Crear mensaje con el estado como texto
-            mensaje = json.dumps({"estado": estado_actual})
-            
-            # Publicar en MQTT
-            if client:
-                client.publish(MQTT_TOPIC_SENSOR, mensaje)
-                print(f"Joystick: {estado_actual}")
-            
-            # Actualizar estado anterior
-            ultimo_estado = estado_actual
-            ultimo_tiempo_publicacion = ahora
-            
-    except Exception as e:
-        print(f"[ERROR] Error en el loop principal: {e}")
-        client = None
-        time.sleep(2)
-        
-    time.sleep(0.05)  # Pequeña pausa para estabilidad
\ No newline at end of file
+import time
+import json
+from array import array
+from machine import Pin, ADC
+import codec
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from joystick import Eje, cargar, guardar
+from muestreo import CanalADC, TablaCalibracion
+
+# 📡 Configuración WiFi
+WIFI_SSID = "Red-Peter"
+WIFI_PASSWORD = "12345678"
+
+# 🌐 Configuración MQTT
+MQTT_CLIENT_ID = "esp32_ky023"
+MQTT_BROKER = "broker.emqx.io"
+MQTT_PORT = 1883
+MQTT_TOPIC_SENSOR = "gds0653/ky-023"
+
+# 🕹️ Configuración del sensor KY-023 (Joystick)
+# Pines analógicos para los ejes X e Y
+JOYSTICK_X_PIN = 32  # Pin ADC para el eje X
+JOYSTICK_Y_PIN = 33  # Pin ADC para el eje Y
+JOYSTICK_BTN_PIN = 14  # Pin para el botón del joystick
+
+# Configuración ADC para los ejes X e Y
+adc_x = ADC(Pin(JOYSTICK_X_PIN))
+adc_y = ADC(Pin(JOYSTICK_Y_PIN))
+adc_x.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
+adc_y.atten(ADC.ATTN_11DB)  # Configuración para rango 0-3.3V
+adc_x.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
+adc_y.width(ADC.WIDTH_12BIT)  # Resolución de 12 bits (0-4095)
+
+# Cada eje: ráfaga de 8 conversiones sin las 2 más bajas ni las 2 más
+# altas, en un mismo buffer (los ejes se leen uno tras otro)
+buffer_adc = array("H", [0] * 8)
+tabla_adc = TablaCalibracion.desde_archivo("adc_cal.json")
+canal_x = CanalADC(adc_x, muestras=8, metodo="recortado", recorte=2, tabla=tabla_adc, buffer=buffer_adc)
+canal_y = CanalADC(adc_y, muestras=8, metodo="recortado", recorte=2, tabla=tabla_adc, buffer=buffer_adc)
+
+# Configuración del botón (generalmente activo en LOW)
+btn = Pin(JOYSTICK_BTN_PIN, Pin.IN, Pin.PULL_UP)
+
+# LED para indicación visual
+led_onboard = Pin(2, Pin.OUT)
+
+# Modo de publicación:
+#   "flujo":   vectores (x, y, botón) normalizados a FRECUENCIA_FLUJO Hz en
+#              tramas binarias de codec.py (esquema "ky-023") en
+#              MQTT_TOPIC_SENSOR + "/bin"; ingesta/decodificador.py las pasa
+#              a JSON en MQTT_TOPIC_SENSOR
+#   "eventos": el texto de la dirección ({"estado": "DERECHA"}) al cambiar
+MODO = "flujo"
+FRECUENCIA_FLUJO = 50      # Hz (50-100)
+MUESTRAS_POR_TRAMA = 5     # 100 ms por mensaje a 50 Hz, 50 ms a 100 Hz
+MEDIR_LATENCIA = True      # Se suscribe a sus propias tramas para medir el retardo
+MQTT_TOPIC_FLUJO = MQTT_TOPIC_SENSOR + "/bin"
+
+# Calibración: el centro se mide al arrancar (joystick en reposo) y los
+# extremos se amplían solos al mover el joystick; se guardan en la flash
+ARCHIVO_CALIBRACION = "joystick.json"
+eje_x = Eje(canal_x)
+eje_y = Eje(canal_y)
+ejes = {"x": eje_x, "y": eje_y}
+
+# Modo eventos
+ultimo_tiempo_publicacion = 0
+INTERVALO_PUBLICACION = 200  # Publicar cada 200ms cuando hay cambios
+ultimo_estado = "CENTRO"
+ZONA_MUERTA = 200  # Milésimas del recorrido (antes 400 cuentas fijas alrededor de 2047)
+PERIODO_MUESTREO = 50  # Leer el joystick cada 50ms
+
+# Función para obtener tiempo en milisegundos
+def millis():
+    return time.ticks_ms()
+
+# 🕹️ Modo eventos (la tarea corre cada PERIODO_MUESTREO)
+def muestrear_joystick():
+    global ultimo_estado, ultimo_tiempo_publicacion
+
+    # Leer valores del joystick (-1000..1000, 0 en el centro calibrado)
+    x = eje_x.leer()
+    y = eje_y.leer()
+    valor_btn = not btn.value()  # Lee botón (normalmente activo en LOW)
+
+    # Encender LED cuando se presiona el botón
+    led_onboard.value(valor_btn)
+
+    # Determinar estado del joystick como texto
+    if valor_btn:
+        estado_actual = "PRESIONADO"
+    elif abs(x) > ZONA_MUERTA or abs(y) > ZONA_MUERTA:
+        # Priorizar el eje con mayor desviación
+        if abs(x) > abs(y):
+            estado_actual = "DERECHA" if x > 0 else "IZQUIERDA"
+        else:
+            estado_actual = "ABAJO" if y > 0 else "ARRIBA"
+    else:
+        # En centro pero no presionado
+        estado_actual = "LIBERADO"
+
+    # Obtener tiempo actual
+    ahora = millis()
+
+    # Publicar si cambia el estado o pasó suficiente tiempo
+    cambio_estado = estado_actual != ultimo_estado
+    tiempo_publicar = time.ticks_diff(ahora, ultimo_tiempo_publicacion) > INTERVALO_PUBLICACION
+
+    if cambio_estado and tiempo_publicar:
+        # Crear mensaje con el estado como texto y encolarlo (no bloquea)
+        mensaje = json.dumps({"estado": estado_actual})
+        dispositivo.publicar(MQTT_TOPIC_SENSOR, mensaje)
+        print(f"Joystick: {estado_actual}")
+
+        # Actualizar estado anterior
+        ultimo_estado = estado_actual
+        ultimo_tiempo_publicacion = ahora
+
+# 🕹️ Modo flujo (la tarea corre a FRECUENCIA_FLUJO)
+ESQUEMA_FLUJO = codec.esquema("ky-023")
+trama = bytearray(codec.tamano(ESQUEMA_FLUJO, MUESTRAS_POR_TRAMA))
+muestras = []
+t0_trama = 0
+
+def muestrear_flujo():
+    global t0_trama
+
+    if not muestras:
+        t0_trama = time.ticks_ms()
+    valor_btn = 0 if btn.value() else 1
+    led_onboard.value(valor_btn)
+    muestras.append((eje_x.leer(), eje_y.leer(), valor_btn))
+
+    if len(muestras) >= MUESTRAS_POR_TRAMA:
+        largo = codec.codificar_en(trama, ESQUEMA_FLUJO, (t0_trama, 1000 // FRECUENCIA_FLUJO), muestras)
+        # Copia: la cola guarda la referencia y la trama se reutiliza
+        dispositivo.publicar(MQTT_TOPIC_FLUJO, bytes(trama[:largo]))
+        muestras.clear()
+
+# Latencia: instante de la última muestra de cada trama hasta que vuelve del
+# broker (cota superior del retardo entrada -> broker, incluye la vuelta)
+latencias = {"n": 0, "suma": 0, "maximo": 0}
+
+def recibir_trama(topic, msg):
+    try:
+        _, campos = codec.decodificar(msg)
+    except (ValueError, IndexError):
+        return
+    ultima = time.ticks_add(campos["t0"], (len(campos["x"]) - 1) * campos["periodo"])
+    retardo = time.ticks_diff(time.ticks_ms(), ultima)
+    latencias["n"] += 1
+    latencias["suma"] += retardo
+    if retardo > latencias["maximo"]:
+        latencias["maximo"] = retardo
+
+def reportar():
+    if latencias["n"]:
+        promedio = latencias["suma"] // latencias["n"]
+        print(f"[INFO] Latencia muestra->broker->ESP32: prom {promedio} ms, máx {latencias['maximo']} ms ({latencias['n']} tramas)")
+        latencias["n"] = latencias["suma"] = latencias["maximo"] = 0
+    # Los extremos ampliados se guardan como mucho una vez por reporte
+    if guardar(ARCHIVO_CALIBRACION, ejes):
+        print(f"[INFO] Calibración guardada: x {eje_x.minimo}-{eje_x.tope} y {eje_y.minimo}-{eje_y.tope}")
+
+# 🏁 Inicialización: WiFi/MQTT se reconectan en su propia tarea
+print("[INFO] Iniciando sensor KY-023 (Joystick)")
+print("[INFO] Calibrando centro, no mover el joystick...")
+eje_x.calibrar_centro()
+eje_y.calibrar_centro()
+cargar(ARCHIVO_CALIBRACION, ejes)
+print(f"[INFO] Centro x={eje_x.centro} y={eje_y.centro}")
+
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
+dispositivo = Dispositivo(conexion)
+if MODO == "flujo":
+    dispositivo.periodico("joystick", 1000 // FRECUENCIA_FLUJO, muestrear_flujo)
+    if MEDIR_LATENCIA:
+        dispositivo.suscribir(MQTT_TOPIC_FLUJO, recibir_trama)
+    print(f"[INFO] Flujo a {FRECUENCIA_FLUJO} Hz en {MQTT_TOPIC_FLUJO}")
+else:
+    dispositivo.periodico("joystick", PERIODO_MUESTREO, muestrear_joystick)
+dispositivo.periodico("reporte", 10000, reportar)
+print("[INFO] Mueva el joystick o presione el botón")
+
+# 🔄 Bucle principal (uasyncio)
+dispositivo.ejecutar()
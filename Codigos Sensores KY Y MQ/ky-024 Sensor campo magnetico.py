@@ -1,7 +1,7 @@
 import time
-import network
 from machine import Pin
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
 
 # Configuración WiFi
 WIFI_SSID = "Red-Peter"
@@ -18,22 +18,8 @@ reed_switch = Pin(34, Pin.IN)  # Salida digital del sensor
 
 # Conectar WiFi
 def conectar_wifi():
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    
-    timeout = 10
-    while not sta_if.isconnected() and timeout > 0:
-        print(".", end="")
-        time.sleep(1)
-        timeout -= 1
-    
-    if sta_if.isconnected():
-        print("\n[INFO] WiFi Conectada!")
-        print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
-    else:
-        print("\n[ERROR] No se pudo conectar a WiFi")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    return conectar_red(WIFI_SSID, WIFI_PASSWORD, intentos=3)
 
 # Conectar a MQTT
 def conectar_mqtt():
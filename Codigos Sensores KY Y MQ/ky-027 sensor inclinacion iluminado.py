@@ -2,6 +2,7 @@ from machine import Pin
 import time
 import network
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
 
 WIFI_SSID = "Red-Peter"
 WIFI_PASSWORD = "12345678"
@@ -15,17 +16,8 @@ sensor_pin = Pin(14, Pin.IN)   # Entrada digital del sensor KY-027
 led_pin = Pin(16, Pin.OUT)    # Salida para el LED
 
 def conectar_wifi():
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-
-    print("\n[INFO] WiFi Conectada!")
-    print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    conectar_red(WIFI_SSID, WIFI_PASSWORD)
 
 def conectar_mqtt():
     try:
@@ -1,7 +1,7 @@
 from machine import Pin, ADC
-import network
 import time
 from umqtt.robust import MQTTClient
+from conexion import conectar_wifi as conectar_red, id_cliente
 import json
 import urequests  # Usar para hacer solicitudes HTTP
 
@@ -13,7 +13,7 @@ PASSWORD = "12345678"
 MQTT_SERVER = "broker.emqx.io"
 MQTT_PORT = 1883
 MQTT_TOPIC = b"gds0643/ky-028"
-CLIENT_ID = "ESP32Client_" + str(time.time())
+CLIENT_ID = id_cliente("esp32_ky028")  # Único por placa y estable entre reinicios
 
 # Configuración del sensor KY-028
 TEMP_DIGITAL_PIN = 16    # Pin para la salida digital
@@ -26,16 +26,8 @@ SAMPLE_TIME = 2   # Tiempo entre muestras en segundos
 SERVER_URL = "http://tu-servidor.com/api/insert_temperature"  # Cambia por tu URL de API
 
 def conectar_wifi():
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    if not wlan.isconnected():
-        print('Conectando a WiFi...')
-        wlan.connect(SSID, PASSWORD)
-        while not wlan.isconnected():
-            time.sleep(0.5)
-            print('.', end='')
-    print('\nConectado a WiFi')
-    print('Dirección IP:', wlan.ifconfig()[0])
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    conectar_red(SSID, PASSWORD)
 
 def conectar_mqtt():
     try:
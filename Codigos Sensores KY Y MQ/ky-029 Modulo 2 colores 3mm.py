@@ -1,17 +1,18 @@
-import time
-import network
 from machine import Pin
-from umqtt.simple import MQTTClient
+from actuador import Actuador
+from conexion import GestorConexion
+from dispositivo import Dispositivo
 
 # Configuración WiFi
 WIFI_SSID = "Red-Peter"
 WIFI_PASSWORD = "12345678"
 
 # Configuración MQTT
-MQTT_CLIENT_ID = "esp32_ky029"
+MQTT_CLIENT_ID = "esp32_ky029"  # GestorConexion le agrega el id del chip
 MQTT_BROKER = "broker.emqx.io"
 MQTT_PORT = 1883
-MQTT_TOPIC = "gds0653/ky-029"
+MQTT_TOPIC = "gds0653/ky-029"          # Estado (retenido): 1 (rojo), 2 (verde) o CICLO
+MQTT_TOPIC_VIDA = MQTT_TOPIC + "/vida"  # Last Will: conectado / desconectado
 
 # Configuración del KY-029 (LED de dos colores)
 RED_PIN = 12    # Pin para el LED rojo
@@ -21,90 +22,22 @@ GREEN_PIN = 14  # Pin para el LED verde
 led_rojo = Pin(RED_PIN, Pin.OUT)
 led_verde = Pin(GREEN_PIN, Pin.OUT)
 
-# Variable para seguir el estado actual
-estado_actual = "1"  # Comenzamos con rojo
-ultimo_cambio = 0
 INTERVALO_CAMBIO = 2000  # Alternar cada 2 segundos (ms)
 
-# Conectar a WiFi
-def conectar_wifi():
-    print("Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-    print("\nWiFi Conectada!")
+# Función para cambiar el estado del LED (0: rojo, 1: verde)
+def mostrar(indice):
+    led_rojo.value(1 - indice)
+    led_verde.value(indice)
 
-# Conectar a MQTT
-def conectar_mqtt():
-    try:
-        client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
-        client.connect()
-        print("Conectado a MQTT")
-        return client
-    except:
-        print("Error conectando a MQTT")
-        return None
+# WiFi/MQTT se reconectan en su propia tarea
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
+                          topic_vida=MQTT_TOPIC_VIDA)
+dispositivo = Dispositivo(conexion)
 
-# Función para obtener tiempo actual en ms
-def millis():
-    return time.ticks_ms()
-
-# Función para cambiar el estado del LED
-def cambiar_estado():
-    global estado_actual
-    
-    if estado_actual == "1":  # Si está en rojo, cambiar a verde
-        led_rojo.value(0)
-        led_verde.value(1)
-        estado_actual = "2"
-        print("LED: VERDE (2)")
-    else:  # Si está en verde, cambiar a rojo
-        led_rojo.value(1)
-        led_verde.value(0)
-        estado_actual = "1"
-        print("LED: ROJO (1)")
-    
-    # Publicar el nuevo estado en MQTT
-    if client:
-        client.publish(MQTT_TOPIC, estado_actual)
-
-# Inicialización
+# Comenzamos con rojo y alternamos solos; el estado se publica solo al
+# cambiar (CICLO mientras alterna) y MQTT_TOPIC + "/cmd" acepta 1, 2 o CICLO
 print("Iniciando sistema...")
-conectar_wifi()
-client = conectar_mqtt()
-
-# Iniciar con rojo
-led_rojo.value(1)
-led_verde.value(0)
-
-# Publicar estado inicial
-if client:
-    client.publish(MQTT_TOPIC, "1")
-    print("Estado inicial: ROJO (1)")
-
-print("Sistema listo! Alternando automáticamente entre ROJO y VERDE...")
+Actuador(dispositivo, MQTT_TOPIC, ("1", "2"), mostrar, ciclo_ms=INTERVALO_CAMBIO)
 
-# Bucle principal - alterna automáticamente
-while True:
-    try:
-        # Verificar tiempo para cambio
-        ahora = millis()
-        if ahora - ultimo_cambio >= INTERVALO_CAMBIO:
-            cambiar_estado()
-            ultimo_cambio = ahora
-        
-        # Verificar conexión MQTT
-        if client is None:
-            print("Reconectando a MQTT...")
-            client = conectar_mqtt()
-            time.sleep(1)
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        client = None
-        time.sleep(1)
-        
-    time.sleep(0.1)
\ No newline at end of file
+# Bucle principal (uasyncio)
+dispositivo.ejecutar()
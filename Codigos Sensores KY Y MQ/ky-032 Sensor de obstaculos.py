@@ -1,7 +1,7 @@
 import time
-import network
 from machine import Pin
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
 
 # 📡 Configuración WiFi
 WIFI_SSID = "Red-Peter"
@@ -19,17 +19,8 @@ sensor = Pin(SENSOR_PIN, Pin.IN)
 
 # 🔌 Conectar a WiFi
 def conectar_wifi():
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-
-    print("\n[INFO] WiFi Conectada!")
-    print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    conectar_red(WIFI_SSID, WIFI_PASSWORD)
 
 # 🔄 Conectar a MQTT
 def conectar_mqtt():
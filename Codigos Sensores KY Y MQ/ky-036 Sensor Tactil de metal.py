@@ -1,7 +1,7 @@
 from machine import Pin, ADC
 import time
-import network
 from umqtt.simple import MQTTClient
+from conexion import conectar_wifi as conectar_red
 
 # Configuración del broker MQTT
 MQTT_BROKER = "broker.emqx.io"
@@ -24,15 +24,8 @@ ultimo_envio = 0
 INTERVALO_ENVIO = 1000  # Enviar datos cada 1 segundo (ms)
 
 def conectar_wifi():
-    print("Conectando WiFi...", end="")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect('Red-Peter', '12345678')
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.3)
-    print(" ¡Conectado!")
-    print(f"Dirección IP: {sta_if.ifconfig()[0]}")
+    # Reasociación rápida (BSSID e IP guardados), plazos acotados y pausas crecientes
+    conectar_red('Red-Peter', '12345678')
 
 def subscribir():
     client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT,
@@ -1,58 +1,57 @@
-import time
-import network
-from machine import ADC, Pin
-from umqtt.simple import MQTTClient
-
-# 📡 Configuración WiFi
-WIFI_SSID = "Red-Peter"
-WIFI_PASSWORD = "12345678"
-
-MQTT_CLIENT_ID = "esp32_sensor_sonido"
-MQTT_BROKER = "broker.emqx.io"
-MQTT_PORT = 1883
-MQTT_TOPIC = "gds0653/ky-038"  # Tema para publicar los valores del sensor
-
-sensor_pin = ADC(Pin(34))  # Entrada analógica del sensor KY-038 (pin A0)
-sensor_pin.width(ADC.WIDTH_10BIT)  # Configura el ancho de bits (10 bits = 0-1023)
-sensor_pin.atten(ADC.ATTN_0DB)  # Configura la atenuación (0-3.3V)
-
-def conectar_wifi():
-    print("[INFO] Conectando a WiFi...")
-    sta_if = network.WLAN(network.STA_IF)
-    sta_if.active(True)
-    sta_if.connect(WIFI_SSID, WIFI_PASSWORD)
-
-    while not sta_if.isconnected():
-        print(".", end="")
-        time.sleep(0.5)
-
-    print("\n[INFO] WiFi Conectada!")
-    print(f"[INFO] Dirección IP: {sta_if.ifconfig()[0]}")
-
-def conectar_mqtt():
-    try:
-        client = MQTTClient(MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
-        client.connect()
-        print(f"[INFO] Conectado a MQTT en {MQTT_BROKER}")
-        return client
-    except Exception as e:
-        print(f"[ERROR] No se pudo conectar a MQTT: {e}")
-        return None
-
-conectar_wifi()
-client = conectar_mqtt()
-
-while True:
-    try:
-        sonido = sensor_pin.read()  # Lee un valor entre 0 y 1023
-
-        if client:
-            client.publish(MQTT_TOPIC, str(sonido))
-            print(f"[INFO] Publicado en {MQTT_TOPIC}: {sonido}")
-
-        time.sleep(2)
-
-    except Exception as e:
-        print(f"[ERROR] Error en el loop principal: {e}")
-        client = None  # Intentará reconectar en la siguiente iteración
-        time.sleep(5)
+from machine import ADC, Pin
+from audio import MedidorSonido
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+from politicas import crear
+
+# 📡 Configuración WiFi
+WIFI_SSID = "Red-Peter"
+WIFI_PASSWORD = "12345678"
+
+MQTT_CLIENT_ID = "esp32_sensor_sonido"
+MQTT_BROKER = "broker.emqx.io"
+MQTT_PORT = 1883
+MQTT_TOPIC = "gds0653/ky-038"  # Tema para publicar los valores del sensor
+
+sensor_pin = ADC(Pin(34))  # Entrada analógica del sensor KY-038 (pin A0)
+sensor_pin.width(ADC.WIDTH_10BIT)  # Configura el ancho de bits (10 bits = 0-1023)
+sensor_pin.atten(ADC.ATTN_0DB)  # Configura la atenuación (0-3.3V)
+
+# Ventanas de 512 muestras a 8 kHz (64 ms): una lectura suelta no dice
+# nada de un sonido que cambia miles de veces por segundo
+medidor = MedidorSonido(sensor_pin, frecuencia=8000, muestras=512, bits=10)
+PERIODO_MEDICION = 1000  # Una ventana por segundo (ms)
+
+# Cuándo publicar: si el nivel cambia más de 3 dB, y como mínimo cada 30 s
+POLITICA = {"tipo": "banda", "umbral": 3, "silencio_max_ms": 30000}
+politica = crear(POLITICA)
+
+# 🔋 Bajo consumo: con True la placa duerme (deep sleep) entre ventanas,
+# junta los dB en la memoria RTC y enciende la radio solo para subirlos en
+# un lote ({"t0","dt","v"} en MQTT_TOPIC/lote) cada DESPERTARES_POR_ENVIO
+BAJO_CONSUMO = False
+DESPERTARES_POR_ENVIO = 30  # Un lote cada 30 s
+
+# Tarea de medición (la ejecuta el runtime cada PERIODO_MEDICION)
+def medir_sonido():
+    if politica.evaluar(medidor.medir()) is not None:
+        # {"db":..,"rms":..,"pico":..,"cresta":..} en vez de las muestras
+        mensaje = medidor.json()
+        dispositivo.publicar(MQTT_TOPIC, mensaje)
+        print(f"[INFO] Publicado en {MQTT_TOPIC}: {mensaje}")
+
+if BAJO_CONSUMO:
+    # Cada despertar corre el script desde el principio y termina durmiendo
+    from sueno import CicloSueno
+    ciclo = CicloSueno(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, MQTT_TOPIC + "/lote",
+                       periodo_ms=PERIODO_MEDICION, despertares_por_envio=DESPERTARES_POR_ENVIO,
+                       port=MQTT_PORT, formato="%.1f")
+    ciclo.ejecutar(medidor.medir)
+
+# WiFi/MQTT se reconectan en su propia tarea
+conexion = GestorConexion(WIFI_SSID, WIFI_PASSWORD, MQTT_CLIENT_ID, MQTT_BROKER, port=MQTT_PORT)
+dispositivo = Dispositivo(conexion)
+dispositivo.periodico("sonido", PERIODO_MEDICION, medir_sonido)
+
+# 🔄 Bucle principal (uasyncio)
+dispositivo.ejecutar()
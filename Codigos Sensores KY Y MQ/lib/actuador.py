@@ -0,0 +1,83 @@
+CICLO = "CICLO"
+
+
+class Actuador:
+    """Estado de un actuador, publicado retenido y solo cuando cambia.
+
+    ``estados`` son los payloads que lo describen (p. ej. ``("APAGADO",
+    "ENCENDIDO")``) y ``aplicar(i)`` pone el hardware en ``estados[i]``.
+    El estado va a ``topic`` con retain: quien se suscribe tarde (Node-RED
+    tras reiniciar, un panel) lo recibe al instante, así que no hace
+    falta repetirlo en cada vuelta ni tras reconectar.
+
+    Con ``ciclo_ms`` el actuador alterna solo entre sus estados y lo
+    publicado es ``CICLO``, una vez: cada parpadeo no es un cambio de
+    estado. Los comandos en ``topic + "/cmd"`` fijan un estado (su
+    payload, ``ON``/``1`` para el último u ``OFF``/``0`` para el
+    primero) o vuelven al ``CICLO``. Sin ``estados`` solo queda
+    ``informar()``, para actuadores con su propio formato (``ky-016``).
+
+    Con ``topic_real`` cada movimiento del hardware, también los del
+    ciclo, publica ``estados[i]`` ahí sin retain: el ``CICLO`` retenido
+    dice el modo y este el estado real para la base de datos (``ky-019``).
+    """
+
+    def __init__(self, dispositivo, topic, estados=(), aplicar=None, ciclo_ms=0, inicial=0,
+                 nombre="ciclo", topic_real=None):
+        self.dispositivo = dispositivo
+        self.topic = topic
+        self.topic_real = topic_real
+        self.estados = estados
+        self.aplicar = aplicar
+        self.indice = inicial
+        self.automatico = bool(ciclo_ms)
+        self.publicaciones = 0
+        self._publicado = None
+        if not estados:
+            return
+        self._mover(inicial)
+        dispositivo.suscribir(topic + "/cmd", self._comando)
+        if ciclo_ms:
+            dispositivo.periodico(nombre, ciclo_ms, self._alternar)
+        self.informar(CICLO if self.automatico else estados[inicial])
+
+    def informar(self, payload):
+        """Publica ``payload`` (retenido) si no es el último publicado."""
+        if payload == self._publicado:
+            return
+        self._publicado = payload
+        self.publicaciones += 1
+        self.dispositivo.publicar(self.topic, payload, True)
+        print(f"[INFO] Estado de {self.topic}: {payload}")
+
+    def fijar(self, indice):
+        self.automatico = False
+        self._mover(indice)
+        self.informar(self.estados[indice])
+
+    def ciclo(self):
+        self.automatico = True
+        self.informar(CICLO)
+
+    def _mover(self, indice):
+        self.indice = indice
+        self.aplicar(indice)
+        if self.topic_real:
+            self.dispositivo.publicar(self.topic_real, self.estados[indice])
+
+    def _alternar(self):
+        if self.automatico:
+            self._mover((self.indice + 1) % len(self.estados))
+
+    def _comando(self, topic, msg):
+        comando = msg.decode().strip()
+        if comando in self.estados:
+            self.fijar(self.estados.index(comando))
+        elif comando.upper() in ("ON", "1"):
+            self.fijar(len(self.estados) - 1)
+        elif comando.upper() in ("OFF", "0"):
+            self.fijar(0)
+        elif comando.upper() == CICLO:
+            self.ciclo()
+        else:
+            print(f"[ERROR] Comando no reconocido en {self.topic}: {comando}")
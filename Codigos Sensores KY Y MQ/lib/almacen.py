@@ -0,0 +1,155 @@
+import os
+import struct
+
+# Registro de tamaño fijo: secuencia, arranque, ticks_ms, canal, valor
+FORMATO = "<IIIHf"
+TAMANO = struct.calcsize(FORMATO)  # 18 bytes
+SECTOR = 4096  # Tamaño de sector de la flash del ESP32
+
+
+class RegistroCircular:
+    """Registro circular de lecturas en la flash para cuando no hay red.
+
+    Las lecturas se acumulan en RAM y se escriben a la flash de a
+    ``bloque`` registros, así una lectura no cuesta una escritura. Cada
+    registro lleva un número de secuencia: al arrancar se recorre el
+    archivo para recuperar la posición, y solo el puntero de lectura se
+    guarda aparte (``<ruta>.pos``), una vez por lote confirmado.
+    Si el corte dura más que la capacidad se pisan los registros más
+    antiguos.
+
+    ``ticks_ms`` vuelve a cero en cada reinicio, así que cada registro
+    lleva también el número de ``arranque`` en que se guardó: al
+    recuperar, el mayor del archivo más uno (sin escrituras extra). Los
+    ticks de un registro solo sirven para fecharlo si su arranque es el
+    actual.
+    """
+
+    def __init__(self, ruta="registro.bin", capacidad=2048, bloque=16):
+        self.ruta = ruta
+        self.capacidad = capacidad
+        self.bloque = bloque
+        self._ram = bytearray(bloque * TAMANO)
+        self._en_ram = 0
+        self._secuencia = 1   # Próximo número de secuencia a escribir
+        self._lectura = 1     # Secuencia del registro más antiguo sin enviar
+        self.arranque = 1
+        sectores = (capacidad * TAMANO + SECTOR - 1) // SECTOR
+        self.escrituras_sector = [0] * sectores
+        self.escrituras = 0
+        self.bytes_escritos = 0
+        self.perdidos = 0
+        self._abrir()
+        self._recuperar()
+
+    def _abrir(self):
+        largo = self.capacidad * TAMANO
+        try:
+            existe = os.stat(self.ruta)[6] == largo
+        except OSError:
+            existe = False
+        if not existe:
+            with open(self.ruta, "wb") as archivo:
+                vacio = bytes(SECTOR)
+                restante = largo
+                while restante > 0:
+                    archivo.write(vacio[:min(SECTOR, restante)])
+                    restante -= SECTOR
+        self._archivo = open(self.ruta, "r+b")
+
+    def _recuperar(self):
+        maxima = 0
+        arranque = 0
+        registro = bytearray(TAMANO)
+        self._archivo.seek(0)
+        for _ in range(self.capacidad):
+            self._archivo.readinto(registro)
+            secuencia, anterior = struct.unpack_from("<II", registro)
+            if secuencia > maxima:
+                maxima = secuencia
+            if anterior > arranque:
+                arranque = anterior
+        self._secuencia = maxima + 1
+        self.arranque = arranque + 1
+        try:
+            with open(self.ruta + ".pos", "rb") as archivo:
+                self._lectura = struct.unpack("<I", archivo.read(4))[0]
+        except (OSError, ValueError):
+            self._lectura = 1
+        self._lectura = max(self._lectura, self._secuencia - self.capacidad, 1)
+
+    def pendientes(self):
+        return self._secuencia - self._lectura
+
+    def agregar(self, ticks, canal, valor):
+        struct.pack_into(FORMATO, self._ram, self._en_ram * TAMANO,
+                         self._secuencia, self.arranque, ticks, canal, valor)
+        self._secuencia += 1
+        self._en_ram += 1
+        if self.pendientes() > self.capacidad:
+            self._lectura += 1
+            self.perdidos += 1
+        if self._en_ram == self.bloque:
+            self.volcar()
+
+    def volcar(self):
+        """Escribe a la flash las lecturas que aún están en RAM."""
+        if not self._en_ram:
+            return
+        primera = self._secuencia - self._en_ram
+        vista = memoryview(self._ram)
+        hecho = 0
+        while hecho < self._en_ram:
+            ranura = (primera + hecho - 1) % self.capacidad
+            cantidad = min(self._en_ram - hecho, self.capacidad - ranura)
+            self._escribir(ranura * TAMANO, vista[hecho * TAMANO:(hecho + cantidad) * TAMANO])
+            hecho += cantidad
+        self._archivo.flush()
+        self._en_ram = 0
+
+    def _escribir(self, posicion, datos):
+        self._archivo.seek(posicion)
+        self._archivo.write(datos)
+        self.escrituras += 1
+        self.bytes_escritos += len(datos)
+        for sector in range(posicion // SECTOR, (posicion + len(datos) - 1) // SECTOR + 1):
+            self.escrituras_sector[sector] += 1
+
+    def leer(self, maximo):
+        """Devuelve hasta ``maximo`` lecturas pendientes [(arranque, ticks,
+        canal, valor)] sin consumirlas; se descartan con ``confirmar()``
+        tras enviarlas."""
+        self.volcar()
+        lote = []
+        registro = bytearray(TAMANO)
+        secuencia = self._lectura
+        while len(lote) < maximo and secuencia < self._secuencia:
+            self._archivo.seek(((secuencia - 1) % self.capacidad) * TAMANO)
+            self._archivo.readinto(registro)
+            leida, arranque, ticks, canal, valor = struct.unpack(FORMATO, registro)
+            if leida != secuencia:
+                if lote:
+                    break
+                # Registro dañado (p. ej. corte de energía al escribir): se salta
+                self._lectura += 1
+                self.perdidos += 1
+            else:
+                lote.append((arranque, ticks, canal, valor))
+            secuencia += 1
+        return lote
+
+    def confirmar(self, cantidad):
+        self._lectura += cantidad
+        with open(self.ruta + ".pos", "wb") as archivo:
+            archivo.write(struct.pack("<I", self._lectura))
+        self.escrituras += 1
+        self.bytes_escritos += 4
+
+    def estadisticas(self):
+        return {
+            "pendientes": self.pendientes(),
+            "perdidos": self.perdidos,
+            "escrituras": self.escrituras,
+            "bytes_escritos": self.bytes_escritos,
+            "desgaste_max": max(self.escrituras_sector),
+        }
@@ -0,0 +1,90 @@
+import math
+import time
+import micropython
+from array import array
+
+
+class MedidorSonido:
+    """Nivel de sonido de un micrófono analógico (KY-037, KY-038).
+
+    ``medir()`` captura una ventana de ``muestras`` lecturas a
+    ``frecuencia`` Hz (espera activa con ``ticks_us``) en un
+    ``array('H')`` reutilizado y calcula, sin guardar las muestras:
+
+    - ``rms``: valor eficaz sin la componente continua (cuentas);
+    - ``pico``: mayor desvío respecto de la media (cuentas);
+    - ``cresta``: pico / rms (≈1.4 un tono puro, más alto los golpes);
+    - ``db``: nivel en dBFS (0 = senoidal de escala completa) o, con
+      ``offset_db`` calibrado contra un sonómetro, dB SPL aproximados.
+
+    La captura bloquea durante ``muestras / frecuencia`` s (64 ms con los
+    valores por defecto). Si el ADC no alcanza la frecuencia pedida,
+    ``frecuencia_real`` dice cuál se logró.
+    """
+
+    def __init__(self, adc, frecuencia=8000, muestras=512, bits=12, offset_db=None):
+        self.adc = adc
+        self.frecuencia = frecuencia
+        self.periodo_us = 1000000 // frecuencia
+        self.muestras = muestras
+        self.offset_db = offset_db
+        self._buffer = array("H", [0] * muestras)
+        # RMS de una senoidal que ocupa toda la escala del ADC
+        self._escala_completa = (1 << bits) / 2 / math.sqrt(2)
+        self.media = 0
+        self.rms = 0.0
+        self.pico = 0
+        self.cresta = 0.0
+        self.db = 0.0
+        self.frecuencia_real = 0
+        self.ventanas = 0
+
+    @micropython.native
+    def _capturar(self):
+        buffer = self._buffer
+        leer = self.adc.read
+        periodo = self.periodo_us
+        inicio = time.ticks_us()
+        siguiente = inicio
+        for i in range(self.muestras):
+            while time.ticks_diff(time.ticks_us(), siguiente) < 0:
+                pass
+            buffer[i] = leer()
+            siguiente = time.ticks_add(siguiente, periodo)
+        return time.ticks_diff(time.ticks_us(), inicio)
+
+    def medir(self):
+        duracion = self._capturar()
+        self.frecuencia_real = self.muestras * 1000000 // max(1, duracion)
+
+        buffer = self._buffer
+        n = self.muestras
+        total = 0
+        for i in range(n):
+            total += buffer[i]
+        media = total // n
+        # Desvíos en enteros: una sola raíz y un logaritmo por ventana
+        cuadrados = 0
+        pico = 0
+        for i in range(n):
+            desvio = buffer[i] - media
+            cuadrados += desvio * desvio
+            if desvio < 0:
+                desvio = -desvio
+            if desvio > pico:
+                pico = desvio
+
+        self.media = media
+        self.pico = pico
+        self.rms = math.sqrt(cuadrados / n)
+        self.cresta = pico / self.rms if self.rms else 0.0
+        # Piso de 0.5 cuentas: el ruido de cuantización del ADC
+        self.db = 20 * math.log10(max(self.rms, 0.5) / self._escala_completa)
+        if self.offset_db is not None:
+            self.db += self.offset_db
+        self.ventanas += 1
+        return self.db
+
+    def json(self):
+        return '{"db":%.1f,"rms":%.1f,"pico":%d,"cresta":%.2f}' % (
+            self.db, self.rms, self.pico, self.cresta)
@@ -0,0 +1,160 @@
+import struct
+
+# Formato binario compacto para los mensajes de los sensores.
+#
+#   byte 0      versión del formato (VERSION)
+#   byte 1      id del esquema (ESQUEMAS)
+#   bytes 2..   campos fijos empaquetados con struct (little endian)
+#   [n, ...]    si el esquema es de lote: 1 byte con la cantidad de
+#               elementos y luego n veces el formato repetido
+#
+# Un campo es un nombre, o (nombre, escala) para números con decimales
+# (se envía round(valor * escala) como entero), o (nombre, opciones)
+# para textos de un conjunto fijo (se envía el índice).
+# Agregar campos a un esquema rompe a los receptores: para eso se crea
+# un esquema nuevo o se sube VERSION.
+VERSION = 1
+
+COLORES = ("apagado", "blanco", "rojo", "verde", "azul", "amarillo",
+           "magenta", "cian", "personalizado")
+
+# id: (nombre, formato fijo, campos fijos, formato repetido, campos repetidos)
+ESQUEMAS = {
+    1: ("mq-135", "<H", ("valor",), None, ()),
+    2: ("mq-04", "<HB", ("valor", "alerta"), None, ()),
+    3: ("mq-05", "<HBH", ("valor", "alerta", "ppm_aprox"), None, ()),
+    4: ("ky-001", "<h", (("temperatura", 100),), None, ()),
+    5: ("ky-039", "<HB", ("valor", "bpm"), None, ()),
+    6: ("ky-040", "<BiB", (("evento", ("ROT", "BTN")), "contador",
+                           ("direccion", ("CW", "CCW", "PRESS"))), None, ()),
+    7: ("ky-016", "<HHHBIi", ("r", "g", "b", ("color", COLORES), "contador", "timestamp"),
+        None, ()),
+    8: ("ky-010", "<BIIi", ("valor", "contador", "interrupciones", "timestamp"), None, ()),
+    9: ("ky-028", "<BHhIi", ("valor_digital", "valor_analogico", ("temperatura_aprox", 10),
+                            "contador", "timestamp"), None, ()),
+    # Lotes de lotes.Lote: instante de la primera muestra + (dt, valor) por muestra
+    10: ("lote", "<I", ("t0",), "<HH", ("dt", "v")),
+    11: ("ky-039/lote", "<IB", ("t0", "bpm"), "<HH", ("dt", "v")),
+    # Tramas del joystick: instante de la primera muestra, ms entre muestras
+    # y (x, y) en milésimas de -1000 a 1000 más el botón por muestra
+    12: ("ky-023", "<IB", ("t0", "periodo"), "<hhB", ("x", "y", "boton")),
+}
+
+_POR_NOMBRE = {esquema[0]: numero for numero, esquema in ESQUEMAS.items()}
+
+
+def _directo(campos):
+    # Sin escalas ni opciones los valores se empaquetan tal cual
+    for campo in campos:
+        if isinstance(campo, tuple):
+            return False
+    return True
+
+
+# id: (fijos directos, repetidos directos)
+_DIRECTOS = {numero: (_directo(e[2]), _directo(e[4])) for numero, e in ESQUEMAS.items()}
+
+
+def esquema(nombre):
+    """Id numérico del esquema ``nombre`` (p. ej. "mq-135")."""
+    return _POR_NOMBRE[nombre]
+
+
+def _a_entero(campo, valor):
+    if isinstance(campo, tuple):
+        opciones = campo[1]
+        if isinstance(opciones, tuple):
+            if valor not in opciones:
+                # Codificarlo como otra opción haría que el receptor lea un dato falso
+                raise ValueError("valor fuera de las opciones: %s" % valor)
+            return opciones.index(valor)
+        return int(round(valor * opciones))
+    return int(valor)
+
+
+def tamano(numero, elementos=0):
+    """Bytes que ocupa un mensaje del esquema ``numero``."""
+    _, fijo, _, repetido, _ = ESQUEMAS[numero]
+    largo = 2 + struct.calcsize(fijo)
+    if repetido:
+        largo += 1 + elementos * struct.calcsize(repetido)
+    return largo
+
+
+def codificar_en(buf, numero, valores, elementos=None):
+    """Escribe el mensaje en ``buf`` (bytearray) y devuelve su largo.
+
+    ``valores`` son los campos fijos en el orden del esquema y
+    ``elementos`` una lista de tuplas con los campos repetidos.
+    """
+    _, fijo, campos, repetido, campos_rep = ESQUEMAS[numero]
+    directo_fijo, directo_rep = _DIRECTOS[numero]
+    buf[0] = VERSION
+    buf[1] = numero
+    if not directo_fijo:
+        valores = [_a_entero(c, v) for c, v in zip(campos, valores)]
+    struct.pack_into(fijo, buf, 2, *valores)
+    largo = 2 + struct.calcsize(fijo)
+    if repetido:
+        elementos = elementos or ()
+        buf[largo] = len(elementos)
+        largo += 1
+        paso = struct.calcsize(repetido)
+        for elemento in elementos:
+            if not directo_rep:
+                elemento = [_a_entero(c, v) for c, v in zip(campos_rep, elemento)]
+            struct.pack_into(repetido, buf, largo, *elemento)
+            largo += paso
+    return largo
+
+
+def codificar(numero, valores, elementos=None):
+    buf = bytearray(tamano(numero, len(elementos) if elementos else 0))
+    codificar_en(buf, numero, valores, elementos)
+    return buf
+
+
+def _de_entero(campo, valor):
+    if isinstance(campo, tuple):
+        nombre, opciones = campo
+        if isinstance(opciones, tuple):
+            return nombre, opciones[valor] if valor < len(opciones) else None
+        return nombre, valor / opciones
+    return campo, valor
+
+
+def decodificar(datos):
+    """Devuelve (nombre del esquema, dict de campos) de un mensaje binario.
+
+    Los campos repetidos quedan como listas, p. ej. {"t0":.., "dt":[..], "v":[..]}.
+    Un mensaje mal formado (incluso truncado) da ``ValueError``.
+    """
+    datos = bytes(datos)
+    if len(datos) < 2 or datos[0] != VERSION:
+        raise ValueError("versión de formato desconocida")
+    if datos[1] not in ESQUEMAS:
+        raise ValueError("esquema desconocido: %d" % datos[1])
+    nombre, fijo, campos, repetido, campos_rep = ESQUEMAS[datos[1]]
+    largo = tamano(datos[1])
+    if repetido and len(datos) >= largo:
+        # El último byte de la parte fija es la cantidad de elementos
+        largo = tamano(datos[1], datos[largo - 1])
+    if len(datos) < largo:
+        raise ValueError("mensaje truncado: %d bytes" % len(datos))
+    resultado = {}
+    for campo, valor in zip(campos, struct.unpack_from(fijo, datos, 2)):
+        clave, valor = _de_entero(campo, valor)
+        resultado[clave] = valor
+    if repetido:
+        posicion = 2 + struct.calcsize(fijo)
+        cantidad = datos[posicion]
+        posicion += 1
+        paso = struct.calcsize(repetido)
+        for campo in campos_rep:
+            resultado[_de_entero(campo, 0)[0]] = []
+        for _ in range(cantidad):
+            for campo, valor in zip(campos_rep, struct.unpack_from(repetido, datos, posicion)):
+                clave, valor = _de_entero(campo, valor)
+                resultado[clave].append(valor)
+            posicion += paso
+    return nombre, resultado
@@ -0,0 +1,358 @@
+import binascii
+import json
+import time
+import machine
+import network
+import uasyncio as asyncio
+from umqtt.simple import MQTTClient
+
+# Tiempos por defecto (ms)
+TIEMPO_MAX_WIFI = 15000      # Espera máxima por la asociación WiFi
+TIEMPO_MAX_RAPIDA = 2000     # Espera máxima de la reasociación con datos guardados
+ESPERA_REINTENTO = 2000      # Pausa fija entre intentos (conexión completa)
+ESPERA_MINIMA = 500          # Pausas crecientes: la primera...
+ESPERA_MAXIMA = 60000        # ...se duplica en cada fallo hasta este tope
+PERIODO_SUPERVISION = 500    # Cada cuánto se revisa el estado de la conexión
+INTENTOS_RAPIDA = 2          # Reasociaciones fallidas antes de volver a escanear
+VIDA_MINIMA_SESION = 10000   # Una sesión MQTT cortada antes de esto cuenta como toma
+
+# BSSID, canal e IP del último enlace bueno (flash: sobrevive a los cortes de luz)
+ARCHIVO_RED = "red.json"
+
+
+def espera_reintento(fallos):
+    """Pausa (ms) antes del siguiente intento tras ``fallos`` seguidos."""
+    return min(ESPERA_MINIMA << min(fallos - 1, 7), ESPERA_MAXIMA) if fallos else 0
+
+
+def id_cliente(prefijo):
+    """Client id único por placa: ``prefijo`` más el id del chip (MAC de fábrica).
+
+    Un id fijo se repite si el mismo script corre en dos placas, y uno
+    armado con ``time.time()`` se repite tras cada reinicio sin RTC.
+    """
+    return prefijo + "_" + binascii.hexlify(machine.unique_id()).decode()
+
+
+class ControlSesion:
+    """Detecta la toma de sesión y espacia las reconexiones que la causan.
+
+    Con dos clientes con el mismo client id el broker corta la sesión
+    anterior en cuanto entra la nueva, sin aviso: el único síntoma es que
+    el socket se cae poco después de conectar con la WiFi en pie. Cada
+    sesión que dura menos de ``vida_minima_ms`` cuenta en ``tomas`` y la
+    pausa antes de reconectar (``espera_ms()``) se duplica con las
+    ``seguidas``, en vez de patear al otro cliente de vuelta al instante.
+    Una sesión que dura más vuelve la pausa a cero.
+    """
+
+    def __init__(self, vida_minima_ms=VIDA_MINIMA_SESION):
+        self.vida_minima_ms = vida_minima_ms
+        self.tomas = 0
+        self.seguidas = 0
+        self._inicio = None
+
+    def conectada(self):
+        self._inicio = time.ticks_ms()
+
+    def perdida(self, enlace=True):
+        """Registra la caída (``enlace``: la WiFi sigue conectada); devuelve
+        la pausa (ms) antes de reconectar."""
+        if self._inicio is not None:
+            vida = time.ticks_diff(time.ticks_ms(), self._inicio)
+            self._inicio = None
+            if enlace and vida < self.vida_minima_ms:
+                self.tomas += 1
+                self.seguidas += 1
+                print(f"[ERROR] Sesión MQTT cortada a los {vida} ms ({self.seguidas} seguidas): ¿client id repetido?")
+            else:
+                self.seguidas = 0
+        return self.espera_ms()
+
+    def espera_ms(self):
+        return espera_reintento(self.seguidas)
+
+
+class RedRapida:
+    """Asociación WiFi con el BSSID, el canal y la IP del último enlace.
+
+    Sin datos guardados se escanea, se elige el AP con mejor señal y se
+    conecta por DHCP; luego se guardan en ``archivo`` (solo si cambiaron,
+    para no gastar la flash). Con datos se fija la IP (sin DHCP) y se
+    conecta directo al BSSID (sin escaneo): ~0.3 s en vez de 2-3 s. Tras
+    ``INTENTOS_RAPIDA`` reasociaciones que no terminan en
+    ``TIEMPO_MAX_RAPIDA`` (corte, otro AP, IP ocupada) el intento vuelve
+    a escanear: si no ve la red falla al instante, sin esperar el plazo,
+    y los datos se conservan; si ve el mismo AP conserva la IP.
+
+    ``iniciar()`` arranca un intento y ``esperar_ms()`` da su plazo; el
+    sondeo de ``isconnected()`` queda a cargo de quien la usa (con
+    ``await`` o con ``sleep``).
+    """
+
+    def __init__(self, wlan, ssid, password, archivo=ARCHIVO_RED, reusar_ip=True):
+        self.wlan = wlan
+        self.ssid = ssid
+        self.password = password
+        self.archivo = archivo
+        self.reusar_ip = reusar_ip
+        self.datos = self._cargar()
+        self.rapida = False
+        self.fallos_rapida = 0
+        self._ap = None
+        self.rapidas = 0
+        self.completas = 0
+
+    def _cargar(self):
+        try:
+            with open(self.archivo) as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return datos if datos.get("ssid") == self.ssid else None
+
+    def iniciar(self):
+        """Arranca un intento; devuelve False si el escaneo no ve la red."""
+        self.wlan.active(True)
+        self.rapida = self.datos is not None and self.fallos_rapida < INTENTOS_RAPIDA
+        if self.rapida:
+            if self.reusar_ip and self.datos.get("ip"):
+                self.wlan.ifconfig(tuple(self.datos["ip"]))
+            self.wlan.connect(self.ssid, self.password, bssid=binascii.unhexlify(self.datos["bssid"]))
+            self.rapidas += 1
+            return True
+        # El escaneo bloquea (~1-2 s) pero solo ocurre sin datos o tras fallar la rápida
+        mejor = None
+        for red in self.wlan.scan():
+            if red[0].decode() == self.ssid and (mejor is None or red[3] > mejor[3]):
+                mejor = red
+        if mejor is None:
+            return False
+        self._ap = (mejor[1], mejor[2])
+        # Mismo AP que antes: la IP guardada sigue sirviendo
+        mismo = self.datos is not None and binascii.hexlify(mejor[1]).decode() == self.datos["bssid"]
+        if not (mismo and self.reusar_ip and self.datos.get("ip")):
+            self.wlan.ifconfig("dhcp")
+        self.wlan.connect(self.ssid, self.password, bssid=mejor[1])
+        self.completas += 1
+        return True
+
+    def esperar_ms(self, tiempo_max=TIEMPO_MAX_WIFI):
+        return TIEMPO_MAX_RAPIDA if self.rapida else tiempo_max
+
+    def conectada(self):
+        # Tras un enlace completo se guardan BSSID, canal e IP
+        self.fallos_rapida = 0
+        if not self.rapida and self._ap is not None:
+            bssid, canal = self._ap
+            datos = {"ssid": self.ssid, "bssid": binascii.hexlify(bssid).decode(),
+                     "canal": canal, "ip": list(self.wlan.ifconfig())}
+            if datos != self.datos:
+                try:
+                    with open(self.archivo, "w") as f:
+                        json.dump(datos, f)
+                except OSError:
+                    pass
+            self.datos = datos
+            self._ap = None
+
+    def fallida(self):
+        self.wlan.disconnect()
+        if self.rapida:
+            self.fallos_rapida += 1
+
+
+def conectar_wifi(ssid, password, tiempo_max=TIEMPO_MAX_WIFI, intentos=None, archivo=ARCHIVO_RED):
+    """Versión bloqueante para los scripts con bucle propio: reintenta
+    con pausas crecientes hasta conectar o agotar ``intentos``."""
+    wlan = network.WLAN(network.STA_IF)
+    if wlan.isconnected():
+        return True
+    print("[INFO] Conectando a WiFi...")
+    red = RedRapida(wlan, ssid, password, archivo)
+    fallos = 0
+    inicio = time.ticks_ms()
+    while intentos is None or fallos < intentos:
+        if red.iniciar():
+            plazo = red.esperar_ms(tiempo_max)
+            intento = time.ticks_ms()
+            while not wlan.isconnected() and time.ticks_diff(time.ticks_ms(), intento) < plazo:
+                time.sleep_ms(50)
+        if wlan.isconnected():
+            red.conectada()
+            ms = time.ticks_diff(time.ticks_ms(), inicio)
+            modo = "rápida" if red.rapida else "completa"
+            print(f"[INFO] WiFi Conectada en {ms} ms ({modo}), IP: {wlan.ifconfig()[0]}")
+            return True
+        red.fallida()
+        fallos += 1
+        print(f"[ERROR] WiFi sin conexión (intento {fallos})")
+        if intentos is None or fallos < intentos:
+            time.sleep_ms(espera_reintento(fallos))
+    return False
+
+
+class GestorConexion:
+    """Mantiene WiFi y MQTT conectados desde una tarea de uasyncio.
+
+    Nunca bloquea el bucle esperando a la red: la asociación WiFi se
+    sondea con ``await``. Solo ``MQTTClient.connect()`` es bloqueante
+    (umqtt.simple no tiene versión asíncrona) y queda acotado por el
+    timeout del socket.
+
+    La WiFi se reasocia con ``RedRapida`` (``rapida=False`` vuelve a la
+    conexión completa de siempre) y los intentos fallidos esperan cada
+    vez el doble, hasta ``ESPERA_MAXIMA``. ``arranque_ms`` y
+    ``reconexion_ms`` miden desde el arranque o la caída hasta la primera
+    publicación entregada (``Dispositivo`` llama ``primera_publicacion()``);
+    con ``topic_telemetria`` se publican tras cada conexión.
+
+    ``client_id`` es un prefijo: se le agrega el id del chip
+    (``id_cliente()``) salvo con ``unico=False``. Las sesiones que el
+    broker corta enseguida (otro cliente con el mismo id) se cuentan en
+    ``sesion.tomas`` y espacian la reconexión (``ControlSesion``).
+
+    Con ``topic_vida`` la placa deja un solo Last Will para todos sus
+    topics: ``desconectado`` (retenido) que el broker publica si la
+    conexión muere sin aviso, y ``conectado`` al conectar.
+    """
+
+    def __init__(self, ssid, password, client_id, broker, port=1883,
+                 user=None, password_mqtt=None, keepalive=60, rapida=True,
+                 topic_telemetria=None, unico=True, topic_vida=None):
+        self.ssid = ssid
+        self.password = password
+        self.client_id = id_cliente(client_id) if unico else client_id
+        self.broker = broker
+        self.port = port
+        self.user = user or None
+        self.password_mqtt = password_mqtt or None
+        self.keepalive = keepalive
+        self.cliente = None
+        self.wlan = network.WLAN(network.STA_IF)
+        self.red = RedRapida(self.wlan, ssid, password) if rapida else None
+        self.topic_telemetria = topic_telemetria
+        self.topic_vida = topic_vida
+        self.sesion = ControlSesion()
+        self._al_conectar = []
+        # Conexiones MQTT logradas; reconexiones cuenta desde la segunda
+        self.conexiones = 0
+        self.reconexiones = 0
+        self.fallos = 0
+        # Intentos fallidos del corte en curso: la telemetría los informa
+        # en la primera publicación (fallos vuelve a 0 al conectar)
+        self._fallos_corte = 0
+        self.arranque_ms = None
+        self.reconexion_ms = None
+        # ticks_ms() cuenta desde el arranque: la primera medición es el boot
+        self._desde = 0
+
+    def al_conectar(self, funcion):
+        # funcion(cliente) se llama tras cada conexión MQTT (p. ej. para suscribirse)
+        self._al_conectar.append(funcion)
+
+    def conectado(self):
+        return self.cliente is not None and self.wlan.isconnected()
+
+    def perdida(self):
+        # Lo llaman las tareas que detectan un error de socket
+        if self.cliente is not None:
+            try:
+                self.cliente.sock.close()
+            except Exception:
+                pass
+            self.sesion.perdida(self.wlan.isconnected())
+            if self._desde is None:
+                self._desde = time.ticks_ms()
+        self.cliente = None
+
+    def midiendo(self):
+        return self._desde is not None
+
+    def primera_publicacion(self):
+        """Cierra la medición en curso; devuelve la telemetría como dict."""
+        ms = time.ticks_diff(time.ticks_ms(), self._desde)
+        self._desde = None
+        fallos = self._fallos_corte
+        self._fallos_corte = 0
+        if self.arranque_ms is None:
+            self.arranque_ms = ms
+        else:
+            self.reconexion_ms = ms
+        return {"arranque_ms": self.arranque_ms, "reconexion_ms": self.reconexion_ms,
+                "rapida": int(self.red is not None and self.red.rapida),
+                "reconexiones": self.reconexiones, "fallos": fallos, "tomas": self.sesion.tomas}
+
+    async def conectar_wifi(self, tiempo_max=TIEMPO_MAX_WIFI):
+        if self.wlan.isconnected():
+            return True
+        print("[INFO] Conectando a WiFi...")
+        if self.red is not None:
+            if not self.red.iniciar():
+                print("[ERROR] Red WiFi no encontrada")
+                return False
+            tiempo_max = self.red.esperar_ms(tiempo_max)
+        else:
+            self.wlan.active(True)
+            self.wlan.connect(self.ssid, self.password)
+        inicio = time.ticks_ms()
+        while not self.wlan.isconnected():
+            if time.ticks_diff(time.ticks_ms(), inicio) > tiempo_max:
+                print("[ERROR] Tiempo de espera WiFi agotado")
+                if self.red is not None:
+                    self.red.fallida()
+                return False
+            await asyncio.sleep_ms(50 if self.red is not None else 100)
+        if self.red is not None:
+            self.red.conectada()
+        print(f"[INFO] WiFi Conectada! IP: {self.wlan.ifconfig()[0]}")
+        return True
+
+    def conectar_mqtt(self):
+        try:
+            cliente = MQTTClient(self.client_id, self.broker, port=self.port,
+                                 user=self.user, password=self.password_mqtt,
+                                 keepalive=self.keepalive)
+            if self.topic_vida:
+                cliente.set_last_will(self.topic_vida, b"desconectado", retain=True)
+            cliente.connect()
+            if self.topic_vida:
+                cliente.publish(self.topic_vida, b"conectado", True)
+        except Exception as e:
+            print(f"[ERROR] No se pudo conectar a MQTT: {e}")
+            return None
+        print(f"[INFO] Conectado a MQTT en {self.broker} como {self.client_id}")
+        self.cliente = cliente
+        self.sesion.conectada()
+        if self.conexiones:
+            self.reconexiones += 1
+        self.conexiones += 1
+        for funcion in self._al_conectar:
+            funcion(cliente)
+        return cliente
+
+    async def _reintentar(self):
+        self.fallos += 1
+        self._fallos_corte += 1
+        await asyncio.sleep_ms(espera_reintento(self.fallos) if self.red is not None else ESPERA_REINTENTO)
+
+    async def mantener(self):
+        # Tarea de fondo: reconecta WiFi/MQTT sin frenar al resto de tareas
+        while True:
+            if not self.wlan.isconnected():
+                self.perdida()
+                if self._desde is None:
+                    self._desde = time.ticks_ms()
+                if not await self.conectar_wifi():
+                    await self._reintentar()
+                    continue
+            if self.cliente is None:
+                espera = self.sesion.espera_ms()
+                if espera:
+                    print(f"[INFO] Reconexión MQTT en {espera} ms")
+                    await asyncio.sleep_ms(espera)
+                if self.conectar_mqtt() is None:
+                    await self._reintentar()
+                    continue
+                self.fallos = 0
+            await asyncio.sleep_ms(PERIODO_SUPERVISION)
@@ -0,0 +1,7 @@
+"""Controladores de sensores para ``firmware.armar()``.
+
+Cada módulo expone ``crear(dispositivo, config, numero)``: arma el
+sensor con su entrada del manifiesto y registra sus tareas en el
+``Dispositivo``. ``config["topic"]`` ya trae el prefijo del broker y
+``numero`` es el canal del sensor en el almacén de la flash.
+"""
@@ -0,0 +1,26 @@
+from machine import ADC, Pin
+from muestreo import CanalADC, TablaCalibracion
+from politicas import crear as crear_politica
+
+
+def crear(dispositivo, config, numero):
+    """Entrada analógica filtrada (KY-035, KY-038, potenciómetros...).
+
+    Cada ``periodo_ms`` lee una ráfaga de ``CanalADC`` y publica la
+    lectura cuando la ``politica`` del manifiesto lo decide.
+    """
+    adc = ADC(Pin(config["pin"]))
+    adc.atten(ADC.ATTN_11DB)
+    tabla = TablaCalibracion.desde_archivo(config["calibracion"]) if "calibracion" in config else None
+    canal = CanalADC(adc, muestras=config.get("muestras", 16), metodo=config.get("metodo", "recortado"),
+                     recorte=config.get("recorte", 4), suavizado=config.get("suavizado", 0), tabla=tabla)
+    politica = crear_politica(config.get("politica",
+                                         {"tipo": "banda", "umbral": 40, "silencio_max_ms": 30000}))
+
+    def muestrear():
+        valor = politica.evaluar(canal.leer())
+        if valor is not None:
+            dispositivo.registrar(numero, valor)
+
+    dispositivo.canal(numero, config["topic"])
+    dispositivo.periodico(config["nombre"], config.get("periodo_ms", 100), muestrear)
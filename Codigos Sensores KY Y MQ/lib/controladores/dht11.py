@@ -0,0 +1,32 @@
+import dht
+from machine import Pin
+from humedad import LectorDHT
+from politicas import crear as crear_politica
+
+
+def crear(dispositivo, config, numero):
+    """DHT11/DHT22 (KY-015) leído con ``LectorDHT``: publica
+    ``{"temperatura": t, "humedad": h}`` cuando alguna política lo pide."""
+    modelo = dht.DHT22 if config.get("modelo") == "DHT22" else dht.DHT11
+    lector = LectorDHT(modelo(Pin(config["pin"])), periodo_ms=config.get("periodo_ms", 5000),
+                       intervalo_min_ms=2000 if modelo is dht.DHT22 else 1000)
+    politicas = config.get("politicas", {})
+    temperatura = crear_politica(politicas.get("temperatura",
+                                               {"tipo": "banda", "umbral": 0, "silencio_max_ms": 60000}))
+    humedad = crear_politica(politicas.get("humedad",
+                                           {"tipo": "banda", "umbral": 1, "silencio_max_ms": 60000}))
+    topic = config["topic"]
+
+    def leer():
+        lector.actualizar()
+        t, h = lector.temperatura, lector.humedad
+        if t is None:
+            return
+        cambio_t = temperatura.evaluar(t) is not None
+        cambio_h = humedad.evaluar(h) is not None
+        if cambio_t or cambio_h:
+            temperatura.forzar(t)
+            humedad.forzar(h)
+            dispositivo.publicar(topic, '{"temperatura":%s,"humedad":%s}' % (t, h))
+
+    dispositivo.periodico(config["nombre"], 250, leer)
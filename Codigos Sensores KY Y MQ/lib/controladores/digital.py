@@ -0,0 +1,29 @@
+import time
+from machine import Pin
+from flancos import CapturaFlancos
+
+
+def crear(dispositivo, config, numero):
+    """Entrada digital por interrupción (KY-003, KY-010, KY-017, KY-020...).
+
+    Publica ``textos[nivel]`` en cada cambio estable y lo repite cada
+    ``latido_ms`` aunque no cambie.
+    """
+    pull = {"arriba": Pin.PULL_UP, "abajo": Pin.PULL_DOWN}.get(config.get("pull"))
+    pin = Pin(config["pin"], Pin.IN, pull) if pull is not None else Pin(config["pin"], Pin.IN)
+    captura = CapturaFlancos(pin, antirrebote_ms=config.get("antirrebote_ms", 50))
+    textos = config.get("textos", ["0", "1"])
+    latido_ms = config.get("latido_ms", 5000)
+    topic = config["topic"]
+    estado = {"t": time.ticks_ms()}
+
+    def publicar(t_us, nivel):
+        dispositivo.publicar(topic, textos[nivel])
+        estado["t"] = time.ticks_ms()
+
+    def revisar():
+        if not captura.vaciar(publicar) and time.ticks_diff(time.ticks_ms(), estado["t"]) > latido_ms:
+            publicar(None, captura.estado)
+
+    dispositivo.periodico(config["nombre"], config.get("periodo_ms", 10), revisar)
+    publicar(None, captura.estado)
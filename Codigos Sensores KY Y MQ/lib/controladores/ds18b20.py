@@ -0,0 +1,24 @@
+import onewire
+import ds18x20
+from machine import Pin
+from sondas import SondasDS18B20
+
+
+def crear(dispositivo, config, numero):
+    """Bus de sondas DS18B20 (KY-001): publica cada ``publicacion_ms`` el
+    promedio de la primera sonda en ``topic`` (número solo, como el script)
+    y ``{"<rom>": temperatura, ...}`` de todas en ``topic/sondas``."""
+    ds = ds18x20.DS18X20(onewire.OneWire(Pin(config["pin"])))
+    sondas = SondasDS18B20(ds, resolucion=config.get("resolucion", 12))
+    sondas.buscar()
+
+    def publicar():
+        promedios = sondas.promedios()
+        if promedios:
+            dispositivo.registrar(numero, round(promedios[0][1], 1))
+            mensaje = "{" + ",".join('"%s":%.2f' % (rom, t) for rom, t in promedios) + "}"
+            dispositivo.publicar(config["topic"] + "/sondas", mensaje)
+
+    dispositivo.canal(numero, config["topic"])
+    dispositivo.tarea(sondas.ejecutar())
+    dispositivo.periodico(config["nombre"], config.get("publicacion_ms", 2000), publicar)
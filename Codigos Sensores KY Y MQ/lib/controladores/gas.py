@@ -0,0 +1,44 @@
+from machine import ADC, Pin
+from gases import Calentamiento, SensorGas
+from muestreo import CanalADC
+from politicas import crear as crear_politica
+
+
+def crear(dispositivo, config, numero):
+    """Sensor MQ con su curva de ``gases``: publica
+    ``{"valor": crudo, "ppm": x}`` según la ``politica``, con
+    ``"calentando":1`` hasta que la lectura se asienta (o ``"inestable":1``
+    si se agotó el calentamiento derivando, sin calibrar R0)."""
+    adc = ADC(Pin(config["pin"]))
+    adc.atten(ADC.ATTN_11DB)
+    canal = CanalADC(adc, muestras=16, metodo="recortado", recorte=4, suavizado=config.get("suavizado", 0))
+    gas = config.get("gas")
+    sensor = SensorGas(config["modelo"], gases=[gas] if gas else None, rl_kohm=config.get("rl_kohm", 10.0),
+                       archivo=config.get("archivo_r0", "r0.json"))
+    periodo_ms = config.get("periodo_ms", 1000)
+    calentamiento = Calentamiento(minimo_ms=config.get("calentamiento_min_ms", 30000),
+                                  maximo_ms=config.get("calentamiento_max_ms", 180000),
+                                  intervalo_ms=periodo_ms)
+    politica = crear_politica(config.get("politica",
+                                         {"tipo": "banda", "umbral": 40, "silencio_max_ms": 30000}))
+    topic = config["topic"]
+
+    def muestrear():
+        valor = canal.leer()
+        recien_listo = not calentamiento.listo and calentamiento.agregar(valor)
+        if recien_listo:
+            if calentamiento.estable and not sensor.calibrado:
+                sensor.calibrar(calentamiento.promedio())
+            politica.olvidar()
+        if politica.evaluar(valor) is None:
+            return
+        mensaje = '{"valor":%d' % valor
+        if sensor.calibrado:
+            mensaje += ',"ppm":%.1f' % sensor.ppm(valor)
+        if not calentamiento.listo:
+            mensaje += ',"calentando":1'
+        elif not calentamiento.estable:
+            mensaje += ',"inestable":1'
+        dispositivo.publicar(topic, mensaje + "}")
+
+    dispositivo.periodico(config["nombre"], periodo_ms, muestrear)
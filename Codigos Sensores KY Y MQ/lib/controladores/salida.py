@@ -0,0 +1,13 @@
+from machine import Pin
+from actuador import Actuador
+
+
+def crear(dispositivo, config, numero):
+    """Salida digital (relé KY-019, láser KY-008, LED...) mandada por MQTT.
+
+    Escucha ``<topic>/cmd`` (``ON``/``OFF``/``1``/``0``) y publica el
+    estado en ``<topic>``, retenido y solo cuando cambia
+    (``actuador.Actuador``).
+    """
+    pin = Pin(config["pin"], Pin.OUT)
+    Actuador(dispositivo, config["topic"], ("OFF", "ON"), pin.value, inicial=config.get("inicial", 0))
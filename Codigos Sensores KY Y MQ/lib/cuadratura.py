@@ -0,0 +1,63 @@
+import machine
+from machine import Pin
+
+# Cambio de posición según (estado anterior << 2) | estado actual, con
+# estado = (CLK << 1) | DT. 2 marca un salto imposible (cambiaron los dos
+# canales a la vez): se perdió un flanco y no se sabe el sentido.
+_TABLA = (0, -1, 1, 2,
+          1, 0, 2, -1,
+          -1, 2, 0, 1,
+          2, 1, -1, 0)
+
+
+class Cuadratura:
+    """Decodificador de encoder en cuadratura por interrupciones.
+
+    Atiende los flancos de subida y bajada de CLK y DT, así que cuenta las
+    4 transiciones de cada paso (detent) y el sentido sale de la tabla de
+    estados, no de leer un pin justo después del otro. El handler no
+    asigna memoria (solo enteros pequeños), por eso puede ser ``hard``.
+    """
+
+    def __init__(self, clk, dt, transiciones_por_paso=4):
+        self._clk = clk
+        self._dt = dt
+        self.transiciones_por_paso = transiciones_por_paso
+        self._estado = (clk.value() << 1) | dt.value()
+        self._transiciones = 0
+        self.errores = 0
+        disparo = Pin.IRQ_RISING | Pin.IRQ_FALLING
+        clk.irq(handler=self._irq, trigger=disparo, hard=True)
+        dt.irq(handler=self._irq, trigger=disparo, hard=True)
+
+    def _irq(self, pin):
+        estado = (self._clk.value() << 1) | self._dt.value()
+        cambio = _TABLA[(self._estado << 2) | estado]
+        if cambio == 2:
+            self.errores += 1
+        else:
+            self._transiciones += cambio
+        self._estado = estado
+
+    def transiciones(self):
+        # Lectura atómica respecto de la IRQ
+        estado_irq = machine.disable_irq()
+        valor = self._transiciones
+        machine.enable_irq(estado_irq)
+        return valor
+
+    def pasos(self):
+        """Posición en pasos (detents); redondea hacia cero entre pasos."""
+        transiciones = self.transiciones()
+        if transiciones < 0:
+            return -(-transiciones // self.transiciones_por_paso)
+        return transiciones // self.transiciones_por_paso
+
+    def reiniciar(self):
+        estado_irq = machine.disable_irq()
+        self._transiciones = 0
+        machine.enable_irq(estado_irq)
+
+    def detener(self):
+        self._clk.irq(handler=None)
+        self._dt.irq(handler=None)
@@ -0,0 +1,111 @@
+import time
+import micropython
+from array import array
+
+
+class ColaEventos:
+    """Trabajo diferido desde una interrupción.
+
+    ``registrar(valor)`` es lo único que se llama desde la IRQ: guarda
+    ``(ticks_us, valor)`` en un anillo preasignado y pide con
+    ``micropython.schedule`` que ``funcion(t_us, valor)`` se ejecute fuera
+    de la interrupción. Publicar, imprimir o asignar memoria queda en esa
+    función, nunca en el handler.
+
+    Si la cola de ``schedule`` está llena, los eventos siguen en el anillo
+    y los entrega la próxima llamada a ``vaciar()`` (conviene llamarla
+    también desde una tarea periódica). Un evento se pierde solo si el
+    anillo está lleno; ``perdidos`` los cuenta.
+    """
+
+    def __init__(self, funcion, capacidad=32):
+        self._funcion = funcion
+        self._capacidad = capacidad
+        self._tiempos = array("i", [0] * capacidad)
+        self._valores = array("i", [0] * capacidad)
+        self._escritura = 0
+        self._lectura = 0
+        self._programado = False
+        self._vaciando = False
+        # Referencia creada una sola vez: schedule() no asigna en la IRQ
+        self._atender_ref = self._atender
+        self.registrados = 0
+        self.entregados = 0
+        self.perdidos = 0
+        self.sin_schedule = 0
+        # Tiempo dentro de la IRQ y de la IRQ a la entrega (µs)
+        self.irq_max_us = 0
+        self.entrega_max_us = 0
+        self._entrega_suma_us = 0
+
+    def registrar(self, valor=0):
+        inicio = time.ticks_us()
+        siguiente = self._escritura + 1
+        if siguiente == self._capacidad:
+            siguiente = 0
+        if siguiente == self._lectura:
+            self.perdidos += 1
+        else:
+            self._tiempos[self._escritura] = inicio
+            self._valores[self._escritura] = valor
+            self._escritura = siguiente
+            self.registrados += 1
+            if not self._programado:
+                try:
+                    micropython.schedule(self._atender_ref, 0)
+                    self._programado = True
+                except RuntimeError:
+                    # Cola de schedule llena: lo recoge la tarea periódica
+                    self.sin_schedule += 1
+        duracion = time.ticks_diff(time.ticks_us(), inicio)
+        if duracion > self.irq_max_us:
+            self.irq_max_us = duracion
+
+    def _atender(self, _):
+        self._programado = False
+        self.vaciar()
+
+    def vaciar(self):
+        """Entrega los eventos pendientes en orden; devuelve cuántos."""
+        # schedule() puede interrumpir a una tarea que ya está vaciando:
+        # en ese caso el bucle en curso entrega también los nuevos
+        if self._vaciando:
+            return 0
+        self._vaciando = True
+        try:
+            return self._vaciar()
+        finally:
+            self._vaciando = False
+
+    def _vaciar(self):
+        entregados = 0
+        while self._lectura != self._escritura:
+            t = self._tiempos[self._lectura]
+            valor = self._valores[self._lectura]
+            self._lectura = self._lectura + 1 if self._lectura + 1 < self._capacidad else 0
+            espera = time.ticks_diff(time.ticks_us(), t)
+            self._entrega_suma_us += espera
+            if espera > self.entrega_max_us:
+                self.entrega_max_us = espera
+            self.entregados += 1
+            entregados += 1
+            try:
+                self._funcion(t, valor)
+            except Exception as e:
+                print(f"[ERROR] Error atendiendo evento: {e}")
+        return entregados
+
+    def pendientes(self):
+        pendientes = self._escritura - self._lectura
+        return pendientes + self._capacidad if pendientes < 0 else pendientes
+
+    def estadisticas(self):
+        return {
+            "registrados": self.registrados,
+            "entregados": self.entregados,
+            "perdidos": self.perdidos,
+            "sin_schedule": self.sin_schedule,
+            "irq_max_us": self.irq_max_us,
+            "entrega_media_us": self._entrega_suma_us // self.entregados if self.entregados else 0,
+            "entrega_max_us": self.entrega_max_us,
+        }
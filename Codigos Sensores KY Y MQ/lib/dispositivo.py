@@ -0,0 +1,308 @@
+import time
+import uasyncio as asyncio
+import perfil
+
+# Cada cuánto se atiende el socket MQTT en busca de comandos (ms)
+PERIODO_COMANDOS = 20
+# Mensajes ya recibidos que se atienden por vuelta (una ráfaga de comandos
+# no espera PERIODO_COMANDOS por cada uno)
+COMANDOS_POR_VUELTA = 8
+# Lecturas por mensaje al vaciar el registro de la flash
+LOTE_REENVIO = 100
+
+
+class Latencia:
+    """Acumula el retraso de planificación (µs) de una tarea periódica."""
+
+    def __init__(self):
+        self.n = 0
+        self.suma = 0
+        self.maximo = 0
+
+    def registrar(self, retraso_us):
+        self.n += 1
+        self.suma += retraso_us
+        if retraso_us > self.maximo:
+            self.maximo = retraso_us
+
+    def promedio(self):
+        return self.suma // self.n if self.n else 0
+
+
+class Dispositivo:
+    """Runtime cooperativo: muestreo, publicación, conexión y comandos
+    corren como tareas separadas de uasyncio.
+
+    Las funciones de muestreo son síncronas y cortas; para enviar datos
+    llaman a ``publicar()``, que solo encola el mensaje. Así una
+    reconexión lenta nunca retrasa la siguiente muestra.
+
+    Con un ``almacen`` (``almacen.RegistroCircular``) las lecturas
+    numéricas enviadas con ``registrar()`` se guardan en la flash mientras
+    no hay conexión y se reenvían en lotes al volver.
+
+    Con ``perfilar()`` (o un ``perfil.json`` en la flash) cada tarea
+    periódica se mide con ``perfil.Perfil``: tiempo contra su periodo,
+    memoria asignada y recolecciones, en ``perfiles``.
+    """
+
+    def __init__(self, conexion=None, cola_max=32, almacen=None):
+        self.conexion = conexion
+        self.almacen = almacen
+        self._canales = {}
+        self._periodicas = []
+        self._tareas = []
+        self._suscripciones = {}
+        # Cola circular de mensajes pendientes (topic, payload, retain)
+        self._cola = [None] * cola_max
+        self._inicio = 0
+        self._cantidad = 0
+        self._hay_datos = asyncio.Event()
+        self.latencias = {}
+        self.perfiles = {}
+        self._perfilado = perfil.configuracion()
+        self.publicados = 0
+        self.descartados = 0
+        self.reenviados = 0
+        if conexion is not None:
+            conexion.al_conectar(self._suscribir)
+
+    def periodico(self, nombre, periodo_ms, funcion):
+        # funcion() se ejecuta cada periodo_ms, compensando la deriva
+        self._periodicas.append((nombre, periodo_ms, funcion))
+        self.latencias[nombre] = Latencia()
+
+    def perfilar(self, topic=None, periodo_ms=60000):
+        # Con topic se publica el resumen de cada tarea cada periodo_ms
+        self._perfilado = {"topic": topic, "periodo_ms": periodo_ms}
+
+    def tarea(self, corrutina):
+        # Tareas propias del script (se crean al arrancar el runtime)
+        self._tareas.append(corrutina)
+
+    def suscribir(self, topic, callback):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        self._suscripciones[topic] = callback
+        if self.conexion is not None and self.conexion.cliente is not None:
+            self.conexion.cliente.subscribe(topic)
+
+    def publicar(self, topic, payload, retain=False):
+        # No bloquea: si la cola está llena se descarta el mensaje más antiguo
+        capacidad = len(self._cola)
+        if self._cantidad == capacidad:
+            self._inicio = (self._inicio + 1) % capacidad
+            self._cantidad -= 1
+            self.descartados += 1
+        fin = (self._inicio + self._cantidad) % capacidad
+        self._cola[fin] = (topic, payload, retain)
+        self._cantidad += 1
+        self._hay_datos.set()
+
+    def pendientes(self):
+        return self._cantidad
+
+    def canal(self, numero, topic, formato=str):
+        # Asocia un número de canal (el que se guarda en la flash) a su topic
+        self._canales[numero] = (topic, formato)
+
+    def registrar(self, numero, valor, payload=None):
+        """Envía una lectura numérica; sin conexión se guarda en la flash.
+
+        ``payload`` permite conservar el mensaje completo del script cuando
+        hay conexión; en la flash solo se guarda ``valor``.
+        """
+        en_linea = self.conexion is None or self.conexion.conectado()
+        if self.almacen is None or (en_linea and not self.almacen.pendientes()):
+            topic, formato = self._canales[numero]
+            self.publicar(topic, formato(valor) if payload is None else payload)
+        else:
+            # Mientras haya atrasados también se guarda, para conservar el orden
+            self.almacen.agregar(time.ticks_ms(), numero, valor)
+
+    def _suscribir(self, cliente):
+        cliente.set_callback(self._despachar)
+        for topic in self._suscripciones:
+            cliente.subscribe(topic)
+
+    def _despachar(self, topic, msg):
+        callback = self._suscripciones.get(topic)
+        if callback is None:
+            return
+        try:
+            callback(topic, msg)
+        except Exception as e:
+            print(f"[ERROR] Error procesando comando: {e}")
+
+    async def _ciclo(self, nombre, periodo_ms, funcion):
+        latencia = self.latencias[nombre]
+        medicion = self.perfiles.get(nombre)
+        siguiente = time.ticks_add(time.ticks_us(), periodo_ms * 1000)
+        while True:
+            espera = time.ticks_diff(siguiente, time.ticks_us())
+            if espera > 0:
+                await asyncio.sleep_ms((espera + 999) // 1000)
+            ahora = time.ticks_us()
+            latencia.registrar(max(0, time.ticks_diff(ahora, siguiente)))
+            try:
+                if medicion is None:
+                    funcion()
+                else:
+                    medicion.medir(funcion)
+            except Exception as e:
+                print(f"[ERROR] Error en {nombre}: {e}")
+            siguiente = time.ticks_add(siguiente, periodo_ms * 1000)
+            # Si la tarea se atrasó más de un periodo, se salta en vez de acumular
+            if time.ticks_diff(time.ticks_us(), siguiente) > periodo_ms * 1000:
+                siguiente = time.ticks_add(time.ticks_us(), periodo_ms * 1000)
+
+    async def _publicacion(self):
+        while True:
+            await self._hay_datos.wait()
+            self._hay_datos.clear()
+            while self._cantidad:
+                if self.conexion is None:
+                    # Sin red: los mensajes se consumen localmente
+                    self._sacar()
+                    continue
+                cliente = self.conexion.cliente
+                if cliente is None:
+                    await asyncio.sleep_ms(100)
+                    continue
+                topic, payload, retain = self._cola[self._inicio]
+                try:
+                    cliente.publish(topic, payload, retain)
+                except OSError as e:
+                    print(f"[ERROR] Fallo al publicar: {e}")
+                    self.conexion.perdida()
+                    continue
+                self._sacar()
+                self.publicados += 1
+                if self.conexion.midiendo():
+                    self._telemetria_red()
+                # Cede el control entre mensajes para no acaparar el bucle
+                await asyncio.sleep_ms(0)
+
+    def _telemetria_red(self):
+        # Primera publicación tras el arranque o una caída
+        datos = self.conexion.primera_publicacion()
+        print(f"[INFO] Hasta publicar: arranque {datos['arranque_ms']} ms, reconexión {datos['reconexion_ms']} ms")
+        topic = self.conexion.topic_telemetria
+        if topic:
+            self.publicar(topic, ('{"arranque_ms":%d,"reconexion_ms":%s,"rapida":%d,"reconexiones":%d,'
+                                  '"fallos":%d,"tomas":%d}') % (
+                datos["arranque_ms"], "null" if datos["reconexion_ms"] is None else datos["reconexion_ms"],
+                datos["rapida"], datos["reconexiones"], datos["fallos"], datos["tomas"]))
+
+    def _sacar(self):
+        self._cola[self._inicio] = None
+        self._inicio = (self._inicio + 1) % len(self._cola)
+        self._cantidad -= 1
+
+    async def _reenvio(self):
+        # Vacía el registro de la flash en lotes grandes cuando vuelve la red
+        while True:
+            cliente = self.conexion.cliente if self.conexion is not None else None
+            if cliente is None or not self.almacen.pendientes():
+                await asyncio.sleep_ms(1000)
+                continue
+            lote = self.almacen.leer(LOTE_REENVIO)
+            if not lote:
+                await asyncio.sleep_ms(0)
+                continue
+            try:
+                for topic, payload in self._armar_lotes(lote):
+                    cliente.publish(topic, payload)
+            except OSError as e:
+                print(f"[ERROR] Fallo al reenviar lote: {e}")
+                self.conexion.perdida()
+                continue
+            self.almacen.confirmar(len(lote))
+            self.reenviados += len(lote)
+            await asyncio.sleep_ms(0)
+
+    def _armar_lotes(self, lote):
+        # Un mensaje por canal: {"ahora": ticks, "t": [ticks...], "v": [valores...]}
+        # El receptor obtiene la hora de cada lectura como recepción - (ahora - t).
+        # Las lecturas de un arranque anterior tienen ticks de otro reinicio:
+        # van aparte como {"previo":1,"t":[...],"v":[...]}, sin "ahora"
+        # (los t solo ordenan; la hora real se perdió con el reinicio)
+        ahora = time.ticks_ms()
+        actual = self.almacen.arranque
+        por_canal = {}
+        for arranque, ticks, numero, valor in lote:
+            tiempos, valores = por_canal.setdefault((numero, arranque == actual), ([], []))
+            tiempos.append(ticks)
+            valores.append(valor)
+        for (numero, es_actual), (tiempos, valores) in por_canal.items():
+            topic, formato = self._canales.get(numero, (f"reenvio/{numero}", str))
+            payload = '{%s,"t":[%s],"v":[%s]}' % (
+                '"ahora":%d' % ahora if es_actual else '"previo":1',
+                ",".join(str(t) for t in tiempos), ",".join(formato(v) for v in valores))
+            yield topic + "/lote", payload
+
+    async def _comandos(self):
+        ultimo_ping = time.ticks_ms()
+        anterior = None
+        while True:
+            cliente = self.conexion.cliente
+            if cliente is not anterior:
+                # Cliente nuevo (reconexión): el keepalive cuenta desde su connect
+                anterior = cliente
+                ultimo_ping = time.ticks_ms()
+            if cliente is not None:
+                try:
+                    for _ in range(COMANDOS_POR_VUELTA):
+                        if cliente.check_msg() is None:
+                            break
+                    keepalive = self.conexion.keepalive
+                    if keepalive and time.ticks_diff(time.ticks_ms(), ultimo_ping) > keepalive * 500:
+                        cliente.ping()
+                        ultimo_ping = time.ticks_ms()
+                except OSError as e:
+                    print(f"[ERROR] Conexión MQTT perdida: {e}")
+                    self.conexion.perdida()
+            await asyncio.sleep_ms(PERIODO_COMANDOS)
+
+    async def _resumen_perfiles(self, topic, periodo_ms):
+        while True:
+            await asyncio.sleep_ms(periodo_ms)
+            self.publicar(topic, "[" + ",".join(p.resumen() for p in self.perfiles.values()) + "]")
+            for medicion in self.perfiles.values():
+                medicion.reiniciar()
+
+    async def principal(self):
+        if self._perfilado is not None:
+            for nombre, periodo_ms, _ in self._periodicas:
+                self.perfiles[nombre] = perfil.Perfil(nombre, periodo_ms)
+            if self._perfilado.get("topic"):
+                asyncio.create_task(self._resumen_perfiles(self._perfilado["topic"],
+                                                           self._perfilado.get("periodo_ms", 60000)))
+        if self.conexion is not None:
+            asyncio.create_task(self.conexion.mantener())
+            asyncio.create_task(self._comandos())
+        asyncio.create_task(self._publicacion())
+        if self.almacen is not None:
+            asyncio.create_task(self._reenvio())
+        for nombre, periodo_ms, funcion in self._periodicas:
+            asyncio.create_task(self._ciclo(nombre, periodo_ms, funcion))
+        for corrutina in self._tareas:
+            asyncio.create_task(corrutina)
+        while True:
+            await asyncio.sleep_ms(60000)
+
+    def ejecutar(self):
+        try:
+            asyncio.run(self.principal())
+        finally:
+            asyncio.new_event_loop()
+
+    def estadisticas(self):
+        resumen = {}
+        for nombre, latencia in self.latencias.items():
+            resumen[nombre] = {
+                "n": latencia.n,
+                "promedio_us": latencia.promedio(),
+                "maximo_us": latencia.maximo,
+            }
+        return resumen
@@ -0,0 +1,55 @@
+import json
+import time
+from conexion import GestorConexion
+from dispositivo import Dispositivo
+
+
+def cargar(ruta="config.json"):
+    """Lee el manifiesto de la placa (JSON)."""
+    with open(ruta) as f:
+        return json.load(f)
+
+
+def armar(config):
+    """Arma el ``Dispositivo`` que describe el manifiesto.
+
+    ``config`` tiene la red (``wifi``), el broker (``mqtt``, con un
+    ``prefijo`` que se antepone a cada topic, un topic ``telemetria``
+    opcional para los tiempos de conexión y otro ``vida`` para el Last
+    Will) y la lista ``sensores``;
+    cada sensor nombra su ``tipo`` y el resto de la entrada (pines, topic,
+    periodos, políticas) es del controlador ``controladores.<tipo>``.
+    Solo se importan los controladores que aparecen, de modo que una
+    placa con un DHT11 no carga el código de los MQ ni las tablas de gas.
+    """
+    wifi = config["wifi"]
+    mqtt = config["mqtt"]
+    conexion = GestorConexion(wifi["ssid"], wifi["password"], mqtt["client_id"], mqtt["broker"],
+                              port=mqtt.get("port", 1883), user=mqtt.get("user"),
+                              password_mqtt=mqtt.get("password"), keepalive=mqtt.get("keepalive", 60),
+                              rapida=wifi.get("rapida", True), topic_telemetria=mqtt.get("telemetria"),
+                              topic_vida=mqtt.get("vida"))
+    almacen = None
+    if "almacen" in config:
+        from almacen import RegistroCircular
+        almacen = RegistroCircular(config["almacen"]["archivo"],
+                                   capacidad=config["almacen"].get("capacidad", 4096))
+    dispositivo = Dispositivo(conexion, almacen=almacen)
+    prefijo = mqtt.get("prefijo", "")
+    for numero, sensor in enumerate(config["sensores"]):
+        sensor = dict(sensor)
+        sensor["topic"] = prefijo + "/" + sensor["topic"] if prefijo else sensor["topic"]
+        sensor.setdefault("nombre", sensor["tipo"] + str(numero))
+        controlador = __import__("controladores." + sensor["tipo"], None, None, ("crear",))
+        controlador.crear(dispositivo, sensor, numero)
+    return dispositivo
+
+
+def arrancar(ruta="config.json"):
+    """Punto de entrada del firmware (lo llama ``main.py``)."""
+    inicio = time.ticks_ms()
+    config = cargar(ruta)
+    dispositivo = armar(config)
+    listo_ms = time.ticks_diff(time.ticks_ms(), inicio)
+    print(f"[INFO] {len(config['sensores'])} sensores listos en {listo_ms} ms")
+    dispositivo.ejecutar()
@@ -0,0 +1,97 @@
+import time
+from array import array
+from machine import Pin
+
+
+class CapturaFlancos:
+    """Captura por interrupción los flancos de una entrada digital.
+
+    El handler solo guarda ``(ticks_us, nivel)`` en un anillo preasignado
+    (sin asignar memoria, por eso es ``hard``); el anti-rebote se aplica
+    después, al vaciar el anillo desde una tarea normal. Solo la IRQ
+    escribe ``_escritura`` y solo ``vaciar()`` escribe ``_lectura``, así
+    que no hace falta deshabilitar interrupciones.
+
+    ``estado`` es el último nivel estable entregado.
+    """
+
+    def __init__(self, pin, antirrebote_ms=0, capacidad=64,
+                 disparo=Pin.IRQ_RISING | Pin.IRQ_FALLING):
+        self._pin = pin
+        self._capacidad = capacidad
+        self._tiempos = array("i", [0] * capacidad)
+        self._niveles = bytearray(capacidad)
+        self._escritura = 0
+        self._lectura = 0
+        self.antirrebote_us = int(antirrebote_ms * 1000)
+        self.estado = pin.value()
+        self._ultimo_us = time.ticks_add(time.ticks_us(), -self.antirrebote_us)
+        # Último flanco crudo visto (para confirmar el nivel final del rebote)
+        self._crudo_nivel = self.estado
+        self._crudo_us = self._ultimo_us
+        self.flancos = 0
+        self.perdidos = 0
+        self.rebotes = 0
+        pin.irq(handler=self._irq, trigger=disparo, hard=True)
+
+    def _irq(self, pin):
+        t = time.ticks_us()
+        siguiente = self._escritura + 1
+        if siguiente == self._capacidad:
+            siguiente = 0
+        if siguiente == self._lectura:
+            self.perdidos += 1
+            return
+        self._tiempos[self._escritura] = t
+        self._niveles[self._escritura] = pin.value()
+        self._escritura = siguiente
+
+    def _aceptar(self, t_us, nivel, funcion):
+        self.estado = nivel
+        self._ultimo_us = t_us
+        funcion(t_us, nivel)
+
+    def vaciar(self, funcion):
+        """Llama ``funcion(t_us, nivel)`` por cada cambio estable; devuelve cuántos.
+
+        Un flanco se acepta si cambia ``estado`` y pasó ``antirrebote_ms``
+        desde el último aceptado. Si el rebote termina en otro nivel, ese
+        nivel se entrega cuando lleva ``antirrebote_ms`` quieto.
+        """
+        entregados = 0
+        inicio = time.ticks_us()
+        while self._lectura != self._escritura:
+            t = self._tiempos[self._lectura]
+            nivel = self._niveles[self._lectura]
+            self._lectura = self._lectura + 1 if self._lectura + 1 < self._capacidad else 0
+            self.flancos += 1
+            self._crudo_nivel = nivel
+            self._crudo_us = t
+            if nivel == self.estado:
+                continue
+            if time.ticks_diff(t, self._ultimo_us) < self.antirrebote_us:
+                self.rebotes += 1
+                continue
+            self._aceptar(t, nivel, funcion)
+            entregados += 1
+
+        # Nivel final del rebote (o un flanco que la IRQ no alcanzó a ver)
+        ahora = time.ticks_us()
+        nivel = self._pin.value()
+        if (nivel != self.estado
+                and time.ticks_diff(ahora, self._ultimo_us) >= self.antirrebote_us
+                and time.ticks_diff(ahora, self._crudo_us) >= self.antirrebote_us):
+            self._aceptar(self._crudo_us if nivel == self._crudo_nivel else ahora, nivel, funcion)
+            entregados += 1
+
+        # Tiempos viejos se acercan al presente: ticks_diff da la vuelta a los
+        # ~9 minutos y un flanco real pasaría por rebote
+        limite = time.ticks_add(inicio, -self.antirrebote_us)
+        if time.ticks_diff(limite, self._ultimo_us) > 0:
+            self._ultimo_us = limite
+        if time.ticks_diff(limite, self._crudo_us) > 0:
+            self._crudo_us = limite
+        return entregados
+
+    def detener(self):
+        self._pin.irq(handler=None)
@@ -0,0 +1,267 @@
+import json
+import math
+import time
+from array import array
+
+# Curvas de sensibilidad de las hojas de datos ajustadas como rectas en
+# escala log-log: ppm = a * (Rs/R0) ** b (+ base). "aire" es Rs/R0 en
+# aire limpio, con el que se calibra R0. "escala" es la resolución de las
+# tablas (100 = centésimas de ppm); el MQ-3 mide alcohol en mg/L y usa
+# diezmilésimas. El CO2 del MQ-135 se suma a los ~400 ppm del aire.
+CURVAS = {
+    "MQ-2": {"aire": 9.83, "gases": {
+        "GLP": (574.25, -2.222), "propano": (658.71, -2.168), "H2": (987.99, -2.162),
+        "alcohol": (3616.1, -2.675), "CO": (36974.0, -3.109)}},
+    "MQ-3": {"aire": 60.0, "escala": 10000, "gases": {"alcohol": (0.3934, -1.504)}},
+    "MQ-4": {"aire": 4.4, "gases": {"CH4": (1012.7, -2.786), "GLP": (3811.9, -3.113)}},
+    "MQ-5": {"aire": 6.5, "gases": {
+        "GLP": (80.897, -2.431), "CH4": (177.65, -2.56), "H2": (1163.8, -3.874)}},
+    "MQ-6": {"aire": 10.0, "gases": {"GLP": (1009.2, -2.35), "CH4": (2127.2, -2.526)}},
+    "MQ-7": {"aire": 27.5, "gases": {"CO": (99.042, -1.518), "H2": (69.014, -1.374)}},
+    "MQ-9": {"aire": 9.6, "gases": {
+        "CO": (599.65, -2.244), "CH4": (4269.6, -2.648), "GLP": (1000.5, -2.186)}},
+    "MQ-135": {"aire": 3.6, "gases": {
+        "CO2": (110.47, -2.862, 400), "NH4": (102.2, -2.473), "alcohol": (77.255, -3.18),
+        "CO": (605.18, -3.937), "tolueno": (44.947, -3.445), "acetona": (34.668, -3.369)}},
+}
+
+# Fuera del rango de las hojas de datos la recta no vale: se recorta
+PPM_MAXIMO = 100000
+
+
+class SensorGas:
+    """Concentración de gas de un sensor MQ a partir de la lectura del ADC.
+
+    La salida del módulo es el divisor entre Rs (el sensor) y ``rl_kohm``
+    alimentado con ``vc`` voltios; ``divisor`` es la relación de un
+    divisor resistivo entre AO y el pin (1.0 si va directo). R0, la Rs en
+    aire limpio, se calibra una vez con ``calibrar()`` y se guarda en
+    ``archivo`` por modelo, así sobrevive a los reinicios.
+
+    Con R0 conocido se arma una tabla por gas con la concentración en
+    ``tramos + 1`` lecturas equiespaciadas del ADC (enteros en un
+    ``array('I')``, ver "escala" en ``CURVAS``); ``ppm()`` interpola
+    entre dos nodos sin ``log`` ni ``pow``. ``ppm_exacto()`` hace la
+    cuenta completa.
+    """
+
+    def __init__(self, modelo, gases=None, rl_kohm=10.0, vc=5.0, vref=3.3, divisor=1.0,
+                 maximo=4095, archivo="r0.json", tramos=128):
+        if modelo not in CURVAS:
+            raise ValueError("Sensor desconocido: " + modelo)
+        self.modelo = modelo
+        self.curva = CURVAS[modelo]
+        self.gases = gases or list(self.curva["gases"])
+        for gas in self.gases:
+            if gas not in self.curva["gases"]:
+                raise ValueError(modelo + " no tiene curva para " + gas)
+        self.rl_kohm = rl_kohm
+        self.vc = vc
+        self._voltios_por_cuenta = vref * divisor / maximo
+        self.maximo = maximo
+        self.archivo = archivo
+        self.paso = (maximo + 1) // tramos
+        self._desplazamiento = 0
+        while (1 << self._desplazamiento) < self.paso:
+            self._desplazamiento += 1
+        if (1 << self._desplazamiento) != self.paso:
+            raise ValueError("(maximo + 1) / tramos debe ser potencia de 2")
+        self._mascara = self.paso - 1
+        self._tramos = tramos
+        self._escala = self.curva.get("escala", 100)
+        self._tablas = {}
+        self.r0 = self._cargar_r0()
+        if self.r0 is not None:
+            self._armar_tablas()
+
+    @property
+    def calibrado(self):
+        return self.r0 is not None
+
+    def rs(self, crudo):
+        """Resistencia del sensor en kΩ."""
+        voltaje = max(crudo, 1) * self._voltios_por_cuenta
+        if voltaje >= self.vc:
+            return 0.0
+        return self.rl_kohm * (self.vc - voltaje) / voltaje
+
+    def calibrar(self, crudo_aire):
+        """Fija R0 con una lectura (ya promediada) en aire limpio y la guarda."""
+        self.r0 = self.rs(crudo_aire) / self.curva["aire"]
+        self._guardar_r0()
+        self._armar_tablas()
+        return self.r0
+
+    def asegurar_r0(self, leer, muestras=32, espera_ms=50):
+        """Calibra con el promedio de ``muestras`` llamadas a ``leer()`` si
+        R0 no estaba guardado. Llamarla con el sensor caliente y en aire
+        limpio; para recalibrar, borrar el modelo de ``archivo``."""
+        if self.r0 is None:
+            total = 0
+            for _ in range(muestras):
+                total += leer()
+                time.sleep_ms(espera_ms)
+            self.calibrar(total // muestras)
+        return self.r0
+
+    def ppm_exacto(self, crudo, gas=None):
+        gas = gas or self.gases[0]
+        curva = self.curva["gases"][gas]
+        rs = self.rs(crudo)
+        if rs <= 0:
+            return PPM_MAXIMO
+        ppm = curva[0] * math.pow(rs / self.r0, curva[1])
+        if len(curva) > 2:
+            ppm += curva[2]
+        return min(ppm, PPM_MAXIMO)
+
+    def ppm(self, crudo, gas=None):
+        return self._interpolar(crudo, gas) / self._escala
+
+    def ppm_entero(self, crudo, gas=None):
+        """Como ``ppm()`` pero truncado a entero, sin crear floats."""
+        return self._interpolar(crudo, gas) // self._escala
+
+    def _interpolar(self, crudo, gas):
+        # ppm * escala, interpolado en la tabla con aritmética entera
+        tabla = self._tablas[gas or self.gases[0]]
+        i = crudo >> self._desplazamiento
+        if i >= self._tramos:
+            return tabla[self._tramos]
+        v0 = tabla[i]
+        return v0 + (((tabla[i + 1] - v0) * (crudo & self._mascara)) >> self._desplazamiento)
+
+    def _armar_tablas(self):
+        for gas in self.gases:
+            tabla = array("I", [0] * (self._tramos + 1))
+            for i in range(self._tramos + 1):
+                tabla[i] = int(self.ppm_exacto(min(i * self.paso, self.maximo), gas) * self._escala + 0.5)
+            self._tablas[gas] = tabla
+
+    def _cargar_r0(self):
+        try:
+            with open(self.archivo) as f:
+                return json.load(f).get(self.modelo)
+        except (OSError, ValueError):
+            return None
+
+    def _guardar_r0(self):
+        try:
+            with open(self.archivo) as f:
+                valores = json.load(f)
+        except (OSError, ValueError):
+            valores = {}
+        valores[self.modelo] = self.r0
+        with open(self.archivo, "w") as f:
+            json.dump(valores, f)
+
+
+def comparar(sensor, gas=None, repeticiones=1000, minimo=1.0):
+    """µs por conversión con la tabla y con log/pow, y el mayor error
+    relativo de la tabla entre ``minimo`` y ``PPM_MAXIMO`` ppm. Sirve en
+    la placa: ``gases.comparar(SensorGas("MQ-2"))`` desde el REPL."""
+    gas = gas or sensor.gases[0]
+    lecturas = [(i * 997) % (sensor.maximo + 1) for i in range(repeticiones)]
+    inicio = time.ticks_us()
+    for crudo in lecturas:
+        sensor.ppm(crudo, gas)
+    tabla_us = time.ticks_diff(time.ticks_us(), inicio) / repeticiones
+    inicio = time.ticks_us()
+    for crudo in lecturas:
+        sensor.ppm_exacto(crudo, gas)
+    exacto_us = time.ticks_diff(time.ticks_us(), inicio) / repeticiones
+    error = 0.0
+    for crudo in range(1, sensor.maximo + 1):
+        exacto = sensor.ppm_exacto(crudo, gas)
+        if minimo <= exacto < PPM_MAXIMO:
+            error = max(error, abs(sensor.ppm(crudo, gas) - exacto) / exacto)
+    return {"tabla_us": tabla_us, "exacto_us": exacto_us, "error_max": error}
+
+
+class Calentamiento:
+    """Calentamiento de un sensor MQ sin bloquear el arranque.
+
+    Con el calefactor frío la lectura deriva durante minutos. El script
+    muestrea y publica desde el primer segundo (marcando los datos como
+    de calentamiento) y pasa cada lectura a ``agregar()``. Una vez por
+    ``intervalo_ms`` se guarda un punto en un anillo de ``puntos`` y se
+    mide la ``deriva``: la diferencia en cuentas entre el promedio de la
+    mitad más nueva y el de la más vieja.
+
+    El sensor queda ``listo`` cuando pasaron ``minimo_ms`` y la deriva no
+    supera ``tolerancia``, o a los ``maximo_ms`` aunque siga derivando.
+    ``estable`` distingue ambos casos: solo con la lectura asentada sirve
+    ``promedio()`` como R0 de aire limpio; si se agotó el plazo, el script
+    publica las lecturas marcadas y no calibra. ``progreso`` (0-100)
+    estima el avance con el criterio más atrasado y ``listo_ms`` guarda
+    cuánto tardó.
+    """
+
+    def __init__(self, minimo_ms=30000, maximo_ms=180000, tolerancia=20, puntos=20,
+                 intervalo_ms=1000):
+        self.minimo_ms = minimo_ms
+        self.maximo_ms = maximo_ms
+        self.tolerancia = tolerancia
+        self.intervalo_ms = intervalo_ms
+        self._puntos = array("H", [0] * puntos)
+        self._cantidad = 0
+        self._siguiente = 0
+        self._inicio = time.ticks_ms()
+        self._proximo = self._inicio
+        self.deriva = None
+        self.progreso = 0
+        self.listo = False
+        self.estable = False
+        self.listo_ms = None
+
+    def agregar(self, valor, t=None):
+        """Devuelve True si el sensor ya está listo."""
+        if self.listo:
+            return True
+        if t is None:
+            t = time.ticks_ms()
+        if time.ticks_diff(t, self._proximo) < 0:
+            return False
+        self._proximo = time.ticks_add(t, self.intervalo_ms)
+        n = len(self._puntos)
+        self._puntos[self._siguiente] = valor
+        self._siguiente = self._siguiente + 1 if self._siguiente + 1 < n else 0
+        if self._cantidad < n:
+            self._cantidad += 1
+        if self._cantidad == n:
+            # El anillo está lleno: desde _siguiente va del más viejo al más nuevo
+            mitad = n // 2
+            viejo = 0
+            nuevo = 0
+            for k in range(n):
+                v = self._puntos[(self._siguiente + k) % n]
+                if k < mitad:
+                    viejo += v
+                elif k >= n - mitad:
+                    nuevo += v
+            self.deriva = abs(nuevo - viejo) // mitad
+
+        transcurrido = time.ticks_diff(t, self._inicio)
+        por_tiempo = min(100, transcurrido * 100 // self.minimo_ms)
+        if self.deriva is None:
+            por_estabilidad = 0
+        else:
+            por_estabilidad = min(100, self.tolerancia * 100 // max(1, self.deriva))
+        self.progreso = max(min(por_tiempo, por_estabilidad), transcurrido * 100 // self.maximo_ms)
+        self.estable = (transcurrido >= self.minimo_ms and self.deriva is not None
+                        and self.deriva <= self.tolerancia)
+        if self.estable or transcurrido >= self.maximo_ms:
+            self.listo = True
+            self.progreso = 100
+            self.listo_ms = transcurrido
+        return self.listo
+
+    def promedio(self):
+        """Promedio de los puntos guardados (con ``estable``, la lectura
+        ya asentada: útil para calibrar R0)."""
+        if not self._cantidad:
+            return 0
+        total = 0
+        for k in range(self._cantidad):
+            total += self._puntos[k]
+        return total // self._cantidad
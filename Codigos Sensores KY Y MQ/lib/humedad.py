@@ -0,0 +1,65 @@
+import time
+
+
+class LectorDHT:
+    """Lecturas de un DHT11/DHT22 con caché, respetando su ritmo.
+
+    El sensor no acepta más de una lectura por ``intervalo_min_ms`` (1 s
+    el DHT11, 2 s el DHT22) y cada ``measure()`` bloquea ~25 ms con las
+    interrupciones apagadas, así que no se sondea: ``actualizar()`` se
+    llama desde una tarea periódica más rápida que el intervalo mínimo
+    (p. ej. cada 250 ms) y solo mide cuando corresponde, cada
+    ``periodo_ms`` tras una lectura buena o apenas pasa el intervalo
+    mínimo tras una fallida (checksum o timeout), sin esperas.
+
+    ``temperatura`` y ``humedad`` guardan la última lectura buena;
+    ``edad_ms()`` dice cuánto tiene y ``valido(max_edad_ms)`` si sirve.
+    Tras ``fallos_max`` fallos seguidos se espera ``periodo_ms`` entre
+    intentos, para no gastar CPU con el sensor desconectado.
+    """
+
+    def __init__(self, sensor, periodo_ms=5000, intervalo_min_ms=1000, fallos_max=5):
+        self.sensor = sensor
+        self.periodo_ms = max(periodo_ms, intervalo_min_ms)
+        self.intervalo_min_ms = intervalo_min_ms
+        self.fallos_max = fallos_max
+        self.temperatura = None
+        self.humedad = None
+        self._t_lectura = None
+        self._proxima = time.ticks_add(time.ticks_ms(), -1)
+        self.fallos_seguidos = 0
+        self.lecturas = 0
+        self.errores = 0
+
+    def actualizar(self):
+        """Mide si ya toca; devuelve True si hay una lectura nueva."""
+        ahora = time.ticks_ms()
+        # Estricto: ticks_ms trunca, un "1000" puede ser 999.x ms reales
+        if time.ticks_diff(ahora, self._proxima) <= 0:
+            return False
+        try:
+            self.sensor.measure()
+            temperatura = self.sensor.temperature()
+            humedad = self.sensor.humidity()
+        except Exception:
+            self.errores += 1
+            self.fallos_seguidos += 1
+            espera = self.periodo_ms if self.fallos_seguidos >= self.fallos_max else self.intervalo_min_ms
+            self._proxima = time.ticks_add(ahora, espera)
+            return False
+        self.temperatura = temperatura
+        self.humedad = humedad
+        self._t_lectura = ahora
+        self.fallos_seguidos = 0
+        self.lecturas += 1
+        self._proxima = time.ticks_add(ahora, self.periodo_ms)
+        return True
+
+    def edad_ms(self):
+        if self._t_lectura is None:
+            return None
+        return time.ticks_diff(time.ticks_ms(), self._t_lectura)
+
+    def valido(self, max_edad_ms):
+        edad = self.edad_ms()
+        return edad is not None and edad <= max_edad_ms
@@ -0,0 +1,97 @@
+import json
+import time
+
+ESCALA = 1000  # Posición normalizada: -1000..1000 (milésimas)
+
+
+class Eje:
+    """Un eje analógico (potenciómetro) normalizado a -1000..1000.
+
+    ``calibrar_centro()`` promedia lecturas en reposo al arrancar, así el
+    centro no depende de un 2047 fijo. Los extremos de cada lado arrancan
+    en ``recorrido`` (fracción de la distancia del centro al tope del ADC)
+    y se amplían solos cuando el eje llega más lejos; ``ajustado`` indica
+    que se alejaron más de ``margen`` cuentas de los últimos guardados
+    (así el ruido en los topes no escribe la flash). ``zona_muerta``
+    (milésimas) absorbe el ruido en reposo y el resto de la escala se
+    reparte sin saltos.
+    """
+
+    def __init__(self, canal, maximo=4095, zona_muerta=50, recorrido=0.8, margen=40):
+        self.canal = canal
+        self.maximo = maximo
+        self.zona_muerta = zona_muerta
+        self.recorrido = recorrido
+        self.margen = margen
+        self.centro = maximo // 2
+        self.crudo = self.centro
+        self._limites_por_defecto()
+
+    def _limites_por_defecto(self):
+        self.minimo = int(self.centro - self.centro * self.recorrido)
+        self.tope = int(self.centro + (self.maximo - self.centro) * self.recorrido)
+        self._guardados = (self.minimo, self.tope)
+
+    @property
+    def ajustado(self):
+        return (self.minimo < self._guardados[0] - self.margen
+                or self.tope > self._guardados[1] + self.margen)
+
+    def calibrar_centro(self, muestras=32, espera_ms=5):
+        total = 0
+        for _ in range(muestras):
+            total += self.canal.leer()
+            time.sleep_ms(espera_ms)
+        self.centro = total // muestras
+        self._limites_por_defecto()
+        return self.centro
+
+    def restaurar(self, datos):
+        """Extremos guardados (los de ``estado()``), válidos si contienen
+        al centro medido en este arranque."""
+        if datos and datos["minimo"] < self.centro < datos["tope"]:
+            self.minimo = datos["minimo"]
+            self.tope = datos["tope"]
+            self._guardados = (self.minimo, self.tope)
+
+    def estado(self):
+        """Extremos actuales; se toman como los guardados."""
+        self._guardados = (self.minimo, self.tope)
+        return {"minimo": self.minimo, "tope": self.tope}
+
+    def leer(self):
+        crudo = self.canal.leer()
+        self.crudo = crudo
+        if crudo < self.minimo:
+            self.minimo = crudo
+        elif crudo > self.tope:
+            self.tope = crudo
+        if crudo >= self.centro:
+            valor = (crudo - self.centro) * ESCALA // max(1, self.tope - self.centro)
+        else:
+            valor = -((self.centro - crudo) * ESCALA // max(1, self.centro - self.minimo))
+        if -self.zona_muerta < valor < self.zona_muerta:
+            return 0
+        if valor > 0:
+            return (valor - self.zona_muerta) * ESCALA // (ESCALA - self.zona_muerta)
+        return -((-valor - self.zona_muerta) * ESCALA // (ESCALA - self.zona_muerta))
+
+
+def cargar(ruta, ejes):
+    """Restaura los extremos de ``ejes`` (dict nombre -> Eje) desde ``ruta``."""
+    try:
+        with open(ruta) as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return
+    for nombre, eje in ejes.items():
+        eje.restaurar(datos.get(nombre))
+
+
+def guardar(ruta, ejes):
+    """Guarda los extremos si alguno se amplió; devuelve True si escribió."""
+    if not any(eje.ajustado for eje in ejes.values()):
+        return False
+    with open(ruta, "w") as f:
+        json.dump({nombre: eje.estado() for nombre, eje in ejes.items()}, f)
+    return True
@@ -0,0 +1,63 @@
+import time
+
+
+class Lote:
+    """Junta varias muestras de un sensor en un solo mensaje MQTT.
+
+    Formato: ``{"t0": ticks_ms, "dt": [...], "v": [...]}``. ``t0`` es el
+    instante de la primera muestra y cada ``dt`` los ms desde la muestra
+    anterior (el primero es 0), así el mensaje conserva la hora de cada
+    lectura sin repetir marcas de tiempo completas. Los valores de
+    ``extra`` se agregan como campos del mensaje (p. ej. el BPM).
+
+    El lote se envía al llegar a ``maximo`` muestras o cuando la primera
+    tiene ``edad_max_ms``, lo que ocurra antes.
+    """
+
+    def __init__(self, dispositivo, topic, maximo=20, edad_max_ms=1000, formato=str):
+        self.dispositivo = dispositivo
+        self.topic = topic
+        self.maximo = maximo
+        self.edad_max_ms = edad_max_ms
+        self.formato = formato
+        self.extra = {}
+        self._deltas = []
+        self._valores = []
+        self._t0 = 0
+        self._ultimo = 0
+        self.muestras = 0
+        self.enviados = 0
+        # Revisa la edad aunque el sensor deje de entregar muestras
+        dispositivo.periodico("lote " + topic, max(10, edad_max_ms // 4), self.revisar)
+
+    def agregar(self, valor, ticks=None):
+        if ticks is None:
+            ticks = time.ticks_ms()
+        if not self._valores:
+            self._t0 = ticks
+            self._deltas.append(0)
+        else:
+            self._deltas.append(time.ticks_diff(ticks, self._ultimo))
+        self._ultimo = ticks
+        self._valores.append(valor)
+        self.muestras += 1
+        if len(self._valores) >= self.maximo:
+            self.vaciar()
+
+    def revisar(self):
+        if self._valores and time.ticks_diff(time.ticks_ms(), self._t0) >= self.edad_max_ms:
+            self.vaciar()
+
+    def vaciar(self):
+        if not self._valores:
+            return
+        campos = "".join(',"%s":%s' % (k, v) for k, v in self.extra.items())
+        payload = '{"t0":%d,"dt":[%s],"v":[%s]%s}' % (
+            self._t0,
+            ",".join(str(d) for d in self._deltas),
+            ",".join(self.formato(v) for v in self._valores),
+            campos)
+        self.dispositivo.publicar(self.topic, payload)
+        self.enviados += 1
+        self._deltas = []
+        self._valores = []
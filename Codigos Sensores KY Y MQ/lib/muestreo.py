@@ -0,0 +1,229 @@
+import json
+import time
+from array import array
+from machine import Timer
+
+
+class TablaCalibracion:
+    """Corrige la no linealidad del ADC del ESP32 con una tabla.
+
+    Se arma a partir de puntos medidos ``(crudo, real)``: lo que leyó el
+    ADC y lo que debió leer un ADC ideal con ese voltaje (``V * 4095 /
+    3.3`` con 12 bits), medido con un multímetro. Los puntos se
+    interpolan una sola vez sobre ``tramos + 1`` nodos equiespaciados en
+    un ``array('H')``; ``corregir`` solo hace una interpolación entera
+    entre dos nodos, sin floats.
+    """
+
+    def __init__(self, puntos, maximo=4095, tramos=32):
+        puntos = sorted(puntos)
+        if len(puntos) < 2:
+            raise ValueError("Se necesitan al menos dos puntos de calibración")
+        self.paso = (maximo + 1) // tramos
+        self._desplazamiento = 0
+        while (1 << self._desplazamiento) < self.paso:
+            self._desplazamiento += 1
+        if (1 << self._desplazamiento) != self.paso:
+            raise ValueError("(maximo + 1) / tramos debe ser potencia de 2")
+        self._mascara = self.paso - 1
+        self._nodos = array("H", [0] * (tramos + 1))
+        for i in range(tramos + 1):
+            self._nodos[i] = min(65535, max(0, round(_interpolar(puntos, i * self.paso))))
+
+    def corregir(self, crudo):
+        i = crudo >> self._desplazamiento
+        if i >= len(self._nodos) - 1:
+            return self._nodos[-1]
+        v0 = self._nodos[i]
+        return v0 + (((self._nodos[i + 1] - v0) * (crudo & self._mascara)) >> self._desplazamiento)
+
+    @classmethod
+    def desde_archivo(cls, ruta, maximo=4095, tramos=32):
+        """Carga ``{"puntos": [[crudo, real], ...]}`` (en cuentas de 12
+        bits, con ATTN_11DB) y la escala a ``maximo``; ``None`` si el
+        archivo no existe (la placa no se calibró)."""
+        try:
+            with open(ruta) as f:
+                puntos = json.load(f)["puntos"]
+        except OSError:
+            return None
+        factor = (maximo + 1) / 4096
+        return cls([(c * factor, r * factor) for c, r in puntos], maximo, tramos)
+
+
+def _interpolar(puntos, x):
+    # Recta por los dos puntos más cercanos (extrapola en los extremos)
+    k = 1
+    while k < len(puntos) - 1 and puntos[k][0] < x:
+        k += 1
+    (x0, y0), (x1, y1) = puntos[k - 1], puntos[k]
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+
+class CanalADC:
+    """Lectura filtrada de una entrada analógica.
+
+    Cada ``leer()`` toma una ráfaga de ``muestras`` conversiones seguidas
+    en un ``array('H')`` preasignado (``buffer`` permite compartirlo
+    entre canales) y la reduce según ``metodo``:
+
+    - ``"promedio"``: reduce el ruido gaussiano en √muestras;
+    - ``"mediana"``: descarta los picos aislados del ADC del ESP32 que
+      un promedio arrastra;
+    - ``"recortado"``: promedio sin las ``recorte`` lecturas más bajas
+      ni las ``recorte`` más altas (un punto intermedio entre ambos).
+
+    Luego ``tabla`` (una ``TablaCalibracion``) corrige la no linealidad
+    y ``suavizado = k`` aplica un IIR de primer orden con alfa = 1/2**k.
+    El estado del IIR es propio de cada canal y entero (×256), así que
+    ``leer()`` no crea floats. ``crudo`` guarda la ráfaga reducida antes
+    de la tabla y el IIR.
+    """
+
+    def __init__(self, adc, muestras=8, metodo="promedio", recorte=0,
+                 tabla=None, suavizado=0, buffer=None):
+        if metodo not in ("promedio", "mediana", "recortado"):
+            raise ValueError("Método desconocido: " + metodo)
+        if metodo == "recortado" and 2 * recorte >= muestras:
+            raise ValueError("El recorte deja la ráfaga vacía")
+        self.adc = adc
+        self.muestras = muestras
+        self.metodo = metodo
+        self.recorte = recorte if metodo == "recortado" else 0
+        self.tabla = tabla
+        self.suavizado = suavizado
+        self._buffer = buffer if buffer is not None else array("H", [0] * muestras)
+        if len(self._buffer) < muestras:
+            raise ValueError("El buffer es más chico que la ráfaga")
+        self._estado = None
+        self.crudo = 0
+        self.lecturas = 0
+
+    def leer(self):
+        buffer = self._buffer
+        leer = self.adc.read
+        n = self.muestras
+        for i in range(n):
+            buffer[i] = leer()
+        if self.metodo == "promedio":
+            total = 0
+            for i in range(n):
+                total += buffer[i]
+            valor = (total + n // 2) // n
+        else:
+            _ordenar(buffer, n)
+            if self.metodo == "mediana":
+                medio = n >> 1
+                valor = buffer[medio] if n & 1 else (buffer[medio - 1] + buffer[medio] + 1) >> 1
+            else:
+                total = 0
+                for i in range(self.recorte, n - self.recorte):
+                    total += buffer[i]
+                quedan = n - 2 * self.recorte
+                valor = (total + quedan // 2) // quedan
+        self.crudo = valor
+        self.lecturas += 1
+        if self.tabla is not None:
+            valor = self.tabla.corregir(valor)
+        if self.suavizado:
+            if self._estado is None:
+                self._estado = valor << 8
+            else:
+                self._estado += ((valor << 8) - self._estado) >> self.suavizado
+            valor = (self._estado + 128) >> 8
+        return valor
+
+    def reiniciar(self):
+        # El próximo leer() arranca el IIR en la lectura nueva (p. ej. tras un salto)
+        self._estado = None
+
+
+def _ordenar(buffer, n):
+    # Inserción en el mismo array: no asigna y con n <= 32 es suficiente
+    for i in range(1, n):
+        valor = buffer[i]
+        j = i - 1
+        while j >= 0 and buffer[j] > valor:
+            buffer[j + 1] = buffer[j]
+            j -= 1
+        buffer[j + 1] = valor
+
+
+class MuestreadorPeriodico:
+    """Lee un ``CanalADC`` a frecuencia fija desde un ``machine.Timer``.
+
+    El callback del timer solo lee el canal y guarda el valor en un
+    anillo ``array('H')``, junto con su ``ticks_ms()``; ``vaciar(funcion)``
+    entrega las muestras en orden desde una tarea y deja en ``instante``
+    el de la muestra que se está entregando. El timer marca el ritmo, así
+    que los intervalos no heredan el jitter del bucle aunque la tarea
+    corra tarde.
+
+    Con el anillo lleno (una tarea que bloquea más de ``capacidad`` /
+    ``frecuencia``, como ``MQTTClient.connect()``) las muestras nuevas se
+    descartan y el hueco queda en ``instante``. ``perdidas`` las cuenta,
+    ``jitter_max_us`` el mayor desvío entre callbacks respecto del
+    periodo y ``callback_max_us`` lo más que tardó uno.
+    """
+
+    def __init__(self, canal, frecuencia, capacidad=128, timer=0):
+        self.canal = canal
+        self.frecuencia = frecuencia
+        self.periodo_us = 1000000 // frecuencia
+        self._capacidad = capacidad
+        self._valores = array("H", [0] * capacidad)
+        self._instantes = array("L", [0] * capacidad)
+        self._escritura = 0
+        self._lectura = 0
+        self._anterior = None
+        self._timer = Timer(timer)
+        # Referencia creada una sola vez para el callback
+        self._muestrear_ref = self._muestrear
+        self.activo = False
+        self.instante = 0
+        self.muestras = 0
+        self.perdidas = 0
+        self.jitter_max_us = 0
+        self.callback_max_us = 0
+
+    def iniciar(self):
+        self._anterior = None
+        self.activo = True
+        self._timer.init(mode=Timer.PERIODIC, freq=self.frecuencia, callback=self._muestrear_ref)
+
+    def detener(self):
+        self.activo = False
+        self._timer.deinit()
+
+    def _muestrear(self, _):
+        inicio = time.ticks_us()
+        if self._anterior is not None:
+            desvio = abs(time.ticks_diff(inicio, self._anterior) - self.periodo_us)
+            if desvio > self.jitter_max_us:
+                self.jitter_max_us = desvio
+        self._anterior = inicio
+        valor = self.canal.leer()
+        siguiente = self._escritura + 1
+        if siguiente == self._capacidad:
+            siguiente = 0
+        if siguiente == self._lectura:
+            self.perdidas += 1
+        else:
+            self._valores[self._escritura] = valor
+            self._instantes[self._escritura] = time.ticks_ms()
+            self._escritura = siguiente
+        self.muestras += 1
+        duracion = time.ticks_diff(time.ticks_us(), inicio)
+        if duracion > self.callback_max_us:
+            self.callback_max_us = duracion
+
+    def vaciar(self, funcion):
+        """Llama a ``funcion(valor)`` con cada muestra pendiente; devuelve cuántas."""
+        entregadas = 0
+        while self._lectura != self._escritura:
+            valor = self._valores[self._lectura]
+            self.instante = self._instantes[self._lectura]
+            self._lectura = self._lectura + 1 if self._lectura + 1 < self._capacidad else 0
+            funcion(valor)
+            entregadas += 1
+        return entregadas
@@ -0,0 +1,162 @@
+import gc
+import json
+import time
+
+# Con este archivo en la flash ({"topic": ..., "periodo_ms": ...})
+# Dispositivo perfila sus tareas periódicas sin tocar el script
+ARCHIVO = "perfil.json"
+
+# Perfiles creados desde el arranque (el emulador arma su reporte con ellos)
+PERFILES = []
+
+
+def configuracion(archivo=ARCHIVO):
+    try:
+        with open(archivo) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Seccion:
+    """Un tramo del bucle medido aparte: ``with perfil.seccion("json"):``."""
+
+    def __init__(self, nombre, propio):
+        self.nombre = nombre
+        self._propio = propio
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.n = 0
+        self.suma_us = 0
+        self.asignado = 0
+
+    def __enter__(self):
+        self._asignado = gc.mem_alloc()
+        self._inicio = time.ticks_us()
+        return self
+
+    def __exit__(self, *excepcion):
+        us = time.ticks_diff(time.ticks_us(), self._inicio)
+        delta = gc.mem_alloc() - self._asignado - self._propio
+        self.n += 1
+        self.suma_us += us
+        if delta > 0:
+            self.asignado += delta
+
+
+class Perfil:
+    """Tiempo y memoria por iteración de un bucle, medidos en la placa.
+
+    Cada iteración va entre ``iniciar()`` y ``terminar()`` (o ``with
+    perfil:``, o ``medir(funcion)``) y se registra su duración contra
+    ``presupuesto_ms`` (el periodo del bucle), los bytes que asignó en el
+    heap según ``gc.mem_alloc()`` y si corrió el GC en medio (lo asignado
+    bajó): esas iteraciones cuentan en ``colecciones`` y su exceso sobre
+    el promedio estima la pausa. ``seccion(nombre)`` mide aparte un tramo
+    para ubicar dónde se asigna la memoria.
+
+    La medición no asigna memoria propia, pero ``mem_alloc()`` recorre la
+    tabla del heap: conviene activarla para diagnosticar, no siempre.
+    ``resumen()`` da el JSON que se publica; ``reiniciar()`` abre una
+    nueva ventana.
+    """
+
+    def __init__(self, nombre, presupuesto_ms=0):
+        self.nombre = nombre
+        self.presupuesto_us = presupuesto_ms * 1000
+        # Lo que asigna la propia consulta (0 en la placa; no en el emulador)
+        antes = gc.mem_alloc()
+        self._propio = gc.mem_alloc() - antes
+        self._heap = gc.mem_alloc() + gc.mem_free()
+        self.secciones = {}
+        self._asignado = 0
+        self._inicio = 0
+        self.reiniciar()
+        PERFILES.append(self)
+
+    def reiniciar(self):
+        self.n = 0
+        self.suma_us = 0
+        self.maximo_us = 0
+        self.excedidas = 0
+        self.medidas = 0
+        self.asignado = 0
+        self.asignado_max = 0
+        self.colecciones = 0
+        self.suma_gc_us = 0
+        self.libre_min = self._heap - gc.mem_alloc()
+        for seccion in self.secciones.values():
+            seccion.reiniciar()
+
+    def iniciar(self):
+        self._asignado = gc.mem_alloc()
+        self._inicio = time.ticks_us()
+
+    def terminar(self):
+        us = time.ticks_diff(time.ticks_us(), self._inicio)
+        asignado = gc.mem_alloc()
+        self.n += 1
+        self.suma_us += us
+        if us > self.maximo_us:
+            self.maximo_us = us
+        if self.presupuesto_us and us > self.presupuesto_us:
+            self.excedidas += 1
+        if asignado < self._asignado:
+            # El GC corrió durante la iteración: no se sabe cuánto asignó
+            self.colecciones += 1
+            self.suma_gc_us += us
+        else:
+            delta = max(0, asignado - self._asignado - self._propio)
+            self.medidas += 1
+            self.asignado += delta
+            if delta > self.asignado_max:
+                self.asignado_max = delta
+        libre = self._heap - asignado
+        if libre < self.libre_min:
+            self.libre_min = libre
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.terminar()
+
+    def medir(self, funcion):
+        self.iniciar()
+        try:
+            return funcion()
+        finally:
+            self.terminar()
+
+    def seccion(self, nombre):
+        # Se crea una vez y se reutiliza: el with no asigna en cada vuelta
+        seccion = self.secciones.get(nombre)
+        if seccion is None:
+            seccion = self.secciones[nombre] = Seccion(nombre, self._propio)
+        return seccion
+
+    def promedio_us(self):
+        return self.suma_us // self.n if self.n else 0
+
+    def bytes_por_iteracion(self):
+        return self.asignado // self.medidas if self.medidas else 0
+
+    def pausa_gc_us(self):
+        # Exceso de las iteraciones con GC sobre las demás
+        if not self.colecciones:
+            return 0
+        normales = self.n - self.colecciones
+        sin_gc = (self.suma_us - self.suma_gc_us) // normales if normales else 0
+        return max(0, self.suma_gc_us // self.colecciones - sin_gc)
+
+    def resumen(self):
+        secciones = ",".join('"%s":{"n":%d,"us":%d,"bytes":%d}' % (
+            s.nombre, s.n, s.suma_us // s.n if s.n else 0, s.asignado // s.n if s.n else 0)
+            for s in self.secciones.values())
+        return ('{"nombre":"%s","n":%d,"prom_us":%d,"max_us":%d,"presupuesto_us":%d,"excedidas":%d,'
+                '"bytes_iter":%d,"bytes_max":%d,"gc":%d,"pausa_gc_us":%d,"libre_min":%d,"secciones":{%s}}') % (
+            self.nombre, self.n, self.promedio_us(), self.maximo_us, self.presupuesto_us, self.excedidas,
+            self.bytes_por_iteracion(), self.asignado_max, self.colecciones, self.pausa_gc_us(),
+            self.libre_min, secciones)
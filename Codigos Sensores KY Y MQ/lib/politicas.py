@@ -0,0 +1,198 @@
+import time
+
+
+class Politica:
+    """Decide qué lecturas de un sensor vale la pena publicar.
+
+    ``evaluar(valor)`` se llama con cada muestra y devuelve el valor a
+    publicar, o ``None`` si no hay que enviar nada; ``t_reportado`` es el
+    instante (ticks_ms) de ese valor. Con ``silencio_max_ms`` se publica
+    aunque no haya cambios cuando pasa ese tiempo sin enviar (latido).
+
+    Esta clase base publica todas las muestras.
+    """
+
+    # Cómo reconstruye el receptor la señal entre dos reportes
+    interpolacion = "escalon"
+
+    def __init__(self, silencio_max_ms=None):
+        self.silencio_max_ms = silencio_max_ms
+        self._ultimo = None
+        self._t_ultimo = 0
+        self.t_reportado = 0
+        self.evaluadas = 0
+        self.reportadas = 0
+
+    def evaluar(self, valor, t=None):
+        if t is None:
+            t = time.ticks_ms()
+        self.evaluadas += 1
+        if self._ultimo is None or self._supera(valor) or self._callado(t):
+            return self._reportar(valor, t)
+        return None
+
+    def forzar(self, valor, t=None):
+        # Publicación por otra causa (p. ej. cambió la salida digital)
+        return self._reportar(valor, time.ticks_ms() if t is None else t)
+
+    def olvidar(self):
+        # El último envío no llegó (p. ej. sin conexión): la próxima
+        # muestra se publica sí o sí
+        self._ultimo = None
+
+    def _supera(self, valor):
+        return True
+
+    def _callado(self, t):
+        return (self.silencio_max_ms is not None
+                and time.ticks_diff(t, self._t_ultimo) >= self.silencio_max_ms)
+
+    def _reportar(self, valor, t):
+        self._ultimo = valor
+        self._t_ultimo = t
+        self.t_reportado = t
+        self.reportadas += 1
+        return valor
+
+    def reduccion(self):
+        return self.evaluadas / self.reportadas if self.reportadas else 0.0
+
+
+class Latido(Politica):
+    """Solo publica cada ``silencio_max_ms``, cambie o no el valor."""
+
+    def __init__(self, silencio_max_ms):
+        super().__init__(silencio_max_ms)
+
+    def _supera(self, valor):
+        return False
+
+
+class BandaMuerta(Politica):
+    """Publica cuando el valor se aleja más de ``umbral`` del último enviado."""
+
+    def __init__(self, umbral, silencio_max_ms=None):
+        super().__init__(silencio_max_ms)
+        self.umbral = umbral
+
+    def _supera(self, valor):
+        return abs(valor - self._ultimo) > self.umbral
+
+
+class BandaPorcentual(Politica):
+    """Como ``BandaMuerta`` pero el umbral es un % del último valor enviado
+    (nunca menor que ``minimo``, para valores cercanos a cero)."""
+
+    def __init__(self, porcentaje, minimo=0, silencio_max_ms=None):
+        super().__init__(silencio_max_ms)
+        self.porcentaje = porcentaje
+        self.minimo = minimo
+
+    def _supera(self, valor):
+        umbral = abs(self._ultimo) * self.porcentaje / 100
+        return abs(valor - self._ultimo) > max(umbral, self.minimo)
+
+
+class PuertaGiratoria(Politica):
+    """Compresión swinging door: el receptor une los puntos publicados con
+    rectas y ninguna muestra intermedia queda a más de ``desviacion``.
+
+    Mientras todas las muestras desde el último punto publicado quepan en
+    un corredor de ancho ``2 * desviacion`` no se envía nada; cuando una
+    lo rompe se publica el punto del corredor en el instante de la muestra
+    anterior (con su ``t_reportado``), así que cada reporte llega un
+    periodo de muestreo tarde y puede diferir de la lectura cruda hasta en
+    ``desviacion``.
+    """
+
+    interpolacion = "lineal"
+
+    def __init__(self, desviacion, silencio_max_ms=None):
+        super().__init__(silencio_max_ms)
+        self.desviacion = desviacion
+        self._pendiente_sup = 0.0
+        self._pendiente_inf = 0.0
+        self._abierta = False
+        self._t_previo = 0
+        self._previo = None
+
+    def evaluar(self, valor, t=None):
+        if t is None:
+            t = time.ticks_ms()
+        self.evaluadas += 1
+        if self._ultimo is None:
+            return self._archivar(valor, t)
+        dt = time.ticks_diff(t, self._t_ultimo)
+        if dt <= 0:
+            return None
+        sup = (valor + self.desviacion - self._ultimo) / dt
+        inf = (valor - self.desviacion - self._ultimo) / dt
+        if self._abierta and (inf > self._pendiente_sup or sup < self._pendiente_inf):
+            # La puerta se cierra: se publica el punto del corredor en la
+            # muestra anterior y el nuevo corredor arranca en él
+            punto = self._en_corredor(self._previo, self._t_previo)
+            self._reportar(punto, self._t_previo)
+            dt = time.ticks_diff(t, self._t_previo)
+            self._pendiente_sup = (valor + self.desviacion - punto) / dt
+            self._pendiente_inf = (valor - self.desviacion - punto) / dt
+            self._previo = valor
+            self._t_previo = t
+            return punto
+        if not self._abierta or sup < self._pendiente_sup:
+            self._pendiente_sup = sup
+        if not self._abierta or inf > self._pendiente_inf:
+            self._pendiente_inf = inf
+        self._abierta = True
+        if self._callado(t):
+            return self._archivar(self._en_corredor(valor, t), t)
+        self._previo = valor
+        self._t_previo = t
+        return None
+
+    def forzar(self, valor, t=None):
+        return self._archivar(valor, time.ticks_ms() if t is None else t)
+
+    def _en_corredor(self, valor, t):
+        # La recta desde el último punto con la pendiente más cercana a la
+        # de la muestra que cabe en el corredor: así ninguna muestra
+        # intermedia queda fuera
+        dt = time.ticks_diff(t, self._t_ultimo)
+        pendiente = (valor - self._ultimo) / dt
+        if pendiente > self._pendiente_sup:
+            pendiente = self._pendiente_sup
+        elif pendiente < self._pendiente_inf:
+            pendiente = self._pendiente_inf
+        else:
+            return valor
+        punto = self._ultimo + pendiente * dt
+        return round(punto) if isinstance(valor, int) else punto
+
+    def _archivar(self, valor, t):
+        self._abierta = False
+        self._previo = valor
+        self._t_previo = t
+        return self._reportar(valor, t)
+
+
+_TIPOS = {
+    "siempre": Politica,
+    "latido": Latido,
+    "banda": BandaMuerta,
+    "porcentaje": BandaPorcentual,
+    "puerta": PuertaGiratoria,
+}
+
+
+def crear(config):
+    """Crea la política descrita por un dict, p. ej.
+    ``{"tipo": "banda", "umbral": 40, "silencio_max_ms": 10000}``.
+
+    Tipos: ``siempre``, ``latido`` (``silencio_max_ms``), ``banda``
+    (``umbral``), ``porcentaje`` (``porcentaje``, ``minimo``) y ``puerta``
+    (``desviacion``); todos aceptan ``silencio_max_ms``.
+    """
+    parametros = dict(config)
+    tipo = parametros.pop("tipo")
+    if tipo not in _TIPOS:
+        raise ValueError("Política desconocida: " + tipo)
+    return _TIPOS[tipo](**parametros)
@@ -0,0 +1,173 @@
+import gc
+import uasyncio as asyncio
+
+# Potencias de 10 para escribir enteros sin crear cadenas
+_POTENCIAS = (1000000000, 100000000, 10000000, 1000000, 100000, 10000, 1000, 100, 10, 1)
+# Mayor valor absoluto que entran en los 10 dígitos de entero()
+ENTERO_MAX = 9999999999
+
+
+class Publicador:
+    """Publica en un topic fijo sin asignar memoria en cada envío.
+
+    El paquete PUBLISH (QoS 0) se arma en buffers creados una sola vez:
+    ``cabecera`` lleva el tipo y el largo restante, y ``cuerpo`` el largo
+    del topic, el topic y el payload. El payload se escribe en su lugar
+    con ``texto()`` (constantes ``b"..."``), ``entero()`` y ``fijo()``,
+    y ``enviar()`` hace dos ``sock.write(buf, largo)`` sobre el socket de
+    ``umqtt.simple`` (``publish()`` hace cuatro y crea varios objetos).
+
+    Para que no haya asignaciones los decimales se pasan como enteros
+    escalados (``fijo(2153, 3)`` escribe ``2.153``): en el ESP32 cada
+    ``float`` es un objeto en el heap.
+
+    Desde una tarea de muestreo no conviene llamar ``enviar()``: el
+    ``sock.write`` bloquea mientras el enlace esté lento. ``listo()``
+    solo marca el payload armado y ``tarea(conexion)`` (registrada con
+    ``Dispositivo.tarea``) lo envía desde su propia tarea, como la cola
+    de ``Dispositivo``. Hay un solo buffer: si se arma otro payload antes
+    de que salga el anterior, gana el último (``reemplazados``).
+
+    ``asignado`` guarda los bytes que se asignaron en el heap durante la
+    última publicación (desde ``inicio()`` hasta ``enviar()`` o
+    ``listo()``), medidos con ``gc.mem_alloc()``.
+    """
+
+    def __init__(self, topic, largo_max=64):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        self._inicio_payload = 2 + len(topic)
+        self._cuerpo = bytearray(self._inicio_payload + largo_max)
+        self._cuerpo[0] = len(topic) >> 8
+        self._cuerpo[1] = len(topic) & 0xFF
+        i = 0
+        while i < len(topic):
+            self._cuerpo[2 + i] = topic[i]
+            i += 1
+        self._cabecera = bytearray(5)
+        self._largo = self._inicio_payload
+        self._memoria = 0
+        self.asignado = 0
+        self.enviados = 0
+        self.fallidos = 0
+        self.reemplazados = 0
+        self.pendiente = False
+        self._aviso = asyncio.Event()
+
+    def inicio(self):
+        # Descarta el payload anterior y empieza a medir asignaciones
+        self._largo = self._inicio_payload
+        self._memoria = gc.mem_alloc()
+        return self
+
+    def texto(self, datos):
+        buf = self._cuerpo
+        n = self._largo
+        i = 0
+        while i < len(datos):
+            buf[n] = datos[i]
+            n += 1
+            i += 1
+        self._largo = n
+        return self
+
+    def entero(self, valor, digitos_min=1):
+        # Hasta 10 dígitos (ENTERO_MAX); más no se pueden escribir bien
+        if valor > ENTERO_MAX or valor < -ENTERO_MAX:
+            raise ValueError("entero fuera de rango")
+        buf = self._cuerpo
+        n = self._largo
+        if valor < 0:
+            buf[n] = 0x2D  # "-"
+            n += 1
+            valor = -valor
+        escribir = False
+        i = 0
+        while i < 10:
+            potencia = _POTENCIAS[i]
+            digito = 0
+            while valor >= potencia:
+                valor -= potencia
+                digito += 1
+            if digito or escribir or 10 - i <= digitos_min:
+                buf[n] = 0x30 + digito
+                n += 1
+                escribir = True
+            i += 1
+        self._largo = n
+        return self
+
+    def fijo(self, valor, decimales):
+        # valor es el número multiplicado por 10**decimales
+        if valor < 0:
+            self._cuerpo[self._largo] = 0x2D
+            self._largo += 1
+            valor = -valor
+        escala = _POTENCIAS[9 - decimales]
+        parte_entera = 0
+        while valor >= escala:
+            valor -= escala
+            parte_entera += 1
+        self.entero(parte_entera)
+        if decimales:
+            self._cuerpo[self._largo] = 0x2E  # "."
+            self._largo += 1
+            self.entero(valor, decimales)
+        return self
+
+    def payload(self):
+        # Copia del payload armado (asigna memoria: solo para depurar)
+        return bytes(self._cuerpo[self._inicio_payload:self._largo])
+
+    def listo(self):
+        # El payload armado queda para tarea(); no toca el socket
+        self.asignado = gc.mem_alloc() - self._memoria
+        if self.pendiente:
+            self.reemplazados += 1
+        self.pendiente = True
+        self._aviso.set()
+
+    async def tarea(self, conexion, retain=False):
+        """Envía el payload marcado con ``listo()`` cuando hay cliente."""
+        while True:
+            await self._aviso.wait()
+            self._aviso.clear()
+            while self.pendiente:
+                cliente = conexion.cliente
+                if cliente is None:
+                    await asyncio.sleep_ms(100)
+                    continue
+                try:
+                    self._escribir(cliente, retain)
+                except OSError as e:
+                    print(f"[ERROR] Fallo al publicar: {e}")
+                    conexion.perdida()
+                    continue
+                self.pendiente = False
+
+    def enviar(self, cliente, retain=False):
+        """Escribe el paquete en el socket de ``cliente`` (MQTTClient).
+
+        Devuelve False si no hay cliente; los OSError se propagan para que
+        el llamador marque la conexión como perdida.
+        """
+        if cliente is None:
+            self.fallidos += 1
+            return False
+        self._escribir(cliente, retain)
+        self.asignado = gc.mem_alloc() - self._memoria
+        return True
+
+    def _escribir(self, cliente, retain):
+        cabecera = self._cabecera
+        cabecera[0] = 0x31 if retain else 0x30
+        restante = self._largo
+        i = 1
+        while restante > 0x7F:
+            cabecera[i] = (restante & 0x7F) | 0x80
+            restante >>= 7
+            i += 1
+        cabecera[i] = restante
+        cliente.sock.write(cabecera, i + 1)
+        cliente.sock.write(self._cuerpo, self._largo)
+        self.enviados += 1
@@ -0,0 +1,158 @@
+from array import array
+
+
+class Ventana:
+    """Últimos ``capacidad`` valores en un ``array`` con su suma al día:
+    agregar y promediar son O(1), sin listas ni ``pop(0)``."""
+
+    def __init__(self, capacidad, tipo="i"):
+        self.capacidad = capacidad
+        self._valores = array(tipo, [0] * capacidad)
+        self._siguiente = 0
+        self.cantidad = 0
+        self.suma = 0
+
+    def agregar(self, valor):
+        if self.cantidad == self.capacidad:
+            self.suma -= self._valores[self._siguiente]
+        else:
+            self.cantidad += 1
+        self._valores[self._siguiente] = valor
+        self.suma += valor
+        self._siguiente = self._siguiente + 1 if self._siguiente + 1 < self.capacidad else 0
+
+    def anterior(self, k):
+        # k = 0 es el último valor agregado
+        i = self._siguiente - 1 - k
+        if i < 0:
+            i += self.capacidad
+        return self._valores[i]
+
+    def promedio(self):
+        return self.suma // self.cantidad if self.cantidad else 0
+
+    def lleno(self):
+        return self.cantidad == self.capacidad
+
+    def vaciar(self):
+        self._siguiente = 0
+        self.cantidad = 0
+        self.suma = 0
+
+
+class DetectorPulso:
+    """Latidos de un fotopletismograma (KY-039) muestreado a ritmo fijo.
+
+    Cada muestra se suaviza con una media móvil de ~20 ms y se deriva
+    sobre ~40 ms. Los primeros ``aprendizaje_ms`` solo aprenden la
+    pendiente máxima (al menos un latido entero a 30 BPM), así el primer
+    latido no se arma con cualquier ruido. Después el detector se arma
+    cuando la pendiente supera el 40% de la pendiente típica de los
+    últimos latidos (umbral adaptativo, que se reduce a la mitad cada 2 s
+    sin latidos) y el latido es la muestra más alta antes de que la
+    pendiente se haga negativa. Un periodo refractario de 250 ms descarta
+    la muesca dícrota.
+
+    Los intervalos se cuentan en muestras, no con el reloj, así que no
+    dependen de cuándo se procesa cada una; si se pierden muestras hay
+    que llamar ``interrumpir()``. ``procesar(valor)`` devuelve
+    True en cada latido; ``bpm`` es la media de los últimos ``latidos``
+    intervalos válidos (30-200 BPM siempre y, desde el cuarto, a menos
+    de 30% de la media).
+    """
+
+    def __init__(self, periodo_ms, latidos=8, aprendizaje_ms=2000):
+        self.periodo_ms = periodo_ms
+        self._aprendizaje = round(aprendizaje_ms / periodo_ms)
+        self._suave = Ventana(max(1, round(20 / periodo_ms)))
+        self._k = max(1, round(40 / periodo_ms))
+        self._historia = Ventana(self._k + 1)
+        self._refractario = round(250 / periodo_ms)
+        self._espera_max = round(2000 / periodo_ms)
+        self._intervalos = Ventana(latidos)
+        self._n = 0
+        self._armado = False
+        self._pendiente_ref = 0
+        self._pendiente_max = 0
+        self._pico = 0
+        self._n_pico = 0
+        self._n_latido = None
+        self._n_ajuste = 0
+        self._rechazos = 0
+        self.bpm = 0
+        self.latidos = 0
+
+    def procesar(self, valor):
+        self._n += 1
+        n = self._n
+        self._suave.agregar(valor)
+        if not self._suave.lleno():
+            return False
+        s = self._suave.suma
+        self._historia.agregar(s)
+        if not self._historia.lleno():
+            return False
+        d = s - self._historia.anterior(self._k)
+
+        if n <= self._aprendizaje:
+            # Aprendizaje: la pendiente de referencia es la mayor de la ventana
+            if d > self._pendiente_ref:
+                self._pendiente_ref = d
+            self._n_ajuste = n
+            return False
+        if self._armado:
+            if d > self._pendiente_max:
+                self._pendiente_max = d
+            if s > self._pico:
+                self._pico = s
+                self._n_pico = n
+            if d <= 0:
+                # Pasó la cima: la pendiente de este latido ajusta el umbral
+                self._armado = False
+                if self._pendiente_ref:
+                    self._pendiente_ref = (3 * self._pendiente_ref + self._pendiente_max) >> 2
+                else:
+                    self._pendiente_ref = self._pendiente_max
+                self._n_ajuste = n
+                return self._latido(self._n_pico)
+        elif d > 0 and d > (2 * self._pendiente_ref) // 5:
+            if self._n_latido is None or n - self._n_latido > self._refractario:
+                self._armado = True
+                self._pendiente_max = d
+                self._pico = s
+                self._n_pico = n
+
+        # Sin latidos (dedo fuera o señal más débil): baja el umbral
+        if n - self._n_ajuste > self._espera_max:
+            self._pendiente_ref >>= 1
+            self._n_ajuste = n
+        return False
+
+    def interrumpir(self):
+        """La señal tiene un hueco (muestras perdidas): descarta el latido
+        en curso para no medir un intervalo a través del hueco. El BPM y
+        los intervalos ya aceptados se conservan."""
+        self._suave.vaciar()
+        self._historia.vaciar()
+        self._armado = False
+        self._n_latido = None
+
+    def _latido(self, n_pico):
+        self.latidos += 1
+        if self._n_latido is not None:
+            intervalo = (n_pico - self._n_latido) * self.periodo_ms
+            cantidad = self._intervalos.cantidad
+            suma = self._intervalos.suma
+            if 300 <= intervalo <= 2000 and (
+                    cantidad < 3 or abs(intervalo * cantidad - suma) * 10 < 3 * suma):
+                self._intervalos.agregar(intervalo)
+                self._rechazos = 0
+                self.bpm = 60000 * self._intervalos.cantidad // self._intervalos.suma
+            else:
+                self._rechazos += 1
+                if self._rechazos >= 3:
+                    # Tres intervalos fuera de la media: el ritmo cambió
+                    self._intervalos.vaciar()
+                    self._rechazos = 0
+        self._n_latido = n_pico
+        return True
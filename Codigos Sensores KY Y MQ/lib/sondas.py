@@ -0,0 +1,112 @@
+import binascii
+import time
+import uasyncio as asyncio
+from array import array
+
+# Tiempo máximo de conversión del DS18B20 por resolución (bits -> ms)
+CONVERSION_MS = {9: 94, 10: 188, 11: 375, 12: 750}
+
+
+class SondasDS18B20:
+    """Todas las sondas DS18B20 de un bus 1-Wire, sin bloquear.
+
+    Cada ciclo manda una sola conversión a todo el bus (SKIP_ROM) y espera
+    con ``await``: con alimentación propia (``sondeo=True``) las sondas
+    mantienen el bus en 0 mientras convierten, así que pasada la mitad del
+    tiempo máximo se consulta un bit cada 5 ms y se lee apenas terminan;
+    con alimentación parásita se espera el máximo de ``CONVERSION_MS``.
+    Luego se lee el scratchpad de cada ROM.
+
+    ``resolucion`` (9-12 bits) fija la duración: 94 ms a 9 bits (0.5 °C),
+    750 ms a 12 bits (0.0625 °C). Como la conversión es una sola para
+    todas, las lecturas por segundo crecen con la cantidad de sondas.
+    Las lecturas se acumulan por sonda hasta ``promedios()``; una lectura
+    con CRC inválido cuenta en ``errores`` y se descarta.
+    """
+
+    def __init__(self, ds, resolucion=12, sondeo=True):
+        if resolucion not in CONVERSION_MS:
+            raise ValueError("Resolución entre 9 y 12 bits")
+        self.ds = ds
+        self.resolucion = resolucion
+        self.sondeo = sondeo
+        self.roms = []
+        self.ids = []
+        self.ultimas = array("f")
+        self._sumas = array("f")
+        self._cuentas = array("H")
+        self.ciclos = 0
+        self.lecturas = 0
+        self.errores = 0
+        self.conversion_ms = 0
+
+    def buscar(self):
+        """Busca las sondas del bus y les fija la resolución."""
+        self.roms = self.ds.scan()
+        self.ids = [binascii.hexlify(rom).decode() for rom in self.roms]
+        n = len(self.roms)
+        self.ultimas = array("f", [0] * n)
+        self._sumas = array("f", [0] * n)
+        self._cuentas = array("H", [0] * n)
+        # Scratchpad: alarma alta, alarma baja, configuración (bits 5-6)
+        configuracion = bytearray((0, 0, ((self.resolucion - 9) << 5) | 0x1F))
+        for rom in self.roms:
+            self.ds.write_scratch(rom, configuracion)
+        return n
+
+    async def medir(self):
+        """Un ciclo de conversión y lectura; devuelve las lecturas válidas."""
+        self.ds.convert_temp()
+        inicio = time.ticks_ms()
+        maximo = CONVERSION_MS[self.resolucion]
+        if self.sondeo:
+            await asyncio.sleep_ms(maximo // 2)
+            while not self.ds.ow.readbit() and time.ticks_diff(time.ticks_ms(), inicio) < maximo:
+                await asyncio.sleep_ms(5)
+        else:
+            await asyncio.sleep_ms(maximo)
+        self.conversion_ms = time.ticks_diff(time.ticks_ms(), inicio)
+
+        leidas = 0
+        for i in range(len(self.roms)):
+            try:
+                temperatura = self.ds.read_temp(self.roms[i])
+            except Exception:
+                self.errores += 1
+                continue
+            self.ultimas[i] = temperatura
+            self._sumas[i] += temperatura
+            self._cuentas[i] += 1
+            leidas += 1
+        self.ciclos += 1
+        self.lecturas += leidas
+        return leidas
+
+    async def ejecutar(self, pausa_ms=0):
+        """Tarea para ``Dispositivo.tarea``: convierte sin parar (o con
+        ``pausa_ms`` entre ciclos) y vuelve a buscar si el bus queda vacío."""
+        while True:
+            if not self.roms and not self.buscar():
+                print("[INFO] Buscando sensores...")
+                await asyncio.sleep_ms(5000)
+                continue
+            try:
+                await self.medir()
+            except Exception as e:
+                print(f"[ERROR] Error leyendo temperatura: {e}")
+                self.roms = []
+                await asyncio.sleep_ms(5000)
+                continue
+            if pausa_ms:
+                await asyncio.sleep_ms(pausa_ms)
+
+    def promedios(self):
+        """Promedio por sonda desde la llamada anterior, como lista de
+        ``(id, temperatura)``; las sondas sin lecturas no aparecen."""
+        resultado = []
+        for i in range(len(self.roms)):
+            if self._cuentas[i]:
+                resultado.append((self.ids[i], self._sumas[i] / self._cuentas[i]))
+                self._sumas[i] = 0
+                self._cuentas[i] = 0
+        return resultado
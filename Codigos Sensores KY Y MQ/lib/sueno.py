@@ -0,0 +1,161 @@
+import struct
+import time
+import machine
+
+# Memoria RTC: encabezado (marca, despertares, lecturas, t0, próximo
+# despertar) y una entrada por lectura (ms desde t0, valor)
+ENCABEZADO = "<2sHHqq"
+MUESTRA = "<If"
+TAM_ENCABEZADO = struct.calcsize(ENCABEZADO)
+TAM_MUESTRA = struct.calcsize(MUESTRA)
+MEMORIA_RTC = 2048
+MARCA = b"CS"
+
+TIEMPO_MAX_WIFI = 5000  # Un envío fallido no debe gastar más radio que esto
+
+
+def ahora_ms():
+    # El RTC sigue contando en deep sleep; ticks_ms() vuelve a 0 en cada despertar
+    return time.time_ns() // 1000000
+
+
+class CicloSueno:
+    """Modo de bajo consumo para sensores lentos: despertar, medir, dormir.
+
+    Cada despertar (timer del RTC) corre el script desde el principio:
+    ``ejecutar(medir)`` toma una lectura, la agrega al lote que vive en la
+    memoria RTC (sobrevive al deep sleep, no a un corte de luz) y vuelve
+    a ``machine.deepsleep()`` hasta el siguiente múltiplo de
+    ``periodo_ms``. La radio se enciende solo cada
+    ``despertares_por_envio`` despertares (o con el lote lleno) para
+    publicar todo el lote en un mensaje, con el formato de
+    ``lotes.Lote``: ``{"t0": ms, "dt": [...], "v": [...]}``, donde ``t0``
+    es la hora del RTC (ms) de la primera lectura.
+
+    Si el envío falla el lote se conserva y se reintenta en el siguiente
+    turno de envío; con la memoria llena (~250 lecturas) se descartan las
+    más viejas. La WiFi usa ``conexion.conectar_wifi`` (BSSID e IP
+    guardados), así que un envío enciende la radio ~0.5 s. Como en
+    ``GestorConexion``, ``client_id`` lleva el id del chip salvo con
+    ``unico=False``.
+    """
+
+    def __init__(self, ssid, password, client_id, broker, topic, periodo_ms=2000,
+                 despertares_por_envio=15, port=1883, user=None, password_mqtt=None,
+                 formato="%.2f", unico=True):
+        self.ssid = ssid
+        self.password = password
+        self.client_id = client_id
+        self.broker = broker
+        self.topic = topic
+        self.periodo_ms = periodo_ms
+        self.despertares_por_envio = despertares_por_envio
+        self.port = port
+        self.user = user or None
+        self.password_mqtt = password_mqtt or None
+        self.formato = formato
+        self.unico = unico
+        self.capacidad = (MEMORIA_RTC - TAM_ENCABEZADO) // TAM_MUESTRA
+        self.extra = {}
+        self.rtc = machine.RTC()
+        self._cargar()
+
+    def _cargar(self):
+        datos = self.rtc.memory()
+        if len(datos) >= TAM_ENCABEZADO and datos[:2] == MARCA:
+            _, self.despertares, n, self.t0, self.proximo = struct.unpack_from(ENCABEZADO, datos)
+            self._muestras = bytearray(datos[TAM_ENCABEZADO:TAM_ENCABEZADO + n * TAM_MUESTRA])
+        else:
+            # Encendido: lote vacío y el ciclo arranca ahora
+            self.despertares = 0
+            self.t0 = 0
+            self.proximo = ahora_ms()
+            self._muestras = bytearray()
+        self.despertares += 1
+
+    def _guardar(self):
+        encabezado = struct.pack(ENCABEZADO, MARCA, self.despertares, self.lecturas(),
+                                 self.t0, self.proximo)
+        self.rtc.memory(encabezado + self._muestras)
+
+    def lecturas(self):
+        return len(self._muestras) // TAM_MUESTRA
+
+    def agregar(self, valor):
+        t = ahora_ms()
+        if not self._muestras:
+            self.t0 = t
+        elif self.lecturas() >= self.capacidad:
+            # Lote lleno (envíos fallidos): se descarta la lectura más vieja
+            self._muestras = self._muestras[TAM_MUESTRA:]
+            corrimiento = struct.unpack_from(MUESTRA, self._muestras)[0]
+            for i in range(0, len(self._muestras), TAM_MUESTRA):
+                dt, v = struct.unpack_from(MUESTRA, self._muestras, i)
+                struct.pack_into(MUESTRA, self._muestras, i, dt - corrimiento, v)
+            self.t0 += corrimiento
+        self._muestras += struct.pack(MUESTRA, t - self.t0, valor)
+
+    def toca_enviar(self):
+        return self.despertares >= self.despertares_por_envio or self.lecturas() >= self.capacidad
+
+    def payload(self):
+        deltas = []
+        valores = []
+        anterior = 0
+        for i in range(0, len(self._muestras), TAM_MUESTRA):
+            t, v = struct.unpack_from(MUESTRA, self._muestras, i)
+            deltas.append(str(t - anterior))
+            valores.append(self.formato % v)
+            anterior = t
+        campos = "".join(',"%s":%s' % (k, v) for k, v in self.extra.items())
+        return '{"t0":%d,"dt":[%s],"v":[%s]%s}' % (
+            self.t0, ",".join(deltas), ",".join(valores), campos)
+
+    def enviar(self):
+        """Conecta, publica el lote y apaga la radio; True si se entregó."""
+        self.despertares = 0
+        if not self._muestras:
+            return True
+        # La pila de red se importa solo en los despertares que envían
+        import network
+        from umqtt.simple import MQTTClient
+        from conexion import conectar_wifi, id_cliente
+        wlan = network.WLAN(network.STA_IF)
+        try:
+            if not conectar_wifi(self.ssid, self.password, TIEMPO_MAX_WIFI, intentos=1):
+                return False
+            client_id = id_cliente(self.client_id) if self.unico else self.client_id
+            cliente = MQTTClient(client_id, self.broker, port=self.port,
+                                 user=self.user, password=self.password_mqtt)
+            cliente.connect()
+            cliente.publish(self.topic, self.payload())
+            cliente.disconnect()
+        except Exception as e:
+            print(f"[ERROR] No se pudo enviar el lote: {e}")
+            return False
+        finally:
+            wlan.active(False)
+        print(f"[INFO] Lote de {self.lecturas()} lecturas publicado en {self.topic}")
+        self._muestras = bytearray()
+        return True
+
+    def dormir(self):
+        """Guarda el lote en la memoria RTC y duerme hasta el próximo turno."""
+        ahora = ahora_ms()
+        self.proximo += self.periodo_ms
+        if self.proximo <= ahora:
+            # Turnos perdidos (un envío lento): se salta al siguiente
+            self.proximo += ((ahora - self.proximo) // self.periodo_ms + 1) * self.periodo_ms
+        self._guardar()
+        machine.deepsleep(self.proximo - ahora)
+
+    def ejecutar(self, medir):
+        """Un despertar completo: ``medir()`` devuelve la lectura (o None).
+        No retorna: termina en deep sleep."""
+        valor = medir()
+        if valor is not None:
+            self.agregar(valor)
+        print(f"[INFO] Despertar {self.despertares}/{self.despertares_por_envio}: {self.lecturas()} lecturas en RTC")
+        if self.toca_enviar():
+            self.enviar()
+        self.dormir()
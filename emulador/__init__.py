@@ -0,0 +1,116 @@
+"""Capa de emulación para ejecutar el código MicroPython en CPython.
+
+``instalar()`` agrega al ``sys.path`` los módulos sustitutos de
+``emulador/modulos`` (``machine``, ``network``, ``umqtt``...) y la
+carpeta ``lib`` de los scripts, y redirige ``time`` al reloj virtual
+(``emulador.reloj``), incluidas las funciones ``ticks_*``/``sleep_*`` de
+MicroPython. También agrega a ``gc`` las funciones ``mem_alloc``/``mem_free``.
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from emulador.reloj import RELOJ
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARPETA_SCRIPTS = os.path.join(RAIZ, "Codigos Sensores KY Y MQ")
+CARPETA_LIB = os.path.join(CARPETA_SCRIPTS, "lib")
+CARPETA_MODULOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modulos")
+
+# Igual que en el puerto ESP32: los ticks dan la vuelta en 2**30
+TICKS_PERIODO = 1 << 30
+TICKS_MAX = TICKS_PERIODO - 1
+TICKS_MITAD = TICKS_PERIODO // 2
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(fin, inicio):
+    return ((fin - inicio + TICKS_MITAD) & TICKS_MAX) - TICKS_MITAD
+
+
+# Los ticks vuelven a cero en cada arranque (también al despertar de
+# deep sleep); time.time() sigue al RTC, que no se detiene
+def _ticks_us():
+    return (RELOJ.ahora_us() - RELOJ.arranque_us) & TICKS_MAX
+
+
+def _ticks_ms():
+    return ((RELOJ.ahora_us() - RELOJ.arranque_us) // 1000) & TICKS_MAX
+
+
+# Heap de MicroPython en un ESP32 sin PSRAM y pausa de cada recolección
+HEAP_BYTES = 110000
+PAUSA_GC_US = 3000
+
+_memoria = {"asignado": 0, "ultimo": 0, "colecciones": 0}
+
+
+def _mem_alloc():
+    # En MicroPython lo asignado solo crece hasta el próximo gc.collect();
+    # en CPython lo temporal se libera al instante, así que se acumula el
+    # pico entre llamadas. Solo mide con tracemalloc activo (es lento, lo
+    # activan los benchmarks). Cada llamada agrega unos 64 bytes propios:
+    # para medir una operación conviene repetirla muchas veces.
+    # Al llenarse HEAP_BYTES corre el GC: cuenta la pausa y lo asignado
+    # vuelve a 0 (lo vivo no se modela).
+    if not tracemalloc.is_tracing():
+        return _memoria["asignado"]
+    actual, pico = tracemalloc.get_traced_memory()
+    _memoria["asignado"] += pico - _memoria["ultimo"]
+    _memoria["ultimo"] = actual
+    tracemalloc.reset_peak()
+    if _memoria["asignado"] >= HEAP_BYTES:
+        _memoria["asignado"] = 0
+        _memoria["colecciones"] += 1
+        RELOJ.ocupar_us(PAUSA_GC_US)
+    return _memoria["asignado"]
+
+
+def _mem_free():
+    return max(0, HEAP_BYTES - _memoria["asignado"])
+
+
+def colecciones():
+    """Recolecciones de basura emuladas desde que se cargó el emulador."""
+    return _memoria["colecciones"]
+
+
+def instalar(tiempo_real=False, escala_cpu=None):
+    """Prepara el intérprete para importar código MicroPython.
+
+    Con ``tiempo_real=True`` el reloj sigue al reloj del sistema (útil
+    para medir latencias reales); si no, el tiempo es virtual y los
+    ``sleep`` no esperan.
+    """
+    for carpeta in (CARPETA_LIB, CARPETA_MODULOS):
+        if carpeta not in sys.path:
+            sys.path.insert(0, carpeta)
+    RELOJ.tiempo_real = tiempo_real
+    if escala_cpu is not None:
+        RELOJ.escala_cpu = escala_cpu
+    time.ticks_ms = _ticks_ms
+    time.ticks_us = _ticks_us
+    time.ticks_cpu = _ticks_us
+    time.ticks_add = ticks_add
+    time.ticks_diff = ticks_diff
+    time.sleep = lambda s: RELOJ.dormir_us(s * 1000000)
+    time.sleep_ms = lambda ms: RELOJ.dormir_us(ms * 1000)
+    time.sleep_us = RELOJ.dormir_us
+    # Sin RTC sincronizado el ESP32 arranca en la época 2000-01-01
+    time.time = lambda: RELOJ.ahora_us() // 1000000
+    time.time_ns = lambda: RELOJ.ahora_us() * 1000
+    # Funciones de gc que existen solo en MicroPython
+    if not hasattr(gc, "mem_alloc"):
+        gc.mem_alloc = _mem_alloc
+        gc.mem_free = _mem_free
+        gc.threshold = lambda cantidad=None: -1 if cantidad is None else None
+    if not tiempo_real:
+        from emulador.bucle import PoliticaVirtual
+        asyncio.set_event_loop_policy(PoliticaVirtual())
@@ -0,0 +1,77 @@
+"""Mensajes y filas por hora de los actuadores: estado en ciclos fijos vs solo al cambiar.
+
+Corre cada actuador una hora virtual con tres comandos en el medio
+(a los 15, 30 y 45 minutos: encender, apagar y volver al ciclo, o tres
+colores en el LED RGB) y cuenta lo que publica: mensajes, filas que
+insertaría ``flow.json`` (los topics que escucha un ``mqtt in``), el
+estado retenido que recibiría un suscriptor que llega tarde y el Last
+Will publicado al cortar la red en los últimos minutos.
+
+    python -m emulador.bench_actuadores --scripts ky-016,ky-034,ky-029,ky-006,ky-019,pwm
+"""
+
+import argparse
+import json
+import os
+
+import emulador
+from emulador.broker import BROKER
+from emulador.ejecutar import ejecutar, reiniciar
+from emulador.placa import PLACA
+
+# script, topic de estado, topic de comandos, comandos a los 15, 30 y 45 min
+SCRIPTS = {
+    "ky-016": ("ky-016 Modulo Led RGB.py", "gds0643/ky-016", "gds0643/ky-016",
+               ('{"color":"rojo"}', '{"color":"azul"}', '{"color":"apagado"}')),
+    "ky-034": ("ky-034 Led de 7 colores.py", "gds0653/ky-034", "gds0653/ky-034/cmd", ("ON", "OFF", "CICLO")),
+    "ky-029": ("ky-029 Modulo 2 colores 3mm.py", "gds0653/ky-029", "gds0653/ky-029/cmd", ("ON", "OFF", "CICLO")),
+    "ky-006": ("ky-006 Buzzer Pasivo.py", "gds0653/ky-006", "gds0653/ky-006/cmd", ("ON", "OFF", "CICLO")),
+    "ky-019": ("ky-019 Relevador.py", "gds0653/ky-019", "gds0653/ky-019/cmd", ("ON", "OFF", "CICLO")),
+    "pwm": ("Modulo Vibracion pwm.py", "gds0653/pwm", "gds0653/pwm/cmd", ("ON", "OFF", "CICLO")),
+}
+
+DURACION_S = 3600
+CORTE_MS = (3300000, 120000)  # Corte de WiFi más largo que el keepalive: el broker publica el Last Will
+
+
+def topics_flow(ruta=os.path.join(emulador.RAIZ, "flow.json")):
+    """Topics que ``flow.json`` inserta en la base de datos."""
+    with open(ruta, encoding="utf-8") as f:
+        return {nodo["topic"].encode() for nodo in json.load(f)
+                if nodo.get("type") == "mqtt in" and nodo.get("topic")}
+
+
+def medir(nombre):
+    script, topic, topic_cmd, comandos = SCRIPTS[nombre]
+    reiniciar()
+    PLACA.red.cortar(*CORTE_MS)
+    for i, comando in enumerate(comandos):
+        BROKER.programar((i + 1) * 900 * 1000000, topic_cmd, comando)
+    resumen = ejecutar(os.path.join(emulador.CARPETA_SCRIPTS, script), DURACION_S)
+    propios = [m for m in BROKER.mensajes if m.cliente is not None]
+    filas = topics_flow()
+    return {
+        "mensajes": len(propios),
+        "filas": sum(1 for m in propios if m.topic in filas),
+        "retenido": BROKER.retenidos.get(topic.encode()),
+        "wills": BROKER.wills_publicados,
+        "error": resumen["error"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", default=",".join(SCRIPTS), help=", ".join(SCRIPTS))
+    args = parser.parse_args()
+
+    emulador.instalar()
+    print(f"  {'script':<8} {'mensajes/h':>10} {'filas/h':>8} {'wills':>5}  estado retenido")
+    for nombre in args.scripts.split(","):
+        datos = medir(nombre)
+        retenido = datos["retenido"].decode() if datos["retenido"] is not None else "-"
+        error = "  error: " + datos["error"] if datos["error"] else ""
+        print(f"  {nombre:<8} {datos['mensajes']:>10} {datos['filas']:>8} {datos['wills']:>5}  {retenido}{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Ruido, tiempo y envíos falsos de cada filtro de ``muestreo.CanalADC``.
+
+Lee una entrada constante con ruido gaussiano y picos aislados (como el
+ADC del ESP32 con el WiFi activo) y reporta, para cada configuración:
+desviación y error máximo de la lectura, µs por lectura en el reloj
+virtual (conversiones del ADC más CPU escalado), lecturas hasta seguir
+un escalón, y cuántos envíos falsos por hora haría una banda muerta de
+cada ancho con una lectura cada 100 ms.
+
+    python -m emulador.bench_adc --ruido 25 --picos 0.02,600
+"""
+
+import argparse
+import math
+
+from emulador import instalar
+from emulador.ejecutar import reiniciar
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+from emulador.senales import Picos, Ruido, Secuencia
+
+instalar()
+
+from machine import ADC, Pin  # noqa: E402
+from muestreo import CanalADC  # noqa: E402
+from politicas import BandaMuerta  # noqa: E402
+
+PIN = 34
+NIVEL = 1800
+ESCALON = 400
+BANDAS = (100, 60, 30, 15)
+
+CONFIGURACIONES = [
+    ("una lectura", {"muestras": 1}),
+    ("promedio 8", {"muestras": 8}),
+    ("promedio 16", {"muestras": 16}),
+    ("mediana 9", {"muestras": 9, "metodo": "mediana"}),
+    ("recortado 16/4", {"muestras": 16, "metodo": "recortado", "recorte": 4}),
+    ("recortado 16/4 + IIR 1/4", {"muestras": 16, "metodo": "recortado", "recorte": 4, "suavizado": 2}),
+    ("mediana 9 + IIR 1/8", {"muestras": 9, "metodo": "mediana", "suavizado": 3}),
+]
+
+
+def _preparar(ruido, probabilidad, amplitud, escalon_us=None):
+    reiniciar()
+    base = Secuencia([(escalon_us / 1000, NIVEL + ESCALON)], inicial=NIVEL) if escalon_us else NIVEL
+    PLACA.senal(PIN, Picos(Ruido(base, ruido), probabilidad, amplitud))
+    adc = ADC(Pin(PIN))
+    adc.atten(ADC.ATTN_11DB)
+    return adc
+
+
+def medir(config, lecturas, ruido, probabilidad, amplitud):
+    canal = CanalADC(_preparar(ruido, probabilidad, amplitud), **config)
+    valores = []
+    inicio = RELOJ.ahora_us()
+    for _ in range(lecturas):
+        valores.append(canal.leer())
+        RELOJ.dormir_us(100000)
+    ocupado_us = RELOJ.ahora_us() - inicio - lecturas * 100000
+
+    media = sum(valores) / len(valores)
+    desviacion = math.sqrt(sum((v - media) ** 2 for v in valores) / len(valores))
+    horas = lecturas * 0.1 / 3600
+    falsos = []
+    for ancho in BANDAS:
+        politica = BandaMuerta(ancho)
+        for i, v in enumerate(valores):
+            politica.evaluar(v, i * 100)
+        falsos.append((politica.reportadas - 1) / horas)
+
+    # Escalón de ESCALON cuentas: lecturas hasta quedar a menos de 10%
+    canal = CanalADC(_preparar(ruido, 0, 0, escalon_us=1000000), **config)
+    for _ in range(10):
+        canal.leer()
+        RELOJ.dormir_us(100000)
+    respuesta = 0
+    while abs(canal.leer() - NIVEL - ESCALON) > ESCALON / 10 and respuesta < 100:
+        respuesta += 1
+        RELOJ.dormir_us(100000)
+    return {
+        "desviacion": desviacion,
+        "error_max": max(abs(v - NIVEL) for v in valores),
+        "us_lectura": ocupado_us / lecturas,
+        "respuesta": respuesta + 1,
+        "falsos": falsos,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ruido", type=float, default=25, help="desviación gaussiana en cuentas")
+    parser.add_argument("--picos", default="0.02,600", metavar="PROBABILIDAD,AMPLITUD",
+                        help="picos aislados por conversión")
+    parser.add_argument("--lecturas", type=int, default=6000, help="lecturas a 100 ms (6000 = 10 min)")
+    args = parser.parse_args()
+    probabilidad, amplitud = (float(x) for x in args.picos.split(","))
+
+    print(f"Entrada {NIVEL} ± {args.ruido:g} (gauss) con picos de ±{amplitud:g} "
+          f"en {probabilidad:.0%} de las conversiones")
+    bandas = " ".join(f"{'±' + str(b):>7}" for b in BANDAS)
+    print(f"{'filtro':<26} {'desv.':>6} {'máx.':>5} {'µs/lect.':>8} {'escalón':>7}   "
+          f"envíos falsos por hora con banda {bandas}")
+    for nombre, config in CONFIGURACIONES:
+        r = medir(config, args.lecturas, args.ruido, probabilidad, amplitud)
+        falsos = " ".join(f"{f:>7.0f}" for f in r["falsos"])
+        print(f"{nombre:<26} {r['desviacion']:>6.1f} {r['error_max']:>5} {r['us_lectura']:>8.0f} "
+              f"{r['respuesta']:>7}   {' ' * 34}{falsos}")
+
+
+if __name__ == "__main__":
+    main()
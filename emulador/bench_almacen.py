@@ -0,0 +1,89 @@
+"""Mide el almacenamiento en flash durante un corte de WiFi.
+
+Un sensor registra lecturas a ``--frecuencia`` Hz a través de
+``Dispositivo.registrar()`` con un ``RegistroCircular``; la red se corta
+``--corte`` segundos. Reporta lecturas guardadas y perdidas, cuánto tarda
+en vaciarse el registro al volver la red, mensajes usados para el
+reenvío y el desgaste de la flash (escrituras por sector).
+
+    python -m emulador.bench_almacen --frecuencia 10 --corte 300
+"""
+
+import argparse
+import os
+import tempfile
+
+from emulador import instalar
+from emulador.broker import BROKER
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+
+instalar()
+
+from almacen import RegistroCircular  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+
+TOPIC = "emulador/almacen"
+
+
+def medir(frecuencia_hz=10, corte_s=300, capacidad=4096, bloque=16, inicio_corte_s=20):
+    reiniciar()
+    fin_corte_ms = int((inicio_corte_s + corte_s) * 1000)
+    PLACA.red.cortar(inicio_corte_s * 1000, int(corte_s * 1000))
+    directorio_original = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="flash_"))
+    try:
+        almacen = RegistroCircular("bench.bin", capacidad=capacidad, bloque=bloque)
+        conexion = GestorConexion(PLACA.red.ssid, "", "bench_almacen", "broker.emqx.io")
+        disp = Dispositivo(conexion, almacen=almacen)
+        disp.canal(0, TOPIC)
+        lecturas = [0]
+
+        def muestrear():
+            lecturas[0] += 1
+            disp.registrar(0, lecturas[0])
+
+        disp.periodico("sensor", max(1, 1000 // frecuencia_hz), muestrear)
+        duracion_s = inicio_corte_s + corte_s + max(60, corte_s)
+        correr(disp, duracion_s)
+        guardadas = almacen.perdidos + disp.reenviados + almacen.pendientes()
+        lotes = BROKER.por_topic(TOPIC + "/lote")
+        vaciado_ms = None
+        if lotes and not almacen.pendientes():
+            vaciado_ms = lotes[-1].instante_us // 1000 - fin_corte_ms
+        resumen = almacen.estadisticas()
+        resumen.update({
+            "lecturas": lecturas[0],
+            "guardadas": guardadas,
+            "reenviadas": disp.reenviados,
+            "mensajes_reenvio": len(lotes),
+            "bytes_reenvio": sum(len(m.payload) for m in lotes),
+            "vaciado_ms": vaciado_ms,
+            "bytes_por_lectura": resumen["bytes_escritos"] / max(1, guardadas),
+        })
+        return resumen
+    finally:
+        os.chdir(directorio_original)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frecuencia", type=int, default=10, help="lecturas por segundo")
+    parser.add_argument("--corte", type=int, default=300, help="segundos sin WiFi")
+    parser.add_argument("--capacidad", type=int, default=4096, help="registros en la flash")
+    parser.add_argument("--bloque", type=int, default=16, help="registros por escritura")
+    args = parser.parse_args()
+
+    r = medir(args.frecuencia, args.corte, args.capacidad, args.bloque)
+    print(f"Lecturas: {r['lecturas']}  guardadas en flash: {r['guardadas']}  "
+          f"perdidas: {r['perdidos']}  reenviadas: {r['reenviadas']}")
+    vaciado = "sin terminar" if r["vaciado_ms"] is None else f"{r['vaciado_ms'] / 1000:.1f} s"
+    print(f"Vaciado tras el corte: {vaciado} en {r['mensajes_reenvio']} mensajes "
+          f"({r['bytes_reenvio']} bytes)")
+    print(f"Flash: {r['escrituras']} escrituras, {r['bytes_escritos']} bytes "
+          f"({r['bytes_por_lectura']:.1f} B/lectura), máx. {r['desgaste_max']} escrituras por sector")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Nivel de sonido por ventana contra una lectura suelta (KY-037/KY-038).
+
+Para cada sonido emulado compara lo que publicaban los scripts (una
+lectura del ADC por periodo) con las ventanas de ``audio.MedidorSonido``:
+rango de valores en ``--ventanas`` mediciones del mismo sonido estable,
+nivel medido contra el real, factor de cresta, frecuencia de muestreo
+lograda y bytes por segundo frente a enviar las muestras crudas.
+
+    python -m emulador.bench_audio --frecuencia 8000 --muestras 512
+"""
+
+import argparse
+import math
+
+from emulador import instalar
+from emulador.ejecutar import reiniciar
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+from emulador.senales import Cuadrada, Ruido, Senoidal
+
+instalar()
+
+from machine import ADC, Pin  # noqa: E402
+from audio import MedidorSonido  # noqa: E402
+
+PIN = 34
+CENTRO = 2048
+ESCALA_COMPLETA = 4096 / 2 / math.sqrt(2)
+
+
+def _sonidos(ruido):
+    # (nombre, señal, RMS real en cuentas)
+    return [
+        ("silencio", Ruido(CENTRO, ruido), ruido),
+        ("tono 1 kHz suave", Ruido(Senoidal(CENTRO, 100, 1), ruido), math.sqrt(100 ** 2 / 2 + ruido ** 2)),
+        ("tono 1 kHz fuerte", Ruido(Senoidal(CENTRO, 1500, 1), ruido), math.sqrt(1500 ** 2 / 2 + ruido ** 2)),
+        ("tono 3 kHz", Ruido(Senoidal(CENTRO, 600, 1 / 3), ruido), math.sqrt(600 ** 2 / 2 + ruido ** 2)),
+        # Golpes de 1 ms cada 20 ms: mucha cresta, poco RMS
+        ("golpes", Ruido(Cuadrada(20, 0.05, CENTRO + 1500, CENTRO), ruido),
+         math.sqrt(0.05 * 0.95 * 1500 ** 2 + ruido ** 2)),
+    ]
+
+
+def medir(senal, ventanas, frecuencia, muestras):
+    reiniciar()
+    PLACA.senal(PIN, senal)
+    adc = ADC(Pin(PIN))
+    adc.atten(ADC.ATTN_0DB)
+    medidor = MedidorSonido(adc, frecuencia=frecuencia, muestras=muestras)
+    sueltas, niveles, crestas = [], [], []
+    ocupado_us = 0
+    for _ in range(ventanas):
+        sueltas.append(adc.read())
+        inicio = RELOJ.ahora_us()
+        niveles.append(medidor.medir())
+        ocupado_us += RELOJ.ahora_us() - inicio
+        crestas.append(medidor.cresta)
+        RELOJ.dormir_us(937000)  # Desfasado del sonido a propósito
+    return {
+        "sueltas": (min(sueltas), max(sueltas)),
+        "db": (min(niveles), max(niveles)),
+        "cresta": sum(crestas) / len(crestas),
+        "frecuencia_real": medidor.frecuencia_real,
+        "ms_ventana": ocupado_us / ventanas / 1000,
+        "json": len(medidor.json()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frecuencia", type=int, default=8000, help="Hz de la ventana")
+    parser.add_argument("--muestras", type=int, default=512, help="muestras por ventana")
+    parser.add_argument("--ventanas", type=int, default=30, help="mediciones por sonido")
+    parser.add_argument("--ruido", type=float, default=8, help="ruido del ADC en cuentas")
+    args = parser.parse_args()
+
+    print(f"{'sonido':<18} {'lectura suelta':>14} {'dBFS real':>9} {'dBFS medido':>13} "
+          f"{'cresta':>6} {'Hz logrados':>11} {'ms/ventana':>10}")
+    for nombre, senal, rms in _sonidos(args.ruido):
+        r = medir(senal, args.ventanas, args.frecuencia, args.muestras)
+        real = 20 * math.log10(rms / ESCALA_COMPLETA)
+        print(f"{nombre:<18} {r['sueltas'][0]:>6}-{r['sueltas'][1]:<7} {real:>9.1f} "
+              f"{r['db'][0]:>6.1f}/{r['db'][1]:<6.1f} {r['cresta']:>6.2f} {r['frecuencia_real']:>11} "
+              f"{r['ms_ventana']:>10.1f}")
+    crudo = args.frecuencia * 5  # "2048," por muestra en texto
+    print(f"\nBytes por segundo: muestras crudas a {args.frecuencia} Hz ≈ {crudo}, "
+          f"una ventana por segundo ≈ {r['json']} (÷{crudo // r['json']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compara los formatos de mensaje actuales con el binario de ``codec.py``.
+
+Para cada forma de mensaje de los scripts arma el payload como lo hace
+hoy el script (texto, CSV o JSON) y con ``codec.codificar_en`` sobre un
+buffer reutilizado; reporta bytes por mensaje y µs por codificación
+(medidos en este equipo y escalados por ``--escala-cpu`` como estimación
+para el ESP32). Verifica además que cada mensaje binario se decodifique
+a los mismos valores.
+
+    python -m emulador.bench_codec --repeticiones 20000
+"""
+
+import argparse
+import json
+import time
+
+from emulador import instalar
+
+instalar()
+
+import codec  # noqa: E402
+from emulador.reloj import RELOJ  # noqa: E402
+
+_T0 = 123456
+_DT = [50] * 20
+_V = [2013, 2000, 2017, 2032, 2023, 2185, 2313, 2125, 2045, 2053,
+      2125, 2142, 2094, 2076, 2041, 2074, 2054, 2046, 2059, 2062]
+
+
+def _json_lote(bpm):
+    return '{"t0":%d,"dt":[%s],"v":[%s],"bpm":%d}' % (
+        _T0, ",".join(str(d) for d in _DT), ",".join(str(v) for v in _V), bpm)
+
+
+# (descripción, esquema, función con el formato actual, valores fijos, elementos)
+FORMAS = [
+    ("MQ-135 número", "mq-135", lambda: str(1534).encode(), (1534,), None),
+    ("MQ-04 JSON a mano", "mq-04",
+     lambda: ('{"valor":' + str(1534) + ',"alerta":' + str(0) + '}').encode(), (1534, 0), None),
+    ("MQ-05 JSON a mano", "mq-05",
+     lambda: ('{"valor":' + str(2210) + ',"alerta":' + str(1) + ',"ppm_aprox":'
+              + str(640) + '}').encode(), (2210, 1, 640), None),
+    ("KY-001 texto", "ky-001", lambda: str(round(23.4375, 1)).encode(), (23.4375,), None),
+    ("KY-039 CSV", "ky-039", lambda: f"{2062},{72}".encode(), (2062, 72), None),
+    ("KY-040 CSV", "ky-040", lambda: f"ROT,{-37},{'CCW'}".encode(), ("ROT", -37, "CCW"), None),
+    ("KY-016 json.dumps", "ky-016",
+     lambda: json.dumps({"dispositivo": "led_rgb", "color": "magenta", "r": 1023, "g": 0,
+                         "b": 1023, "valor": "magenta", "contador": 1520,
+                         "timestamp": 1718000000}).encode(),
+     (1023, 0, 1023, "magenta", 1520, 1718000000), None),
+    ("KY-010 json.dumps", "ky-010",
+     lambda: json.dumps({"sensor": "fotointerruptor", "valor": 1, "estado": "interrumpido",
+                         "contador": 812, "interrupciones": 97,
+                         "timestamp": 1718000000}).encode(),
+     (1, 812, 97, 1718000000), None),
+    ("KY-028 json.dumps", "ky-028",
+     lambda: json.dumps({"sensor": "temperatura", "valor_digital": True,
+                         "valor_analogico": 2710, "temperatura_aprox": 31.7,
+                         "estado": "caliente", "contador": 433,
+                         "timestamp": 1718000000}).encode(),
+     (1, 2710, 31.7, 433, 1718000000), None),
+    ("KY-039 lote 20 (JSON)", "ky-039/lote", lambda: _json_lote(72).encode(),
+     (_T0, 72), list(zip(_DT, _V))),
+]
+
+
+def _medir_us(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000000 / repeticiones
+
+
+def medir(repeticiones=20000):
+    buf = bytearray(256)
+    filas = []
+    for descripcion, nombre, actual, valores, elementos in FORMAS:
+        numero = codec.esquema(nombre)
+        largo = codec.codificar_en(buf, numero, valores, elementos)
+        _, decodificado = codec.decodificar(buf[:largo])
+        filas.append({
+            "forma": descripcion,
+            "bytes_actual": len(actual()),
+            "bytes_binario": largo,
+            "us_actual": _medir_us(actual, repeticiones),
+            "us_binario": _medir_us(lambda: codec.codificar_en(buf, numero, valores, elementos),
+                                    repeticiones),
+            "decodificado": decodificado,
+        })
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=20000)
+    parser.add_argument("--escala-cpu", type=float, default=RELOJ.escala_cpu,
+                        help="cuántas veces más lento es el ESP32 que este equipo")
+    parser.add_argument("--ver-decodificado", action="store_true")
+    args = parser.parse_args()
+
+    escala = args.escala_cpu
+    print(f"{'mensaje':<24} {'B actual':>9} {'B bin':>6} {'µs actual':>10} {'µs bin':>8}"
+          f"  (µs estimados en ESP32, x{escala:g})")
+    for f in medir(args.repeticiones):
+        print(f"{f['forma']:<24} {f['bytes_actual']:>9} {f['bytes_binario']:>6} "
+              f"{f['us_actual'] * escala:>10.1f} {f['us_binario'] * escala:>8.1f}")
+        if args.ver_decodificado:
+            print(f"    {f['decodificado']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Latencia de comando a actuación del LED RGB (ky-016) y del relé (ky-019).
+
+Mientras el script corre, el broker emulado recibe comandos a intervalos
+irregulares (como los mandaría un panel de Node-RED) que alternan entre
+dos estados del actuador. La latencia va desde que el comando llega al
+broker hasta que cambia el pin (duty del PWM rojo o nivel del relé):
+incluye la espera hasta que el script atiende el socket, la lectura del
+mensaje y el callback. Reporta mediana, p95 y máximo, los comandos que
+nunca se aplicaron y el CPU del script.
+
+    python -m emulador.bench_comandos --scripts ky-016,ky-019 --comandos 100
+"""
+
+import argparse
+import os
+import random
+
+import emulador
+from emulador.broker import BROKER
+from emulador.ejecutar import ejecutar, reiniciar
+from emulador.placa import PLACA
+
+# script, topic de comandos, pin del actuador, (payload, valor esperado) alternados
+SCRIPTS = {
+    "ky-016": ("ky-016 Modulo Led RGB.py", "gds0643/ky-016", 16,
+               (('{"color":"rojo"}', 1023), ('{"color":"apagado"}', 0))),
+    "ky-019": ("ky-019 Relevador.py", "gds0653/ky-019/cmd", 15, (("ON", 1), ("OFF", 0))),
+}
+
+INICIO_S = 15  # Los comandos empiezan con la placa ya conectada
+
+
+def medir(nombre, comandos, semilla=1):
+    """Corre el script con ``comandos`` comandos; devuelve (latencias_us, resumen)."""
+    script, topic, pin, estados = SCRIPTS[nombre]
+    reiniciar()
+    azar = random.Random(semilla)
+    instantes = []
+    t = INICIO_S * 1000000
+    # El primer comando solo alinea el estado: no entra en la estadística
+    for i in range(comandos + 1):
+        payload, _ = estados[i % 2]
+        BROKER.programar(t, topic, payload)
+        instantes.append(t)
+        t += int(azar.uniform(0.6, 1.4) * 1000000)
+    instantes.append(t)
+    resumen = ejecutar(os.path.join(emulador.CARPETA_SCRIPTS, script), t / 1000000 + 5)
+
+    historial = PLACA.salidas.get(pin, [])
+    latencias = []
+    for i in range(1, comandos + 1):
+        esperado = estados[i % 2][1]
+        for instante, valor in historial:
+            if instantes[i] <= instante < instantes[i + 1] and valor == esperado:
+                latencias.append(instante - instantes[i])
+                break
+    return latencias, resumen
+
+
+def _percentil(valores, p):
+    return valores[min(len(valores) - 1, int(len(valores) * p))] if valores else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", default="ky-016,ky-019", help=", ".join(SCRIPTS))
+    parser.add_argument("--comandos", type=int, default=100)
+    args = parser.parse_args()
+
+    emulador.instalar()
+    print(f"  {'script':<8} {'aplicados':>10} {'mediana':>8} {'p95':>8} {'máximo':>8} {'CPU %':>6}")
+    for nombre in args.scripts.split(","):
+        latencias, resumen = medir(nombre, args.comandos)
+        latencias.sort()
+        error = "  error: " + resumen["error"] if resumen["error"] else ""
+        print(f"  {nombre:<8} {len(latencias):>4}/{args.comandos:<5} {_percentil(latencias, 0.5) / 1000:>5.1f} ms "
+              f"{_percentil(latencias, 0.95) / 1000:>5.1f} ms {(latencias[-1] if latencias else 0) / 1000:>5.1f} ms "
+              f"{resumen['cpu_pct']:>6.1f}{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Lecturas, errores y mensajes del DHT11 (KY-015) según cómo se consulta.
+
+Compara consultar ``measure()`` cada ``--sondeo`` ms y publicar cada
+lectura (como el bucle de 100 ms que tenía el script) con
+``humedad.LectorDHT``: una medición cada ``--periodo`` ms, reintento al
+segundo si falla y publicación por cambio con latido de 60 s. Con una
+probabilidad ``--errores`` de checksum inválido reporta lecturas buenas
+y fallidas por minuto (las consultas antes de 1 s siempre fallan),
+mensajes por minuto, la edad máxima del valor publicado y el CPU.
+
+    python -m emulador.bench_dht --errores 0,0.1,0.3 --sondeo 100
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.broker import BROKER
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+from emulador.senales import Senoidal
+
+instalar()
+
+import dht  # noqa: E402
+import time  # noqa: E402
+from machine import Pin  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+from humedad import LectorDHT  # noqa: E402
+from politicas import crear  # noqa: E402
+
+PIN = 4
+TOPIC = "gds0653/ky-015"
+
+
+def _preparar(errores):
+    reiniciar()
+    # Variaciones lentas, como las de una habitación
+    PLACA.dht11(PIN, Senoidal(24, 3, 600000), Senoidal(55, 10, 900000, fase=1.0), errores)
+    conexion = GestorConexion(PLACA.red.ssid, "", "bench_dht", "broker.emqx.io")
+    return dht.DHT11(Pin(PIN)), Dispositivo(conexion)
+
+
+def medir_sondeo(errores, duracion_s, sondeo_ms):
+    sensor, disp = _preparar(errores)
+    estado = {"buenas": 0, "fallidas": 0, "t": None, "edad_max": 0}
+
+    def leer():
+        ahora = time.ticks_ms()
+        try:
+            sensor.measure()
+        except Exception:
+            estado["fallidas"] += 1
+        else:
+            estado["buenas"] += 1
+            estado["t"] = ahora
+            disp.publicar(TOPIC, '{"temperatura":%d,"humedad":%d}' % (sensor.temperature(), sensor.humidity()))
+        if estado["t"] is not None:
+            estado["edad_max"] = max(estado["edad_max"], time.ticks_diff(ahora, estado["t"]))
+
+    disp.periodico("dht11", sondeo_ms, leer)
+    cpu = RELOJ.cpu_us
+    correr(disp, duracion_s)
+    return estado["buenas"], estado["fallidas"], estado["edad_max"], RELOJ.cpu_us - cpu
+
+
+def medir_lector(errores, duracion_s, periodo_ms):
+    sensor, disp = _preparar(errores)
+    lector = LectorDHT(sensor, periodo_ms=periodo_ms)
+    politica_t = crear({"tipo": "banda", "umbral": 0, "silencio_max_ms": 60000})
+    politica_h = crear({"tipo": "banda", "umbral": 1, "silencio_max_ms": 60000})
+    estado = {"edad_max": 0}
+
+    def leer():
+        lector.actualizar()
+        if lector.temperatura is None:
+            return
+        estado["edad_max"] = max(estado["edad_max"], lector.edad_ms())
+        cambio_t = politica_t.evaluar(lector.temperatura) is not None
+        cambio_h = politica_h.evaluar(lector.humedad) is not None
+        if cambio_t or cambio_h:
+            politica_t.forzar(lector.temperatura)
+            politica_h.forzar(lector.humedad)
+            disp.publicar(TOPIC, '{"temperatura":%d,"humedad":%d}' % (lector.temperatura, lector.humedad))
+
+    disp.periodico("dht11", 250, leer)
+    cpu = RELOJ.cpu_us
+    correr(disp, duracion_s)
+    return lector.lecturas, lector.errores, estado["edad_max"], RELOJ.cpu_us - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--errores", default="0,0.1,0.3", help="probabilidad de checksum inválido")
+    parser.add_argument("--sondeo", type=int, default=100, help="ms entre consultas del bucle anterior")
+    parser.add_argument("--periodo", type=int, default=5000, help="ms entre mediciones de LectorDHT")
+    parser.add_argument("--duracion", type=float, default=600, help="segundos por prueba")
+    args = parser.parse_args()
+
+    minutos = args.duracion / 60
+    print(f"{'errores':>7}  {'consulta':<22} {'buenas/min':>10} {'fallidas/min':>12} "
+          f"{'msg/min':>7} {'edad máx':>8} {'CPU %':>6}")
+    for errores in (float(e) for e in args.errores.split(",")):
+        casos = [
+            (f"cada {args.sondeo} ms", lambda: medir_sondeo(errores, args.duracion, args.sondeo)),
+            (f"LectorDHT {args.periodo} ms", lambda: medir_lector(errores, args.duracion, args.periodo)),
+        ]
+        for nombre, medir in casos:
+            buenas, fallidas, edad_max, cpu_us = medir()
+            mensajes = len(BROKER.por_topic(TOPIC))
+            print(f"{errores:>7.2f}  {nombre:<22} {buenas / minutos:>10.1f} {fallidas / minutos:>12.1f} "
+                  f"{mensajes / minutos:>7.1f} {edad_max / 1000:>7.1f}s {cpu_us / (args.duracion * 10000):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Pasos perdidos del KY-040 según la velocidad de giro.
+
+Gira un encoder emulado a velocidad constante y compara los pasos reales
+con los que cuenta el decodificador por interrupciones
+(``cuadratura.Cuadratura``) y el sondeo cada 1 ms que usaba el script
+(leer CLK y comparar con DT). Las IRQ del emulador tienen latencia y
+pierden un flanco si llega otro con la anterior aún pendiente, como el
+ESP32.
+
+    python -m emulador.bench_encoder --velocidades 5,20,100,300,1000 --duracion 5
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Encoder
+
+instalar()
+
+from machine import Pin  # noqa: E402
+from cuadratura import Cuadratura  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+
+CLK, DT = 26, 25
+
+
+def _preparar(velocidad, duracion_s):
+    reiniciar()
+    # Gira durante duracion_s y se detiene, para leer la posición final quieta
+    encoder = Encoder([(0, velocidad), (duracion_s * 1000, 0)])
+    PLACA.senal(CLK, encoder.canal(0))
+    PLACA.senal(DT, encoder.canal(1))
+    return encoder, Pin(CLK, Pin.IN, Pin.PULL_UP), Pin(DT, Pin.IN, Pin.PULL_UP)
+
+
+def medir_irq(velocidad, duracion_s):
+    encoder, clk, dt = _preparar(velocidad, duracion_s)
+    decodificador = Cuadratura(clk, dt)
+    correr(Dispositivo(), duracion_s + 0.5)
+    return encoder.pasos(int(duracion_s * 1000000)), decodificador.pasos(), decodificador.errores
+
+
+def medir_sondeo(velocidad, duracion_s):
+    encoder, clk, dt = _preparar(velocidad, duracion_s)
+    estado = {"contador": 0, "clk": clk.value()}
+
+    def leer():
+        # Misma lógica que el script original: un cambio de CLK = medio paso
+        actual = clk.value()
+        if actual != estado["clk"]:
+            estado["contador"] += 1 if dt.value() != actual else -1
+            estado["clk"] = actual
+
+    disp = Dispositivo()
+    disp.periodico("encoder", 1, leer)
+    correr(disp, duracion_s + 0.5)
+    return encoder.pasos(int(duracion_s * 1000000)), estado["contador"] // 2, 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--velocidades", default="5,20,100,300,1000,3000",
+                        help="pasos por segundo")
+    parser.add_argument("--duracion", type=float, default=5.0, help="segundos de giro")
+    args = parser.parse_args()
+
+    print(f"{'pasos/s':>8} {'reales':>8} {'IRQ':>8} {'% perdido':>10} {'errores':>8} "
+          f"{'sondeo':>8} {'% perdido':>10}")
+    for velocidad in (float(v) for v in args.velocidades.split(",")):
+        reales, irq, errores = medir_irq(velocidad, args.duracion)
+        _, sondeo, _ = medir_sondeo(velocidad, args.duracion)
+        perdido_irq = 100.0 * (reales - irq) / max(1, abs(reales))
+        perdido_sondeo = 100.0 * (reales - sondeo) / max(1, abs(reales))
+        print(f"{velocidad:>8g} {reales:>8} {irq:>8} {perdido_irq:>10.1f} {errores:>8} "
+              f"{sondeo:>8} {perdido_sondeo:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
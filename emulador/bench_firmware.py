@@ -0,0 +1,165 @@
+"""Flash, código importado y arranque del firmware único vs los scripts sueltos.
+
+Para cada manifiesto de ``firmware/placas`` corre ``firmware/main.py``
+con ese manifiesto como ``config.json`` y, por separado, los scripts que
+hacen lo mismo hoy (una placa por script). Reporta por configuración:
+
+- bytes en el sistema de archivos de la placa: los scripts llevan el
+  script y toda ``lib/`` como .py; el firmware, ``main.py`` y el
+  manifiesto (lib/ va congelada en la imagen);
+- módulos de ``lib/`` que se importan;
+- el bytecode que queda en el heap (tamaño como .mpy, con ``pip install
+  mpy-cross``; sin él, ``n/d``) y lo que tarda el host en compilar los
+  .py, trabajo que la placa repite en cada arranque (ahí es ~50x más
+  lento): el script y sus módulos, o solo ``main.py`` en el firmware,
+  porque los módulos congelados corren desde la flash sin compilarse;
+- el arranque hasta la primera publicación de cada topic (reloj virtual).
+
+    python -m emulador.bench_firmware --placas ky-003,ky-015,ambiente
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import emulador
+from emulador.broker import BROKER
+from emulador.ejecutar import ejecutar, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Asentamiento, Constante, Ruido, Senoidal
+
+CARPETA_FIRMWARE = os.path.join(emulador.CARPETA_SCRIPTS, "firmware")
+CARPETA_PLACAS = os.path.join(CARPETA_FIRMWARE, "placas")
+
+# Scripts que hoy cubren lo mismo que cada manifiesto (uno por placa)
+SCRIPTS = {
+    "ky-003": ["ky-003 Sensor Efecto Hall.py"],
+    "ky-015": ["ky-015 DHT11.py"],
+    "ambiente": ["ky-015 DHT11.py", "ky-001 Sensor Temperatura.py", "MQ-135.py",
+                 "ky-035 Sensor efecto hall analogico.py", "ky-019 Relevador.py"],
+}
+
+
+def _preparar(ssid=None):
+    reiniciar()
+    if ssid:
+        PLACA.red.ssid = ssid
+    PLACA.senal(16, Constante(1))
+    PLACA.senal(34, Ruido(Asentamiento(3000, 1300, 20000), 10))
+    PLACA.senal(35, Ruido(Senoidal(2000, 300, 20000), 10))
+    PLACA.dht11(4, Senoidal(24, 3, 600000), Senoidal(55, 10, 900000))
+    PLACA.sondas_ds18b20(26, [21.5])
+
+
+def _modulos_lib():
+    archivos = set()
+    for modulo in list(sys.modules.values()):
+        archivo = getattr(modulo, "__file__", None) or ""
+        if archivo.startswith(emulador.CARPETA_LIB):
+            archivos.add(archivo)
+    return sorted(archivos)
+
+
+def _primeras(inicio_us):
+    # Primera publicación de cada topic, en ms desde el arranque
+    primeras = {}
+    for mensaje in BROKER.mensajes:
+        if mensaje.cliente is not None:
+            primeras.setdefault(mensaje.topic.decode(), (mensaje.instante_us - inicio_us) / 1000)
+    return primeras
+
+
+def _tamano_mpy(archivos):
+    try:
+        import mpy_cross
+    except ImportError:
+        return None
+    total = 0
+    with tempfile.TemporaryDirectory() as carpeta:
+        for i, archivo in enumerate(archivos):
+            destino = os.path.join(carpeta, f"{i}.mpy")
+            mpy_cross.run("-O3", "-march=xtensawin", "-o", destino, archivo, stderr=subprocess.DEVNULL).wait()
+            total += os.path.getsize(destino)
+    return total
+
+
+def _compilar_ms(archivos, repeticiones=20):
+    fuentes = []
+    for archivo in archivos:
+        with open(archivo, encoding="utf-8") as f:
+            fuentes.append((archivo, f.read()))
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for archivo, fuente in fuentes:
+            compile(fuente, archivo, "exec")
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+def _tamano_lib():
+    total = 0
+    for raiz, carpetas, archivos in os.walk(emulador.CARPETA_LIB):
+        carpetas[:] = [c for c in carpetas if c != "__pycache__"]
+        total += sum(os.path.getsize(os.path.join(raiz, a)) for a in archivos if a.endswith(".py"))
+    return total
+
+
+def medir_firmware(placa, duracion_s):
+    _preparar()
+    flash = tempfile.mkdtemp(prefix="flash_")
+    manifiesto = os.path.join(CARPETA_PLACAS, placa + ".json")
+    shutil.copy(manifiesto, os.path.join(flash, "config.json"))
+    principal = os.path.join(CARPETA_FIRMWARE, "main.py")
+    resumen = ejecutar(principal, duracion_s, flash=flash)
+    modulos = _modulos_lib()
+    shutil.rmtree(flash, ignore_errors=True)
+    sistema = os.path.getsize(principal) + os.path.getsize(manifiesto)
+    return resumen, modulos, sistema, _primeras(0), [principal]
+
+
+def medir_script(script, duracion_s):
+    ruta = os.path.join(emulador.CARPETA_SCRIPTS, script)
+    with open(ruta, encoding="utf-8") as f:
+        ssid = re.search(r'WIFI_SSID\s*=\s*"([^"]*)"', f.read())
+    _preparar(ssid.group(1) if ssid else None)
+    resumen = ejecutar(ruta, duracion_s)
+    modulos = _modulos_lib()
+    sistema = os.path.getsize(ruta) + _tamano_lib()
+    return resumen, modulos, sistema, _primeras(0), [ruta] + modulos
+
+
+def _fila(nombre, resumen, modulos, sistema, primeras, compilados):
+    heap = _tamano_mpy(compilados)
+    compilar = _compilar_ms(compilados)
+    arranque = max(primeras.values()) if primeras else float("nan")
+    error = "  error: " + resumen["error"] if resumen["error"] else ""
+    print(f"  {nombre:<40} {sistema:>9} {len(modulos):>8} {'n/d' if heap is None else heap:>8} "
+          f"{compilar:>9.1f} {arranque:>8.0f} {len(primeras):>7}{error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--placas", default="ky-003,ky-015,ambiente", help="manifiestos de firmware/placas")
+    parser.add_argument("--duracion", type=float, default=60, help="segundos virtuales por corrida")
+    args = parser.parse_args()
+
+    emulador.instalar()
+    imagen = _tamano_mpy([os.path.join(raiz, a) for raiz, _, archivos in os.walk(emulador.CARPETA_LIB)
+                          for a in archivos if a.endswith(".py")])
+    print(f"lib/ congelada en la imagen: {'n/d' if imagen is None else imagen} bytes de .mpy "
+          f"({_tamano_lib()} bytes de .py)")
+    print(f"  {'':<40} {'FS bytes':>9} {'módulos':>8} {'heap':>8} {'compilar':>9} {'1ª pub.':>8} {'topics':>7}")
+    print(f"  {'':<40} {'':>9} {'':>8} {'bytes':>8} {'ms host':>9} {'ms':>8}")
+    for placa in args.placas.split(","):
+        print(placa)
+        _fila(f"firmware ({placa}.json)", *medir_firmware(placa, args.duracion))
+        for script in SCRIPTS.get(placa, []):
+            _fila(script, *medir_script(script, args.duracion))
+
+
+if __name__ == "__main__":
+    main()
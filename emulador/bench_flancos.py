@@ -0,0 +1,111 @@
+"""Pulsos detectados y latencia de detección en las entradas digitales.
+
+Compara el sondeo que hacían los scripts (leer el pin cada 50–500 ms y
+aplicar el anti-rebote sobre esas lecturas) con ``flancos.CapturaFlancos``
+(flancos por interrupción con su ``ticks_us``, vaciados cada 10 ms). La
+entrada recibe un pulso cada 1.237 s del ancho indicado; la latencia
+es el tiempo entre el flanco real y el momento en que el script lo ve.
+
+    python -m emulador.bench_flancos --anchos 1,5,20,100,400 --sondeos 50,100,500
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Cuadrada
+
+instalar()
+
+import time  # noqa: E402
+from machine import Pin  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+from flancos import CapturaFlancos  # noqa: E402
+
+PIN = 16
+# Lejos de un múltiplo de los periodos de sondeo, para que el pulso caiga
+# en todas las fases de la lectura
+PERIODO_PULSOS_MS = 1237
+PERIODO_VACIADO_MS = 10
+
+
+def _preparar(ancho_ms):
+    reiniciar()
+    PLACA.senal(PIN, Cuadrada(PERIODO_PULSOS_MS, ancho_ms / PERIODO_PULSOS_MS, desfase_ms=500))
+    return Pin(PIN, Pin.IN)
+
+
+def _retraso_us(ahora_us):
+    # Tiempo desde el último flanco de subida real (uno por periodo)
+    return (ahora_us - 500000) % (PERIODO_PULSOS_MS * 1000)
+
+
+def _resultado(detectados, retrasos):
+    return {
+        "detectados": detectados,
+        "latencia_media_ms": sum(retrasos) / len(retrasos) / 1000 if retrasos else 0.0,
+        "latencia_max_ms": max(retrasos) / 1000 if retrasos else 0.0,
+    }
+
+
+def medir_captura(ancho_ms, duracion_s, antirrebote_ms):
+    pin = _preparar(ancho_ms)
+    captura = CapturaFlancos(pin, antirrebote_ms=antirrebote_ms)
+    retrasos = []
+
+    def al_cambiar(t_us, nivel):
+        if nivel:
+            retrasos.append(_retraso_us(time.ticks_us()))
+
+    disp = Dispositivo()
+    disp.periodico("flancos", PERIODO_VACIADO_MS, lambda: captura.vaciar(al_cambiar))
+    correr(disp, duracion_s)
+    captura.detener()
+    return _resultado(len(retrasos), retrasos)
+
+
+def medir_sondeo(ancho_ms, duracion_s, periodo_ms, antirrebote_ms):
+    pin = _preparar(ancho_ms)
+    estado = {"ultimo": pin.value(), "cambio": -antirrebote_ms}
+    retrasos = []
+
+    def leer():
+        # Lógica de los scripts originales: cambio + tiempo desde el último
+        ahora = time.ticks_ms()
+        valor = pin.value()
+        if valor != estado["ultimo"] and time.ticks_diff(ahora, estado["cambio"]) > antirrebote_ms:
+            if valor:
+                retrasos.append(_retraso_us(time.ticks_us()))
+            estado["ultimo"] = valor
+            estado["cambio"] = ahora
+
+    disp = Dispositivo()
+    disp.periodico("sondeo", periodo_ms, leer)
+    correr(disp, duracion_s)
+    return _resultado(len(retrasos), retrasos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--anchos", default="1,5,20,100,400", help="ancho del pulso (ms)")
+    parser.add_argument("--sondeos", default="50,100,500", help="periodos de sondeo (ms)")
+    parser.add_argument("--duracion", type=float, default=30.0, help="segundos virtuales")
+    parser.add_argument("--antirrebote", type=float, default=5.0,
+                        help="anti-rebote de la captura (ms); el sondeo usa 300 como los scripts")
+    args = parser.parse_args()
+
+    pulsos = int(args.duracion * 1000 // PERIODO_PULSOS_MS)
+    print(f"{pulsos} pulsos por prueba")
+    print(f"{'ancho ms':>8}  {'método':<14} {'detectados':>10} {'lat. media ms':>14} {'lat. máx ms':>12}")
+    for ancho in (float(a) for a in args.anchos.split(",")):
+        filas = [("IRQ", medir_captura(ancho, args.duracion, args.antirrebote))]
+        for periodo in (int(p) for p in args.sondeos.split(",")):
+            filas.append((f"sondeo {periodo} ms", medir_sondeo(ancho, args.duracion, periodo, 300)))
+        for nombre, r in filas:
+            print(f"{ancho:>8g}  {nombre:<14} {r['detectados']:>10} "
+                  f"{r['latencia_media_ms']:>14.1f} {r['latencia_max_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
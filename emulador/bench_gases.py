@@ -0,0 +1,50 @@
+"""Costo por conversión de ppm con tabla y con log/pow (sensores MQ).
+
+Para cada sensor de ``gases.CURVAS`` calibra R0 con una lectura de aire
+limpio y mide con ``gases.comparar`` los µs por conversión de
+``SensorGas.ppm`` (tabla interpolada) y ``SensorGas.ppm_exacto``
+(``math.pow``), el mayor error relativo de la tabla en el rango útil y
+los bytes de las tablas. Los µs son del reloj virtual del emulador; en
+la placa se obtienen con ``gases.comparar`` desde el REPL.
+
+    python -m emulador.bench_gases --tramos 128
+"""
+
+import argparse
+import os
+import tempfile
+
+from emulador import instalar
+from emulador.ejecutar import reiniciar
+
+instalar()
+
+from gases import CURVAS, SensorGas, comparar  # noqa: E402
+
+AIRE_LIMPIO = 1200  # Lectura típica en aire de un MQ con RL de 10 kΩ
+# El MQ-3 mide en mg/L: el error se mide desde 0.01 mg/L
+MINIMO = {"MQ-3": 0.01}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tramos", type=int, default=128, help="tramos de cada tabla")
+    parser.add_argument("--repeticiones", type=int, default=5000, help="conversiones por medición")
+    args = parser.parse_args()
+
+    archivo = os.path.join(tempfile.mkdtemp(), "r0.json")
+    print(f"{'sensor':<8} {'gas':<9} {'µs tabla':>9} {'µs log/pow':>10} {'×':>5} "
+          f"{'error máx':>9} {'bytes':>6}")
+    for modelo, curva in CURVAS.items():
+        reiniciar()
+        sensor = SensorGas(modelo, archivo=archivo, tramos=args.tramos)
+        sensor.calibrar(AIRE_LIMPIO)
+        for gas in curva["gases"]:
+            r = comparar(sensor, gas, args.repeticiones, MINIMO.get(modelo, 1.0))
+            print(f"{modelo:<8} {gas:<9} {r['tabla_us']:>9.1f} {r['exacto_us']:>10.1f} "
+                  f"{r['exacto_us'] / max(r['tabla_us'], 0.01):>5.1f} {r['error_max'] * 100:>8.2f}% "
+                  f"{(args.tramos + 1) * 4:>6}")
+
+
+if __name__ == "__main__":
+    main()
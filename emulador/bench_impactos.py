@@ -0,0 +1,124 @@
+"""Impactos entregados y tiempo en la IRQ del KY-031.
+
+Compara el handler original (imprime y llama a ``client.publish`` dentro
+de la interrupción) con ``diferido.ColaEventos`` (la IRQ solo guarda el
+instante y ``micropython.schedule`` publica después). Cada impacto es un
+flanco de bajada seguido de rebotes; llegan en ráfagas con la separación
+indicada. Un flanco que llega mientras el handler corre queda pendiente y
+los siguientes de esa ventana se pierden, como en el ESP32.
+
+    python -m emulador.bench_impactos --separaciones 50,20,10,5 --impactos 20
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.broker import BROKER
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Secuencia
+
+instalar()
+
+import time  # noqa: E402
+from machine import Pin  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from diferido import ColaEventos  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+
+PIN = 23
+TOPIC = "gds0653/ky-031"
+INICIO_MS = 5000           # Las ráfagas empiezan con MQTT ya conectado
+ENTRE_RAFAGAS_MS = 2000
+REBOTES_US = (100, 200, 300, 400, 500, 600)
+
+
+def _rafagas(rafagas, impactos, separacion_ms):
+    puntos = []
+    for r in range(rafagas):
+        base = INICIO_MS + r * (ENTRE_RAFAGAS_MS + impactos * separacion_ms)
+        for i in range(impactos):
+            t = base + i * separacion_ms
+            puntos.append((t, 0))
+            for k, rebote in enumerate(REBOTES_US):
+                puntos.append((t + rebote / 1000, 1 if k % 2 == 0 else 0))
+            puntos.append((t + 1, 1))
+    return Secuencia(puntos, inicial=1)
+
+
+def _preparar(rafagas, impactos, separacion_ms):
+    reiniciar()
+    PLACA.senal(PIN, _rafagas(rafagas, impactos, separacion_ms))
+    pin = Pin(PIN, Pin.IN, Pin.PULL_UP)
+    conexion = GestorConexion(PLACA.red.ssid, "", "bench_impactos", "broker.emqx.io")
+    return pin, conexion, Dispositivo(conexion, cola_max=256)
+
+
+def _duracion_s(rafagas, impactos, separacion_ms):
+    return (INICIO_MS + rafagas * (ENTRE_RAFAGAS_MS + impactos * separacion_ms)) / 1000 + 1
+
+
+def _entregados():
+    return sum(1 for m in BROKER.por_topic(TOPIC) if m.payload == b"1")
+
+
+def medir_en_irq(rafagas, impactos, separacion_ms, antirrebote_ms):
+    pin, conexion, disp = _preparar(rafagas, impactos, separacion_ms)
+    estado = {"ultimo": -1000000, "irq_max_us": 0}
+
+    def detectar_impacto(p):
+        # Como el script original: print y publish dentro de la interrupción
+        inicio = time.ticks_us()
+        if time.ticks_diff(inicio, estado["ultimo"]) > antirrebote_ms * 1000:
+            print("¡IMPACTO DETECTADO! Valor: 1")
+            if conexion.cliente:
+                conexion.cliente.publish(TOPIC, "1")
+            estado["ultimo"] = inicio
+        estado["irq_max_us"] = max(estado["irq_max_us"], time.ticks_diff(time.ticks_us(), inicio))
+
+    pin.irq(trigger=Pin.IRQ_FALLING, handler=detectar_impacto)
+    correr(disp, _duracion_s(rafagas, impactos, separacion_ms))
+    return {"entregados": _entregados(), "perdidas_irq": pin.irq_perdidas,
+            "irq_max_us": estado["irq_max_us"], "entrega_media_us": 0, "entrega_max_us": 0}
+
+
+def medir_diferido(rafagas, impactos, separacion_ms, antirrebote_ms):
+    pin, conexion, disp = _preparar(rafagas, impactos, separacion_ms)
+    estado = {"ultimo": -1000000}
+
+    def procesar(t_us, valor):
+        if time.ticks_diff(t_us, estado["ultimo"]) > antirrebote_ms * 1000:
+            print("¡IMPACTO DETECTADO! Valor: 1")
+            disp.publicar(TOPIC, "1")
+            estado["ultimo"] = t_us
+
+    cola = ColaEventos(procesar, capacidad=64)
+    pin.irq(trigger=Pin.IRQ_FALLING, handler=lambda p: cola.registrar(), hard=True)
+    disp.periodico("reposo", 50, cola.vaciar)
+    correr(disp, _duracion_s(rafagas, impactos, separacion_ms))
+    return {"entregados": _entregados(), "perdidas_irq": pin.irq_perdidas + cola.perdidos,
+            "irq_max_us": cola.irq_max_us, "entrega_media_us": cola.estadisticas()["entrega_media_us"],
+            "entrega_max_us": cola.entrega_max_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--separaciones", default="50,20,10,5", help="ms entre impactos de una ráfaga")
+    parser.add_argument("--impactos", type=int, default=20, help="impactos por ráfaga")
+    parser.add_argument("--rafagas", type=int, default=5)
+    parser.add_argument("--antirrebote", type=float, default=2.0, help="ms, igual para los dos")
+    args = parser.parse_args()
+
+    total = args.impactos * args.rafagas
+    print(f"{total} impactos por prueba")
+    print(f"{'sep. ms':>7}  {'handler':<10} {'entregados':>10} {'flancos perdidos':>16} "
+          f"{'máx. en IRQ µs':>15} {'a entrega µs (media/máx)':>25}")
+    for separacion in (float(s) for s in args.separaciones.split(",")):
+        for nombre, medir in (("en la IRQ", medir_en_irq), ("diferido", medir_diferido)):
+            r = medir(args.rafagas, args.impactos, separacion, args.antirrebote)
+            print(f"{separacion:>7g}  {nombre:<10} {r['entregados']:>10} {r['perdidas_irq']:>16} "
+                  f"{r['irq_max_us']:>15} {r['entrega_media_us']:>12}/{r['entrega_max_us']:<12}")
+
+
+if __name__ == "__main__":
+    main()
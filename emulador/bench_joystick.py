@@ -0,0 +1,170 @@
+"""Latencia entrada -> broker del KY-023 en modo eventos y en modo flujo.
+
+El eje X salta del centro a un extremo y vuelve cada ``--paso`` ms. Para
+cada salto se mide, con el instante en que el broker emulado recibe cada
+mensaje, cuánto tarda en llegar el primero que lo refleja: el texto de
+la dirección en modo eventos (muestreo cada 50 ms y a lo sumo un mensaje
+cada 200 ms) o una trama de ``codec`` con la posición en modo flujo.
+También reporta mensajes y bytes por segundo y CPU de la tarea.
+
+    python -m emulador.bench_joystick --frecuencias 50,100 --tramas 1,5
+"""
+
+import argparse
+import json
+
+from emulador import instalar
+from emulador.broker import BROKER
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Constante, Ruido, Secuencia
+
+instalar()
+
+import time  # noqa: E402
+from array import array  # noqa: E402
+from machine import ADC, Pin  # noqa: E402
+import codec  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+from joystick import Eje  # noqa: E402
+from muestreo import CanalADC  # noqa: E402
+
+PIN_X, PIN_Y, PIN_BTN = 32, 33, 14
+CENTRO, EXTREMO = 2048, 3900
+ARRANQUE_MS = 3000  # WiFi y MQTT conectados antes del primer salto
+
+
+def _saltos(duracion_s, paso_ms):
+    # (instante_ms, en_extremo) de cada salto del eje X
+    saltos = []
+    t = ARRANQUE_MS
+    extremo = True
+    while t < duracion_s * 1000 - paso_ms:
+        saltos.append((t, extremo))
+        extremo = not extremo
+        t += paso_ms
+    return saltos
+
+
+def _preparar(saltos, ruido):
+    reiniciar()
+    puntos = [(t, EXTREMO if extremo else CENTRO) for t, extremo in saltos]
+    PLACA.senal(PIN_X, Ruido(Secuencia(puntos, inicial=CENTRO), ruido))
+    PLACA.senal(PIN_Y, Ruido(Constante(CENTRO), ruido))
+    PLACA.senal(PIN_BTN, Constante(1))
+    buffer_adc = array("H", [0] * 8)
+    ejes = []
+    for pin in (PIN_X, PIN_Y):
+        adc = ADC(Pin(pin))
+        adc.atten(ADC.ATTN_11DB)
+        eje = Eje(CanalADC(adc, muestras=8, metodo="recortado", recorte=2, buffer=buffer_adc))
+        eje.calibrar_centro()
+        ejes.append(eje)
+    conexion = GestorConexion(PLACA.red.ssid, "", "bench_joystick", "broker.emqx.io")
+    return ejes, Pin(PIN_BTN, Pin.IN), Dispositivo(conexion)
+
+
+def medir_eventos(saltos, duracion_s, ruido):
+    (eje_x, eje_y), btn, disp = _preparar(saltos, ruido)
+    estado = {"ultimo": "CENTRO", "t": 0, "us": 0}
+
+    def muestrear():
+        inicio = time.ticks_us()
+        x, y = eje_x.leer(), eje_y.leer()
+        if not btn.value():
+            actual = "PRESIONADO"
+        elif abs(x) > 200 or abs(y) > 200:
+            if abs(x) > abs(y):
+                actual = "DERECHA" if x > 0 else "IZQUIERDA"
+            else:
+                actual = "ABAJO" if y > 0 else "ARRIBA"
+        else:
+            actual = "LIBERADO"
+        ahora = time.ticks_ms()
+        if actual != estado["ultimo"] and time.ticks_diff(ahora, estado["t"]) > 200:
+            disp.publicar("gds0653/ky-023", json.dumps({"estado": actual}))
+            estado["ultimo"] = actual
+            estado["t"] = ahora
+        estado["us"] += time.ticks_diff(time.ticks_us(), inicio)
+
+    disp.periodico("joystick", 50, muestrear)
+    correr(disp, duracion_s)
+
+    def refleja(mensaje, extremo):
+        texto = json.loads(mensaje.payload)["estado"]
+        return texto == "DERECHA" if extremo else texto == "LIBERADO"
+
+    return BROKER.por_topic("gds0653/ky-023"), refleja, estado["us"]
+
+
+def medir_flujo(saltos, duracion_s, ruido, frecuencia, por_trama):
+    (eje_x, eje_y), btn, disp = _preparar(saltos, ruido)
+    numero = codec.esquema("ky-023")
+    trama = bytearray(codec.tamano(numero, por_trama))
+    muestras = []
+    estado = {"t0": 0, "us": 0}
+
+    def muestrear():
+        inicio = time.ticks_us()
+        if not muestras:
+            estado["t0"] = time.ticks_ms()
+        muestras.append((eje_x.leer(), eje_y.leer(), 0 if btn.value() else 1))
+        if len(muestras) >= por_trama:
+            largo = codec.codificar_en(trama, numero, (estado["t0"], 1000 // frecuencia), muestras)
+            disp.publicar("gds0653/ky-023/bin", bytes(trama[:largo]))
+            muestras.clear()
+        estado["us"] += time.ticks_diff(time.ticks_us(), inicio)
+
+    disp.periodico("joystick", 1000 // frecuencia, muestrear)
+    correr(disp, duracion_s)
+
+    def refleja(mensaje, extremo):
+        x = codec.decodificar(mensaje.payload)[1]["x"]
+        return any(v > 500 for v in x) if extremo else any(abs(v) < 100 for v in x)
+
+    return BROKER.por_topic("gds0653/ky-023/bin"), refleja, estado["us"]
+
+
+def latencias(mensajes, refleja, saltos):
+    resultado = []
+    for t_ms, extremo in saltos:
+        for mensaje in mensajes:
+            if mensaje.instante_us >= t_ms * 1000 and refleja(mensaje, extremo):
+                resultado.append((mensaje.instante_us - t_ms * 1000) / 1000)
+                break
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frecuencias", default="50,100", help="Hz del modo flujo")
+    parser.add_argument("--tramas", default="1,5", help="muestras por trama")
+    parser.add_argument("--paso", type=int, default=737, help="ms entre saltos del eje")
+    parser.add_argument("--duracion", type=float, default=30, help="segundos por prueba")
+    parser.add_argument("--ruido", type=float, default=8, help="ruido del ADC en cuentas")
+    args = parser.parse_args()
+
+    saltos = _saltos(args.duracion, args.paso)
+    casos = [("eventos 20 Hz", lambda: medir_eventos(saltos, args.duracion, args.ruido))]
+    for frecuencia in (int(f) for f in args.frecuencias.split(",")):
+        for por_trama in (int(n) for n in args.tramas.split(",")):
+            casos.append((f"flujo {frecuencia} Hz x{por_trama}",
+                          lambda f=frecuencia, n=por_trama: medir_flujo(saltos, args.duracion, args.ruido, f, n)))
+
+    print(f"{len(saltos)} saltos del eje X; latencia = salto -> primer mensaje que lo refleja en el broker")
+    print(f"{'modo':<18} {'lat. prom':>9} {'lat. máx':>9} {'perdidos':>8} {'msg/s':>6} {'bytes/s':>8} {'CPU %':>6}")
+    for nombre, medir in casos:
+        mensajes, refleja, cpu_us = medir()
+        valores = latencias(mensajes, refleja, saltos)
+        promedio = sum(valores) / len(valores) if valores else float("nan")
+        maximo = max(valores) if valores else float("nan")
+        util_s = args.duracion - ARRANQUE_MS / 1000
+        enviados = [m for m in mensajes if m.instante_us >= ARRANQUE_MS * 1000]
+        print(f"{nombre:<18} {promedio:>7.1f}ms {maximo:>7.1f}ms {len(saltos) - len(valores):>8} "
+              f"{len(enviados) / util_s:>6.1f} {sum(len(m.payload) for m in enviados) / util_s:>8.0f} "
+              f"{cpu_us / (args.duracion * 10000):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
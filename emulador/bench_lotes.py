@@ -0,0 +1,75 @@
+"""Compara publicar cada muestra contra enviarlas en lotes (``lotes.Lote``).
+
+Un sensor muestrea a ``--frecuencia`` Hz durante ``--duracion`` segundos
+virtuales; para cada tamaño de lote reporta mensajes, paquetes MQTT,
+escrituras TCP y bytes por muestra. El tamaño 1 es el comportamiento
+de publicar una cadena por lectura.
+
+    python -m emulador.bench_lotes --frecuencia 20 --tamanos 1,5,20,50
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.broker import BROKER
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Pulso
+
+instalar()
+
+from machine import ADC, Pin  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+from lotes import Lote  # noqa: E402
+
+TOPIC = "emulador/lotes"
+
+
+def medir(tamano, frecuencia_hz=20, duracion_s=60):
+    reiniciar()
+    PLACA.senal(34, Pulso(72))
+    adc = ADC(Pin(34))
+    conexion = GestorConexion(PLACA.red.ssid, "", "bench_lotes", "broker.emqx.io")
+    disp = Dispositivo(conexion)
+    periodo_ms = max(1, 1000 // frecuencia_hz)
+    if tamano <= 1:
+        def muestrear():
+            disp.publicar(TOPIC, str(adc.read()))
+    else:
+        lote = Lote(disp, TOPIC, maximo=tamano, edad_max_ms=tamano * periodo_ms * 2)
+
+        def muestrear():
+            lote.agregar(adc.read())
+    disp.periodico("sensor", periodo_ms, muestrear)
+    correr(disp, duracion_s)
+
+    muestras = adc.lecturas
+    mensajes = BROKER.por_topic(TOPIC)
+    return {
+        "muestras": muestras,
+        "mensajes": len(mensajes),
+        "paquetes": BROKER.paquetes,
+        "escrituras": BROKER.escrituras,
+        "bytes_por_muestra": BROKER.bytes / max(1, muestras),
+        "descartados": disp.descartados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frecuencia", type=int, default=20, help="muestras por segundo")
+    parser.add_argument("--duracion", type=float, default=60, help="segundos virtuales")
+    parser.add_argument("--tamanos", default="1,5,20,50", help="muestras por mensaje")
+    args = parser.parse_args()
+
+    print(f"{'lote':>5} {'muestras':>9} {'mensajes':>9} {'paquetes':>9} "
+          f"{'escrituras':>11} {'B/muestra':>10} {'descartadas':>12}")
+    for tamano in (int(t) for t in args.tamanos.split(",")):
+        r = medir(tamano, args.frecuencia, args.duracion)
+        print(f"{tamano:>5} {r['muestras']:>9} {r['mensajes']:>9} {r['paquetes']:>9} "
+              f"{r['escrituras']:>11} {r['bytes_por_muestra']:>10.1f} {r['descartados']:>12}")
+
+
+if __name__ == "__main__":
+    main()
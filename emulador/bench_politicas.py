@@ -0,0 +1,172 @@
+"""Mensajes ahorrados contra error de reconstrucción por política de envío.
+
+Pasa cada traza por las políticas de ``politicas`` y reconstruye la señal
+como la vería el receptor: escalones entre reportes (bandas, latido) o
+rectas entre puntos (puerta giratoria). El error se mide contra todas
+las muestras de la traza hasta el último reporte, que es lo que llegaría
+publicando cada una.
+
+Las trazas incluidas imitan a los sensores (ruido del ADC del ESP32
+incluido); ``--csv RUTA,PERIODO_MS`` agrega una traza grabada.
+
+    python -m emulador.bench_politicas
+    python -m emulador.bench_politicas --csv lecturas_mq04.csv,100
+"""
+
+import argparse
+import math
+import random
+
+from emulador import instalar
+from emulador.senales import Traza
+
+instalar()
+
+from politicas import crear  # noqa: E402
+
+# Políticas evaluadas en cada traza (umbrales en unidades de la traza)
+POLITICAS = {
+    "gas": [
+        {"tipo": "siempre"},
+        {"tipo": "latido", "silencio_max_ms": 2000},
+        {"tipo": "banda", "umbral": 100, "silencio_max_ms": 2000},
+        {"tipo": "banda", "umbral": 60, "silencio_max_ms": 30000},
+        {"tipo": "porcentaje", "porcentaje": 5, "minimo": 40, "silencio_max_ms": 30000},
+        {"tipo": "puerta", "desviacion": 60, "silencio_max_ms": 30000},
+    ],
+    "hall": [
+        {"tipo": "siempre"},
+        {"tipo": "banda", "umbral": 100, "silencio_max_ms": 1000},
+        {"tipo": "banda", "umbral": 100, "silencio_max_ms": 30000},
+        {"tipo": "puerta", "desviacion": 60, "silencio_max_ms": 30000},
+    ],
+    "temperatura": [
+        {"tipo": "siempre"},
+        {"tipo": "banda", "umbral": 0.2, "silencio_max_ms": 60000},
+        {"tipo": "porcentaje", "porcentaje": 1, "silencio_max_ms": 60000},
+        {"tipo": "puerta", "desviacion": 0.2, "silencio_max_ms": 60000},
+    ],
+    "sonido": [
+        {"tipo": "siempre"},
+        {"tipo": "banda", "umbral": 30, "silencio_max_ms": 30000},
+        {"tipo": "puerta", "desviacion": 30, "silencio_max_ms": 30000},
+    ],
+}
+
+
+def _traza_gas(periodo_ms, duracion_s, rnd):
+    # Base con deriva lenta, una fuga que sube en 60 s y se ventila en 3 min
+    muestras = []
+    for i in range(int(duracion_s * 1000 / periodo_ms)):
+        t = i * periodo_ms / 1000
+        valor = 800 + 60 * math.sin(t / 300)
+        if 200 <= t < 260:
+            valor += 1700 * (t - 200) / 60
+        elif t >= 260:
+            valor += 1700 * math.exp(-(t - 260) / 60)
+        muestras.append(round(valor + rnd.gauss(0, 25)))
+    return muestras
+
+
+def _traza_hall(periodo_ms, duracion_s, rnd):
+    # Un imán que se acerca y aleja cada tanto
+    muestras = []
+    cerca = False
+    for i in range(int(duracion_s * 1000 / periodo_ms)):
+        if rnd.random() < periodo_ms / 20000:
+            cerca = not cerca
+        muestras.append(round((2700 if cerca else 1900) + rnd.gauss(0, 20)))
+    return muestras
+
+
+def _traza_temperatura(periodo_ms, duracion_s, rnd):
+    # Ciclo lento de 25 ± 3 °C con ruido de 0.05 °C
+    return [round(25 + 3 * math.sin(2 * math.pi * i * periodo_ms / 1800000) + rnd.gauss(0, 0.05), 2)
+            for i in range(int(duracion_s * 1000 / periodo_ms))]
+
+
+def _traza_sonido(periodo_ms, duracion_s, rnd):
+    # Ruido ambiente con ráfagas de ruido fuerte
+    muestras = []
+    for i in range(int(duracion_s * 1000 / periodo_ms)):
+        t = i * periodo_ms / 1000
+        fuerte = int(t / 30) % 4 == 1
+        muestras.append(max(0, round((400 if fuerte else 120) + rnd.gauss(0, 60 if fuerte else 15))))
+    return muestras
+
+
+def trazas(duracion_s=1800, semilla=1):
+    rnd = random.Random(semilla)
+    return [
+        ("gas", "MQ-04/MQ-05, cada 100 ms", 100, _traza_gas(100, duracion_s, rnd)),
+        ("hall", "KY-035, cada 100 ms", 100, _traza_hall(100, duracion_s, rnd)),
+        ("temperatura", "KY-013/KY-001, cada 2 s", 2000, _traza_temperatura(2000, duracion_s, rnd)),
+        ("sonido", "KY-038, cada 2 s", 2000, _traza_sonido(2000, duracion_s, rnd)),
+    ]
+
+
+def reconstruir(reportes, tiempos, interpolacion):
+    """Valor que vería el receptor en cada instante de ``tiempos``."""
+    salida = []
+    k = 0
+    for t in tiempos:
+        while k + 1 < len(reportes) and reportes[k + 1][0] <= t:
+            k += 1
+        t0, v0 = reportes[k]
+        if interpolacion == "lineal" and k + 1 < len(reportes):
+            t1, v1 = reportes[k + 1]
+            salida.append(v0 + (v1 - v0) * (t - t0) / (t1 - t0))
+        else:
+            salida.append(v0)
+    return salida
+
+
+def medir(config, muestras, periodo_ms):
+    politica = crear(config)
+    tiempos = [i * periodo_ms for i in range(len(muestras))]
+    reportes = []
+    for t, valor in zip(tiempos, muestras):
+        reportado = politica.evaluar(valor, t)
+        if reportado is not None:
+            reportes.append((politica.t_reportado, reportado))
+    # Después del último reporte el receptor todavía no sabe nada: no se mide
+    hasta = sum(1 for t in tiempos if t <= reportes[-1][0])
+    reconstruida = reconstruir(reportes, tiempos[:hasta], politica.interpolacion)
+    errores = [abs(a - b) for a, b in zip(muestras, reconstruida)]
+    return {
+        "mensajes": len(reportes),
+        "reduccion": len(muestras) / len(reportes),
+        "error_rms": math.sqrt(sum(e * e for e in errores) / len(errores)),
+        "error_max": max(errores),
+    }
+
+
+def _describir(config):
+    return " ".join(f"{k}={v}" for k, v in config.items() if k != "tipo") or "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duracion", type=float, default=1800, help="segundos de cada traza")
+    parser.add_argument("--csv", action="append", default=[], metavar="RUTA,PERIODO_MS",
+                        help="traza grabada (se evalúa con las políticas de 'gas')")
+    args = parser.parse_args()
+
+    lista = trazas(args.duracion)
+    for especificacion in args.csv:
+        ruta, periodo = especificacion.rsplit(",", 1)
+        traza = Traza.desde_csv(ruta, float(periodo), repetir=False)
+        lista.append(("gas", ruta, float(periodo), traza.muestras))
+
+    for clave, nombre, periodo_ms, muestras in lista:
+        print(f"\n{nombre}: {len(muestras)} muestras")
+        print(f"  {'política':<11} {'parámetros':<40} {'mensajes':>8} {'reducción':>9} "
+              f"{'error RMS':>9} {'error máx':>9}")
+        for config in POLITICAS[clave]:
+            r = medir(config, muestras, periodo_ms)
+            print(f"  {config['tipo']:<11} {_describir(config):<40} {r['mensajes']:>8} "
+                  f"{r['reduccion']:>8.1f}x {r['error_rms']:>9.2f} {r['error_max']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
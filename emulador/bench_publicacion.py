@@ -0,0 +1,123 @@
+"""Mide memoria asignada, escrituras al socket y tiempo por publicación.
+
+Compara el camino actual de los scripts (armar un ``str`` y llamar a
+``MQTTClient.publish``) con ``publicador.Publicador``, que arma el paquete
+en buffers fijos. El socket es un sumidero que no copia los datos, así
+que solo se cuenta lo que asigna el código del dispositivo. La memoria
+se mide con tracemalloc, publicación por publicación, como el pico por
+encima de lo que estaba asignado antes.
+
+En CPython los enteros mayores a 256 son objetos: aparecen como unos
+pocos bytes por publicación que en MicroPython (small ints) no existen.
+
+    python -m emulador.bench_publicacion --repeticiones 2000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from emulador import instalar
+
+instalar()
+
+from publicador import Publicador  # noqa: E402
+from umqtt.simple import MQTTClient  # noqa: E402
+
+TOPIC = "gds0653/mq-05"
+
+
+class SocketNulo:
+    def __init__(self):
+        self.escrituras = 0
+
+    def write(self, datos, longitud=None):
+        self.escrituras += 1
+        return len(datos) if longitud is None else longitud
+
+
+def _cliente():
+    cliente = MQTTClient("bench_publicacion", "broker.emqx.io")
+    cliente.sock = SocketNulo()
+    return cliente
+
+
+def _caminos(cliente, publicador):
+    def concatenado(valor, alerta):
+        mensaje = ('{"valor":' + str(valor) + ',"alerta":' + str(alerta)
+                   + ',"ppm_aprox":' + str(valor * 2) + '}')
+        cliente.publish(TOPIC, mensaje)
+
+    def formateado(valor, alerta):
+        mensaje = f'{{"valor":{valor},"alerta":{alerta},"ppm_aprox":{valor * 2}}}'
+        cliente.publish(TOPIC, mensaje.encode())
+
+    def json_dumps(valor, alerta):
+        mensaje = json.dumps({"valor": valor, "alerta": alerta, "ppm_aprox": valor * 2})
+        cliente.publish(TOPIC, mensaje.encode())
+
+    def preasignado(valor, alerta):
+        publicador.inicio()
+        publicador.texto(b'{"valor":').entero(valor)
+        publicador.texto(b',"alerta":').entero(alerta)
+        publicador.texto(b',"ppm_aprox":').entero(valor * 2).texto(b'}')
+        publicador.enviar(cliente)
+
+    return [("str + concatenación", concatenado), ("f-string + encode", formateado),
+            ("json.dumps + encode", json_dumps), ("Publicador", preasignado)]
+
+
+def _asignado(funcion, valores):
+    # Pico de memoria de cada publicación respecto de lo que había antes
+    # (en CPython lo temporal se libera enseguida, así que se mide el pico)
+    leer = tracemalloc.get_traced_memory
+    total = 0
+    tracemalloc.start()
+    try:
+        for valor, alerta in valores:
+            antes = leer()[0]
+            tracemalloc.reset_peak()
+            funcion(valor, alerta)
+            total += leer()[1] - antes
+    finally:
+        tracemalloc.stop()
+    return total
+
+
+def medir(repeticiones=2000):
+    cliente = _cliente()
+    publicador = Publicador(TOPIC)
+    valores = [((i * 37) % 4096, i & 1) for i in range(repeticiones)]
+    filas = []
+    for nombre, funcion in _caminos(cliente, publicador):
+        funcion(*valores[0])
+        # Tiempo sin tracemalloc (lo hace mucho más lento)
+        inicio = time.perf_counter()
+        for valor, alerta in valores:
+            funcion(valor, alerta)
+        us = (time.perf_counter() - inicio) * 1000000 / repeticiones
+        cliente.sock.escrituras = 0
+        asignado = _asignado(funcion, valores)
+        filas.append({
+            "camino": nombre,
+            "bytes_por_publicacion": asignado / repeticiones,
+            "escrituras_por_publicacion": cliente.sock.escrituras / repeticiones,
+            "us": us,
+        })
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'camino':<22} {'B asignados':>12} {'writes':>7} {'µs (CPython)':>13}")
+    for f in medir(args.repeticiones):
+        print(f"{f['camino']:<22} {f['bytes_por_publicacion']:>12.1f} "
+              f"{f['escrituras_por_publicacion']:>7.1f} {f['us']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
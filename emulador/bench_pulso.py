@@ -0,0 +1,183 @@
+"""Precisión del BPM y CPU por muestra del KY-039.
+
+Compara el detector anterior del script (tarea cada 50 ms, listas con
+``append``/``pop(0)`` y el promedio recalculado en cada muestra) con
+``pulso.DetectorPulso`` alimentado por ``muestreo.MuestreadorPeriodico``
+a 250 y 500 Hz. Con ``--carga`` otra tarea ocupa el CPU unos ms cada
+segundo (como una publicación bloqueante), lo que atrasa a las tareas
+pero no al timer. Los µs por muestra son del reloj virtual e incluyen
+las conversiones del ADC (1 en el anterior, 3 con la mediana).
+
+El BPM real sale de los latidos del fotopletismograma emulado; con
+``--csv RUTA,PERIODO_MS,BPM`` se evalúa una traza grabada contra el BPM
+medido con otro equipo.
+
+    python -m emulador.bench_pulso --bpm 45,72,120,180 --carga 30
+    python -m emulador.bench_pulso --csv ppg_dedo.csv,10,68
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Pulso, Ruido, Traza
+
+instalar()
+
+import time  # noqa: E402
+from machine import ADC, Pin  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+from muestreo import CanalADC, MuestreadorPeriodico  # noqa: E402
+from pulso import DetectorPulso  # noqa: E402
+
+PIN = 34
+ESTABILIZACION_S = 10  # El BPM se evalúa después de este tiempo
+
+
+class DetectorOriginal:
+    """El algoritmo que tenía el script: umbral a ±100 del promedio de las
+    últimas 20 muestras y BPM con el promedio de los últimos 10 intervalos."""
+
+    def __init__(self):
+        self.buffer_valores = []
+        self.pulsos = []
+        self.ultimo_pulso = 0
+        self.estado_pulso = False
+        self.bpm = 0
+
+    def procesar(self, valor, ahora):
+        self.buffer_valores.append(valor)
+        if len(self.buffer_valores) > 20:
+            self.buffer_valores.pop(0)
+        if len(self.buffer_valores) == 20:
+            promedio = sum(self.buffer_valores) / len(self.buffer_valores)
+            if valor > promedio + 100 and not self.estado_pulso:
+                self.estado_pulso = True
+                if self.ultimo_pulso > 0:
+                    intervalo = time.ticks_diff(ahora, self.ultimo_pulso)
+                    if 240 < intervalo < 2000:
+                        self.pulsos.append(intervalo)
+                        if len(self.pulsos) > 10:
+                            self.pulsos.pop(0)
+                        self.bpm = int(60000 / (sum(self.pulsos) / len(self.pulsos)))
+                self.ultimo_pulso = ahora
+            elif valor < promedio - 100 and self.estado_pulso:
+                self.estado_pulso = False
+
+
+def _preparar(senal, carga_ms):
+    reiniciar()
+    PLACA.senal(PIN, senal)
+    adc = ADC(Pin(PIN))
+    adc.atten(ADC.ATTN_11DB)
+    conexion = GestorConexion(PLACA.red.ssid, "", "bench_pulso", "broker.emqx.io")
+    disp = Dispositivo(conexion)
+    if carga_ms:
+        disp.periodico("carga", 1000, lambda: time.sleep_ms(carga_ms))
+    return adc, disp
+
+
+def _muestrear_bpm(disp, detector, estado):
+    # Guarda el BPM una vez por segundo tras la estabilización
+    def registrar():
+        if time.ticks_diff(time.ticks_ms(), estado["inicio"]) >= ESTABILIZACION_S * 1000:
+            estado["bpm"].append(detector.bpm)
+    disp.periodico("registro", 1000, registrar)
+
+
+def medir_original(senal, duracion_s, carga_ms):
+    adc, disp = _preparar(senal, carga_ms)
+    detector = DetectorOriginal()
+    estado = {"inicio": time.ticks_ms(), "bpm": [], "us": 0, "muestras": 0}
+
+    def muestrear():
+        inicio = time.ticks_us()
+        detector.procesar(adc.read(), time.ticks_ms())
+        estado["us"] += time.ticks_diff(time.ticks_us(), inicio)
+        estado["muestras"] += 1
+
+    disp.periodico("pulso", 50, muestrear)
+    _muestrear_bpm(disp, detector, estado)
+    correr(disp, duracion_s)
+    return estado, None
+
+
+def medir_timer(senal, duracion_s, carga_ms, frecuencia):
+    adc, disp = _preparar(senal, carga_ms)
+    muestreador = MuestreadorPeriodico(CanalADC(adc, muestras=3, metodo="mediana"), frecuencia)
+    detector = DetectorPulso(1000 // frecuencia)
+    estado = {"inicio": time.ticks_ms(), "bpm": [], "us": 0, "muestras": 0}
+
+    original = muestreador._muestrear_ref
+
+    def en_timer(timer):
+        inicio = time.ticks_us()
+        original(timer)
+        estado["us"] += time.ticks_diff(time.ticks_us(), inicio)
+
+    def procesar():
+        inicio = time.ticks_us()
+        estado["muestras"] += muestreador.vaciar(detector.procesar)
+        estado["us"] += time.ticks_diff(time.ticks_us(), inicio)
+
+    def iniciar(cliente):
+        # Como el script: el timer arranca tras el connect() bloqueante
+        if not muestreador.activo:
+            muestreador.iniciar()
+
+    muestreador._muestrear_ref = en_timer
+    disp.periodico("pulso", 20, procesar)
+    _muestrear_bpm(disp, detector, estado)
+    disp.conexion.al_conectar(iniciar)
+    correr(disp, duracion_s)
+    muestreador.detener()
+    return estado, muestreador
+
+
+def _bpm_real(pulso, duracion_s):
+    latidos = [t for t in pulso.latidos_hasta(duracion_s * 1000000) if t >= ESTABILIZACION_S * 1000000]
+    return 60000000 * (len(latidos) - 1) / (latidos[-1] - latidos[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bpm", default="45,72,120,180", help="frecuencias cardíacas a emular")
+    parser.add_argument("--ruido", type=float, default=10, help="desviación del ruido del ADC")
+    parser.add_argument("--duracion", type=float, default=60, help="segundos por prueba")
+    parser.add_argument("--carga", type=float, default=0, help="ms de CPU ocupado cada segundo")
+    parser.add_argument("--csv", action="append", default=[], metavar="RUTA,PERIODO_MS,BPM",
+                        help="traza grabada y su BPM de referencia")
+    args = parser.parse_args()
+
+    casos = []
+    for bpm in (float(b) for b in args.bpm.split(",")):
+        pulso = Pulso(bpm)
+        casos.append((f"emulado {bpm:g}", lambda p=pulso: Ruido(p, args.ruido), _bpm_real(pulso, args.duracion)))
+    for especificacion in args.csv:
+        ruta, periodo, bpm = especificacion.rsplit(",", 2)
+        casos.append((ruta, lambda r=ruta, p=float(periodo): Traza.desde_csv(r, p), float(bpm)))
+
+    detectores = (
+        ("anterior 20 Hz", lambda s: medir_original(s, args.duracion, args.carga)),
+        ("timer 250 Hz", lambda s: medir_timer(s, args.duracion, args.carga, 250)),
+        ("timer 500 Hz", lambda s: medir_timer(s, args.duracion, args.carga, 500)),
+    )
+    print(f"BPM medido tras {ESTABILIZACION_S} s (mín/máx de un reporte por segundo); carga {args.carga:g} ms/s")
+    print(f"{'señal':<18} {'BPM real':>8}  {'detector':<15} {'BPM':>9} {'error':>6} "
+          f"{'µs/muestra':>10} {'perdidas':>8}")
+    for nombre, crear_senal, real in casos:
+        for detector, medir in detectores:
+            estado, muestreador = medir(crear_senal())
+            reportes = estado["bpm"] or [0]
+            medio = sorted(reportes)[len(reportes) // 2]
+            error = max(abs(b - real) for b in reportes)
+            por_muestra = estado["us"] / max(1, estado["muestras"])
+            perdidas = muestreador.perdidas if muestreador else "-"
+            print(f"{nombre:<18} {real:>8.1f}  {detector:<15} {min(reportes):>4}-{max(reportes):<4} "
+                  f"{error:>6.1f} {por_muestra:>10.0f} {perdidas:>8}  (mediana {medio})")
+
+
+if __name__ == "__main__":
+    main()
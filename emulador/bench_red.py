@@ -0,0 +1,66 @@
+"""Arranque y reconexión hasta la primera publicación, con y sin RedRapida.
+
+Un ``Dispositivo`` publica cada 100 ms y ``GestorConexion`` mide (su
+telemetría) el tiempo desde el arranque, o desde la caída del enlace,
+hasta el primer mensaje entregado. Se compara la conexión completa de
+siempre (escaneo, asociación y DHCP, reintento fijo de 2 s) con
+``conexion.RedRapida`` (BSSID e IP guardados en ``red.json``, plazos
+acotados y pausas crecientes): arranque sin datos guardados, arranque
+con datos de un arranque anterior y reconexión tras cortes de WiFi.
+
+    python -m emulador.bench_red --cortes 1000,5000,20000
+"""
+
+import argparse
+import os
+import tempfile
+
+from emulador import instalar
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+
+instalar()
+
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+
+INICIO_CORTE_MS = 10000
+
+
+def medir(rapida, carpeta, corte_ms=0, duracion_s=60):
+    """Corre una vez en ``carpeta`` (la flash); devuelve la telemetría."""
+    reiniciar()
+    if corte_ms:
+        PLACA.red.cortar(INICIO_CORTE_MS, corte_ms)
+    original = os.getcwd()
+    os.chdir(carpeta)
+    try:
+        # RedRapida lee red.json al crearse: desde la misma carpeta que correr()
+        conexion = GestorConexion(PLACA.red.ssid, "", "bench_red", "broker.emqx.io", rapida=rapida)
+    finally:
+        os.chdir(original)
+    disp = Dispositivo(conexion)
+    disp.periodico("muestra", 100, lambda: disp.publicar("bench/red", "1"))
+    correr(disp, duracion_s, flash=carpeta)
+    return conexion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cortes", default="1000,5000,20000", help="duración de los cortes de WiFi (ms)")
+    args = parser.parse_args()
+
+    print(f"{'conexión':<10} {'caso':<28} {'hasta publicar':>14} {'reconexiones':>12}")
+    for rapida, nombre in ((False, "completa"), (True, "rápida")):
+        with tempfile.TemporaryDirectory() as carpeta:
+            casos = [("arranque sin datos", 0), ("arranque con datos guardados", 0)]
+            casos += [(f"corte de {ms / 1000:g} s", ms) for ms in (int(c) for c in args.cortes.split(","))]
+            for caso, corte_ms in casos:
+                conexion = medir(rapida, carpeta, corte_ms)
+                ms = conexion.reconexion_ms if corte_ms else conexion.arranque_ms
+                print(f"{nombre:<10} {caso:<28} {ms if ms is not None else 'nunca':>11} ms "
+                      f"{conexion.reconexiones:>12}")
+
+
+if __name__ == "__main__":
+    main()
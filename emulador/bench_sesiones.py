@@ -0,0 +1,83 @@
+"""Toma de sesión entre dos placas: client id repetido vs id por chip.
+
+Dos ``Dispositivo`` con su ``GestorConexion`` publican cada segundo en
+el mismo broker. Con el mismo client id el broker corta la sesión
+anterior cada vez que entra la otra: sin detección (``vida_minima_ms =
+0``, como los scripts con id fijo o ``time.time()``) cada placa
+reconecta enseguida y patea a la otra de vuelta; con ``ControlSesion``
+las sesiones cortadas al poco de conectar cuentan como tomas y la
+reconexión espera cada vez el doble. Con ``id_cliente()`` (el id del
+chip, distinto en cada placa) no hay tomas. Reporta por hora tomas en el
+broker, conexiones, mensajes entregados y descartados por cola llena.
+
+    python -m emulador.bench_sesiones --duracion 600
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.broker import BROKER
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+
+instalar()
+
+import uasyncio as asyncio  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+
+CHIPS = (b"\x24\x0a\xc4\x12\x34\x56", b"\x24\x0a\xc4\x65\x43\x21")
+
+
+class _Placas:
+    # correr() espera un Dispositivo: varios comparten el mismo bucle
+    def __init__(self, dispositivos):
+        self.dispositivos = dispositivos
+
+    async def principal(self):
+        for disp in self.dispositivos[1:]:
+            asyncio.create_task(disp.principal())
+        await self.dispositivos[0].principal()
+
+
+def medir(caso, duracion_s):
+    reiniciar()
+    dispositivos = []
+    for n, chip in enumerate(CHIPS):
+        PLACA.id_unico = chip
+        conexion = GestorConexion(PLACA.red.ssid, "", "esp32_client", "broker.emqx.io",
+                                  unico=caso == "unico")
+        if caso == "inmediata":
+            conexion.sesion.vida_minima_ms = 0
+        disp = Dispositivo(conexion)
+        disp.periodico("muestra", 1000, lambda disp=disp, n=n: disp.publicar(f"bench/sesion/{n}", "1"))
+        dispositivos.append(disp)
+    correr(_Placas(dispositivos), duracion_s)
+    return dispositivos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duracion", type=float, default=600, help="segundos virtuales por caso")
+    args = parser.parse_args()
+
+    hora = 3600 / args.duracion
+    casos = (("inmediata", "mismo id, reconexión inmediata"),
+             ("control", "mismo id, ControlSesion"),
+             ("unico", "id por chip"))
+    print(f"  {'':<32} {'tomas':>7} {'conexiones':>10} {'entregados':>10} {'descartados':>11}")
+    print(f"  {'':<32} {'por hora':>7} {'por hora':>10} {'placa 1/2':>10} {'por hora':>11}")
+    for caso, nombre in casos:
+        dispositivos = medir(caso, args.duracion)
+        entregados = "/".join(str(len(BROKER.por_topic(f"bench/sesion/{n}")))
+                              for n in range(len(dispositivos)))
+        descartados = sum(disp.descartados for disp in dispositivos)
+        print(f"  {nombre:<32} {BROKER.tomas_de_sesion * hora:>7.0f} {BROKER.conexiones * hora:>10.0f} "
+              f"{entregados:>10} {descartados * hora:>11.0f}")
+        ids = ", ".join(disp.conexion.client_id for disp in dispositivos)
+        detectadas = "/".join(str(disp.conexion.sesion.tomas) for disp in dispositivos)
+        print(f"    client ids: {ids}; tomas detectadas en cada placa: {detectadas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Lecturas por segundo de un bus DS18B20 según sondas y resolución (KY-001).
+
+Compara el ciclo anterior del script (``convert_temp``, 750 ms de espera,
+leer solo ``roms[0]`` y 2 s de pausa) con ``sondas.SondasDS18B20``: una
+conversión para todo el bus y lectura de cada ROM apenas termina. Para
+cada cantidad de sondas y resolución reporta lecturas por segundo,
+duración del ciclo y CPU usado por la tarea (reloj virtual).
+
+    python -m emulador.bench_sondas --sondas 1,2,4,8 --resoluciones 9,10,11,12
+"""
+
+import argparse
+
+from emulador import instalar
+from emulador.ejecutar import correr, reiniciar
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+
+instalar()
+
+import onewire  # noqa: E402
+import ds18x20  # noqa: E402
+import uasyncio as asyncio  # noqa: E402
+from machine import Pin  # noqa: E402
+from conexion import GestorConexion  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+from sondas import SondasDS18B20  # noqa: E402
+
+PIN = 26
+
+
+def _preparar(cantidad):
+    reiniciar()
+    PLACA.sondas_ds18b20(PIN, [20.0 + i for i in range(cantidad)])
+    ds = ds18x20.DS18X20(onewire.OneWire(Pin(PIN)))
+    conexion = GestorConexion(PLACA.red.ssid, "", "bench_sondas", "broker.emqx.io")
+    return ds, Dispositivo(conexion)
+
+
+def medir_original(cantidad, duracion_s):
+    ds, disp = _preparar(cantidad)
+    roms = ds.scan()
+    estado = {"lecturas": 0}
+
+    async def leer():
+        while True:
+            ds.convert_temp()
+            await asyncio.sleep_ms(750)
+            ds.read_temp(roms[0])
+            estado["lecturas"] += 1
+            await asyncio.sleep_ms(2000)
+
+    disp.tarea(leer())
+    cpu = RELOJ.cpu_us
+    correr(disp, duracion_s)
+    return estado["lecturas"], 2750, RELOJ.cpu_us - cpu
+
+
+def medir_sondas(cantidad, duracion_s, resolucion, sondeo):
+    ds, disp = _preparar(cantidad)
+    sondas = SondasDS18B20(ds, resolucion=resolucion, sondeo=sondeo)
+    sondas.buscar()
+    disp.tarea(sondas.ejecutar())
+    cpu = RELOJ.cpu_us
+    correr(disp, duracion_s)
+    ciclo_ms = duracion_s * 1000 / max(1, sondas.ciclos)
+    return sondas.lecturas, ciclo_ms, RELOJ.cpu_us - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sondas", default="1,2,4,8", help="sondas en el bus")
+    parser.add_argument("--resoluciones", default="9,10,11,12", help="bits de resolución")
+    parser.add_argument("--duracion", type=float, default=30, help="segundos por prueba")
+    args = parser.parse_args()
+
+    print(f"{'sondas':>6}  {'ciclo':<22} {'lecturas/s':>10} {'ms/ciclo':>8} {'CPU %':>6}")
+    for cantidad in (int(n) for n in args.sondas.split(",")):
+        casos = [("anterior (solo roms[0])", lambda: medir_original(cantidad, args.duracion))]
+        for bits in (int(b) for b in args.resoluciones.split(",")):
+            casos.append((f"{bits} bits, sondeo", lambda b=bits: medir_sondas(cantidad, args.duracion, b, True)))
+        casos.append(("12 bits, parásita", lambda: medir_sondas(cantidad, args.duracion, 12, False)))
+        for nombre, medir in casos:
+            lecturas, ciclo_ms, cpu_us = medir()
+            print(f"{cantidad:>6}  {nombre:<22} {lecturas / args.duracion:>10.2f} {ciclo_ms:>8.0f} "
+                  f"{cpu_us / (args.duracion * 10000):>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
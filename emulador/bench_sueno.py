@@ -0,0 +1,88 @@
+"""Radio encendida y consumo por hora: scripts siempre conectados vs deep sleep.
+
+Corre cada script tal cual (conectado todo el tiempo con ``Dispositivo``)
+y con ``BAJO_CONSUMO = True`` (``sueno.CicloSueno``: despierta por timer
+del RTC, mide, guarda en la memoria RTC y duerme) para cada
+``--envios``, cuántos despertares hay entre subidas del lote. Reporta
+por hora: segundos con la radio encendida, segundos despierto (incluido
+el arranque de ~250 ms tras cada deep sleep), mensajes, y con un modelo
+de corriente por estado (radio, CPU sin radio, deep sleep) el consumo
+promedio y cuántos días dura ``--bateria``.
+
+    python -m emulador.bench_sueno --scripts ky-013,ky-001 --envios 1,5,15,30
+"""
+
+import argparse
+import os
+import re
+import tempfile
+
+import emulador
+from emulador.ejecutar import ejecutar, reiniciar
+from emulador.placa import PLACA
+from emulador.senales import Ruido, Senoidal
+
+SCRIPTS = {
+    "ky-013": "ky-013 Sensor Temperartura.py",
+    "ky-001": "ky-001 Sensor Temperatura.py",
+    "ky-038": "ky-038 Sensor Microfono.py",
+    "mq-135": "MQ-135.py",
+}
+
+
+def _preparar():
+    reiniciar()
+    PLACA.senal(34, Ruido(Senoidal(1500, 400, 30000), 25))
+    PLACA.sondas_ds18b20(26, [21.5])
+
+
+def medir(script, duracion_s, envios=None):
+    """Corre ``script``; con ``envios`` en modo de bajo consumo."""
+    _preparar()
+    ruta = os.path.join(emulador.CARPETA_SCRIPTS, script)
+    with tempfile.TemporaryDirectory() as carpeta:
+        if envios is not None:
+            with open(ruta, encoding="utf-8") as f:
+                fuente = f.read()
+            fuente = re.sub(r"(?m)^BAJO_CONSUMO = False", "BAJO_CONSUMO = True", fuente)
+            fuente = re.sub(r"(?m)^DESPERTARES_POR_ENVIO = \S+", f"DESPERTARES_POR_ENVIO = {envios}", fuente)
+            ruta = os.path.join(carpeta, script)
+            with open(ruta, "w", encoding="utf-8") as f:
+                f.write(fuente)
+        return ejecutar(ruta, duracion_s, flash=os.path.join(carpeta, "flash"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", default="ky-013,ky-001", help=", ".join(SCRIPTS))
+    parser.add_argument("--envios", default="1,5,15,30", help="despertares entre subidas del lote")
+    parser.add_argument("--duracion", type=float, default=600, help="segundos virtuales por corrida")
+    parser.add_argument("--radio-ma", type=float, default=110, help="corriente con la WiFi encendida")
+    parser.add_argument("--cpu-ma", type=float, default=40, help="corriente despierto sin radio")
+    parser.add_argument("--sueno-ma", type=float, default=0.01, help="corriente en deep sleep")
+    parser.add_argument("--bateria", type=float, default=2000, help="capacidad de la batería (mAh)")
+    args = parser.parse_args()
+
+    emulador.instalar()
+    hora = 3600 / args.duracion
+    print(f"  {'':<26} {'radio':>8} {'despierto':>9} {'mensajes':>8} {'corriente':>9} {'batería':>8}")
+    print(f"  {'':<26} {'s/h':>8} {'s/h':>9} {'por hora':>8} {'mA prom.':>9} {'días':>8}")
+    for nombre in args.scripts.split(","):
+        print(nombre)
+        casos = [("siempre conectado", None)]
+        casos += [(f"deep sleep, lote cada {n}", int(n)) for n in args.envios.split(",")]
+        for caso, envios in casos:
+            resumen = medir(SCRIPTS[nombre], args.duracion, envios)
+            radio = resumen["radio_s"]
+            despierto = resumen["virtual_s"] - resumen["sueno_s"]
+            mensajes = sum(datos["mensajes"] for datos in resumen["topics"].values())
+            carga = (radio * args.radio_ma + (despierto - radio) * args.cpu_ma
+                     + resumen["sueno_s"] * args.sueno_ma)
+            corriente = carga / resumen["virtual_s"]
+            error = "  error: " + resumen["error"] if resumen["error"] else ""
+            print(f"  {caso:<26} {radio * hora:>8.1f} {despierto * hora:>9.1f} {mensajes * hora:>8.0f} "
+                  f"{corriente:>9.2f} {args.bateria / corriente / 24:>8.1f}{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""Broker MQTT 3.1.1 en proceso.
+
+Los ``MQTTClient`` emulados escriben paquetes MQTT reales en un
+``SocketVirtual``; el broker los decodifica, registra cada publicación
+(con su instante virtual) y entrega a los suscriptores. Implementa lo
+necesario para medir el comportamiento de los scripts: QoS 0/1,
+mensajes retenidos, Last Will, keepalive y toma de sesión cuando dos
+clientes usan el mismo client id.
+"""
+
+import errno
+import struct
+
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ, interno
+
+
+class Mensaje:
+    def __init__(self, instante_us, cliente, topic, payload, retain, qos):
+        self.instante_us = instante_us
+        self.cliente = cliente
+        self.topic = topic
+        self.payload = payload
+        self.retain = retain
+        self.qos = qos
+
+    def __repr__(self):
+        return f"Mensaje({self.instante_us / 1e6:.3f}s, {self.topic!r}, {self.payload!r})"
+
+
+def coincide(filtro, topic):
+    """Compara un filtro con comodines ``+``/``#`` contra un topic."""
+    partes_filtro = filtro.split(b"/")
+    partes_topic = topic.split(b"/")
+    for i, parte in enumerate(partes_filtro):
+        if parte == b"#":
+            return True
+        if i >= len(partes_topic):
+            return False
+        if parte != b"+" and parte != partes_topic[i]:
+            return False
+    return len(partes_filtro) == len(partes_topic)
+
+
+class SocketVirtual:
+    """Lado cliente de la conexión TCP con el broker."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.entrada = bytearray()   # broker -> cliente
+        self._pendiente = bytearray()  # cliente -> broker, sin decodificar
+        self.bloqueante = True
+        self.cerrado = False
+        self.client_id = None
+        self.keepalive = 0
+        self.ultima_actividad_us = 0
+        self.will = None
+        self.suscripciones = []
+        self.escrituras = 0
+        self.bytes_escritos = 0
+
+    def _verificar(self):
+        if self.cerrado:
+            raise OSError(errno.ECONNRESET, "conexión cerrada por el broker")
+        if not PLACA.red.enlace():
+            self.broker.desconectar(self, publicar_will=True)
+            raise OSError(errno.ECONNABORTED, "sin enlace WiFi")
+
+    def setblocking(self, valor):
+        self.bloqueante = bool(valor)
+
+    def settimeout(self, segundos):
+        self.bloqueante = segundos is None or segundos > 0
+
+    @interno
+    def write(self, datos, longitud=None):
+        self._verificar()
+        datos = bytes(datos if longitud is None else memoryview(datos)[:longitud])
+        self.escrituras += 1
+        self.bytes_escritos += len(datos)
+        self.broker.escrituras += 1
+        RELOJ.ocupar_us(PLACA.red.escritura_us)
+        self.ultima_actividad_us = RELOJ.ahora_us()
+        self._pendiente += datos
+        self.broker.procesar(self)
+        return len(datos)
+
+    send = write
+
+    @interno
+    def read(self, cantidad):
+        while len(self.entrada) < cantidad:
+            if self.cerrado:
+                if self.entrada:
+                    break
+                return b""
+            self._verificar()
+            if not self.bloqueante:
+                if not self.entrada:
+                    return None
+                break
+            # Bloqueado esperando al broker: el tiempo virtual sigue corriendo
+            RELOJ.dormir_us(1000)
+            self.broker.revisar_keepalive()
+        datos = bytes(self.entrada[:cantidad])
+        del self.entrada[:cantidad]
+        return datos
+
+    recv = read
+
+    def close(self):
+        if not self.cerrado:
+            self.broker.desconectar(self, publicar_will=True)
+
+
+class Broker:
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.mensajes = []
+        self.retenidos = {}
+        self.sesiones = {}
+        self.conexiones = 0
+        self.tomas_de_sesion = 0
+        self.wills_publicados = 0
+        self.desconexiones_keepalive = 0
+        self.paquetes = 0
+        self.bytes = 0
+        self.escrituras = 0
+        self._observadores = []
+
+    # -- API para benchmarks ------------------------------------------------
+    def conectar(self):
+        return SocketVirtual(self)
+
+    def observar(self, funcion):
+        # funcion(mensaje) se llama en cada publicación recibida
+        self._observadores.append(funcion)
+
+    def inyectar(self, topic, payload, retain=False):
+        """Publica desde "fuera" (Node-RED, un panel) hacia los dispositivos."""
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self._publicar(None, topic, payload, retain, 0)
+
+    def programar(self, instante_us, topic, payload, retain=False):
+        """``inyectar()`` en el instante virtual ``instante_us`` (para
+        comandos que llegan mientras el script corre)."""
+        RELOJ.externo(instante_us, lambda: self.inyectar(topic, payload, retain))
+
+    def por_topic(self, topic):
+        if isinstance(topic, str):
+            topic = topic.encode()
+        return [m for m in self.mensajes if m.topic == topic]
+
+    # -- protocolo -----------------------------------------------------------
+    def procesar(self, sock):
+        buf = sock._pendiente
+        while len(buf) >= 2:
+            longitud, multiplicador, i = 0, 1, 1
+            while True:
+                if i >= len(buf):
+                    return
+                byte = buf[i]
+                longitud += (byte & 0x7F) * multiplicador
+                multiplicador *= 128
+                i += 1
+                if not byte & 0x80:
+                    break
+            if len(buf) < i + longitud:
+                return
+            tipo = buf[0]
+            cuerpo = bytes(buf[i:i + longitud])
+            del buf[:i + longitud]
+            self.paquetes += 1
+            self.bytes += i + longitud
+            self._paquete(sock, tipo, cuerpo)
+            if sock.cerrado:
+                return
+
+    def _paquete(self, sock, tipo, cuerpo):
+        operacion = tipo & 0xF0
+        if operacion == 0x10:
+            self._connect(sock, cuerpo)
+        elif operacion == 0x30:
+            qos = (tipo >> 1) & 0x03
+            retain = bool(tipo & 0x01)
+            largo = struct.unpack("!H", cuerpo[:2])[0]
+            topic = cuerpo[2:2 + largo]
+            resto = cuerpo[2 + largo:]
+            if qos:
+                pid, resto = resto[:2], resto[2:]
+                sock.entrada += b"\x40\x02" + pid
+            self._publicar(sock, topic, resto, retain, qos)
+        elif operacion == 0x80:
+            pid = cuerpo[:2]
+            i = 2
+            codigos = bytearray()
+            filtros = []
+            while i < len(cuerpo):
+                largo = struct.unpack("!H", cuerpo[i:i + 2])[0]
+                filtro = cuerpo[i + 2:i + 2 + largo]
+                codigos.append(cuerpo[i + 2 + largo] & 0x01)
+                i += 3 + largo
+                filtros.append(filtro)
+                if filtro not in sock.suscripciones:
+                    sock.suscripciones.append(filtro)
+            sock.entrada += bytes([0x90, 2 + len(codigos)]) + pid + codigos
+            # Los retenidos llegan después del SUBACK
+            for filtro in filtros:
+                for topic, mensaje in self.retenidos.items():
+                    if coincide(filtro, topic):
+                        self._entregar(sock, topic, mensaje, True)
+        elif operacion == 0xC0:
+            sock.entrada += b"\xd0\x00"
+        elif operacion == 0xE0:
+            self.desconectar(sock, publicar_will=False)
+
+    def _connect(self, sock, cuerpo):
+        largo = struct.unpack("!H", cuerpo[:2])[0]
+        i = 2 + largo
+        banderas = cuerpo[i + 1]
+        sock.keepalive = struct.unpack("!H", cuerpo[i + 2:i + 4])[0]
+        i += 4
+
+        def cadena(i):
+            largo = struct.unpack("!H", cuerpo[i:i + 2])[0]
+            return cuerpo[i + 2:i + 2 + largo], i + 2 + largo
+
+        client_id, i = cadena(i)
+        if banderas & 0x04:
+            topic_will, i = cadena(i)
+            mensaje_will, i = cadena(i)
+            sock.will = (topic_will, mensaje_will, bool(banderas & 0x20), (banderas >> 3) & 0x03)
+        sock.client_id = client_id
+        anterior = self.sesiones.get(client_id)
+        if anterior is not None and anterior is not sock:
+            # Mismo client id: el broker expulsa la sesión anterior
+            self.tomas_de_sesion += 1
+            self.desconectar(anterior, publicar_will=True)
+        self.sesiones[client_id] = sock
+        self.conexiones += 1
+        sock.ultima_actividad_us = RELOJ.ahora_us()
+        sock.entrada += b"\x20\x02\x00\x00"
+
+    def _publicar(self, origen, topic, payload, retain, qos):
+        self.revisar_keepalive()
+        mensaje = Mensaje(RELOJ.ahora_us(), origen.client_id if origen else None,
+                          topic, payload, retain, qos)
+        self.mensajes.append(mensaje)
+        if retain:
+            if payload:
+                self.retenidos[topic] = payload
+            else:
+                self.retenidos.pop(topic, None)
+        for sock in list(self.sesiones.values()):
+            for filtro in sock.suscripciones:
+                if coincide(filtro, topic):
+                    self._entregar(sock, topic, payload, False)
+                    break
+        for funcion in self._observadores:
+            funcion(mensaje)
+
+    def _entregar(self, sock, topic, payload, retain):
+        largo = 2 + len(topic) + len(payload)
+        cabecera = bytearray([0x30 | (1 if retain else 0)])
+        while True:
+            byte = largo & 0x7F
+            largo >>= 7
+            cabecera.append(byte | (0x80 if largo else 0))
+            if not largo:
+                break
+        sock.entrada += cabecera + struct.pack("!H", len(topic)) + topic + payload
+
+    def desconectar(self, sock, publicar_will):
+        if sock.cerrado:
+            return
+        sock.cerrado = True
+        if self.sesiones.get(sock.client_id) is sock:
+            del self.sesiones[sock.client_id]
+        if publicar_will and sock.will is not None:
+            topic, mensaje, retain, qos = sock.will
+            self.wills_publicados += 1
+            self._publicar(None, topic, mensaje, retain, qos)
+
+    def revisar_keepalive(self):
+        ahora = RELOJ.ahora_us()
+        for sock in list(self.sesiones.values()):
+            if sock.keepalive and ahora - sock.ultima_actividad_us > sock.keepalive * 1500000:
+                self.desconexiones_keepalive += 1
+                self.desconectar(sock, publicar_will=True)
+
+
+BROKER = Broker()
@@ -0,0 +1,113 @@
+"""Bucle de asyncio que corre sobre el reloj virtual.
+
+``time()`` devuelve el tiempo emulado y, cuando no hay nada listo, el
+selector salta el reloj hasta el próximo timer de asyncio o evento de
+hardware (IRQ, ``machine.Timer``) en lugar de bloquear en tiempo real.
+"""
+
+import asyncio
+import selectors
+
+from emulador.reloj import RELOJ, FinEmulacion
+
+
+class _SelectorVirtual(selectors.BaseSelector):
+    def __init__(self):
+        self._real = selectors.DefaultSelector()
+        self.agotado = False
+
+    def register(self, fileobj, events, data=None):
+        return self._real.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._real.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._real.modify(fileobj, events, data)
+
+    def get_map(self):
+        return self._real.get_map()
+
+    def close(self):
+        self._real.close()
+
+    def select(self, timeout=None):
+        eventos = self._real.select(0)
+        if eventos or timeout == 0 or self.agotado:
+            return eventos
+        if timeout is None:
+            # Sin timers pendientes: solo un evento de hardware puede despertar
+            timeout = 3600.0
+        try:
+            fin = RELOJ.ahora_us() + int(timeout * 1000000)
+            while True:
+                RELOJ.dormir_hasta_evento(fin - RELOJ.ahora_us())
+                eventos = self._real.select(0)
+                if eventos or RELOJ.ahora_us() >= fin:
+                    return eventos
+        except FinEmulacion:
+            # Desde aquí el selector ya no espera: asyncio.run() puede
+            # cancelar las tareas pendientes mientras la excepción sube
+            self.agotado = True
+            raise
+
+
+class BucleVirtual(asyncio.SelectorEventLoop):
+    def __init__(self):
+        selector = _SelectorVirtual()
+        super().__init__(selector)
+        self._selector_virtual = selector
+
+    def call_exception_handler(self, context):
+        # El límite alcanzado dentro de una tarea (y no en el selector) llega
+        # aquí. Desde un callback se deja subir para que run_until_complete()
+        # termine; desde el __del__ de una tarea ya terminada se ignora (el
+        # selector lo volverá a encontrar al esperar el próximo timer)
+        if isinstance(context.get("exception"), FinEmulacion):
+            if "handle" in context:
+                self._selector_virtual.agotado = True
+                raise context["exception"]
+            return
+        super().call_exception_handler(context)
+
+    def time(self):
+        if self._selector_virtual.agotado:
+            return RELOJ._ahora_us / 1000000
+        return RELOJ.ahora_us() / 1000000
+
+
+class PoliticaVirtual(asyncio.DefaultEventLoopPolicy):
+    def new_event_loop(self):
+        return BucleVirtual()
+
+
+def cerrar(bucle):
+    """Cancela las tareas pendientes de ``bucle`` y lo cierra.
+
+    Con un ``BucleVirtual`` el reloj queda detenido mientras tanto: si
+    una tarea consultara el tiempo al cancelarse volvería a chocar con el
+    límite de la emulación y las demás quedarían sin terminar. Con
+    ``instalar(tiempo_real=True)`` el bucle es el de asyncio y se cierra
+    como lo haría ``asyncio.run()``.
+    """
+    if not isinstance(bucle, BucleVirtual):
+        _cancelar(bucle)
+        return
+    limite = RELOJ.limite_us
+    RELOJ.limite_us = None
+    bucle._selector_virtual.agotado = True
+    try:
+        _cancelar(bucle)
+    finally:
+        RELOJ.limite_us = limite
+
+
+def _cancelar(bucle):
+    try:
+        pendientes = asyncio.all_tasks(bucle)
+        for tarea in pendientes:
+            tarea.cancel()
+        bucle.run_until_complete(asyncio.gather(*pendientes, return_exceptions=True))
+        bucle.run_until_complete(bucle.shutdown_asyncgens())
+    finally:
+        bucle.close()
@@ -0,0 +1,230 @@
+"""Ejecuta un script de sensor sin modificar, sin placa y sin red.
+
+    python -m emulador.ejecutar "Codigos Sensores KY Y MQ/MQ-135.py" --duracion 120 \\
+        --senal 34=seno:1500,400,30000+ruido:25
+
+Al terminar reporta tiempo virtual vs real, costo de CPU del script,
+mensajes y bytes publicados por topic, uso del socket y tiempo con la
+radio encendida y en deep sleep. ``ejecutar()``
+devuelve el mismo resumen como diccionario para los benchmarks.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import runpy
+import sys
+import tempfile
+import time
+
+import emulador
+from emulador.broker import BROKER
+from emulador.bucle import cerrar
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ, FinEmulacion
+from emulador.senales import Encoder, desde_texto
+
+
+def reiniciar():
+    """Deja placa, reloj y broker como recién encendidos."""
+    escala = RELOJ.escala_cpu
+    RELOJ.__init__(escala_cpu=escala)
+    PLACA.__init__()
+    BROKER.reiniciar()
+    _reiniciar_modulos()
+
+
+def _reiniciar_modulos():
+    # Interfaces de red y estado de reinicio viven en los módulos sustitutos
+    network = sys.modules.get("network")
+    if network is not None:
+        network._interfaces.clear()
+    machine = sys.modules.get("machine")
+    if machine is not None:
+        machine._causa_reinicio = machine.PWRON_RESET
+    urequests = sys.modules.get("urequests")
+    if urequests is not None:
+        urequests.solicitudes.clear()
+
+
+def _arrancar(ruta, salida):
+    # Cada arranque importa de cero los módulos de lib/ (como tras un reset)
+    for nombre, modulo in list(sys.modules.items()):
+        archivo = getattr(modulo, "__file__", None) or ""
+        if archivo.startswith(emulador.CARPETA_LIB):
+            del sys.modules[nombre]
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
+    with contextlib.redirect_stdout(salida):
+        runpy.run_path(ruta, run_name="__main__")
+
+
+def ejecutar(ruta, duracion_s=60.0, salida=None, max_reinicios=1000, flash=None):
+    """Corre ``ruta`` hasta ``duracion_s`` segundos virtuales.
+
+    La placa (señales, sondas, red) debe configurarse antes de llamar.
+    Los archivos que escriba el script quedan en ``flash`` (por defecto
+    una carpeta temporal), que hace de sistema de archivos del ESP32.
+    """
+    emulador.instalar()
+    import machine
+
+    ruta = os.path.abspath(ruta)
+    flash = flash or tempfile.mkdtemp(prefix="flash_")
+    os.makedirs(flash, exist_ok=True)
+    directorio_original = os.getcwd()
+    os.chdir(flash)
+
+    salida = salida if salida is not None else io.StringIO()
+    RELOJ.limite_us = RELOJ.ahora_us() + int(duracion_s * 1000000)
+    inicio_real = time.perf_counter()
+    arranques = 0
+    error = None
+    while True:
+        arranques += 1
+        RELOJ._fuentes.clear()
+        RELOJ._eventos.clear()
+        try:
+            _arrancar(ruta, salida)
+            break  # El script terminó por sí solo
+        except FinEmulacion:
+            break
+        except machine.Reinicio as reinicio:
+            if arranques > max_reinicios:
+                break
+            machine._causa_reinicio = reinicio.causa
+            sys.modules["network"]._interfaces.clear()
+            PLACA.red.radio(False)
+            RELOJ.arranque_us = RELOJ._ahora_us
+        except Exception as e:  # noqa: BLE001 - se reporta, no se oculta
+            error = e
+            break
+    real_s = time.perf_counter() - inicio_real
+    RELOJ.limite_us = None
+    os.chdir(directorio_original)
+    virtual_us = RELOJ._ahora_us
+    return _resumen(virtual_us, real_s, arranques, error)
+
+
+def correr(dispositivo, duracion_s, flash=None):
+    """Corre un ``Dispositivo`` armado en el benchmark durante ``duracion_s``
+    segundos virtuales, sin mostrar sus ``print``. Sin ``flash`` los
+    archivos que escriba (p. ej. ``red.json``) van a una carpeta temporal."""
+    import uasyncio as asyncio
+
+    bucle = asyncio.new_event_loop()
+    asyncio.set_event_loop(bucle)
+    RELOJ.limite_us = RELOJ.ahora_us() + int(duracion_s * 1000000)
+    directorio_original = os.getcwd()
+    temporal = None
+    if flash is None:
+        temporal = tempfile.TemporaryDirectory(prefix="flash_")
+        flash = temporal.name
+    os.chdir(flash)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            bucle.run_until_complete(dispositivo.principal())
+    except FinEmulacion:
+        pass
+    finally:
+        RELOJ.limite_us = None
+        os.chdir(directorio_original)
+        if temporal is not None:
+            temporal.cleanup()
+        cerrar(bucle)
+        asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+def _resumen(virtual_us, real_s, arranques, error):
+    virtual_s = virtual_us / 1000000 or 1e-9
+    topics = {}
+    for mensaje in BROKER.mensajes:
+        if mensaje.cliente is None:
+            continue
+        datos = topics.setdefault(mensaje.topic.decode(), {"mensajes": 0, "bytes": 0})
+        datos["mensajes"] += 1
+        datos["bytes"] += len(mensaje.payload)
+    for datos in topics.values():
+        datos["por_segundo"] = datos["mensajes"] / virtual_s
+    return {
+        "virtual_s": virtual_s,
+        "real_s": real_s,
+        "cpu_pct": 100.0 * RELOJ.cpu_us / (virtual_s * 1000000),
+        "arranques": arranques,
+        "error": repr(error) if error else None,
+        "topics": topics,
+        "paquetes": BROKER.paquetes,
+        "bytes_mqtt": BROKER.bytes,
+        "escrituras": BROKER.escrituras,
+        "conexiones": BROKER.conexiones,
+        "tomas_de_sesion": BROKER.tomas_de_sesion,
+        "radio_s": PLACA.red.radio_total_us() / 1000000,
+        "sueno_s": PLACA.sueno_us / 1000000,
+    }
+
+
+def imprimir(resumen):
+    print(f"Tiempo virtual: {resumen['virtual_s']:.1f} s  (real {resumen['real_s']:.2f} s, "
+          f"x{resumen['virtual_s'] / max(resumen['real_s'], 1e-9):.0f})")
+    print(f"CPU del script: {resumen['cpu_pct']:.1f}%  Arranques: {resumen['arranques']}  "
+          f"Conexiones MQTT: {resumen['conexiones']}")
+    print(f"Radio encendida: {resumen['radio_s']:.1f} s  Deep sleep: {resumen['sueno_s']:.1f} s")
+    if resumen["error"]:
+        print(f"El script terminó con error: {resumen['error']}")
+    print(f"{'topic':<32} {'mensajes':>9} {'msg/s':>8} {'bytes':>9}")
+    for topic, datos in sorted(resumen["topics"].items()):
+        print(f"{topic:<32} {datos['mensajes']:>9} {datos['por_segundo']:>8.2f} {datos['bytes']:>9}")
+    print(f"Paquetes MQTT: {resumen['paquetes']}  Escrituras TCP: {resumen['escrituras']}  "
+          f"Bytes en el socket: {resumen['bytes_mqtt']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("script")
+    parser.add_argument("--duracion", type=float, default=60.0, help="segundos virtuales")
+    parser.add_argument("--senal", action="append", default=[], metavar="PIN=ESPEC",
+                        help="señal de entrada, p. ej. 34=pulso:72 o 14=cuadrada:500")
+    parser.add_argument("--sondas", action="append", default=[], metavar="PIN=T1,T2",
+                        help="sondas DS18B20 en un bus 1-Wire")
+    parser.add_argument("--dht", action="append", default=[], metavar="PIN=T,H[,ERRORES]",
+                        help="DHT11 con temperatura, humedad y probabilidad de lectura fallida")
+    parser.add_argument("--encoder", action="append", default=[], metavar="CLK,DT=T_MS:PASOS_S,...",
+                        help="encoder en cuadratura, p. ej. 26,25=0:5,2000:-20")
+    parser.add_argument("--corte", action="append", default=[], metavar="INICIO_MS,MS",
+                        help="corte de WiFi")
+    parser.add_argument("--escala-cpu", type=float, default=None,
+                        help="cuántas veces más lento es el ESP32 que este equipo")
+    parser.add_argument("--flash", default=None, help="carpeta que hace de sistema de archivos")
+    parser.add_argument("--ver-salida", action="store_true", help="mostrar los print del script")
+    args = parser.parse_args()
+
+    emulador.instalar(escala_cpu=args.escala_cpu)
+    reiniciar()
+    for especificacion in args.senal:
+        pin, _, senal = especificacion.partition("=")
+        PLACA.senal(int(pin), desde_texto(senal))
+    for especificacion in args.sondas:
+        pin, _, temperaturas = especificacion.partition("=")
+        PLACA.sondas_ds18b20(int(pin), [float(t) for t in temperaturas.split(",")])
+    for especificacion in args.dht:
+        pin, _, valores = especificacion.partition("=")
+        PLACA.dht11(int(pin), *(float(v) for v in valores.split(",")))
+    for especificacion in args.encoder:
+        pines, _, perfil = especificacion.partition("=")
+        clk, dt = (int(p) for p in pines.split(","))
+        encoder = Encoder([tuple(float(v) for v in punto.split(":")) for punto in perfil.split(",")])
+        PLACA.senal(clk, encoder.canal(0))
+        PLACA.senal(dt, encoder.canal(1))
+    for especificacion in args.corte:
+        inicio, duracion = especificacion.split(",")
+        PLACA.red.cortar(int(inicio), int(duracion))
+
+    resumen = ejecutar(args.script, args.duracion, sys.stdout if args.ver_salida else None,
+                       flash=args.flash)
+    imprimir(resumen)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Mide la latencia de planificación del runtime ``Dispositivo`` en Linux.
+
+Registra varios sensores periódicos y una reconexión simulada (espera
+asíncrona de WiFi + un ``connect()`` bloqueante) y reporta el retraso
+promedio y máximo de cada tarea.
+
+    python -m emulador.latencia --sensores 4 --periodo 10 --duracion 5
+"""
+
+import argparse
+import time
+
+from emulador import instalar
+
+instalar(tiempo_real=True)
+
+import uasyncio as asyncio  # noqa: E402
+from dispositivo import Dispositivo  # noqa: E402
+
+
+def _ocupar(us):
+    # Simula el costo de CPU de una lectura o de un socket bloqueante
+    fin = time.perf_counter() + us / 1000000
+    while time.perf_counter() < fin:
+        pass
+
+
+async def _reconexiones(intervalo_ms, wifi_ms, connect_ms):
+    while True:
+        await asyncio.sleep_ms(intervalo_ms)
+        # Asociación WiFi: se sondea sin bloquear
+        inicio = time.ticks_ms()
+        while time.ticks_diff(time.ticks_ms(), inicio) < wifi_ms:
+            await asyncio.sleep_ms(100)
+        # MQTTClient.connect() sí bloquea
+        _ocupar(connect_ms * 1000)
+
+
+def medir(sensores=4, periodo_ms=10, duracion_s=5.0, costo_us=200,
+          intervalo_reconexion_ms=1000, wifi_ms=2000, connect_ms=5):
+    disp = Dispositivo()
+    for i in range(sensores):
+        disp.periodico(f"sensor{i}", periodo_ms,
+                       lambda i=i: disp.publicar("emulador/latencia", str(i)))
+        if costo_us:
+            disp.periodico(f"carga{i}", periodo_ms, lambda: _ocupar(costo_us))
+    disp.tarea(_reconexiones(intervalo_reconexion_ms, wifi_ms, connect_ms))
+
+    async def limitado():
+        try:
+            await asyncio.wait_for(disp.principal(), duracion_s)
+        except asyncio.TimeoutError:
+            pass
+
+    asyncio.run(limitado())
+    return disp.estadisticas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sensores", type=int, default=4)
+    parser.add_argument("--periodo", type=int, default=10, help="periodo de muestreo en ms")
+    parser.add_argument("--duracion", type=float, default=5.0, help="segundos de medición")
+    parser.add_argument("--costo", type=int, default=200, help="µs de CPU por lectura")
+    parser.add_argument("--connect", type=int, default=5, help="ms que bloquea cada connect()")
+    args = parser.parse_args()
+
+    resumen = medir(args.sensores, args.periodo, args.duracion, args.costo,
+                    connect_ms=args.connect)
+    print(f"{'tarea':<10} {'n':>6} {'prom (µs)':>10} {'máx (µs)':>10}")
+    for nombre, datos in sorted(resumen.items()):
+        print(f"{nombre:<10} {datos['n']:>6} {datos['promedio_us']:>10} {datos['maximo_us']:>10}")
+
+
+if __name__ == "__main__":
+    main()
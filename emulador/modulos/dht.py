@@ -0,0 +1,59 @@
+"""Sustituto de ``dht``: DHT11/DHT22 con los valores de ``PLACA.dht``.
+
+``measure()`` ocupa el CPU lo que dura la trama real (~23 ms con las
+interrupciones apagadas) y falla con ``OSError`` como el módulo de
+MicroPython: si no hay sensor, si se consulta antes de que pase el
+intervalo mínimo del sensor, o al azar con la probabilidad configurada.
+"""
+
+import errno
+import random
+
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+
+TRAMA_US = 23000
+
+
+class DHTBase:
+    INTERVALO_MIN_US = 1000000
+
+    def __init__(self, pin):
+        self.pin = pin.id
+        self._t = 0
+        self._h = 0
+        self._ultima_us = None
+        self._azar = random.Random(self.pin)
+
+    def measure(self):
+        ahora = RELOJ.ahora_us()
+        RELOJ.ocupar_us(TRAMA_US)
+        config = PLACA.dht.get(self.pin)
+        # Antes del intervalo mínimo el sensor no contesta
+        if config is None or (self._ultima_us is not None
+                              and ahora - self._ultima_us < self.INTERVALO_MIN_US):
+            raise OSError(errno.ETIMEDOUT)
+        self._ultima_us = ahora
+        temperatura, humedad, errores = config
+        if self._azar.random() < errores:
+            raise Exception("checksum error")
+        self._t = temperatura(ahora)
+        self._h = humedad(ahora)
+
+
+class DHT11(DHTBase):
+    def temperature(self):
+        return int(self._t)
+
+    def humidity(self):
+        return int(self._h)
+
+
+class DHT22(DHTBase):
+    INTERVALO_MIN_US = 2000000
+
+    def temperature(self):
+        return round(self._t, 1)
+
+    def humidity(self):
+        return round(self._h, 1)
@@ -0,0 +1,66 @@
+"""Sustituto de ``ds18x20`` con tiempos de conversión según la resolución."""
+
+from emulador.reloj import RELOJ
+
+# Tiempo de conversión del DS18B20 por resolución (bits -> µs)
+CONVERSION_US = {9: 93750, 10: 187500, 11: 375000, 12: 750000}
+
+
+class DS18X20:
+    def __init__(self, onewire):
+        self.ow = onewire
+        self.resoluciones = {}
+        self._inicio_us = {}
+        self._valor = {}
+
+    def scan(self):
+        return self.ow.scan()
+
+    def _sonda(self, rom):
+        for candidata, temperatura in self.ow.sondas():
+            if candidata == bytes(rom):
+                return temperatura
+        raise Exception("CRC error")
+
+    def convert_temp(self, rom=None):
+        # reset + SKIP_ROM/MATCH_ROM + comando
+        self.ow.reset()
+        self.ow.escribir_bytes(2 if rom is None else 10)
+        ahora = RELOJ.ahora_us()
+        roms = [bytes(rom)] if rom is not None else [r for r, _ in self.ow.sondas()]
+        fin = ahora
+        for r in roms:
+            self._inicio_us[r] = ahora
+            fin = max(fin, ahora + CONVERSION_US[self.resoluciones.get(r, 12)])
+        self.ow.ocupado_hasta_us = fin
+
+    def _lista(self, rom):
+        inicio = self._inicio_us[rom]
+        return RELOJ.ahora_us() - inicio >= CONVERSION_US[self.resoluciones.get(rom, 12)]
+
+    def read_scratch(self, rom):
+        self.ow.reset()
+        self.ow.escribir_bytes(19)
+        return bytearray(9)
+
+    def write_scratch(self, rom, buf):
+        self.ow.reset()
+        self.ow.escribir_bytes(13)
+        # Byte de configuración: bits 5-6 = resolución - 9
+        self.resoluciones[bytes(rom)] = 9 + ((buf[2] >> 5) & 0x03)
+
+    def read_temp(self, rom):
+        self.ow.reset()
+        self.ow.escribir_bytes(19)
+        rom = bytes(rom)
+        temperatura = self._sonda(rom)
+        inicio = self._inicio_us.get(rom)
+        if inicio is None:
+            return 85.0  # Valor de encendido del scratchpad
+        if not self._lista(rom):
+            return self._valor.get(rom, 85.0)
+        resolucion = self.resoluciones.get(rom, 12)
+        paso = 0.0625 * (1 << (12 - resolucion))
+        valor = round(temperatura(inicio) / paso) * paso
+        self._valor[rom] = valor
+        return valor
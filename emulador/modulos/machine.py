@@ -0,0 +1,307 @@
+"""Sustituto de ``machine`` respaldado por ``emulador.placa``."""
+
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ, interno
+
+# Retardo entre el flanco y la entrada al handler en el puerto ESP32
+LATENCIA_IRQ_US = 25
+
+PWRON_RESET = 1
+HARD_RESET = 2
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+
+_causa_reinicio = PWRON_RESET
+
+
+class Reinicio(BaseException):
+    """``machine.reset()``/``deepsleep()``: el ejecutor vuelve a arrancar el script."""
+
+    def __init__(self, causa):
+        super().__init__(causa)
+        self.causa = causa
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 2
+    IRQ_RISING = 1
+    WAKE_LOW = 4
+    WAKE_HIGH = 5
+
+    @interno
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.modo = mode
+        self.pull = pull
+        self._salida = 0
+        self._handler = None
+        self._trigger = 0
+        self._programado_us = 0
+        self._pendiente_us = -1
+        self._inicio_handler_us = -1
+        self._fin_handler_us = -1
+        self._pendiente_de = -1
+        self.irq_atendidas = 0
+        self.irq_perdidas = 0
+        if value is not None:
+            self.value(value)
+
+    def _por_defecto(self):
+        return 1 if self.pull == Pin.PULL_UP else 0
+
+    @interno
+    def value(self, valor=None):
+        if valor is None:
+            if self.modo == Pin.OUT:
+                return self._salida
+            return PLACA.leer(self.id, self._por_defecto())
+        self._salida = 1 if valor else 0
+        PLACA.escribir(self.id, self._salida)
+
+    __call__ = value
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.modo = mode
+        if pull != -1:
+            self.pull = pull
+        if value is not None:
+            self.value(value)
+
+    @interno
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+        if handler is None:
+            RELOJ.quitar_fuente(self)
+        else:
+            self._programado_us = RELOJ.ahora_us()
+            RELOJ.registrar_fuente(self)
+
+    # -- fuente de eventos para el reloj -----------------------------------
+    def programar_hasta(self, destino_us):
+        senal = PLACA.senales.get(self.id)
+        if senal is None or destino_us <= self._programado_us:
+            return
+        for instante, nivel in senal.flancos(self._programado_us, destino_us):
+            flanco = Pin.IRQ_RISING if nivel else Pin.IRQ_FALLING
+            if not self._trigger & flanco:
+                continue
+            # Un flanco que llega con la IRQ aún pendiente se pierde
+            # (el ESP32 solo guarda un bit de pendiente por pin)
+            if instante < self._pendiente_us:
+                self.irq_perdidas += 1
+                continue
+            self._pendiente_us = instante + LATENCIA_IRQ_US
+            RELOJ.programar(self._pendiente_us, lambda instante=instante: self._atender(instante))
+        self._programado_us = destino_us
+
+    def _atender(self, instante):
+        if instante < self._fin_handler_us:
+            # Llegó con el handler anterior pendiente o corriendo: el ESP32
+            # guarda un solo bit de pendiente, el resto de la ventana se pierde
+            if instante < self._inicio_handler_us or self._pendiente_de == self._inicio_handler_us:
+                self.irq_perdidas += 1
+                return
+            self._pendiente_de = self._inicio_handler_us
+        self.irq_atendidas += 1
+        if self._handler is None:
+            return
+        self._inicio_handler_us = RELOJ._ahora_us
+        self._handler(self)
+        # Cobra ya el CPU del handler para saber cuándo terminó
+        RELOJ.cpu()
+        self._fin_handler_us = RELOJ._ahora_us
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_9BIT = 0
+    WIDTH_10BIT = 1
+    WIDTH_11BIT = 2
+    WIDTH_12BIT = 3
+
+    # Tiempo de una conversión del ADC1 del ESP32
+    CONVERSION_US = 40
+
+    def __init__(self, pin, atten=ATTN_0DB):
+        self.pin = pin.id if isinstance(pin, Pin) else pin
+        self._atenuacion = atten
+        self._bits = 12
+        self.lecturas = 0
+
+    def atten(self, atenuacion):
+        self._atenuacion = atenuacion
+
+    def width(self, ancho):
+        self._bits = 9 + ancho
+
+    @interno
+    def _crudo(self):
+        self.lecturas += 1
+        RELOJ.ocupar_us(ADC.CONVERSION_US)
+        return min(4095, max(0, int(PLACA.leer(self.pin, 0))))
+
+    def read(self):
+        return self._crudo() >> (12 - self._bits)
+
+    def read_u16(self):
+        crudo = self._crudo()
+        return (crudo << 4) | (crudo >> 8)
+
+    def read_uv(self):
+        return self._crudo() * 3300000 // 4095
+
+
+class PWM:
+    def __init__(self, pin, freq=5000, duty=None, duty_u16=None):
+        self.pin = pin.id if isinstance(pin, Pin) else pin
+        self._freq = freq
+        self._duty = 0
+        if duty is not None:
+            self.duty(duty)
+        elif duty_u16 is not None:
+            self.duty_u16(duty_u16)
+
+    def freq(self, valor=None):
+        if valor is None:
+            return self._freq
+        self._freq = valor
+
+    @interno
+    def duty(self, valor=None):
+        if valor is None:
+            return self._duty
+        self._duty = int(valor)
+        PLACA.escribir(self.pin, self._duty)
+
+    def duty_u16(self, valor=None):
+        if valor is None:
+            return self._duty << 6
+        self.duty(int(valor) >> 6)
+
+    def deinit(self):
+        PLACA.escribir(self.pin, 0)
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, **kwargs):
+        self.id = id
+        self._callback = None
+        if kwargs:
+            self.init(**kwargs)
+
+    @interno
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        self.deinit()
+        if freq > 0:
+            self._periodo_us = int(1000000 / freq)
+        else:
+            self._periodo_us = int(period * 1000)
+        self._modo = mode
+        self._callback = callback
+        self._siguiente = RELOJ.ahora_us() + self._periodo_us
+        RELOJ.programar(self._siguiente, self._disparar)
+
+    def _disparar(self):
+        if self._callback is None:
+            return
+        if self._modo == Timer.PERIODIC:
+            self._siguiente += self._periodo_us
+            RELOJ.programar(self._siguiente, self._disparar)
+        callback = self._callback
+        if self._modo == Timer.ONE_SHOT:
+            self._callback = None
+        callback(self)
+
+    def deinit(self):
+        if self._callback is not None:
+            RELOJ.cancelar(self._disparar)
+        self._callback = None
+
+
+class RTC:
+    def __init__(self):
+        pass
+
+    def memory(self, datos=None):
+        if datos is None:
+            return PLACA.memoria_rtc
+        if len(datos) > 2048:
+            raise ValueError("RTC memory limitada a 2048 bytes")
+        PLACA.memoria_rtc = bytes(datos)
+
+    def datetime(self, fecha=None):
+        segundos = RELOJ.ahora_us() // 1000000
+        return (2000, 1, 1, 5, segundos // 3600, segundos // 60 % 60, segundos % 60, 0)
+
+
+def unique_id():
+    return PLACA.id_unico
+
+
+def freq(valor=None):
+    return 240000000 if valor is None else None
+
+
+def reset():
+    PLACA.reinicios += 1
+    raise Reinicio(HARD_RESET)
+
+
+def soft_reset():
+    raise Reinicio(SOFT_RESET)
+
+
+def reset_cause():
+    return _causa_reinicio
+
+
+def idle():
+    RELOJ.dormir_us(100)
+
+
+def lightsleep(tiempo_ms=None):
+    RELOJ.dormir_us((tiempo_ms or 0) * 1000)
+
+
+def deepsleep(tiempo_ms=0):
+    # Se apaga todo menos el RTC: el script vuelve a arrancar al despertar,
+    # tras el arranque del bootloader (la memoria RTC se conserva)
+    PLACA.red.radio(False)
+    RELOJ._eventos.clear()
+    RELOJ._fuentes.clear()
+    inicio = RELOJ.ahora_us()
+    try:
+        RELOJ.dormir_us(tiempo_ms * 1000)
+    finally:
+        PLACA.sueno_us += RELOJ._ahora_us - inicio
+    RELOJ.ocupar_us(PLACA.arranque_ms * 1000)
+    raise Reinicio(DEEPSLEEP_RESET)
+
+
+def disable_irq():
+    RELOJ._despachando, estado = True, RELOJ._despachando
+    return estado
+
+
+def enable_irq(estado=False):
+    RELOJ._despachando = estado
@@ -0,0 +1,37 @@
+"""Sustituto de ``micropython``."""
+
+from emulador.reloj import RELOJ
+
+
+def const(valor):
+    return valor
+
+
+def native(funcion):
+    return funcion
+
+
+viper = native
+
+
+# Tamaño de la cola de schedule() en el puerto ESP32
+COLA_SCHEDULE = 8
+
+
+def schedule(funcion, argumento):
+    # Se ejecuta fuera del contexto de la IRQ, en el próximo avance del reloj
+    if len(RELOJ._diferidos) >= COLA_SCHEDULE:
+        raise RuntimeError("schedule queue full")
+    RELOJ.diferir(funcion, argumento)
+
+
+def alloc_emergency_exception_buf(tamano):
+    pass
+
+
+def opt_level(nivel=None):
+    return 0 if nivel is None else None
+
+
+def mem_info(detallado=False):
+    print("mem: emulado en CPython")
@@ -0,0 +1,120 @@
+"""Sustituto de ``network`` con los tiempos de ``emulador.placa.Red``.
+
+``connect()`` sin BSSID conocido cuesta un escaneo completo; con
+``bssid=`` solo la asociación. Una IP fija (``ifconfig((...))``) se
+salta el DHCP hasta ``ifconfig("dhcp")``. El enlace se cae durante los cortes programados.
+``active()`` lleva la cuenta del tiempo con la radio encendida.
+"""
+
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ, interno
+
+STA_IF = 0
+AP_IF = 1
+
+STAT_IDLE = 1000
+STAT_CONNECTING = 1001
+STAT_GOT_IP = 1010
+STAT_NO_AP_FOUND = 201
+STAT_WRONG_PASSWORD = 202
+
+_interfaces = {}
+
+
+class WLAN:
+    def __new__(cls, interfaz=STA_IF):
+        # Igual que en MicroPython: una sola instancia por interfaz
+        if interfaz not in _interfaces:
+            instancia = super().__new__(cls)
+            instancia._iniciar(interfaz)
+            _interfaces[interfaz] = instancia
+        return _interfaces[interfaz]
+
+    def _iniciar(self, interfaz):
+        self.interfaz = interfaz
+        self._activa = False
+        self._listo_us = None
+        self._ip_fija = None
+        self._ssid = None
+        self.conexiones = 0
+
+    def active(self, valor=None):
+        if valor is None:
+            return self._activa
+        self._activa = bool(valor)
+        PLACA.red.radio(self._activa)
+        if not self._activa:
+            self._listo_us = None
+
+    @interno
+    def connect(self, ssid=None, key=None, bssid=None, channel=None):
+        red = PLACA.red
+        self._ssid = ssid
+        self.conexiones += 1
+        if ssid != red.ssid:
+            self._listo_us = None
+            return
+        demora_ms = red.asociacion_ms
+        if bssid is None or bytes(bssid) != red.bssid:
+            demora_ms += red.escaneo_ms
+        if self._ip_fija is None:
+            demora_ms += red.dhcp_ms
+        self._listo_us = RELOJ.ahora_us() + demora_ms * 1000
+
+    def disconnect(self):
+        self._listo_us = None
+
+    @interno
+    def isconnected(self):
+        if not self._activa or self._listo_us is None:
+            return False
+        ahora = RELOJ.ahora_us()
+        if not PLACA.red.enlace(ahora):
+            # Tras un corte el ESP32 necesita volver a asociarse
+            self._listo_us = None
+            return False
+        return ahora >= self._listo_us
+
+    def status(self, parametro=None):
+        if parametro == "rssi":
+            return PLACA.red.rssi
+        if self.isconnected():
+            return STAT_GOT_IP
+        if self._listo_us is not None:
+            return STAT_CONNECTING
+        if self._ssid is not None and self._ssid != PLACA.red.ssid:
+            return STAT_NO_AP_FOUND
+        return STAT_IDLE
+
+    @interno
+    def scan(self):
+        RELOJ.ocupar_us(PLACA.red.escaneo_ms * 1000)
+        red = PLACA.red
+        if not red.enlace():
+            return []
+        return [(red.ssid.encode(), red.bssid, red.canal, red.rssi, 3, False)]
+
+    def ifconfig(self, configuracion=None):
+        if configuracion is not None:
+            # "dhcp" vuelve a pedir la IP al router
+            self._ip_fija = None if configuracion == "dhcp" else tuple(configuracion)
+            return
+        if self._ip_fija is not None:
+            return self._ip_fija
+        if self.isconnected():
+            return (PLACA.red.ip, "255.255.255.0", "192.168.1.1", "8.8.8.8")
+        return ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0")
+
+    def config(self, *args, **kwargs):
+        if args:
+            if args[0] == "mac":
+                return b"\x24\x0a\xc4" + PLACA.id_unico[3:]
+            if args[0] == "channel":
+                return PLACA.red.canal
+            if args[0] == "essid":
+                return self._ssid or ""
+            raise ValueError("parámetro desconocido")
+
+
+def hostname(nombre=None):
+    return "esp32" if nombre is None else None
@@ -0,0 +1,59 @@
+"""Sustituto de ``onewire``: el bus solo conoce las sondas de ``PLACA.sondas``."""
+
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+
+
+class OneWireError(Exception):
+    pass
+
+
+class OneWire:
+    SEARCH_ROM = 0xF0
+    MATCH_ROM = 0x55
+    SKIP_ROM = 0xCC
+
+    # Duración aproximada de un reset + un byte a 15.4 kbps
+    RESET_US = 960
+    BYTE_US = 520
+
+    def __init__(self, pin):
+        self.pin = pin.id
+        # Mientras haya una conversión en curso las sondas leen 0 en el bus
+        self.ocupado_hasta_us = 0
+
+    def sondas(self):
+        return PLACA.sondas.get(self.pin, [])
+
+    def reset(self, required=False):
+        RELOJ.ocupar_us(OneWire.RESET_US)
+        presente = bool(self.sondas())
+        if required and not presente:
+            raise OneWireError
+        return presente
+
+    def scan(self):
+        # Búsqueda de ROM: 64 bits x 3 slots por sonda
+        RELOJ.ocupar_us(OneWire.RESET_US + len(self.sondas()) * 24 * OneWire.BYTE_US)
+        return [rom for rom, _ in self.sondas()]
+
+    def escribir_bytes(self, cantidad):
+        RELOJ.ocupar_us(cantidad * OneWire.BYTE_US)
+
+    def readbit(self):
+        RELOJ.ocupar_us(70)
+        return 1 if RELOJ.ahora_us() >= self.ocupado_hasta_us else 0
+
+    def readbyte(self):
+        self.escribir_bytes(1)
+        return 0xFF if self.readbit() else 0x00
+
+    def writebyte(self, valor):
+        self.escribir_bytes(1)
+
+    def write(self, datos):
+        self.escribir_bytes(len(datos))
+
+    def select_rom(self, rom):
+        self.reset()
+        self.escribir_bytes(9)
@@ -0,0 +1,51 @@
+"""Sustituto de ``uasyncio`` sobre el ``asyncio`` de CPython.
+
+Solo añade lo que MicroPython tiene y CPython no (``sleep_ms``,
+``wait_for_ms``, ``ThreadSafeFlag``); el resto se reexporta tal cual.
+"""
+
+import asyncio
+from asyncio import *  # noqa: F401,F403
+
+from emulador.bucle import cerrar
+
+
+def run(corrutina):
+    # Como asyncio.run(), pero la limpieza final no avanza el reloj virtual
+    bucle = asyncio.new_event_loop()
+    asyncio.set_event_loop(bucle)
+    try:
+        return bucle.run_until_complete(corrutina)
+    finally:
+        cerrar(bucle)
+
+
+async def sleep_ms(ms):
+    await asyncio.sleep(ms / 1000)
+
+
+async def wait_for_ms(aw, timeout):
+    return await asyncio.wait_for(aw, timeout / 1000)
+
+
+class ThreadSafeFlag:
+    """Bandera que se puede activar desde una ISR (hilo) y esperar en una tarea."""
+
+    def __init__(self):
+        self._evento = asyncio.Event()
+        self._bucle = None
+
+    def set(self):
+        bucle = self._bucle
+        if bucle is None:
+            self._evento.set()
+        else:
+            bucle.call_soon_threadsafe(self._evento.set)
+
+    def clear(self):
+        self._evento.clear()
+
+    async def wait(self):
+        self._bucle = asyncio.get_running_loop()
+        await self._evento.wait()
+        self._evento.clear()
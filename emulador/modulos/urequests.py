@@ -0,0 +1,73 @@
+"""Sustituto de ``urequests`` sin red real.
+
+Cada solicitud bloquea lo que tardaría la ida y vuelta HTTP desde el
+ESP32 (DNS, TCP y respuesta, ``DEMORA_MS``) y contesta 200 con cuerpo
+vacío; sin enlace WiFi falla con ``OSError`` como el original. Las
+solicitudes quedan en ``solicitudes`` como (instante_us, método, url,
+cuerpo) para que los benchmarks las cuenten.
+"""
+
+import errno
+import json as _json
+
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ, interno
+
+DEMORA_MS = 150
+
+solicitudes = []
+
+
+class Response:
+    def __init__(self, status_code=200, content=b""):
+        self.status_code = status_code
+        self.reason = b"OK" if status_code == 200 else b""
+        self.content = content
+        self.encoding = "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+    def json(self):
+        return _json.loads(self.content)
+
+    def close(self):
+        pass
+
+
+@interno
+def request(method, url, data=None, json=None, headers={}, stream=None, timeout=None):
+    if not PLACA.red.enlace():
+        raise OSError(errno.ECONNABORTED, "sin enlace WiFi")
+    if json is not None:
+        data = _json.dumps(json)
+    if isinstance(data, str):
+        data = data.encode()
+    RELOJ.dormir_us(DEMORA_MS * 1000)
+    solicitudes.append((RELOJ.ahora_us(), method, url, data))
+    return Response()
+
+
+def head(url, **kw):
+    return request("HEAD", url, **kw)
+
+
+def get(url, **kw):
+    return request("GET", url, **kw)
+
+
+def post(url, **kw):
+    return request("POST", url, **kw)
+
+
+def put(url, **kw):
+    return request("PUT", url, **kw)
+
+
+def patch(url, **kw):
+    return request("PATCH", url, **kw)
+
+
+def delete(url, **kw):
+    return request("DELETE", url, **kw)
@@ -0,0 +1,148 @@
+"""Perfil de tiempo y memoria de los bucles de cada script, en el emulador.
+
+Copia un ``perfil.json`` a la flash, así ``Dispositivo`` mide cada tarea
+periódica con ``perfil.Perfil`` sin tocar el script (un script con
+bucle propio tiene que usar ``Perfil`` directamente). Cada script
+corre dos veces: una sin tracemalloc, para los tiempos (tracemalloc
+infla el CPU que se cobra al reloj), y otra con tracemalloc, para los
+bytes por iteración, las recolecciones (heap de ``HEAP_BYTES`` y pausa
+de ``PAUSA_GC_US``, ver ``emulador``) y las líneas de ``lib/`` o del
+script donde crece la memoria retenida (listas que no paran de crecer).
+El heap libre no se reporta: el emulador no modela lo que queda vivo.
+
+    python -m emulador.perfilar "Codigos Sensores KY Y MQ/ky-035 Sensor efecto hall analogico.py" \\
+        "Codigos Sensores KY Y MQ/ky-039 Sensor de Pulso.py" --duracion 120
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import emulador
+from emulador.ejecutar import ejecutar, reiniciar
+from emulador.placa import PLACA
+from emulador.reloj import RELOJ
+from emulador.senales import Asentamiento, Pulso, Ruido, Senoidal, desde_texto
+
+
+class _Descarte:
+    # Salida de los print: un StringIO retendría cada línea y aparecería
+    # como memoria que crece
+    def write(self, texto):
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
+def _preparar(senales):
+    reiniciar()
+    PLACA.senal(34, Ruido(Pulso(72, 1800, 600), 15))
+    PLACA.senal(35, Ruido(Senoidal(2000, 300, 20000), 10))
+    PLACA.senal(36, Ruido(Asentamiento(3000, 1300, 20000), 10))
+    PLACA.dht11(4, 24, 55)
+    PLACA.sondas_ds18b20(26, [21.5])
+    for especificacion in senales:
+        pin, _, senal = especificacion.partition("=")
+        PLACA.senal(int(pin), desde_texto(senal))
+
+
+def _correr(ruta, duracion_s, senales, memoria):
+    _preparar(senales)
+    with tempfile.TemporaryDirectory() as flash:
+        with open(os.path.join(flash, "perfil.json"), "w") as f:
+            json.dump({"periodo_ms": int(duracion_s * 1000)}, f)
+        if not memoria:
+            return ejecutar(ruta, duracion_s, salida=_Descarte(), flash=flash), _perfiles(), None, 0
+
+        # Lo retenido se compara desde el primer cuarto de la corrida, así
+        # no cuenta lo que se asigna una sola vez al arrancar. La foto la
+        # toma un evento del reloj: llega aunque el script nunca consulte
+        # gc.mem_alloc() (sin Perfil)
+        estado = {"inicial": None}
+
+        def primer_cuarto():
+            estado["inicial"] = tracemalloc.take_snapshot()
+
+        RELOJ.externo(int(duracion_s * 250000), primer_cuarto)
+        colecciones = emulador.colecciones()
+        tracemalloc.start()
+        try:
+            inicial = tracemalloc.take_snapshot()
+            resumen = ejecutar(ruta, duracion_s, salida=_Descarte(), flash=flash)
+            final = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        crecimiento = _crecimiento(estado["inicial"] or inicial, final)
+        return resumen, _perfiles(), crecimiento, emulador.colecciones() - colecciones
+
+
+def _perfiles():
+    modulo = sys.modules.get("perfil")
+    return {p.nombre: p for p in modulo.PERFILES} if modulo is not None else {}
+
+
+def _crecimiento(inicial, final, minimo=512):
+    # Solo el código de los scripts y de lib/, sin la propia medición
+    filtro = [tracemalloc.Filter(True, os.path.join(emulador.CARPETA_SCRIPTS, "*")),
+              tracemalloc.Filter(False, os.path.join(emulador.CARPETA_LIB, "perfil.py"))]
+    cambios = final.filter_traces(filtro).compare_to(inicial.filter_traces(filtro), "lineno")
+    return [c for c in cambios if c.size_diff >= minimo]
+
+
+def _ms(us):
+    return us / 1000
+
+
+def reportar(ruta, duracion_s, senales, lineas):
+    nombre = os.path.basename(ruta)
+    tiempos, perfiles_t, _, _ = _correr(ruta, duracion_s, senales, memoria=False)
+    memoria, perfiles_m, crecimiento, colecciones = _correr(ruta, duracion_s, senales, memoria=True)
+    error = f"  error: {tiempos['error']}" if tiempos["error"] else ""
+    print(f"== {nombre}: CPU {tiempos['cpu_pct']:.1f}%, {colecciones} recolecciones emuladas "
+          f"en {duracion_s:g} s{error}")
+    if not perfiles_t:
+        print("  sin bucles medidos (ni Dispositivo ni perfil.Perfil)")
+    else:
+        print(f"  {'bucle':<22} {'vueltas':>7} {'prom ms':>8} {'máx ms':>8} {'periodo':>8} {'uso %':>6} "
+              f"{'excedidas':>9} {'B/vuelta':>8} {'B máx':>7} {'GC':>4}")
+    for clave, t in perfiles_t.items():
+        m = perfiles_m.get(clave)
+        uso = 100 * t.promedio_us() / t.presupuesto_us if t.presupuesto_us else 0
+        print(f"  {clave:<22} {t.n:>7} {_ms(t.promedio_us()):>8.2f} {_ms(t.maximo_us):>8.2f} "
+              f"{_ms(t.presupuesto_us):>8.0f} {uso:>6.1f} {t.excedidas:>9} "
+              f"{m.bytes_por_iteracion() if m else 0:>8} {m.asignado_max if m else 0:>7} "
+              f"{m.colecciones if m else 0:>4}")
+        for seccion in t.secciones.values():
+            sm = m.secciones.get(seccion.nombre) if m else None
+            bytes_llamada = sm.asignado // sm.n if sm and sm.n else 0
+            us = seccion.suma_us // seccion.n if seccion.n else 0
+            print(f"    {seccion.nombre:<20} {seccion.n:>7} {_ms(us):>8.2f} ms {bytes_llamada:>8} B por llamada")
+    if crecimiento:
+        print("  memoria retenida que crece (tracemalloc, desde el primer cuarto):")
+        for cambio in crecimiento[:lineas]:
+            marco = cambio.traceback[0]
+            archivo = os.path.relpath(marco.filename, emulador.CARPETA_SCRIPTS)
+            print(f"    {archivo}:{marco.lineno:<5} +{cambio.size_diff} B ({cambio.count_diff:+d} bloques)")
+    return tiempos, memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scripts", nargs="+")
+    parser.add_argument("--duracion", type=float, default=120, help="segundos virtuales por corrida")
+    parser.add_argument("--senal", action="append", default=[], metavar="PIN=ESPEC",
+                        help="señal de entrada además de las de siempre (34, 35, 36)")
+    parser.add_argument("--lineas", type=int, default=5, help="líneas de memoria retenida a mostrar")
+    args = parser.parse_args()
+
+    emulador.instalar()
+    for ruta in args.scripts:
+        reportar(ruta, args.duracion, args.senal, args.lineas)
+
+
+if __name__ == "__main__":
+    main()
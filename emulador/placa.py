@@ -0,0 +1,107 @@
+"""Estado de la placa emulada: señales de entrada, historial de salidas,
+sondas 1-Wire, memoria RTC y condiciones de la red WiFi.
+
+Los módulos sustitutos (``machine``, ``network``, ``onewire``...) leen de
+aquí; los benchmarks y ``emulador.ejecutar`` lo configuran antes de correr
+un script.
+"""
+
+from emulador.reloj import RELOJ
+from emulador.senales import Constante, Senal
+
+
+class Red:
+    """Modelo de la WiFi: tiempos de escaneo, asociación y DHCP, y cortes."""
+
+    def __init__(self):
+        self.ssid = "Red-Peter"
+        self.bssid = b"\x10\x20\x30\x40\x50\x60"
+        self.canal = 6
+        self.rssi = -58
+        self.ip = "192.168.1.50"
+        self.escaneo_ms = 1200       # Barrido de canales cuando no se conoce el BSSID
+        self.asociacion_ms = 300
+        self.dhcp_ms = 800
+        self.escritura_us = 150      # Costo de cada sock.write() en lwIP
+        self.disponible = True
+        self.cortes = []             # [(inicio_ms, fin_ms)] sin enlace
+        self.radio_us = 0            # Tiempo con la interfaz activa (modelo de energía)
+        self._encendida_us = None
+
+    def radio(self, encendida):
+        # La llama WLAN.active(); deepsleep() y los reinicios la apagan
+        ahora = RELOJ.ahora_us()
+        if encendida and self._encendida_us is None:
+            self._encendida_us = ahora
+        elif not encendida and self._encendida_us is not None:
+            self.radio_us += ahora - self._encendida_us
+            self._encendida_us = None
+
+    def radio_total_us(self):
+        if self._encendida_us is None:
+            return self.radio_us
+        return self.radio_us + RELOJ.ahora_us() - self._encendida_us
+
+    def cortar(self, inicio_ms, duracion_ms):
+        self.cortes.append((inicio_ms, inicio_ms + duracion_ms))
+
+    def enlace(self, t_us=None):
+        if not self.disponible:
+            return False
+        t_ms = (RELOJ.ahora_us() if t_us is None else t_us) // 1000
+        for inicio, fin in self.cortes:
+            if inicio <= t_ms < fin:
+                return False
+        return True
+
+
+class Placa:
+    def __init__(self):
+        self.senales = {}
+        self.salidas = {}
+        self.sondas = {}
+        self.dht = {}
+        self.memoria_rtc = b""
+        self.id_unico = b"\x24\x0a\xc4\x12\x34\x56"
+        self.red = Red()
+        self.reinicios = 0
+        self.arranque_ms = 250       # Del despertar de deep sleep a main.py (bootloader e intérprete)
+        self.sueno_us = 0            # Tiempo total en deep sleep
+
+    def senal(self, pin, senal):
+        if not isinstance(senal, Senal):
+            senal = Constante(senal)
+        self.senales[pin] = senal
+
+    def leer(self, pin, por_defecto=0):
+        senal = self.senales.get(pin)
+        if senal is None:
+            return por_defecto
+        return senal(RELOJ.ahora_us())
+
+    def escribir(self, pin, valor):
+        historial = self.salidas.setdefault(pin, [])
+        if not historial or historial[-1][1] != valor:
+            historial.append((RELOJ.ahora_us(), valor))
+
+    def sondas_ds18b20(self, pin, temperaturas):
+        # temperaturas: lista de señales (°C) o valores fijos, una por sonda
+        sondas = []
+        for i, temperatura in enumerate(temperaturas):
+            if not isinstance(temperatura, Senal):
+                temperatura = Constante(temperatura)
+            rom = bytes([0x28, 0xFF, 0x4C, 0x1A, 0x00, 0x16, i, 0x00])
+            sondas.append((rom, temperatura))
+        self.sondas[pin] = sondas
+
+    def dht11(self, pin, temperatura, humedad, errores=0.0):
+        # temperatura/humedad: señales o valores fijos; errores: probabilidad
+        # de que una lectura falle (checksum o timeout)
+        if not isinstance(temperatura, Senal):
+            temperatura = Constante(temperatura)
+        if not isinstance(humedad, Senal):
+            humedad = Constante(humedad)
+        self.dht[pin] = (temperatura, humedad, errores)
+
+
+PLACA = Placa()
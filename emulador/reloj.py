@@ -0,0 +1,207 @@
+"""Reloj virtual del emulador.
+
+El tiempo emulado avanza por dos vías:
+
+* ``dormir()`` (``time.sleep``, ``sleep_ms``, esperas de uasyncio) salta
+  directamente al instante pedido, sin esperar en tiempo real;
+* el CPU consumido por el código del script se suma multiplicado por
+  ``escala_cpu`` (un ESP32 a 240 MHz ejecuta MicroPython bastante más
+  lento que CPython en un PC), así que los bucles de espera activa
+  también avanzan y el costo de cada iteración queda reflejado.
+
+El tiempo que pasa dentro del propio emulador (broker, generadores de
+señal) no se cobra al script: las funciones emuladas se decoran con
+``interno``. Los eventos programados (timers, flancos de pines con IRQ)
+se despachan en orden cada vez que el reloj avanza. Los ``externos``
+(lo que pasa fuera de la placa, como un comando que llega al broker)
+sobreviven a los reinicios del script y tampoco se cobran.
+"""
+
+import heapq
+import time
+
+
+class FinEmulacion(BaseException):
+    """Se alcanzó la duración pedida. Hereda de BaseException para que los
+    ``except Exception`` de los scripts no la atrapen."""
+
+
+class Reloj:
+    def __init__(self, escala_cpu=10.0, tiempo_real=False):
+        self.escala_cpu = escala_cpu
+        self.tiempo_real = tiempo_real
+        self.limite_us = None
+        self._ahora_us = 0
+        self._marca = time.perf_counter_ns()
+        self._origen_real = self._marca
+        self._eventos = []
+        self._externos = []
+        self._secuencia = 0
+        self._profundidad = 0
+        self._despachando = False
+        self._fuentes = []
+        self._diferidos = []
+        self.cpu_us = 0          # CPU del script ya escalado
+        self.dormido_us = 0      # Tiempo pasado en sleep
+        self.arranque_us = 0     # Último arranque: ticks_ms/us cuentan desde aquí
+
+    # -- tiempo -----------------------------------------------------------
+    def ahora_us(self):
+        self.cpu()
+        return self._ahora_us
+
+    def cpu(self):
+        """Cobra al reloj el CPU consumido por el script desde la última marca."""
+        if self._profundidad:
+            return
+        real = time.perf_counter_ns()
+        if self.tiempo_real:
+            nuevo = (real - self._origen_real) // 1000
+        else:
+            costo = int((real - self._marca) * self.escala_cpu) // 1000
+            self.cpu_us += costo
+            nuevo = self._ahora_us + costo
+        self._marca = real
+        self._avanzar(nuevo)
+
+    def marcar(self):
+        self._marca = time.perf_counter_ns()
+
+    def dormir_us(self, us):
+        self.cpu()
+        destino = self._ahora_us + max(0, int(us))
+        if self.tiempo_real:
+            time.sleep(max(0, us) / 1000000)
+            self.cpu()
+        else:
+            self.dormido_us += destino - self._ahora_us
+            self._avanzar(destino)
+        self.marcar()
+
+    def dormir_hasta_evento(self, maximo_us):
+        """Duerme hasta ``maximo_us`` o hasta el próximo evento programado,
+        lo que ocurra primero (lo usa el bucle de uasyncio emulado)."""
+        self.cpu()
+        destino = self._ahora_us + max(0, int(maximo_us))
+        for fuente in self._fuentes:
+            fuente.programar_hasta(destino)
+        proximo = self._ahora_us if self._diferidos else self.proximo_evento_us()
+        if proximo is not None and proximo < destino:
+            destino = max(proximo, self._ahora_us)
+        self.dormir_us(destino - self._ahora_us)
+
+    def ocupar_us(self, us):
+        # Trabajo de CPU/periférico con duración conocida (conversión ADC, escritura de socket)
+        self.cpu()
+        self.cpu_us += int(us)
+        self._avanzar(self._ahora_us + int(us))
+        self.marcar()
+
+    def _avanzar(self, destino):
+        if self.limite_us is not None and destino >= self.limite_us:
+            destino = self.limite_us
+        if not self._despachando:
+            self._despachando = True
+            try:
+                self._despachar(destino)
+            finally:
+                self._despachando = False
+        if destino > self._ahora_us:
+            self._ahora_us = destino
+        if self.limite_us is not None and self._ahora_us >= self.limite_us:
+            raise FinEmulacion()
+
+    def _despachar(self, destino):
+        for fuente in self._fuentes:
+            fuente.programar_hasta(destino)
+        while True:
+            evento = self._eventos[0] if self._eventos and self._eventos[0][0] <= destino else None
+            externo = self._externos[0] if self._externos and self._externos[0][0] <= destino else None
+            if evento is None and externo is None:
+                break
+            if externo is not None and (evento is None or externo < evento):
+                instante, _, callback = heapq.heappop(self._externos)
+                if instante > self._ahora_us:
+                    self._ahora_us = instante
+                self._profundidad += 1
+                try:
+                    callback()
+                finally:
+                    self._profundidad -= 1
+                self.marcar()
+                continue
+            instante, _, callback = heapq.heappop(self._eventos)
+            if instante > self._ahora_us:
+                self._ahora_us = instante
+            self._ejecutar(callback)
+        while self._diferidos:
+            funcion, argumento = self._diferidos.pop(0)
+            self._ejecutar(lambda: funcion(argumento))
+
+    def _ejecutar(self, callback):
+        # El código del callback es del script: se cobra su CPU
+        self.marcar()
+        profundidad = self._profundidad
+        self._profundidad = 0
+        try:
+            callback()
+        finally:
+            self._profundidad = profundidad
+            real = time.perf_counter_ns()
+            if not self.tiempo_real:
+                costo = int((real - self._marca) * self.escala_cpu) // 1000
+                self.cpu_us += costo
+                self._ahora_us += costo
+            self._marca = real
+
+    # -- eventos ----------------------------------------------------------
+    def programar(self, instante_us, callback):
+        self._secuencia += 1
+        heapq.heappush(self._eventos, (instante_us, self._secuencia, callback))
+
+    def externo(self, instante_us, callback):
+        # Como programar(), pero fuera de la placa: no se borra al reiniciar
+        # el script ni se cobra como CPU
+        self._secuencia += 1
+        heapq.heappush(self._externos, (instante_us, self._secuencia, callback))
+
+    def diferir(self, funcion, argumento):
+        # Equivalente a micropython.schedule(): corre en el siguiente avance
+        self._diferidos.append((funcion, argumento))
+
+    def registrar_fuente(self, fuente):
+        # fuente.programar_hasta(t) agenda los eventos que ocurran hasta t
+        if fuente not in self._fuentes:
+            self._fuentes.append(fuente)
+
+    def quitar_fuente(self, fuente):
+        if fuente in self._fuentes:
+            self._fuentes.remove(fuente)
+
+    def cancelar(self, callback):
+        self._eventos = [e for e in self._eventos if e[2] is not callback]
+        heapq.heapify(self._eventos)
+
+    def proximo_evento_us(self):
+        instantes = [cola[0][0] for cola in (self._eventos, self._externos) if cola]
+        return min(instantes) if instantes else None
+
+
+RELOJ = Reloj()
+
+
+def interno(funcion):
+    """Marca una función del emulador: su tiempo de ejecución no se cobra
+    al reloj virtual (lo que sí se cobra es el CPU del script previo)."""
+    def envoltura(*args, **kwargs):
+        RELOJ.cpu()
+        RELOJ._profundidad += 1
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            RELOJ._profundidad -= 1
+            if not RELOJ._profundidad:
+                RELOJ.marcar()
+    envoltura.__name__ = funcion.__name__
+    envoltura.__doc__ = funcion.__doc__
+    return envoltura
@@ -0,0 +1,376 @@
+"""Generadores de señal programables para las entradas emuladas.
+
+Cada generador es invocable con el instante en µs y devuelve el valor
+crudo que leería el script: cuentas de ADC (0-4095) para entradas
+analógicas o 0/1 para entradas digitales. Los generadores digitales
+además implementan ``flancos(t0, t1)`` para que las IRQ se disparen en el
+instante exacto de cada cambio.
+"""
+
+import math
+import random
+
+
+class Senal:
+    digital = False
+
+    def __call__(self, t_us):
+        raise NotImplementedError
+
+    def flancos(self, t0_us, t1_us, resolucion_us=100):
+        # Implementación genérica: muestrea y detecta cambios
+        cambios = []
+        anterior = self(t0_us)
+        t = t0_us + resolucion_us
+        while t <= t1_us:
+            valor = self(t)
+            if valor != anterior:
+                cambios.append((t, valor))
+                anterior = valor
+            t += resolucion_us
+        return cambios
+
+
+class Constante(Senal):
+    def __init__(self, valor):
+        self.valor = valor
+
+    def __call__(self, t_us):
+        return self.valor
+
+    def flancos(self, t0_us, t1_us, resolucion_us=100):
+        return []
+
+
+class Ruido(Senal):
+    """Envuelve otra señal sumando ruido gaussiano (ruido del ADC del ESP32)."""
+
+    def __init__(self, base, desviacion, semilla=1):
+        self.base = base if isinstance(base, Senal) else Constante(base)
+        self.desviacion = desviacion
+        self._azar = random.Random(semilla)
+
+    def __call__(self, t_us):
+        valor = self.base(t_us) + self._azar.gauss(0, self.desviacion)
+        return min(4095, max(0, int(round(valor))))
+
+
+class Picos(Senal):
+    """Envuelve otra señal con picos aislados: con ``probabilidad`` por
+    lectura el ADC devuelve el valor desplazado hasta ``amplitud`` cuentas
+    (acoplamiento del WiFi y de la conmutación en el ADC del ESP32)."""
+
+    def __init__(self, base, probabilidad, amplitud, semilla=2):
+        self.base = base if isinstance(base, Senal) else Constante(base)
+        self.probabilidad = probabilidad
+        self.amplitud = amplitud
+        self._azar = random.Random(semilla)
+
+    def __call__(self, t_us):
+        valor = self.base(t_us)
+        if self._azar.random() < self.probabilidad:
+            valor += self._azar.uniform(-self.amplitud, self.amplitud)
+        return min(4095, max(0, int(round(valor))))
+
+
+class Senoidal(Senal):
+    def __init__(self, centro, amplitud, periodo_ms, fase=0.0):
+        self.centro = centro
+        self.amplitud = amplitud
+        self.periodo_us = periodo_ms * 1000
+        self.fase = fase
+
+    def __call__(self, t_us):
+        angulo = 2 * math.pi * t_us / self.periodo_us + self.fase
+        return int(round(self.centro + self.amplitud * math.sin(angulo)))
+
+
+class Rampa(Senal):
+    def __init__(self, inicio, fin, duracion_ms):
+        self.inicio = inicio
+        self.fin = fin
+        self.duracion_us = duracion_ms * 1000
+
+    def __call__(self, t_us):
+        if t_us >= self.duracion_us:
+            return self.fin
+        return int(round(self.inicio + (self.fin - self.inicio) * t_us / self.duracion_us))
+
+
+class Asentamiento(Senal):
+    """Deriva exponencial de ``inicio`` a ``final`` con constante ``tau_ms``,
+    como la lectura de un sensor MQ mientras se calienta el calefactor."""
+
+    def __init__(self, inicio, final, tau_ms):
+        self.inicio = inicio
+        self.final = final
+        self.tau_us = tau_ms * 1000
+
+    def __call__(self, t_us):
+        return int(round(self.final + (self.inicio - self.final) * math.exp(-t_us / self.tau_us)))
+
+
+class Cuadrada(Senal):
+    """Señal digital periódica; ``ciclo`` es la fracción del periodo en alto."""
+
+    digital = True
+
+    def __init__(self, periodo_ms, ciclo=0.5, alto=1, bajo=0, desfase_ms=0):
+        self.periodo_us = int(periodo_ms * 1000)
+        self.alto_us = int(self.periodo_us * ciclo)
+        self.alto = alto
+        self.bajo = bajo
+        self.desfase_us = int(desfase_ms * 1000)
+
+    def __call__(self, t_us):
+        fase = (t_us - self.desfase_us) % self.periodo_us
+        return self.alto if fase < self.alto_us else self.bajo
+
+    def flancos(self, t0_us, t1_us, resolucion_us=100):
+        cambios = []
+        base = t0_us - (t0_us - self.desfase_us) % self.periodo_us
+        while base <= t1_us:
+            for offset, valor in ((0, self.alto), (self.alto_us, self.bajo)):
+                t = base + offset
+                if t0_us < t <= t1_us:
+                    cambios.append((t, valor))
+            base += self.periodo_us
+        return cambios
+
+
+class Secuencia(Senal):
+    """Valores escalonados: lista de ``(t_ms, valor)`` ordenada por tiempo."""
+
+    def __init__(self, puntos, inicial=0):
+        self.puntos = [(int(t * 1000), v) for t, v in puntos]
+        self.inicial = inicial
+        self.digital = all(v in (0, 1) for _, v in puntos)
+
+    def __call__(self, t_us):
+        valor = self.inicial
+        for t, v in self.puntos:
+            if t > t_us:
+                break
+            valor = v
+        return valor
+
+    def flancos(self, t0_us, t1_us, resolucion_us=100):
+        anterior = self(t0_us)
+        cambios = []
+        for t, v in self.puntos:
+            if t0_us < t <= t1_us and v != anterior:
+                cambios.append((t, v))
+                anterior = v
+        return cambios
+
+
+class Traza(Senal):
+    """Reproduce una traza grabada (una muestra por línea, periodo fijo)."""
+
+    def __init__(self, muestras, periodo_ms, repetir=True):
+        self.muestras = list(muestras)
+        self.periodo_us = int(periodo_ms * 1000)
+        self.repetir = repetir
+
+    @classmethod
+    def desde_csv(cls, ruta, periodo_ms, columna=0, repetir=True):
+        muestras = []
+        with open(ruta) as archivo:
+            for linea in archivo:
+                campos = linea.strip().split(",")
+                try:
+                    muestras.append(float(campos[columna]))
+                except (ValueError, IndexError):
+                    continue  # Encabezados o líneas vacías
+        return cls(muestras, periodo_ms, repetir)
+
+    def __call__(self, t_us):
+        indice = t_us // self.periodo_us
+        if self.repetir:
+            indice %= len(self.muestras)
+        else:
+            indice = min(indice, len(self.muestras) - 1)
+        return int(round(self.muestras[indice]))
+
+
+class Pulso(Senal):
+    """Fotopletismograma sintético (KY-039): pico sistólico, muesca
+    dícrota y deriva lenta de la línea base."""
+
+    def __init__(self, bpm=72, base=2000, amplitud=300, deriva=80, variabilidad=0.03, semilla=1):
+        self.bpm = bpm
+        self.base = base
+        self.amplitud = amplitud
+        self.deriva = deriva
+        self._latidos = []
+        self._azar = random.Random(semilla)
+        self.variabilidad = variabilidad
+
+    def _inicio_latido(self, t_us):
+        # Genera los instantes de latido (con variabilidad) hasta t_us
+        if not self._latidos:
+            self._latidos.append(0)
+        while self._latidos[-1] <= t_us:
+            intervalo = 60000000 / self.bpm
+            intervalo *= 1 + self._azar.uniform(-self.variabilidad, self.variabilidad)
+            self._latidos.append(self._latidos[-1] + int(intervalo))
+        # Búsqueda del último latido <= t_us
+        bajo, alto = 0, len(self._latidos) - 1
+        while bajo < alto:
+            medio = (bajo + alto + 1) // 2
+            if self._latidos[medio] <= t_us:
+                bajo = medio
+            else:
+                alto = medio - 1
+        return self._latidos[bajo], self._latidos[bajo + 1] - self._latidos[bajo]
+
+    def latidos_hasta(self, t_us):
+        self._inicio_latido(t_us)
+        return [t for t in self._latidos if t <= t_us]
+
+    def __call__(self, t_us):
+        inicio, duracion = self._inicio_latido(t_us)
+        fase = (t_us - inicio) / duracion
+        sistole = math.exp(-((fase - 0.15) / 0.06) ** 2)
+        muesca = 0.35 * math.exp(-((fase - 0.45) / 0.08) ** 2)
+        deriva = self.deriva * math.sin(2 * math.pi * t_us / 8000000)
+        return int(round(self.base + deriva + self.amplitud * (sistole + muesca)))
+
+
+class Encoder:
+    """Encoder rotativo en cuadratura (KY-040).
+
+    ``perfil`` es una lista de ``(t_ms, pasos_por_segundo)``: la velocidad
+    es constante entre puntos y negativa para girar en sentido
+    antihorario. Cada paso (detent) recorre un ciclo completo de los dos
+    canales, es decir 4 transiciones. ``canal(0)`` es CLK y ``canal(1)`` DT.
+    """
+
+    TRANSICIONES_POR_PASO = 4
+
+    def __init__(self, perfil):
+        self._tramos = []  # (inicio_us, transiciones por µs, posición al inicio)
+        posicion = 0.0
+        anterior = None
+        for t_ms, velocidad in sorted(perfil):
+            t_us = int(t_ms * 1000)
+            if anterior is not None:
+                posicion += anterior[1] * (t_us - anterior[0])
+            anterior = (t_us, velocidad * self.TRANSICIONES_POR_PASO / 1000000)
+            self._tramos.append((t_us, anterior[1], posicion))
+        if not self._tramos or self._tramos[0][0] > 0:
+            self._tramos.insert(0, (0, 0.0, 0.0))
+
+    def _tramo(self, t_us):
+        elegido = self._tramos[0]
+        for tramo in self._tramos:
+            if tramo[0] > t_us:
+                break
+            elegido = tramo
+        return elegido
+
+    def posicion(self, t_us):
+        """Transiciones recorridas hasta ``t_us`` (con signo)."""
+        inicio, velocidad, base = self._tramo(t_us)
+        return base + velocidad * (t_us - inicio)
+
+    def pasos(self, t_us):
+        return int(self.posicion(t_us) / self.TRANSICIONES_POR_PASO)
+
+    def canal(self, numero):
+        return _CanalCuadratura(self, numero)
+
+
+class _CanalCuadratura(Senal):
+    # Código Gray 00 -> 10 -> 11 -> 01: CLK cambia en las transiciones
+    # 4k+1 y 4k+3, DT en 4k+2 y 4k+4
+    digital = True
+
+    def __init__(self, encoder, numero):
+        self.encoder = encoder
+        self.numero = numero
+
+    def _nivel(self, estado):
+        estado %= 4
+        return int(estado in (1, 2)) if self.numero == 0 else int(estado in (2, 3))
+
+    def __call__(self, t_us):
+        return self._nivel(math.floor(self.encoder.posicion(t_us)))
+
+    def flancos(self, t0_us, t1_us, resolucion_us=100):
+        cambios = []
+        tramos = self.encoder._tramos
+        for i, (inicio, velocidad, base) in enumerate(tramos):
+            fin = tramos[i + 1][0] if i + 1 < len(tramos) else t1_us
+            desde, hasta = max(t0_us, inicio), min(t1_us, fin)
+            if desde >= hasta or velocidad == 0:
+                continue
+            x0 = base + velocidad * (desde - inicio)
+            x1 = base + velocidad * (hasta - inicio)
+            paso = 1 if velocidad > 0 else -1
+            # Hacia adelante se cruza k al llegar a k; hacia atrás, al bajar de k
+            k = math.floor(x0) + paso if paso > 0 else math.floor(x0)
+            while (k <= x1) if paso > 0 else (k > x1):
+                # Cruzar el entero k cambia el estado a k (o k - 1 hacia atrás)
+                estado = k if paso > 0 else k - 1
+                if self._nivel(estado) != self._nivel(estado - paso):
+                    # Primer µs entero con el estado nuevo; se ajusta con la
+                    # misma cuenta que posicion() para no depender del redondeo
+                    t = inicio + int((k - base) / velocidad)
+                    while math.floor(base + velocidad * (t - inicio)) != estado:
+                        t += 1
+                    while math.floor(base + velocidad * (t - 1 - inicio)) == estado:
+                        t -= 1
+                    if t0_us < t <= t1_us:
+                        cambios.append((t, self._nivel(estado)))
+                k += paso
+        # Un giro que se invierte justo en una transición deja dos flancos
+        # en el mismo instante: se anulan
+        limpios = []
+        for cambio in cambios:
+            if limpios and limpios[-1][0] == cambio[0]:
+                limpios.pop()
+            else:
+                limpios.append(cambio)
+        return limpios
+
+
+def desde_texto(especificacion):
+    """Construye un generador desde la línea de comandos.
+
+    Formatos: ``constante:V``, ``seno:CENTRO,AMPLITUD,PERIODO_MS``,
+    ``rampa:INICIO,FIN,MS``, ``asentamiento:INICIO,FINAL,TAU_MS``,
+    ``cuadrada:PERIODO_MS[,CICLO]``,
+    ``pulso:BPM``, ``csv:RUTA,PERIODO_MS`` y sufijos opcionales
+    ``+picos:PROBABILIDAD,AMPLITUD`` y ``+ruido:DESVIACION``.
+    """
+    ruido = None
+    picos = None
+    if "+ruido:" in especificacion:
+        especificacion, ruido = especificacion.split("+ruido:")
+    if "+picos:" in especificacion:
+        especificacion, picos = especificacion.split("+picos:")
+    tipo, _, parametros = especificacion.partition(":")
+    valores = parametros.split(",") if parametros else []
+    if tipo == "constante":
+        senal = Constante(int(valores[0]))
+    elif tipo == "seno":
+        senal = Senoidal(float(valores[0]), float(valores[1]), float(valores[2]))
+    elif tipo == "rampa":
+        senal = Rampa(float(valores[0]), float(valores[1]), float(valores[2]))
+    elif tipo == "asentamiento":
+        senal = Asentamiento(float(valores[0]), float(valores[1]), float(valores[2]))
+    elif tipo == "cuadrada":
+        senal = Cuadrada(float(valores[0]), float(valores[1]) if len(valores) > 1 else 0.5)
+    elif tipo == "pulso":
+        senal = Pulso(float(valores[0]))
+    elif tipo == "csv":
+        senal = Traza.desde_csv(valores[0], float(valores[1]))
+    else:
+        raise ValueError(f"Tipo de señal desconocido: {tipo}")
+    if ruido is not None:
+        senal = Ruido(senal, float(ruido))
+    if picos is not None:
+        probabilidad, amplitud = picos.split(",")
+        senal = Picos(senal, float(probabilidad), float(amplitud))
+    return senal
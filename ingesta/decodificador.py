@@ -0,0 +1,66 @@
+"""Decodifica en el servidor los mensajes binarios de ``lib/codec.py``.
+
+Usa las mismas tablas de esquemas que los dispositivos. Como puente se
+suscribe a ``<prefijo>/+/bin`` y vuelve a publicar cada mensaje como JSON
+en ``<prefijo>/<sensor>``, el formato que ya consume el flujo de Node-RED:
+
+    python ingesta/decodificador.py --broker broker.emqx.io --prefijo gds0653
+
+Requiere ``paho-mqtt`` solo para el modo puente; ``a_json()`` no tiene
+dependencias.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "Codigos Sensores KY Y MQ", "lib"))
+
+from codec import decodificar  # noqa: E402
+
+
+def a_json(payload):
+    """Devuelve (sensor, texto JSON) de un mensaje binario."""
+    nombre, campos = decodificar(payload)
+    return nombre, json.dumps(campos, separators=(",", ":"))
+
+
+def puente(broker, puerto, prefijo):
+    try:
+        import paho.mqtt.client as mqtt
+    except ImportError:
+        sys.exit("El modo puente necesita paho-mqtt: pip install paho-mqtt")
+
+    def al_recibir(cliente, _datos, mensaje):
+        try:
+            nombre, texto = a_json(mensaje.payload)
+        except (ValueError, IndexError) as e:
+            print(f"[ERROR] {mensaje.topic}: {e}")
+            return
+        cliente.publish(f"{prefijo}/{nombre}", texto)
+
+    cliente = mqtt.Client()
+    cliente.on_message = al_recibir
+    cliente.connect(broker, puerto, 60)
+    cliente.subscribe(f"{prefijo}/+/bin")
+    print(f"[INFO] Decodificando {prefijo}/+/bin en {broker}")
+    cliente.loop_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--broker", default="broker.emqx.io")
+    parser.add_argument("--puerto", type=int, default=1883)
+    parser.add_argument("--prefijo", default="gds0653")
+    parser.add_argument("--hex", help="decodificar un mensaje en hexadecimal y salir")
+    args = parser.parse_args()
+    if args.hex:
+        print(*a_json(bytes.fromhex(args.hex)))
+        return
+    puente(args.broker, args.puerto, args.prefijo)
+
+
+if __name__ == "__main__":
+    main()